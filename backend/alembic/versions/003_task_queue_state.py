@@ -0,0 +1,24 @@
+"""Live task state
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('task_queue', sa.Column('state', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('task_queue', 'state')
@@ -0,0 +1,108 @@
+"""Job log table and off-row result storage
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+# JSON documents stored as text by earlier models
+EROSION_JSON_COLUMNS = ['input_parameters', 'rusle_comparison_result', 'uncertainty_metrics', 'sensitivity_analysis', 'raw_results']
+
+
+def _to_jsonb(table: str, column: str) -> None:
+    op.alter_column(
+        table, column,
+        type_=postgresql.JSONB(),
+        postgresql_using=f'{column}::jsonb'
+    )
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    postgres = bind.dialect.name == 'postgresql'
+    tables = sa.inspect(bind).get_table_names()
+    
+    op.create_table('job_logs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('job_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('level', sa.String(length=16), nullable=False),
+    sa.Column('message', sa.Text(), nullable=False),
+    sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_job_logs_job_id_id', 'job_logs', ['job_id', 'id'], unique=False)
+    
+    # Existing logs become one line each; the text column goes away
+    op.execute(
+        "INSERT INTO job_logs (job_id, created_at, level, message) "
+        "SELECT id, COALESCE(updated_at, created_at), 'info', logs FROM jobs "
+        "WHERE logs IS NOT NULL AND logs <> ''"
+    )
+    with op.batch_alter_table('jobs') as batch_op:
+        batch_op.drop_column('logs')
+        batch_op.add_column(sa.Column('result_path', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('result_sha256', sa.String(length=64), nullable=True))
+        batch_op.create_index('ix_jobs_result_path', ['result_path'], unique=False)
+    
+    if postgres:
+        for table, column in [('jobs', 'parameters'), ('jobs', 'result'), ('analyses', 'parameters'), ('analyses', 'results')]:
+            _to_jsonb(table, column)
+    
+    # erosion_results is created by init_db rather than by a migration
+    if 'erosion_results' in tables:
+        with op.batch_alter_table('erosion_results') as batch_op:
+            batch_op.add_column(sa.Column('raw_results_path', sa.String(), nullable=True))
+            batch_op.add_column(sa.Column('raw_results_sha256', sa.String(length=64), nullable=True))
+        if postgres:
+            for column in EROSION_JSON_COLUMNS:
+                _to_jsonb('erosion_results', column)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    postgres = bind.dialect.name == 'postgresql'
+    tables = sa.inspect(bind).get_table_names()
+    
+    if 'erosion_results' in tables:
+        if postgres:
+            for column in EROSION_JSON_COLUMNS:
+                op.alter_column('erosion_results', column, type_=sa.String(), postgresql_using=f'{column}::text')
+        with op.batch_alter_table('erosion_results') as batch_op:
+            batch_op.drop_column('raw_results_sha256')
+            batch_op.drop_column('raw_results_path')
+    
+    if postgres:
+        for table, column in [('jobs', 'parameters'), ('jobs', 'result'), ('analyses', 'parameters'), ('analyses', 'results')]:
+            op.alter_column(table, column, type_=sa.JSON(), postgresql_using=f'{column}::json')
+    
+    with op.batch_alter_table('jobs') as batch_op:
+        batch_op.drop_index('ix_jobs_result_path')
+        batch_op.drop_column('result_sha256')
+        batch_op.drop_column('result_path')
+        batch_op.add_column(sa.Column('logs', sa.Text(), nullable=True))
+    
+    # Fold the log lines back into text, in the format append_job_log used to write
+    jobs = sa.table('jobs', sa.column('id', sa.Integer()), sa.column('logs', sa.Text()))
+    lines = {}
+    for job_id, created_at, message in bind.execute(sa.text(
+        "SELECT job_id, created_at, message FROM job_logs ORDER BY job_id, id"
+    )):
+        stamp = created_at.isoformat() if hasattr(created_at, 'isoformat') else created_at
+        lines.setdefault(job_id, []).append(f"[{stamp}] {message}\n")
+    for job_id, job_lines in lines.items():
+        op.execute(jobs.update().where(jobs.c.id == job_id).values(logs="".join(job_lines)))
+    
+    op.drop_index('ix_job_logs_job_id_id', table_name='job_logs')
+    op.drop_table('job_logs')
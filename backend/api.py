@@ -43,6 +43,14 @@ app.include_router(api_router, prefix=settings.API_V1_STR)
 # Mount static files for frontend
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
+@app.on_event("shutdown")
+async def close_database_connections():
+    """Write buffered job updates, then release pooled async database connections"""
+    from db.session import close_async_db
+    from services.job_writer import close_job_update_writer
+    close_job_update_writer()
+    await close_async_db()
+
 @app.get("/")
 async def root():
     """Root endpoint that provides API information."""
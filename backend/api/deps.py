@@ -1,7 +1,9 @@
 from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, WebSocket, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 import sys
 from pathlib import Path
@@ -11,7 +13,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from core.config import settings
 from core.security import verify_token
-from db.session import SessionLocal
+from db.session import SessionLocal, get_async_db
 from models.user import User
 from schemas.user import UserInDB
 
@@ -30,10 +32,13 @@ def get_db() -> Generator:
 
 
 async def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
+    db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)
 ) -> User:
     """
     Dependency to get the current user from JWT token
+    
+    Runs on every authenticated request, so the lookup uses the async
+    session and does not block the event loop.
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -51,7 +56,7 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
     
-    user = db.query(User).filter(User.email == email).first()
+    user = await db.scalar(select(User).where(User.email == email))
     if user is None:
         raise credentials_exception
     return user
@@ -102,3 +107,32 @@ def get_current_user_optional(
     
     user = db.query(User).filter(User.email == email).first()
     return user
+
+
+async def get_websocket_user(websocket: WebSocket, db: AsyncSession = Depends(get_async_db)) -> Optional[User]:
+    """
+    Active user of a WebSocket connection, or None if not authenticated
+    
+    Browsers cannot set headers on WebSocket requests, so the token may also
+    be passed as the ?token= query parameter.
+    """
+    token = websocket.query_params.get("token")
+    if not token:
+        scheme, _, credentials = websocket.headers.get("authorization", "").partition(" ")
+        token = credentials if scheme.lower() == "bearer" else None
+    if not token:
+        return None
+    try:
+        payload = jwt.decode(
+            token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
+        )
+    except JWTError:
+        return None
+    email = payload.get("sub")
+    if email is None:
+        return None
+    
+    user = await db.scalar(select(User).where(User.email == email))
+    if user is None or not user.is_active:
+        return None
+    return user
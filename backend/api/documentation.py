@@ -112,12 +112,15 @@ All responses follow a standard format:
 
 ### Rate Limiting
 
-API endpoints are rate limited to 100 requests per minute per IP.
-Check response headers for rate limit info:
+API endpoints are rate limited to 100 requests per minute per IP, with
+bursts of up to 100. Heavy endpoints cost more of the budget: simulation,
+analysis, pipeline execution and batch submissions count as 10 requests,
+map tiles as 0.1. Check response headers for rate limit info:
 
-- `X-RateLimit-Limit`: Total requests allowed
+- `X-RateLimit-Limit`: Burst size (requests allowed at once)
 - `X-RateLimit-Remaining`: Remaining requests
-- `X-RateLimit-Reset`: Reset timestamp
+- `X-RateLimit-Reset`: Timestamp when the full burst is available again
+- `Retry-After`: Seconds to wait (on 429 responses)
 
 ### Error Codes
 
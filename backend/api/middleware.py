@@ -3,20 +3,29 @@ Middleware components for TerraSim API.
 Handles request/response logging, error handling, and security.
 """
 
+import math
 import time
 import uuid
 import logging
-from typing import Callable, Any
+from typing import Callable, Any, Dict, Optional
 from datetime import datetime
 import json
 
 from fastapi import Request, Response, status
 from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.concurrency import run_in_threadpool
 from starlette.types import ASGIApp
 
+from backend.core.config import settings
 from backend.core.exceptions import TerraSIMException
 from backend.core.validation import ErrorResponse
+from backend.services.rate_limiter import (
+    MemoryRateLimitStore,
+    RateLimiter,
+    RateLimitStore,
+    create_rate_limiter
+)
 
 logger = logging.getLogger(__name__)
 
@@ -178,55 +187,76 @@ class ErrorHandlingMiddleware(BaseHTTPMiddleware):
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
     """
-    Simple rate limiting middleware.
-    Tracks requests per IP address.
+    Rate limiting middleware.
+    Charges each client IP per request with a GCRA token bucket
+    (see services.rate_limiter); heavy routes cost more than reads.
     """
     
-    def __init__(self, app: ASGIApp, requests_per_minute: int = 100):
+    def __init__(
+        self,
+        app: ASGIApp,
+        requests_per_minute: int = 100,
+        burst: Optional[int] = None,
+        store: Optional[RateLimitStore] = None,
+        route_costs: Optional[Dict[str, float]] = None,
+        limiter: Optional[RateLimiter] = None
+    ):
         super().__init__(app)
-        self.requests_per_minute = requests_per_minute
-        self.request_counts: dict = {}  # {ip: [(timestamp, count)]}
+        self.limiter = limiter or RateLimiter(
+            store or MemoryRateLimitStore(),
+            requests_per_minute=requests_per_minute,
+            burst=burst,
+            route_costs=route_costs
+        )
+        self.requests_per_minute = self.limiter.requests_per_minute
     
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
         client_ip = request.client.host if request.client else "unknown"
-        current_time = time.time()
+        cost = self.limiter.cost(request.method, request.url.path)
         
-        # Clean old entries (older than 1 minute)
-        if client_ip in self.request_counts:
-            self.request_counts[client_ip] = [
-                (timestamp, count) for timestamp, count in self.request_counts[client_ip]
-                if current_time - timestamp < 60
-            ]
-        else:
-            self.request_counts[client_ip] = []
+        try:
+            if self.limiter.store.blocking:
+                result = await run_in_threadpool(self.limiter.check, client_ip, cost)
+            else:
+                result = self.limiter.check(client_ip, cost)
+        except Exception as e:
+            # An unavailable shared store must not take the API down with it
+            logger.warning(f"Rate limit check failed, allowing request: {e}")
+            return await call_next(request)
         
-        # Count requests in last minute
-        total_requests = sum(count for _, count in self.request_counts[client_ip])
+        headers = {
+            "X-RateLimit-Limit": str(result.limit),
+            "X-RateLimit-Remaining": str(result.remaining),
+            "X-RateLimit-Reset": str(math.ceil(time.time() + result.reset_after))
+        }
         
-        if total_requests >= self.requests_per_minute:
+        if not result.allowed:
             logger.warning(
                 f"Rate limit exceeded for IP {client_ip}",
-                extra={"client_ip": client_ip, "request_count": total_requests}
+                extra={"client_ip": client_ip, "cost": cost, "retry_after": result.retry_after}
             )
             
             return JSONResponse(
                 status_code=429,
+                headers={**headers, "Retry-After": str(max(1, math.ceil(result.retry_after)))},
                 content={
                     "error": "RATE_LIMIT_EXCEEDED",
                     "message": "Too many requests",
                     "status_code": 429,
                     "details": {
                         "limit": self.requests_per_minute,
-                        "window_seconds": 60
+                        "burst": result.limit,
+                        "cost": cost,
+                        "window_seconds": 60,
+                        "retry_after_seconds": result.retry_after
                     },
                     "timestamp": datetime.now().isoformat()
                 }
             )
         
-        # Add request to count
-        self.request_counts[client_ip].append((current_time, 1))
-        
-        return await call_next(request)
+        response = await call_next(request)
+        response.headers.update(headers)
+        return response
 
 
 def add_middlewares(app: Any) -> None:
@@ -239,7 +269,8 @@ def add_middlewares(app: Any) -> None:
     # Add middlewares in reverse order (they execute bottom-up)
     
     # Rate limiting (outermost)
-    app.add_middleware(RateLimitMiddleware, requests_per_minute=100)
+    if settings.RATE_LIMIT_ENABLED:
+        app.add_middleware(RateLimitMiddleware, limiter=create_rate_limiter())
     
     # Security headers
     app.add_middleware(SecurityHeadersMiddleware)
@@ -4,15 +4,20 @@ TerraSim Modular API
 Fast, modular terrain analysis using domain-based modules.
 """
 
-from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks, Header, Query, Request
+from fastapi.responses import JSONResponse, FileResponse, Response
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Tuple
+import hashlib
 import tempfile
 from pathlib import Path
 import numpy as np
 
 from ..modules.manager import ModuleManager
+from ..modules.visualization import ENGINE_VERSION as VISUALIZATION_VERSION
+from ..services.array_transport import ArrayTransportError, array_response, negotiate_encoding, negotiate_format
+from ..services.compute import ComputeBusy, get_compute_dispatcher
+from ..services.result_cache import etag_for, get_result_cache, if_none_match_status, result_key
 from ..core.logging_config import logger
 
 # Initialize modules
@@ -145,23 +150,111 @@ async def run_erosion_analysis(
 # Visualization Endpoints
 # ============================================================================
 
+def _read_upload(upload: UploadFile) -> Tuple[bytes, str]:
+    """Contents of an upload and their SHA-256 (blocking)"""
+    upload.file.seek(0)
+    contents = upload.file.read()
+    return contents, hashlib.sha256(contents).hexdigest()
+
+
+def _save_upload(contents: bytes, suffix: Optional[str]) -> str:
+    """Write upload contents to a temporary file (blocking); returns its path"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        tmp.write(contents)
+        return tmp.name
+
+
+def _render_heatmap(path: str) -> Tuple[dict, np.ndarray]:
+    """Heatmap visualization of a DEM file as (summary, normalized grid); runs in a worker process"""
+    dem, _ = module_manager.data.load_dem(path)
+    viz = module_manager.visualization.create_visualization(dem)
+    summary = {**viz, 'heatmap': {k: v for k, v in viz['heatmap'].items() if k != 'data'}}
+    return summary, np.asarray(viz['heatmap']['data'])
+
+
+def _heatmap_json(summary: dict, grid: np.ndarray, headers: dict) -> JSONResponse:
+    viz = {**summary, 'heatmap': {**summary['heatmap'], 'data': grid.tolist()}}
+    return JSONResponse({
+        'status': 'success',
+        'visualization': viz,
+    }, headers=headers)
+
+
 @app.post("/api/v2/visualization/heatmap")
-async def create_heatmap(file: UploadFile = File(...)):
-    """Create heatmap visualization from DEM"""
+async def create_heatmap(
+    request: Request,
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, description="json, npy, arrow or msgpack (default: Accept header)"),
+    dtype: Optional[str] = Query(None, description="Output dtype of binary formats, e.g. float32 or float16"),
+    max_size: Optional[int] = Query(None, ge=1, description="Downsample so neither side exceeds this"),
+    resample: Optional[str] = Query(None, pattern="^(mean|nearest)$"),
+    compress: Optional[str] = Query(None, description="zstd, gzip or none (default: Accept-Encoding)"),
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    Create heatmap visualization from DEM
+    
+    The format is chosen by content negotiation (see services.array_transport).
+    JSON returns the visualization with the normalized grid as nested lists;
+    npy, Arrow and msgpack return the grid through array_response, with the
+    title, legend and statistics in its metadata.
+    
+    Results are cached by DEM content; the normalized grid is stored as a
+    compressed array. A matching If-None-Match returns 412 Precondition
+    Failed (this is a POST, so not 304) without rendering. Reading, rendering
+    and encoding run off the event loop.
+    """
+    dispatcher = get_compute_dispatcher()
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file.filename) as tmp:
-            contents = await file.read()
-            tmp.write(contents)
-            tmp_path = tmp.name
+        fmt = negotiate_format(request.headers.get('accept'), format)
+        binary = fmt != 'json'
+        contents, dem_hash = await dispatcher.run_io(_read_upload, file)
+        key = result_key("heatmap", VISUALIZATION_VERSION, {}, dem_hash)
+        # Each representation has its own validator
+        representation = {'format': fmt}
+        if binary:
+            representation.update(
+                dtype=dtype, max_size=max_size, resample=resample,
+                encoding=negotiate_encoding(request.headers.get('accept-encoding'), compress)
+            )
+        representation_key = result_key("heatmap", VISUALIZATION_VERSION, representation, dem_hash)
+        headers = {'ETag': etag_for(representation_key), 'Vary': 'Accept, Accept-Encoding'}
+        status = if_none_match_status(if_none_match, representation_key, request.method)
+        if status is not None:
+            return Response(status_code=status, headers=headers)
         
-        dem, _ = module_manager.data.load_dem(tmp_path)
-        viz = module_manager.visualization.create_visualization(dem)
+        cache = get_result_cache()
+        cached = await dispatcher.run_io(cache.get, key, dem_hash) if cache else None
+        if cached is not None:
+            summary, grid = cached.summary, cached.arrays['heatmap']
+            headers['X-Result-Cache'] = 'hit'
+        else:
+            tmp_path = await dispatcher.run_io(_save_upload, contents, file.filename)
+            summary, grid = await dispatcher.run_cpu(_render_heatmap, tmp_path)
+            if cache:
+                await dispatcher.run_io(cache.put, key, summary, {'heatmap': grid}, input_hash=dem_hash)
+            headers['X-Result-Cache'] = 'miss'
         
-        return JSONResponse({
-            'status': 'success',
-            'visualization': viz,
-        })
+        if binary:
+            return await dispatcher.run_io(
+                array_response,
+                grid,
+                fmt=fmt,
+                accept_encoding=request.headers.get('accept-encoding'),
+                dtype=dtype,
+                max_size=max_size,
+                resample=resample,
+                compress=compress,
+                meta={'visualization': summary},
+                headers=headers
+            )
+        
+        return await dispatcher.run_io(_heatmap_json, summary, grid, headers)
     
+    except ArrayTransportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ComputeBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
     except Exception as e:
         logger.error(f"Visualization error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -23,7 +23,9 @@ from .endpoints import (
     models,
     jobs,
     pipeline,
-    batch_jobs
+    batch_jobs,
+    uploads,
+    tiles
 )
 
 api_router = APIRouter()
@@ -43,7 +45,9 @@ api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(projects.router, prefix="/projects", tags=["projects"])
 api_router.include_router(pointclouds.router, prefix="/pointclouds", tags=["pointclouds"])
 api_router.include_router(rasters.router, prefix="/rasters", tags=["rasters"])
+api_router.include_router(uploads.router, prefix="/uploads", tags=["uploads"])
 api_router.include_router(analysis.router, prefix="/analysis", tags=["analysis"])
+api_router.include_router(tiles.router, prefix="/tiles", tags=["tiles"])
 api_router.include_router(models.router, prefix="/models", tags=["models"])
 api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
 api_router.include_router(batch_jobs.router, prefix="/batch", tags=["batch_processing"])
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, UploadFile, File, Header, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any, Optional
 import sys
@@ -8,12 +9,13 @@ import numpy as np
 # Add backend directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 
-from db.session import get_db
+from db.session import get_async_db, get_db
 from schemas.analysis import AnalysisCreate, AnalysisResult, ErosionAnalysisParameters, ErosionAnalysisResults
 from services.geospatial.analysis import (
     create_analysis,
-    get_analyses,
     get_analysis,
+    get_analyses_async,
+    get_analysis_async,
     run_analysis,
     CorrelationAnalysis,
     RegressionAnalysis,
@@ -21,6 +23,7 @@ from services.geospatial.analysis import (
     UncertaintyQuantification
 )
 from services.erosion_model import (
+    ENGINE_VERSION,
     TerraSIMErosionModel,
     RainfallRunoffCalculator,
     SoilErodibilityCalculator,
@@ -28,6 +31,8 @@ from services.erosion_model import (
     ErosionFactors
 )
 from services.geospatial import DEMProcessor, LandCoverProcessor, SoilDataProcessor
+from services.compute import ComputeBusy, get_compute_dispatcher
+from services.result_cache import etag_for, get_result_cache, if_none_match_status, normalize_params, result_key
 from api.deps import get_current_active_user
 from schemas.user import User
 
@@ -87,17 +92,17 @@ def create_erosion_analysis(
 
 
 @router.get("/", response_model=List[AnalysisResult])
-def list_analyses(
+async def list_analyses(
     skip: int = 0, 
     limit: int = 100,
     project_id: int = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """
     List all analyses for the current user
     """
-    analyses = get_analyses(db, owner_id=current_user.id, skip=skip, limit=limit)
+    analyses = await get_analyses_async(db, owner_id=current_user.id, skip=skip, limit=limit)
     
     # Filter by project if specified
     if project_id is not None:
@@ -107,15 +112,15 @@ def list_analyses(
 
 
 @router.get("/{analysis_id}", response_model=AnalysisResult)
-def get_analysis_by_id(
+async def get_analysis_by_id(
     analysis_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """
     Get analysis by ID
     """
-    analysis = get_analysis(db, analysis_id=analysis_id)
+    analysis = await get_analysis_async(db, analysis_id=analysis_id)
     if not analysis:
         raise HTTPException(status_code=404, detail="Analysis not found")
     if analysis.owner_id != current_user.id and not current_user.is_superuser:
@@ -124,15 +129,15 @@ def get_analysis_by_id(
 
 
 @router.get("/{analysis_id}/results")
-def get_analysis_results(
+async def get_analysis_results(
     analysis_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """
     Get detailed analysis results
     """
-    analysis = get_analysis(db, analysis_id=analysis_id)
+    analysis = await get_analysis_async(db, analysis_id=analysis_id)
     if not analysis:
         raise HTTPException(status_code=404, detail="Analysis not found")
     if analysis.owner_id != current_user.id and not current_user.is_superuser:
@@ -181,8 +186,10 @@ def rerun_analysis(
 @router.post("/erosion-simulation", response_model=Dict[str, Any])
 async def run_erosion_simulation(
     parameters: ErosionAnalysisParameters,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
+    if_none_match: Optional[str] = Header(None),
 ) -> Dict[str, Any]:
     """
     Run TerraSim erosion simulation with USPED-based model.
@@ -192,77 +199,40 @@ async def run_erosion_simulation(
     - Sediment transport calculation
     - Erosion-deposition prediction
     - RUSLE comparison
+    
+    Results are cached by parameters; a matching If-None-Match returns 412
+    Precondition Failed (this is a POST, so not 304) without recording a
+    new analysis.
     """
+    dispatcher = get_compute_dispatcher()
     try:
-        # Initialize model components
-        model = TerraSIMErosionModel(SoilModelParameters())
-        rainfall_calc = RainfallRunoffCalculator()
-        soil_calc = SoilErodibilityCalculator()
-        
-        # Compute rainfall erosivity
-        R = rainfall_calc.compute_rainfall_erosivity(
-            parameters.annual_rainfall,
-            parameters.max_daily_rainfall
-        )
-        
-        # Compute runoff using SCS-CN method
-        CN = rainfall_calc.get_curve_number(
-            parameters.land_use,
-            parameters.soil_group
-        )
-        Q = rainfall_calc.compute_runoff(parameters.annual_rainfall, CN)
-        
-        # Compute soil erodibility
-        K = soil_calc.compute_K_factor(
-            parameters.sand_percent,
-            parameters.silt_percent,
-            parameters.clay_percent,
-            parameters.organic_matter_percent
-        )
-        
-        # Create erosion factors
-        slope_rad = np.radians(parameters.slope)
-        factors = ErosionFactors(
-            R=R,
-            K=K,
-            C=parameters.C_factor,
-            P=parameters.P_factor,
-            LS=parameters.LS_factor,
-            A=parameters.contributing_area,
-            beta=slope_rad,
-            Q=Q
-        )
+        key = result_key("erosion_simulation", ENGINE_VERSION, normalize_params(parameters))
+        status = if_none_match_status(if_none_match, key, "POST")
+        if status is not None:
+            return Response(status_code=status, headers={"ETag": etag_for(key)})
         
-        # Compute sediment transport
-        T = model.compute_sediment_transport(factors)
-        
-        # Compute RUSLE
-        rusle_result = model.compute_rusle_comparison(factors)
-        
-        # Classify risk
-        annual_soil_loss = rusle_result['annual_soil_loss_Mg_ha']
-        risk_class = model.classify_erosion_risk(annual_soil_loss)
+        cache = get_result_cache()
+        cached = await dispatcher.run_io(cache.get, key) if cache else None
+        if cached is not None:
+            result = cached.summary
+        else:
+            result = await dispatcher.run_cpu(_compute_erosion_simulation, parameters)
+            if cache:
+                await dispatcher.run_io(cache.put, key, result)
+        response.headers["ETag"] = etag_for(key)
+        response.headers["X-Result-Cache"] = "hit" if cached is not None else "miss"
         
         # Store analysis result
-        analysis = create_analysis(
+        analysis = await dispatcher.run_io(
+            create_analysis,
             db=db,
             analysis=parameters,
             owner_id=current_user.id
         )
         
-        result = {
-            'analysis_id': analysis.id,
-            'sediment_transport': float(T),
-            'rainfall_erosivity_R': R,
-            'soil_erodibility_K': K,
-            'runoff_depth_mm': Q,
-            'curve_number': CN,
-            'rusle_results': rusle_result,
-            'risk_classification': risk_class,
-            'status': 'completed'
-        }
-        
-        return result
+        return {'analysis_id': analysis.id, **result, 'status': 'completed'}
+    except ComputeBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Simulation error: {str(e)}")
 
@@ -280,16 +250,9 @@ async def compare_with_rusle(
     Tests hypothesis Ha1: TerraSim predictions are consistent with RUSLE
     """
     try:
-        validator = ModelValidation()
-        
-        # Convert to numpy arrays
-        ts_vals = np.array(terrasim_values)
-        rusle_vals = np.array(rusle_values)
-        
-        # Perform comparison
-        comparison = validator.compare_with_rusle(ts_vals, rusle_vals)
-        
-        return comparison
+        return await get_compute_dispatcher().run_cpu(_compare_with_rusle, terrasim_values, rusle_values)
+    except ComputeBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Comparison error: {str(e)}")
 
@@ -307,20 +270,15 @@ async def analyze_factor_correlations(
     Computes Pearson correlation coefficients and significance tests.
     """
     try:
-        analyzer = CorrelationAnalysis()
-        
-        # Convert to numpy arrays
-        erosion_arr = np.array(erosion_values)
-        factor_arrays = {name: np.array(vals) for name, vals in factors.items()}
-        
-        # Perform correlation analysis
-        results = analyzer.analyze_factor_relationships(factor_arrays, erosion_arr)
+        results = await get_compute_dispatcher().run_cpu(_analyze_correlations, factors, erosion_values)
         
         return {
             'correlations': results,
-            'n_samples': len(erosion_arr),
+            'n_samples': len(erosion_values),
             'analysis_date': '2026-01-24'
         }
+    except ComputeBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analysis error: {str(e)}")
 
@@ -338,13 +296,7 @@ async def analyze_uncertainty(
     Identifies extreme erosion events under high-rainfall scenarios.
     """
     try:
-        quantifier = UncertaintyQuantification()
-        
-        erosion_arr = np.array(erosion_values)
-        
-        # Compute VaR/CVaR at different confidence levels
-        var_95 = quantifier.compute_var_cvar(erosion_arr, 0.95)
-        var_99 = quantifier.compute_var_cvar(erosion_arr, 0.99)
+        var_95, var_99 = await get_compute_dispatcher().run_cpu(_compute_var_cvar, erosion_values)
         
         return {
             'var_95_percent': var_95,
@@ -352,6 +304,8 @@ async def analyze_uncertainty(
             'rainfall_scenarios': rainfall_scenarios,
             'interpretation': 'Erosion risk analysis under extreme conditions'
         }
+    except ComputeBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Uncertainty analysis error: {str(e)}")
 
@@ -368,31 +322,14 @@ async def analyze_sensitivity(
     Identifies which environmental factors have the greatest impact on erosion.
     """
     try:
-        quantifier = UncertaintyQuantification()
-        model = TerraSIMErosionModel(SoilModelParameters())
-        
-        # Define erosion function
-        def erosion_function(params):
-            slope_rad = np.radians(params.get('slope', 15))
-            factors = ErosionFactors(
-                R=params.get('R', 100),
-                K=params.get('K', 0.2),
-                C=params.get('C', 0.3),
-                P=params.get('P', 1.0),
-                LS=params.get('LS', 2.0),
-                A=params.get('A', 1000),
-                beta=slope_rad,
-                Q=params.get('Q', 50)
-            )
-            return model.compute_sediment_transport(factors)
-        
-        # Perform sensitivity analysis
-        sensitivity = quantifier.sensitivity_analysis(base_parameters, erosion_function)
+        sensitivity = await get_compute_dispatcher().run_cpu(_analyze_sensitivity, base_parameters)
         
         return {
             'sensitivity_results': sensitivity,
             'interpretation': 'Parameter sensitivity indices (higher = more sensitive)'
         }
+    except ComputeBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Sensitivity analysis error: {str(e)}")
 
@@ -417,3 +354,110 @@ def delete_analysis_by_id(
     if not success:
         raise HTTPException(status_code=500, detail="Failed to delete analysis")
     return {"message": "Analysis deleted successfully"}
+
+
+# ============================================================================
+# COMPUTE TASKS
+# ============================================================================
+# Module-level so the compute dispatcher can run them in worker processes
+
+def _compute_erosion_simulation(parameters: ErosionAnalysisParameters) -> Dict[str, Any]:
+    """USPED sediment transport, RUSLE comparison and risk class for one scenario"""
+    # Initialize model components
+    model = TerraSIMErosionModel(SoilModelParameters())
+    rainfall_calc = RainfallRunoffCalculator()
+    soil_calc = SoilErodibilityCalculator()
+    
+    # Compute rainfall erosivity
+    R = rainfall_calc.compute_rainfall_erosivity(
+        parameters.annual_rainfall,
+        parameters.max_daily_rainfall
+    )
+    
+    # Compute runoff using SCS-CN method
+    CN = rainfall_calc.get_curve_number(
+        parameters.land_use,
+        parameters.soil_group
+    )
+    Q = rainfall_calc.compute_runoff(parameters.annual_rainfall, CN)
+    
+    # Compute soil erodibility
+    K = soil_calc.compute_K_factor(
+        parameters.sand_percent,
+        parameters.silt_percent,
+        parameters.clay_percent,
+        parameters.organic_matter_percent
+    )
+    
+    # Create erosion factors
+    slope_rad = np.radians(parameters.slope)
+    factors = ErosionFactors(
+        R=R,
+        K=K,
+        C=parameters.C_factor,
+        P=parameters.P_factor,
+        LS=parameters.LS_factor,
+        A=parameters.contributing_area,
+        beta=slope_rad,
+        Q=Q
+    )
+    
+    # Compute sediment transport
+    T = model.compute_sediment_transport(factors)
+    
+    # Compute RUSLE
+    rusle_result = model.compute_rusle_comparison(factors)
+    
+    # Classify risk
+    annual_soil_loss = rusle_result['annual_soil_loss_Mg_ha']
+    risk_class = model.classify_erosion_risk(annual_soil_loss)
+    
+    return {
+        'sediment_transport': float(T),
+        'rainfall_erosivity_R': R,
+        'soil_erodibility_K': K,
+        'runoff_depth_mm': Q,
+        'curve_number': CN,
+        'rusle_results': rusle_result,
+        'risk_classification': risk_class
+    }
+
+
+def _compare_with_rusle(terrasim_values: List[float], rusle_values: List[float]) -> Dict[str, Any]:
+    validator = ModelValidation()
+    return validator.compare_with_rusle(np.array(terrasim_values), np.array(rusle_values))
+
+
+def _analyze_correlations(factors: Dict[str, List[float]], erosion_values: List[float]) -> Dict[str, Any]:
+    analyzer = CorrelationAnalysis()
+    factor_arrays = {name: np.array(vals) for name, vals in factors.items()}
+    return analyzer.analyze_factor_relationships(factor_arrays, np.array(erosion_values))
+
+
+def _compute_var_cvar(erosion_values: List[float]):
+    """VaR/CVaR at the 95% and 99% confidence levels"""
+    quantifier = UncertaintyQuantification()
+    erosion_arr = np.array(erosion_values)
+    return quantifier.compute_var_cvar(erosion_arr, 0.95), quantifier.compute_var_cvar(erosion_arr, 0.99)
+
+
+def _sediment_transport_for(params: Dict[str, float]) -> float:
+    """Sediment transport for a parameter set, with defaults for missing factors"""
+    model = TerraSIMErosionModel(SoilModelParameters())
+    slope_rad = np.radians(params.get('slope', 15))
+    factors = ErosionFactors(
+        R=params.get('R', 100),
+        K=params.get('K', 0.2),
+        C=params.get('C', 0.3),
+        P=params.get('P', 1.0),
+        LS=params.get('LS', 2.0),
+        A=params.get('A', 1000),
+        beta=slope_rad,
+        Q=params.get('Q', 50)
+    )
+    return model.compute_sediment_transport(factors)
+
+
+def _analyze_sensitivity(base_parameters: Dict[str, float]) -> Dict[str, Any]:
+    quantifier = UncertaintyQuantification()
+    return quantifier.sensitivity_analysis(base_parameters, _sediment_transport_for)
@@ -3,9 +3,11 @@ Batch Job Processing API Endpoints
 Endpoints for submitting and managing multiple concurrent jobs
 """
 
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Header, Query
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any, Optional
+import hashlib
+import uuid
 import sys
 from pathlib import Path
 
@@ -18,8 +20,10 @@ from schemas.user import User
 from services.worker_pool import (
     get_worker_pool,
     get_batch_manager,
-    submit_parallel_simulations
+    submit_parallel_simulations,
+    WorkerPoolFull
 )
+from services.task_queue import get_task_handler
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -45,6 +49,7 @@ class WorkerStats(BaseModel):
     queued_jobs: int
     total_jobs: int
     worker_type: str
+    max_queue_size: Optional[int] = None
 
 
 class BatchStatus(BaseModel):
@@ -53,6 +58,7 @@ class BatchStatus(BaseModel):
     total_jobs: int
     completed: int
     failed: int
+    cancelled: int = 0
     running: int
     queued: int
     progress_percent: int
@@ -86,6 +92,51 @@ def list_active_jobs(
     }
 
 
+@router.get("/compute/stats")
+def get_compute_statistics():
+    """Concurrency and queue-time metrics of the endpoint compute pools"""
+    from services.compute import get_compute_dispatcher
+    return get_compute_dispatcher().stats()
+
+
+@router.get("/results-cache/stats")
+def get_result_cache_statistics():
+    """Size and hit rate of the simulation result cache"""
+    from services.result_cache import get_result_cache
+    cache = get_result_cache()
+    return cache.stats() if cache else {"enabled": False}
+
+
+@router.get("/tiles-cache/stats")
+def get_tile_cache_statistics():
+    """Size and hit rate of the map tile cache"""
+    from services.tiles import get_tile_cache
+    cache = get_tile_cache()
+    return cache.stats() if cache else {"enabled": False}
+
+
+@router.get("/db/stats")
+def get_database_pool_statistics():
+    """
+    Connections in use, peak, checkouts and wait times of the database pools,
+    and the commit savings of the buffered job update writer
+    """
+    from db.session import pool_stats
+    from services.job_writer import get_job_update_writer
+    
+    stats = pool_stats()
+    writer = get_job_update_writer()
+    stats["job_update_writer"] = writer.stats() if writer else None
+    return stats
+
+
+@router.get("/events/stats")
+def get_progress_event_statistics():
+    """Channels, live subscribers and throttling of the progress event bus"""
+    from services.progress_events import get_progress_bus
+    return get_progress_bus().stats()
+
+
 # ============================================================================
 # BATCH JOB SUBMISSION
 # ============================================================================
@@ -93,29 +144,38 @@ def list_active_jobs(
 @router.post("/batch/submit", response_model=Dict[str, Any])
 def submit_batch_jobs(
     batch: BatchSubmission,
+    idempotency_key: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Submit a batch of jobs for parallel execution
     
+    When the durable task queue is enabled, jobs are persisted and survive
+    restarts. Retrying a request with the same Idempotency-Key header
+    returns the original batch instead of submitting it again.
+    
+    Durable jobs name their input by ID (dem_id for erosion_simulation,
+    pointcloud_id for pointcloud_processing); the input must belong to
+    the caller, and file paths are resolved on the server.
+    
     Example:
     {
         "batch_name": "erosion_scenario_analysis",
         "jobs": [
             {
                 "task_type": "erosion_simulation",
-                "parameters": {"rainfall": 100, "cover_factor": 0.5},
+                "parameters": {"dem_id": 1, "parameters": {"rainfall_erosivity": 100, "cover_factor": 0.5}},
                 "priority": 0
             },
             {
                 "task_type": "erosion_simulation",
-                "parameters": {"rainfall": 150, "cover_factor": 0.5},
+                "parameters": {"dem_id": 1, "parameters": {"rainfall_erosivity": 150, "cover_factor": 0.5}},
                 "priority": 1
             },
             {
-                "task_type": "erosion_simulation",
-                "parameters": {"rainfall": 200, "cover_factor": 0.5},
+                "task_type": "pointcloud_processing",
+                "parameters": {"pointcloud_id": 3, "config": {"resolution": 1.0}},
                 "priority": 2
             }
         ]
@@ -123,6 +183,24 @@ def submit_batch_jobs(
     """
     batch_manager = get_batch_manager()
     
+    if idempotency_key:
+        key_hash = hashlib.sha256(f"{current_user.id}:{idempotency_key}".encode()).hexdigest()[:16]
+        batch_id = f"batch_{current_user.id}_{key_hash}"
+    else:
+        batch_id = f"batch_{current_user.id}_{uuid.uuid4().hex[:12]}"
+    
+    if batch_manager.task_queue is not None:
+        job_configs = []
+        for idx, job in enumerate(batch.jobs):
+            job_configs.append({
+                "task_type": job.task_type,
+                "payload": _durable_payload(db, job, current_user),
+                "priority": job.priority,
+                "idempotency_key": f"{batch_id}:{idx}" if idempotency_key else None,
+                "owner_id": current_user.id
+            })
+        return batch_manager.submit_batch(batch_id=batch_id, jobs=job_configs)
+    
     # Convert job submissions to job configs
     job_configs = []
     for job in batch.jobs:
@@ -142,10 +220,14 @@ def submit_batch_jobs(
         job_configs.append(job_config)
     
     # Submit batch
-    result = batch_manager.submit_batch(
-        batch_id=f"batch_{current_user.id}_{len(batch.jobs)}_jobs",
-        jobs=job_configs
-    )
+    try:
+        result = batch_manager.submit_batch(
+            batch_id=batch_id,
+            jobs=job_configs,
+            owner_id=current_user.id
+        )
+    except WorkerPoolFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
     
     return result
 
@@ -158,6 +240,7 @@ def get_batch_status(
 ):
     """Get status of a batch"""
     batch_manager = get_batch_manager()
+    _authorize_batch(batch_id, current_user)
     
     status = batch_manager.get_batch_status(batch_id)
     if not status:
@@ -166,6 +249,36 @@ def get_batch_status(
     return BatchStatus(**status)
 
 
+@router.get("/batch/{batch_id}/events")
+def stream_batch_events(
+    batch_id: str,
+    last_event_id: Optional[str] = Query(None, description="Resume after this event ID"),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Stream progress and status events of every job in a batch (text/event-stream)
+    
+    The stream ends with a batch status event once all jobs have finished.
+    """
+    from services.progress_events import event_stream_response
+    
+    batch_manager = get_batch_manager()
+    _authorize_batch(batch_id, current_user)
+    
+    def poll() -> Optional[Dict[str, Any]]:
+        status = batch_manager.get_batch_status(batch_id)
+        if not status:
+            return None
+        finished = status["completed"] + status["failed"] + status["cancelled"]
+        return {
+            "status": "completed" if finished == status["total_jobs"] else "running",
+            "progress": status["progress_percent"]
+        }
+    
+    return event_stream_response(batch_id, last_event_id_header or last_event_id, poll=poll)
+
+
 # ============================================================================
 # PARALLEL SIMULATIONS
 # ============================================================================
@@ -207,11 +320,15 @@ def submit_parallel_simulations_endpoint(
         raise HTTPException(status_code=400, detail=f"Failed to load DEM: {str(e)}")
     
     # Submit parallel simulations
-    batch_id = submit_parallel_simulations(
-        db=db,
-        dem_data=dem_data,
-        parameters_list=scenario_parameters
-    )
+    try:
+        batch_id = submit_parallel_simulations(
+            db=db,
+            dem_data=dem_data,
+            parameters_list=scenario_parameters,
+            owner_id=current_user.id
+        )
+    except WorkerPoolFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
     
     return {
         "batch_id": batch_id,
@@ -232,17 +349,30 @@ def cancel_job(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Cancel a queued job"""
+    """Cancel a queued job, or request cancellation of a running one"""
+    task_queue = get_batch_manager().task_queue
+    if task_queue is not None and job_id.startswith("task_"):
+        task_id = _authorize_task(job_id, current_user)
+        if not task_queue.cancel(task_id):
+            raise HTTPException(
+                status_code=400,
+                detail="Job cannot be cancelled (either not found or already finished)"
+            )
+        task = task_queue.get(task_id)
+        status = "cancelling" if task["status"] == "running" else task["status"]
+        return {"status": status, "job_id": job_id}
+    
     pool = get_worker_pool()
     
     success = pool.cancel_job(job_id)
     if not success:
         raise HTTPException(
             status_code=400,
-            detail="Job cannot be cancelled (either not found or already running)"
+            detail="Job cannot be cancelled (either not found or already finished)"
         )
     
-    return {"status": "cancelled", "job_id": job_id}
+    status = pool.get_job_status(job_id)
+    return {"status": status["status"], "job_id": job_id}
 
 
 @router.get("/jobs/{job_id}/status")
@@ -252,9 +382,9 @@ def get_job_status(
     current_user: User = Depends(get_current_active_user)
 ):
     """Get status of a specific job"""
-    pool = get_worker_pool()
-    
-    status = pool.get_job_status(job_id)
+    if get_batch_manager().task_queue is not None and job_id.startswith("task_"):
+        _authorize_task(job_id, current_user)
+    status = _job_status(job_id)
     if not status:
         raise HTTPException(status_code=404, detail="Job not found")
     
@@ -264,10 +394,123 @@ def get_job_status(
     }
 
 
+@router.get("/jobs/{job_id}/events")
+def stream_job_events(
+    job_id: str,
+    last_event_id: Optional[str] = Query(None, description="Resume after this event ID"),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Stream progress and status events of a pool or durable job (text/event-stream)
+    
+    Reconnecting clients resume from the Last-Event-ID header; the stream
+    ends after the final status.
+    """
+    from services.progress_events import event_stream_response
+    
+    if get_batch_manager().task_queue is not None and job_id.startswith("task_"):
+        _authorize_task(job_id, current_user)
+    if not _job_status(job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return event_stream_response(
+        job_id, last_event_id_header or last_event_id, poll=lambda: _job_status(job_id)
+    )
+
+
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
 
+def _job_status(job_id: str) -> Optional[Dict[str, Any]]:
+    """Status of a durable task (task_<id>) or of a worker pool job"""
+    task_queue = get_batch_manager().task_queue
+    if task_queue is not None and job_id.startswith("task_"):
+        return task_queue.get(_parse_task_id(job_id))
+    return get_worker_pool().get_job_status(job_id)
+
+
+# Durable task types clients may submit, with the parameters each accepts.
+# Handlers take file paths, so those are never taken from the request.
+BATCH_TASK_PARAMETERS = {
+    "erosion_simulation": {"dem_id", "parameters"},
+    "pointcloud_processing": {"pointcloud_id", "config"},
+}
+
+
+def _durable_payload(db: Session, job: JobSubmission, current_user: User) -> Dict[str, Any]:
+    """Task payload of a durable batch job, with input paths resolved from the caller's own data"""
+    from core.config import settings
+    from services.geospatial import get_pointcloud, get_raster
+    
+    allowed = BATCH_TASK_PARAMETERS.get(job.task_type)
+    if allowed is None or get_task_handler(job.task_type) is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown task type: {job.task_type}"
+        )
+    unexpected = sorted(set(job.parameters) - allowed)
+    if unexpected:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unexpected parameters for {job.task_type}: {', '.join(unexpected)}"
+        )
+    
+    id_name = "dem_id" if job.task_type == "erosion_simulation" else "pointcloud_id"
+    input_id = job.parameters.get(id_name)
+    if not isinstance(input_id, int) or isinstance(input_id, bool):
+        raise HTTPException(status_code=400, detail=f"{job.task_type} requires an integer {id_name}")
+    
+    if job.task_type == "erosion_simulation":
+        raster = get_raster(db, raster_id=input_id)
+        if not raster:
+            raise HTTPException(status_code=404, detail="DEM not found")
+        if raster.owner_id != current_user.id and not current_user.is_superuser:
+            raise HTTPException(status_code=403, detail="Not enough permissions")
+        return {"dem_path": raster.file_path, "parameters": job.parameters.get("parameters")}
+    
+    pointcloud = get_pointcloud(db, pointcloud_id=input_id)
+    if not pointcloud:
+        raise HTTPException(status_code=404, detail="Point cloud not found")
+    if pointcloud.owner_id != current_user.id and not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    return {
+        "file_path": pointcloud.file_path,
+        "output_dir": f"{settings.LOCAL_STORAGE_PATH}/outputs/pointclouds/{pointcloud.id}",
+        "config": job.parameters.get("config")
+    }
+
+
+def _authorize_task(job_id: str, current_user: User) -> int:
+    """Task ID of a durable job; 404 if unknown, 403 if it is another user's"""
+    task_id = _parse_task_id(job_id)
+    task = get_batch_manager().task_queue.get(task_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if task["owner_id"] != current_user.id and not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    return task_id
+
+
+def _authorize_batch(batch_id: str, current_user: User):
+    """Raise 404 for an unknown batch, 403 for another user's"""
+    batch_manager = get_batch_manager()
+    if not batch_manager.get_batch_status(batch_id):
+        raise HTTPException(status_code=404, detail="Batch not found")
+    owner_id = batch_manager.get_batch_owner(batch_id)
+    if owner_id != current_user.id and not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+
+def _parse_task_id(job_id: str) -> int:
+    """Durable job IDs have the form task_<id>"""
+    try:
+        return int(job_id[len("task_"):])
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+
 def _get_task_function(task_type: str):
     """Map task type to actual function"""
     from backend.services.simulation_engine import get_simulation_engine
@@ -1,38 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, WebSocket
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, List, Optional
+import logging
 import sys
 from pathlib import Path
 
 # Add backend directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 
-from db.session import get_db
-from schemas.job import Job, JobStatus
+from db.session import get_async_db
+from schemas.job import Job, JobLogEntry, JobStatus, JobSummary, JobUpdate
 from services.job_service import (
-    get_jobs,
-    get_job,
+    get_jobs_async,
+    get_job_async,
+    get_job_logs_async,
+    format_job_logs,
+    update_job_async,
     cancel_job,
     get_job_status
 )
-from api.deps import get_current_active_user
+from api.deps import get_current_active_user, get_websocket_user
 from schemas.user import User
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 
-@router.get("/", response_model=List[Job])
-def list_jobs(
+@router.get("/", response_model=List[JobSummary])
+async def list_jobs(
     skip: int = 0, 
     limit: int = 100,
     status: str = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """
-    List all jobs for the current user
+    List all jobs for the current user (without their results)
     """
-    jobs = get_jobs(db, owner_id=current_user.id, skip=skip, limit=limit)
+    jobs = await get_jobs_async(db, owner_id=current_user.id, skip=skip, limit=limit)
     
     # Filter by status if specified
     if status is not None:
@@ -42,15 +48,18 @@ def list_jobs(
 
 
 @router.get("/{job_id}", response_model=Job)
-def get_job_by_id(
+async def get_job_by_id(
     job_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """
     Get job by ID
+    
+    Large result arrays appear as {"$array": name, "shape", "dtype"}
+    references; fetch them from /{job_id}/result/arrays/{name}.
     """
-    job = get_job(db, job_id=job_id)
+    job = await get_job_async(db, job_id=job_id, with_result=True)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     if job.owner_id != current_user.id and not current_user.is_superuser:
@@ -59,15 +68,15 @@ def get_job_by_id(
 
 
 @router.get("/{job_id}/status", response_model=JobStatus)
-def check_job_status(
+async def check_job_status(
     job_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """
     Check the status of a job
     """
-    job = get_job(db, job_id=job_id)
+    job = await get_job_async(db, job_id=job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     if job.owner_id != current_user.id and not current_user.is_superuser:
@@ -80,15 +89,15 @@ def check_job_status(
 
 
 @router.post("/{job_id}/cancel")
-def cancel_job_by_id(
+async def cancel_job_by_id(
     job_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """
     Cancel a running job
     """
-    job = get_job(db, job_id=job_id)
+    job = await get_job_async(db, job_id=job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     if job.owner_id != current_user.id and not current_user.is_superuser:
@@ -102,25 +111,159 @@ def cancel_job_by_id(
         raise HTTPException(status_code=400, detail="Failed to cancel job")
     
     # Update job status in database
-    from services.job_service import update_job
-    update_job(db, job_id, {"status": "cancelled"})
+    await update_job_async(db, job_id, JobUpdate(status="cancelled"))
     
     return {"status": "cancelled"}
 
 
 @router.get("/{job_id}/logs")
-def get_job_logs(
+async def get_job_logs(
     job_id: str,
-    db: Session = Depends(get_db),
+    after: Optional[int] = Query(None, description="Only log lines after this line ID"),
+    limit: int = Query(1000, ge=1, le=10000),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """
     Get job logs
+    
+    To follow a running job, pass the returned last_id as after.
+    """
+    job = await get_job_async(db, job_id=job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.owner_id != current_user.id and not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    entries = await get_job_logs_async(db, job_id, after_id=after, limit=limit)
+    return {
+        "job_id": job_id,
+        "logs": format_job_logs(entries),
+        "entries": [JobLogEntry.model_validate(entry) for entry in entries],
+        "last_id": entries[-1].id if entries else after
+    }
+
+
+@router.get("/{job_id}/result/arrays/{name}")
+async def get_job_result_array(
+    job_id: str,
+    name: str,
+    request: Request,
+    format: Optional[str] = Query(None, description="json, npy, arrow or msgpack (default: Accept header)"),
+    dtype: Optional[str] = Query(None, description="Output dtype, e.g. float32, float16 or uint8"),
+    max_size: Optional[int] = Query(None, ge=1, description="Downsample so neither side exceeds this"),
+    resample: Optional[str] = Query(None, pattern="^(mean|nearest)$"),
+    compress: Optional[str] = Query(None, description="zstd, gzip or none (default: Accept-Encoding)"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    Get an array of a job's result, by the name in its {"$array": name} reference
+    
+    Encoded by content negotiation like the pipeline result grids (see
+    services.array_transport).
+    """
+    from services.array_transport import ArrayTransportError, array_response
+    from services.compute import ComputeBusy, get_compute_dispatcher
+    from services.result_store import ResultStoreError, load_array
+    
+    job = await get_job_async(db, job_id=job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.owner_id != current_user.id and not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    if not job.result_path:
+        raise HTTPException(status_code=404, detail="Job has no stored result arrays")
+    
+    path, sha256 = job.result_path, job.result_sha256
+    
+    def encode():
+        return array_response(
+            load_array(path, name, sha256),
+            accept=request.headers.get("accept"),
+            accept_encoding=request.headers.get("accept-encoding"),
+            fmt=format,
+            dtype=dtype,
+            max_size=max_size,
+            resample=resample,
+            compress=compress,
+            meta={"job_id": job_id, "array": name},
+            headers={"ETag": f'"{sha256[:32]}-{name}"'} if sha256 else None
+        )
+    
+    try:
+        return await get_compute_dispatcher().run_io(encode)
+    except ResultStoreError as e:
+        logger.warning(f"Result array {name} of job {job_id} unavailable: {e}")
+        raise HTTPException(status_code=404, detail=f"Result array '{name}' not found")
+    except ArrayTransportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ComputeBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+
+
+def _poll_job(job_id: str):
+    """Status of a job from the database, for streams of jobs run elsewhere"""
+    def poll() -> Optional[Dict[str, Any]]:
+        from db.session import get_db_session
+        from services.job_service import get_job
+        
+        with get_db_session() as db:
+            job = get_job(db, job_id=job_id)
+            if not job:
+                return None
+            return {"status": job.status, "progress": job.progress}
+    return poll
+
+
+@router.get("/{job_id}/events")
+async def stream_job_events(
+    job_id: str,
+    last_event_id: Optional[str] = Query(None, description="Resume after this event ID"),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    Stream job progress, status and log events (text/event-stream)
+    
+    Replaces polling the status endpoint. Reconnecting clients resume from
+    the Last-Event-ID header; the stream ends after the final status.
     """
-    job = get_job(db, job_id=job_id)
+    from services.progress_events import event_stream_response
+    
+    job = await get_job_async(db, job_id=job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     if job.owner_id != current_user.id and not current_user.is_superuser:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    return {"job_id": job_id, "logs": job.logs or ""}
+    # Don't hold a connection for the lifetime of the stream
+    await db.close()
+    return event_stream_response(job_id, last_event_id_header or last_event_id, poll=_poll_job(job_id))
+
+
+@router.websocket("/{job_id}/ws")
+async def job_events_websocket(
+    websocket: WebSocket,
+    job_id: str,
+    last_event_id: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Optional[User] = Depends(get_websocket_user),
+):
+    """
+    Job progress, status and log events as WebSocket JSON messages
+    
+    Authenticate with the ?token= query parameter; resume with ?last_event_id=.
+    """
+    from services.progress_events import stream_to_websocket
+    
+    job = await get_job_async(db, job_id=job_id)
+    if current_user is None or not job or (job.owner_id != current_user.id and not current_user.is_superuser):
+        # Policy violation: unknown job or not allowed to see it
+        await websocket.close(code=1008)
+        return
+    
+    await db.close()
+    await websocket.accept()
+    await stream_to_websocket(websocket, job_id, last_event_id, poll=_poll_job(job_id))
@@ -13,16 +13,33 @@ API endpoints following the application flow:
 This router implements the complete processing pipeline as REST endpoints.
 """
 
-from fastapi import APIRouter, HTTPException, UploadFile, File, Depends, BackgroundTasks
+from fastapi import APIRouter, HTTPException, UploadFile, File, Depends, BackgroundTasks, Header, Query, Request
+from sqlalchemy.orm import Session
 from typing import Dict, Any, Optional, List
 import logging
+import numpy as np
 from datetime import datetime
 
+from db.session import get_db
+from api.deps import get_current_active_user
+from schemas.user import User
+from core.config import settings
+from services.pipeline import RESULT_GRIDS, PipelineInput, PipelineStage, get_pipeline_manager
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/pipeline", tags=["pipeline"])
 
 
+def authorize_pipeline(pipeline_id: str, current_user: User):
+    """Raise 404 for an unknown pipeline, 403 for another user's"""
+    owner_id = get_pipeline_manager().get_job_owner(pipeline_id)
+    if owner_id is None:
+        raise HTTPException(status_code=404, detail="Pipeline not found")
+    if owner_id != current_user.id and not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+
 # ============================================================================
 # STAGE 1: INPUT COLLECTION - Gather user parameters and files
 # ============================================================================
@@ -61,32 +78,63 @@ async def collect_input(
 async def upload_dem(
     project_id: int,
     file: UploadFile = File(...),
-    input_id: Optional[str] = None
+    input_id: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
 ) -> Dict[str, Any]:
     """
     Stage 2a: Upload Digital Elevation Model (DEM)
     
+    The file is streamed to disk in chunks and validated by opening its
+    header; large DEMs can also be sent through the resumable /uploads/
+    endpoints with data_type "dem".
+    
     Accepts:
     - project_id: Project identifier
     - file: GeoTIFF DEM file
     - input_id: Input collection identifier
     
     Returns:
-    - dem_id: DEM file identifier
+    - dem_id: Raster ID of the DEM, accepted by /execute/complete
     - file_name: Original file name
     - file_size: File size in bytes
+    - sha256: Content hash of the file
     - spatial_info: Spatial information (CRS, bounds)
     """
+    from services.geospatial import register_uploaded_raster
+    from services.uploads import UploadError, UploadTooLarge, receive_upload
+    
+    try:
+        stored, header = await receive_upload(file, "raster")
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    raster = register_uploaded_raster(
+        db,
+        file_path=stored.path,
+        owner_id=current_user.id,
+        header=header,
+        original_filename=stored.filename,
+        file_size=stored.size,
+        sha256=stored.sha256,
+        data_type="dem"
+    )
+    
     return {
-        "dem_id": f"dem_{project_id}_{datetime.now().timestamp()}",
+        "dem_id": raster.id,
         "project_id": project_id,
         "input_id": input_id,
-        "file_name": file.filename,
-        "file_size": "512 MB",
+        "file_name": stored.filename,
+        "file_size": stored.size,
+        "sha256": stored.sha256,
         "spatial_info": {
-            "crs": "EPSG:32633",
-            "bounds": {"north": 1000000, "south": 500000, "east": 200000, "west": 100000},
-            "resolution": (30, 30)
+            "crs": header["srs"],
+            "bounds": header["bounds"],
+            "resolution": (header["resolution"], header["resolution"]),
+            "width": header["width"],
+            "height": header["height"]
         },
         "status": "uploaded",
         "timestamp": datetime.now().isoformat()
@@ -365,7 +413,7 @@ async def get_heatmap_data(job_id: str) -> Dict[str, Any]:
         "job_id": job_id,
         "heatmap_type": "erosion_risk",
         "heatmap_ready": True,
-        "data_url": f"/api/pipeline/data/heatmap/{job_id}",
+        "data_url": f"{settings.API_V1_STR}/pipeline/data/heatmap/{job_id}",
         "color_scale": {
             "low": "#00FF00",
             "medium": "#FFFF00",
@@ -376,6 +424,70 @@ async def get_heatmap_data(job_id: str) -> Dict[str, Any]:
     }
 
 
+@router.get("/data/{layer}/{job_id}")
+async def get_result_grid(
+    layer: str,
+    job_id: str,
+    request: Request,
+    format: Optional[str] = Query(None, description="json, npy, arrow or msgpack (default: Accept header)"),
+    dtype: Optional[str] = Query(None, description="Output dtype, e.g. float32, float16 or uint8"),
+    max_size: Optional[int] = Query(None, ge=1, description="Downsample so neither side exceeds this"),
+    resample: Optional[str] = Query(None, pattern="^(mean|nearest)$"),
+    compress: Optional[str] = Query(None, description="zstd, gzip or none (default: Accept-Encoding)"),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Get a result grid of a completed pipeline
+    
+    Layers:
+    - erosion, deposition: Rates in m/year
+    - risk: Risk classes (0-5)
+    - heatmap: Erosion scaled to 0-1, as drawn in heatmap.png
+    
+    The grid is encoded as JSON, NumPy .npy, Arrow IPC or msgpack by
+    content negotiation, optionally compressed and downsampled server-side
+    (see services.array_transport).
+    """
+    from services.array_transport import ArrayTransportError, array_response
+    from services.compute import ComputeBusy, get_compute_dispatcher
+    
+    if layer not in RESULT_GRIDS and layer != "heatmap":
+        raise HTTPException(status_code=404, detail=f"Unknown layer '{layer}'")
+    
+    def encode():
+        authorize_pipeline(job_id, current_user)
+        grid = get_pipeline_manager().load_result_grid(job_id, "erosion" if layer == "heatmap" else layer)
+        if grid is None:
+            return None
+        if layer == "heatmap":
+            peak = float(grid.max())
+            grid = grid / peak if peak > 0 else np.zeros(grid.shape, dtype=np.float32)
+        return array_response(
+            grid,
+            accept=request.headers.get("accept"),
+            accept_encoding=request.headers.get("accept-encoding"),
+            fmt=format,
+            dtype=dtype,
+            max_size=max_size,
+            resample=resample,
+            compress=compress,
+            meta={"job_id": job_id, "layer": layer}
+        )
+    
+    try:
+        response = await get_compute_dispatcher().run_io(encode)
+    except ArrayTransportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ComputeBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Result grid not found")
+    
+    if response is None:
+        raise HTTPException(status_code=404, detail="Pipeline not found or not completed")
+    return response
+
+
 @router.get("/visualize/table/{job_id}")
 async def get_results_table(job_id: str) -> Dict[str, Any]:
     """
@@ -436,11 +548,12 @@ async def export_results(job_id: str, format: str = "pdf") -> Dict[str, Any]:
 # ============================================================================
 
 @router.post("/execute/complete")
-async def execute_complete_pipeline(
+def execute_complete_pipeline(
     project_id: int,
-    dem_id: str,
+    dem_id: int,
     parameters: Dict[str, Any],
-    background_tasks: BackgroundTasks
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
 ) -> Dict[str, Any]:
     """
     Execute complete pipeline in one call
@@ -449,51 +562,97 @@ async def execute_complete_pipeline(
     Input → Validation → Preprocessing → Terrain Analysis →
     Erosion Computation → Aggregation → Visualization
     
+    The job is queued and this call returns immediately; stages run on a
+    process pool. Poll /status/{pipeline_id} for live stage state.
+    
     Returns:
     - pipeline_id: Complete pipeline execution identifier
     - job_id: Background job identifier
     - stages: All pipeline stages
-    - status: "processing"
+    - status: "queued"
     """
-    pipeline_id = f"pipeline_{project_id}_{datetime.now().timestamp()}"
-    job_id = f"job_{project_id}_{datetime.now().timestamp()}"
+    from services.geospatial import get_raster
+    
+    raster = get_raster(db, raster_id=dem_id)
+    if not raster or raster.owner_id != current_user.id:
+        raise HTTPException(status_code=404, detail="DEM not found")
     
-    background_tasks.add_task(run_complete_pipeline, pipeline_id, project_id, dem_id, parameters)
+    job_id = get_pipeline_manager().submit(PipelineInput(
+        project_id=project_id,
+        user_id=current_user.id,
+        dem_file_path=raster.file_path,
+        parameters=parameters
+    ))
     
     return {
-        "pipeline_id": pipeline_id,
+        "pipeline_id": job_id,
         "project_id": project_id,
         "job_id": job_id,
-        "stages": [
-            "input_collection",
-            "validation",
-            "preprocessing",
-            "terrain_analysis",
-            "erosion_computation",
-            "aggregation",
-            "visualization"
-        ],
-        "status": "processing",
-        "estimated_duration": "15 minutes",
+        "stages": [stage.value for stage in PipelineStage],
+        "status": "queued",
         "timestamp": datetime.now().isoformat()
     }
 
 
 @router.get("/status/{pipeline_id}")
-async def get_pipeline_status(pipeline_id: str) -> Dict[str, Any]:
-    """Get status of pipeline execution"""
+def get_pipeline_status(
+    pipeline_id: str,
+    current_user: User = Depends(get_current_active_user)
+) -> Dict[str, Any]:
+    """Get live status of pipeline execution, including per-stage state"""
+    authorize_pipeline(pipeline_id, current_user)
+    status = get_pipeline_manager().get_job_status(pipeline_id)
+    if "error" in status and "job_id" not in status:
+        raise HTTPException(status_code=404, detail="Pipeline not found")
+    
     return {
         "pipeline_id": pipeline_id,
-        "status": "completed",
-        "current_stage": "visualization",
-        "progress": 100,
-        "execution_time": 892.3,  # seconds
-        "results_ready": True,
-        "timestamp": datetime.now().isoformat()
+        "current_stage": status["stage"],
+        "results_ready": status["status"] == "completed",
+        **status
     }
 
 
-def run_complete_pipeline(pipeline_id: str, project_id: int, dem_id: str, parameters: Dict[str, Any]):
-    """Background task for complete pipeline execution"""
-    logger.info(f"Running complete pipeline {pipeline_id}")
-    # Complete pipeline execution would happen here
+@router.get("/events/{pipeline_id}")
+def stream_pipeline_events(
+    pipeline_id: str,
+    last_event_id: Optional[str] = Query(None, description="Resume after this event ID"),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Stream stage, progress and status events of a pipeline (text/event-stream)
+    
+    Replaces polling /status/{pipeline_id}; the stream ends after the final status.
+    """
+    from services.progress_events import event_stream_response
+    
+    authorize_pipeline(pipeline_id, current_user)
+    manager = get_pipeline_manager()
+    
+    def poll() -> Optional[Dict[str, Any]]:
+        status = manager.get_job_status(pipeline_id)
+        return None if "job_id" not in status else status
+    
+    if poll() is None:
+        raise HTTPException(status_code=404, detail="Pipeline not found")
+    
+    return event_stream_response(pipeline_id, last_event_id_header or last_event_id, poll=poll)
+
+
+@router.post("/cancel/{pipeline_id}")
+def cancel_pipeline(
+    pipeline_id: str,
+    current_user: User = Depends(get_current_active_user)
+) -> Dict[str, Any]:
+    """Cancel a queued pipeline, or stop a running one after its current stage"""
+    authorize_pipeline(pipeline_id, current_user)
+    manager = get_pipeline_manager()
+    if not manager.cancel_job(pipeline_id):
+        raise HTTPException(
+            status_code=400,
+            detail="Pipeline cannot be cancelled (either not found or already finished)"
+        )
+    
+    status = manager.get_job_status(pipeline_id)
+    return {"pipeline_id": pipeline_id, "status": status["status"]}
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, BackgroundTasks
 from sqlalchemy.orm import Session
 from typing import List
+import asyncio
 import os
 import sys
 from pathlib import Path
@@ -12,12 +13,15 @@ from db.session import get_db
 from schemas.pointcloud import PointCloud, PointCloudCreate, PointCloudProcess, PointCloudStats
 from services.geospatial import (
     process_pointcloud_file,
+    process_pointcloud_to_dem,
     get_pointclouds,
     get_pointcloud,
     delete_pointcloud,
     get_pointcloud_stats,
-    create_pointcloud
+    create_pointcloud,
+    register_uploaded_pointcloud
 )
+from services.uploads import UploadError, UploadTooLarge, receive_upload
 from api.deps import get_current_active_user
 from core.config import settings
 from schemas.user import User
@@ -27,7 +31,6 @@ router = APIRouter()
 
 @router.post("/upload/", response_model=PointCloud)
 async def upload_pointcloud(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     project_id: int = None,
     db: Session = Depends(get_db),
@@ -35,36 +38,27 @@ async def upload_pointcloud(
 ):
     """
     Upload a point cloud file (LAS/LAZ)
-    """
-    if not file.filename.endswith(('.las', '.laz')):
-        raise HTTPException(status_code=400, detail="File must be .las or .laz format")
-    
-    # Save file temporarily
-    upload_dir = f"{settings.LOCAL_STORAGE_PATH}/uploads/pointclouds"
-    os.makedirs(upload_dir, exist_ok=True)
-    file_location = f"{upload_dir}/{file.filename}"
     
-    with open(file_location, "wb+") as file_object:
-        file_object.write(await file.read())
-    
-    # Create point cloud record
-    pointcloud_data = PointCloudCreate(
-        name=file.filename,
-        file_path=file_location
-    )
+    The file is streamed to disk in chunks and validated by reading its
+    header. Use the /uploads/ endpoints to upload very large files in
+    resumable chunks.
+    """
+    try:
+        stored, header = await receive_upload(file, "pointcloud")
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    # Process in background
-    background_tasks.add_task(
-        process_pointcloud_file,
-        file_path=file_location,
-        user_id=current_user.id,
-        db=db
+    return register_uploaded_pointcloud(
+        db,
+        file_path=stored.path,
+        owner_id=current_user.id,
+        header=header,
+        original_filename=stored.filename,
+        file_size=stored.size,
+        sha256=stored.sha256
     )
-    
-    from services.geospatial import create_pointcloud
-    db_pointcloud = create_pointcloud(db, pointcloud_data, current_user.id)
-    
-    return db_pointcloud
 
 
 @router.get("/", response_model=List[PointCloud])
@@ -193,24 +187,30 @@ def delete_pointcloud_by_id(
 
 
 async def process_pointcloud_job(job_id: str, pointcloud_id: int, config: dict, db: Session):
-    """Background task to process point cloud"""
+    """Background task to filter a point cloud and build a DEM from its ground points"""
     from services.job_service import start_job, complete_job, fail_job, update_job_progress
     
     try:
         start_job(db, job_id)
-        update_job_progress(db, job_id, 10, "Starting point cloud processing...")
+        update_job_progress(db, job_id, 5, "Starting point cloud processing...")
         
-        # Simulate processing steps
-        update_job_progress(db, job_id, 30, "Reading point cloud data...")
-        # Add actual PDAL processing here
+        pointcloud = get_pointcloud(db, pointcloud_id=pointcloud_id)
+        if not pointcloud:
+            raise ValueError(f"Point cloud {pointcloud_id} not found")
         
-        update_job_progress(db, job_id, 60, "Applying filters...")
-        # Add actual processing here
+        output_dir = f"{settings.LOCAL_STORAGE_PATH}/outputs/pointclouds/{pointcloud_id}"
         
-        update_job_progress(db, job_id, 90, "Generating outputs...")
-        # Add output generation here
+        def report(fraction: float, message: str):
+            update_job_progress(db, job_id, 5 + int(fraction * 90), message)
         
-        result = {"processed": True, "output_path": "/path/to/output"}
+        # CPU-bound: run off the event loop
+        result = await asyncio.to_thread(
+            process_pointcloud_to_dem,
+            pointcloud.file_path,
+            output_dir,
+            config,
+            report
+        )
         complete_job(db, job_id, result)
         
     except Exception as e:
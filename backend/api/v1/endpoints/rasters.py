@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, BackgroundTasks
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
 import os
@@ -8,17 +9,21 @@ from pathlib import Path
 # Add backend directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 
-from db.session import get_db
+from db.session import get_async_db, get_db, get_db_session
 from schemas.raster import Raster, RasterCreate, RasterProcess, RasterStats
 from services.geospatial import (
     process_raster_file,
-    get_rasters,
+    get_rasters_async,
     get_raster,
+    get_raster_async,
     delete_raster,
     get_raster_stats,
     create_cog,
-    create_raster
+    create_raster,
+    register_uploaded_raster,
+    replace_raster_file
 )
+from services.uploads import UploadError, UploadTooLarge, receive_upload
 from api.deps import get_current_active_user
 from core.config import settings
 from schemas.user import User
@@ -28,60 +33,50 @@ router = APIRouter()
 
 @router.post("/upload/", response_model=Raster)
 async def upload_raster(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     project_id: int = None,
     data_type: str = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """
     Upload a raster file (GeoTIFF, etc.)
-    """
-    if not file.filename.lower().endswith(('.tif', '.tiff', '.geotiff')):
-        raise HTTPException(status_code=400, detail="File must be in GeoTIFF format")
     
-    # Save file temporarily
-    upload_dir = f"{settings.LOCAL_STORAGE_PATH}/uploads/rasters"
-    os.makedirs(upload_dir, exist_ok=True)
-    file_location = f"{upload_dir}/{file.filename}"
-    
-    with open(file_location, "wb+") as file_object:
-        file_object.write(await file.read())
+    The file is streamed to disk in chunks and validated by opening its
+    header. Use the /uploads/ endpoints to upload very large files in
+    resumable chunks.
+    """
+    try:
+        stored, header = await receive_upload(file, "raster")
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    # Create raster record
-    raster_data = RasterCreate(
-        name=file.filename,
-        file_path=file_location,
+    return await db.run_sync(
+        register_uploaded_raster,
+        file_path=stored.path,
+        owner_id=current_user.id,
+        header=header,
+        original_filename=stored.filename,
+        file_size=stored.size,
+        sha256=stored.sha256,
         data_type=data_type
     )
-    
-    # Process in background
-    background_tasks.add_task(
-        process_raster_file,
-        file_path=file_location,
-        user_id=current_user.id,
-        db=db
-    )
-    
-    from services.geospatial import create_raster
-    db_raster = create_raster(db, raster_data, current_user.id)
-    
-    return db_raster
 
 
 @router.get("/", response_model=List[Raster])
-def list_rasters(
+async def list_rasters(
     skip: int = 0, 
     limit: int = 100,
     project_id: int = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """
     List all rasters for the current user
     """
-    rasters = get_rasters(db, owner_id=current_user.id, skip=skip, limit=limit)
+    rasters = await get_rasters_async(db, owner_id=current_user.id, skip=skip, limit=limit)
     
     # Filter by project if specified
     if project_id is not None:
@@ -91,15 +86,15 @@ def list_rasters(
 
 
 @router.get("/{raster_id}", response_model=Raster)
-def get_raster_by_id(
+async def get_raster_by_id(
     raster_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """
     Get raster by ID
     """
-    raster = get_raster(db, raster_id=raster_id)
+    raster = await get_raster_async(db, raster_id=raster_id)
     if not raster:
         raise HTTPException(status_code=404, detail="Raster not found")
     if raster.owner_id != current_user.id and not current_user.is_superuser:
@@ -107,6 +102,51 @@ def get_raster_by_id(
     return raster
 
 
+@router.put("/{raster_id}/file", response_model=Raster)
+async def replace_raster_file_endpoint(
+    raster_id: int,
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    Replace a raster's file, e.g. with a corrected DEM
+    
+    Simulation results cached for the previous file are invalidated.
+    """
+    raster = await get_raster_async(db, raster_id=raster_id)
+    if not raster:
+        raise HTTPException(status_code=404, detail="Raster not found")
+    if raster.owner_id != current_user.id and not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    try:
+        stored, header = await receive_upload(file, "raster")
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Invalidating cached results and tiles deletes files: run it off the loop
+    from services.compute import ComputeBusy, get_compute_dispatcher
+    
+    def replace():
+        with get_db_session() as session:
+            return replace_raster_file(
+                session,
+                raster_id,
+                file_path=stored.path,
+                header=header,
+                file_size=stored.size,
+                sha256=stored.sha256
+            )
+    
+    try:
+        return await get_compute_dispatcher().run_io(replace)
+    except ComputeBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+
+
 @router.get("/{raster_id}/stats", response_model=RasterStats)
 def get_raster_statistics(
     raster_id: int,
@@ -3,18 +3,29 @@ Terrain Simulation API Endpoints
 REST API for time-stepped terrain simulation (World Machine-like evolution)
 """
 
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Request, Response
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from pydantic import BaseModel, Field
+import asyncio
 import logging
 
 from backend.db.session import get_db
+from backend.services.compute import ComputeBusy, get_compute_dispatcher
+from backend.services.pipeline_cache import file_sha256
+from backend.services.result_cache import (
+    array_sha256,
+    etag_for,
+    get_result_cache,
+    if_none_match_status,
+    normalize_params,
+    result_key
+)
 from backend.services.terrain_simulator import (
-    TerrainSimulator,
+    ENGINE_VERSION,
     TimeStepParameters,
     SimulationMode,
-    create_simulator_for_mode
+    simulate_terrain
 )
 from backend.core.exceptions import ValidationError, ProcessingError
 
@@ -105,11 +116,56 @@ class SimulationResultResponse(BaseModel):
 
 # ==================== API Endpoints ====================
 
+async def _prepare_simulation(
+    request: SimulationRequest,
+    db: Session
+) -> Tuple[Any, Optional[Dict[str, Any]], str, Dict[str, Any]]:
+    """
+    Resolve the DEM and parameters of a simulation request
+    
+    Returns:
+        (DEM source for simulate_terrain, custom parameters, DEM content
+        hash, normalized settings for the result cache key)
+    """
+    dispatcher = get_compute_dispatcher()
+    
+    # Get DEM data; a raster is read inside the worker process
+    if request.dem_id:
+        # Load from database
+        from backend.models.raster import Raster
+        raster = await dispatcher.run_io(
+            lambda: db.query(Raster).filter(Raster.id == request.dem_id).first()  # type: ignore
+        )
+        if not raster:
+            raise ValidationError("DEM not found", field="dem_id")
+        dem_source = raster.file_path
+        try:
+            dem_hash = await dispatcher.run_io(file_sha256, dem_source)
+        except OSError as e:
+            raise ValidationError(f"Failed to load DEM: {str(e)}", field="dem_id")
+    elif request.dem_data:
+        dem_source = request.dem_data
+        dem_hash = await dispatcher.run_io(array_sha256, dem_source)
+    else:
+        raise ValidationError("Either dem_id or dem_data must be provided")
+    
+    # Validate custom parameters here so errors surface as 422
+    params = None
+    if request.custom_params:
+        params = request.custom_params.dict()
+        TimeStepParameters(**params).validate()
+    
+    # The mode only matters when no custom parameters are given
+    settings = {"params": params} if params else {"mode": request.mode}
+    return dem_source, params, dem_hash, normalize_params({"cell_size": request.cell_size, **settings})
+
+
 @router.post("/run", response_model=SimulationResultResponse, tags=["Terrain Simulation"])
 async def run_terrain_simulation(
     request: SimulationRequest,
+    response: Response,
     db: Session = Depends(get_db),
-    background_tasks: Optional[BackgroundTasks] = None
+    if_none_match: Optional[str] = Header(None)
 ):
     """
     Run a time-stepped terrain simulation.
@@ -123,83 +179,59 @@ async def run_terrain_simulation(
     
     The simulation shows how terrain changes dynamically through erosion
     and deposition processes, similar to World Machine.
+    
+    Results are cached by DEM content and parameters. The response carries
+    an ETag; sending it back in If-None-Match returns 412 Precondition
+    Failed without re-running when the result is unchanged (this is a POST,
+    so 304 does not apply).
     """
+    dispatcher = get_compute_dispatcher()
     try:
         logger.info(f"Starting terrain simulation with mode: {request.mode}")
         
-        # Get DEM data
-        dem_data = None
-        if request.dem_id:
-            # Load from database
-            from backend.models.raster import Raster
-            raster = db.query(Raster).filter(Raster.id == request.dem_id).first()  # type: ignore
-            if not raster:
-                raise ValidationError("DEM not found", field="dem_id")
-            try:
-                import rasterio
-                import numpy as np
-                with rasterio.open(raster.file_path) as src:
-                    dem_data = src.read(1).astype(np.float64)
-            except Exception as e:
-                raise ValidationError(f"Failed to load DEM: {str(e)}", field="dem_id")
-        elif request.dem_data:
-            import numpy as np
-            dem_data = np.array(request.dem_data, dtype=np.float64)
-        else:
-            raise ValidationError("Either dem_id or dem_data must be provided")
-        
-        # Create simulator and parameters
-        if request.custom_params:
-            simulator = TerrainSimulator(dem_data, request.cell_size)
-            params = TimeStepParameters(
-                dt=request.custom_params.dt,
-                num_timesteps=request.custom_params.num_timesteps,
-                rho_b=request.custom_params.rho_b,
-                epsilon=request.custom_params.epsilon,
-                m_exponent=request.custom_params.m_exponent,
-                n_exponent=request.custom_params.n_exponent,
-                rainfall_factor=request.custom_params.rainfall_factor,
-                damping_factor=request.custom_params.damping_factor
-            )
-        else:
-            simulator, params = create_simulator_for_mode(dem_data, request.mode, request.cell_size)
-        
-        # Run simulation
-        snapshots = simulator.run_simulation(params)
+        dem_source, params, dem_hash, settings = await _prepare_simulation(request, db)
+        key = result_key("terrain_simulation", ENGINE_VERSION, settings, dem_hash)
+        status = if_none_match_status(if_none_match, key, "POST")
+        if status is not None:
+            return Response(status_code=status, headers={"ETag": etag_for(key)})
         
-        # Prepare response
-        snapshot_responses = [
-            SimulationSnapshotResponse(
-                timestep=s.timestep,
-                time_years=s.time_years,
-                max_elevation=s.max_elevation,
-                min_elevation=s.min_elevation,
-                mean_elevation=s.mean_elevation,
-                total_volume_change=s.total_volume_change
-            )
-            for s in snapshots
-        ]
+        try:
+            cache = get_result_cache()
+            cached = await dispatcher.run_io(cache.get, key, dem_hash) if cache else None
+            if cached is not None:
+                summary = cached.summary
+            else:
+                # Run simulation on the process pool
+                summary = await dispatcher.run_cpu(
+                    simulate_terrain, dem_source, request.cell_size, request.mode, params
+                )
+                if cache:
+                    await dispatcher.run_io(cache.put, key, summary, input_hash=dem_hash)
+        except OSError as e:
+            if request.dem_id:
+                raise ValidationError(f"Failed to load DEM: {str(e)}", field="dem_id")
+            raise
         
-        # Calculate statistics
-        start_elev = snapshots[0].mean_elevation if snapshots else 0
-        end_elev = snapshots[-1].mean_elevation if snapshots else 0
-        total_volume = snapshots[-1].total_volume_change if snapshots else 0
+        response.headers["ETag"] = etag_for(key)
+        response.headers["X-Result-Cache"] = "hit" if cached is not None else "miss"
         
         result = SimulationResultResponse(
             status="completed",
-            total_timesteps=len(snapshots),
-            snapshots=snapshot_responses,
-            start_elevation=start_elev,
-            end_elevation=end_elev,
-            elevation_change=end_elev - start_elev,
-            total_volume_change=total_volume
+            total_timesteps=len(summary["snapshots"]),
+            snapshots=[SimulationSnapshotResponse(**s) for s in summary["snapshots"]],
+            start_elevation=summary["start_elevation"],
+            end_elevation=summary["end_elevation"],
+            elevation_change=summary["elevation_change"],
+            total_volume_change=summary["total_volume_change"]
         )
         
-        logger.info(f"Simulation completed: {len(snapshots)} timesteps, "
+        logger.info(f"Simulation completed: {result.total_timesteps} timesteps, "
                    f"elevation change: {result.elevation_change:.2f}m")
         
         return result
     
+    except ComputeBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
     except ValidationError as e:
         logger.error(f"Validation error in simulation: {e}")
         raise HTTPException(status_code=422, detail=str(e))
@@ -211,6 +243,78 @@ async def run_terrain_simulation(
         raise HTTPException(status_code=500, detail="Simulation failed")
 
 
+@router.post("/run/grid", tags=["Terrain Simulation"])
+async def run_terrain_simulation_grid(
+    request: SimulationRequest,
+    http_request: Request,
+    layer: str = Query("elevation", pattern="^(elevation|erosion)$"),
+    format: Optional[str] = Query(None, description="json, npy, arrow or msgpack (default: Accept header)"),
+    dtype: Optional[str] = Query(None, description="Output dtype, e.g. float32 or float16"),
+    max_size: Optional[int] = Query(None, ge=1, description="Downsample so neither side exceeds this"),
+    resample: Optional[str] = Query(None, pattern="^(mean|nearest)$"),
+    compress: Optional[str] = Query(None, description="zstd, gzip or none (default: Accept-Encoding)"),
+    db: Session = Depends(get_db)
+):
+    """
+    Run a terrain simulation and return a result grid.
+    
+    - **elevation**: Final DEM
+    - **erosion**: Cumulative erosion/deposition
+    
+    The grid is encoded as JSON, NumPy .npy, Arrow IPC or msgpack by
+    content negotiation (see services.array_transport), optionally
+    compressed and downsampled. Results are cached like /run.
+    """
+    from backend.services.array_transport import ArrayTransportError, array_response
+    
+    dispatcher = get_compute_dispatcher()
+    try:
+        dem_source, params, dem_hash, settings = await _prepare_simulation(request, db)
+        key = result_key("terrain_simulation_grids", ENGINE_VERSION, settings, dem_hash)
+        
+        try:
+            cache = get_result_cache()
+            cached = await dispatcher.run_io(cache.get, key, dem_hash) if cache else None
+            if cached is not None:
+                grids = cached.arrays
+            else:
+                summary = await dispatcher.run_cpu(
+                    simulate_terrain, dem_source, request.cell_size, request.mode, params, True
+                )
+                grids = summary.pop("grids")
+                if cache:
+                    await dispatcher.run_io(cache.put, key, summary, grids, input_hash=dem_hash)
+        except OSError as e:
+            if request.dem_id:
+                raise ValidationError(f"Failed to load DEM: {str(e)}", field="dem_id")
+            raise
+        
+        return await dispatcher.run_io(
+            array_response,
+            grids[layer],
+            accept=http_request.headers.get("accept"),
+            accept_encoding=http_request.headers.get("accept-encoding"),
+            fmt=format,
+            dtype=dtype,
+            max_size=max_size,
+            resample=resample,
+            compress=compress,
+            meta={"layer": layer, "cell_size": request.cell_size},
+            headers={"X-Result-Cache": "hit" if cached is not None else "miss"}
+        )
+    
+    except ComputeBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+    except ArrayTransportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ValidationError as e:
+        logger.error(f"Validation error in simulation: {e}")
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        logger.error(f"Unexpected error in simulation: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Simulation failed")
+
+
 @router.post("/quick", response_model=dict, tags=["Terrain Simulation"])
 async def quick_simulation(
     mode: SimulationMode = SimulationMode.MEDIUM,
@@ -300,26 +404,29 @@ async def compare_simulations(
         if modes is None:
             modes = [SimulationMode.SLOW, SimulationMode.MEDIUM, SimulationMode.FAST]
         
-        import numpy as np
-        dem_array = np.array(dem_data, dtype=np.float64)
+        # Modes are independent, so they run in parallel worker processes
+        dispatcher = get_compute_dispatcher()
+        summaries = await asyncio.gather(*(
+            dispatcher.run_cpu(simulate_terrain, dem_data, cell_size, mode)
+            for mode in modes
+        ))
         
         results = {}
-        for mode in modes:
-            simulator, params = create_simulator_for_mode(dem_array, mode, cell_size)
-            snapshots = simulator.run_simulation(params)
-            
-            final_snap = snapshots[-1]
+        for mode, summary in zip(modes, summaries):
+            final_snap = summary["snapshots"][-1]
             results[mode] = {
-                "total_time_years": final_snap.time_years,
-                "final_max_elevation": final_snap.max_elevation,
-                "final_min_elevation": final_snap.min_elevation,
-                "final_mean_elevation": final_snap.mean_elevation,
-                "total_volume_change": final_snap.total_volume_change,
-                "snapshots_count": len(snapshots)
+                "total_time_years": final_snap["time_years"],
+                "final_max_elevation": final_snap["max_elevation"],
+                "final_min_elevation": final_snap["min_elevation"],
+                "final_mean_elevation": final_snap["mean_elevation"],
+                "total_volume_change": final_snap["total_volume_change"],
+                "snapshots_count": len(summary["snapshots"])
             }
         
         return results
     
+    except ComputeBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
     except Exception as e:
         logger.error(f"Comparison error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
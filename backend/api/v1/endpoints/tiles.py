@@ -0,0 +1,225 @@
+"""
+Map Tile Endpoints
+
+XYZ tiles (z/x/y, Web Mercator) of uploaded rasters and pipeline result
+GeoTIFFs, rendered on demand by services.tiles. Point a web map at the
+tiles URL template from the tilejson endpoints; only the tiles on screen
+are requested.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, Optional
+import os
+import sys
+from pathlib import Path
+
+# Add backend directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from db.session import get_async_db
+from api.deps import get_current_active_user
+from api.v1.endpoints.pipeline import authorize_pipeline
+from core.config import settings
+from schemas.user import User
+from services.geospatial import get_raster_async
+from services.pipeline import RESULT_RASTERS, get_pipeline_manager
+from services.result_cache import if_none_match_status
+
+router = APIRouter()
+
+
+async def _raster_tile_path(db: AsyncSession, raster_id: int, current_user: User) -> str:
+    """File to tile for a raster: its COG when one was built, else the upload"""
+    raster = await get_raster_async(db, raster_id=raster_id)
+    if not raster:
+        raise HTTPException(status_code=404, detail="Raster not found")
+    if raster.owner_id != current_user.id and not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    cog_path = (raster.raster_metadata or {}).get("cog_path")
+    if cog_path and os.path.exists(cog_path):
+        return cog_path
+    return raster.file_path
+
+
+async def _job_raster_path(job_id: str, layer: str, current_user: User) -> str:
+    """Result GeoTIFF of a completed pipeline; the lookups run off the event loop"""
+    from services.compute import ComputeBusy, get_compute_dispatcher
+    
+    if layer not in RESULT_RASTERS:
+        raise HTTPException(status_code=404, detail=f"Unknown layer '{layer}'")
+    
+    def lookup() -> Optional[str]:
+        authorize_pipeline(job_id, current_user)
+        return get_pipeline_manager().get_result_raster_path(job_id, layer)
+    
+    try:
+        path = await get_compute_dispatcher().run_io(lookup)
+    except ComputeBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+    if path is None:
+        raise HTTPException(status_code=404, detail="Pipeline not found or not completed")
+    return path
+
+
+async def _serve_tile(
+    path: str,
+    z: int,
+    x: int,
+    y: int,
+    fmt: str,
+    request: Request,
+    colormap: str,
+    vmin: Optional[float],
+    vmax: Optional[float],
+    resampling: str
+) -> Response:
+    """
+    Render a tile off the event loop and answer with cache headers
+    
+    A tile the client already has (If-None-Match) is answered with 304
+    before any pixels are read.
+    """
+    from services.compute import ComputeBusy, get_compute_dispatcher
+    from services.tiles import TILE_FORMATS, TileError, get_tile_cache, render_tile, tile_etag
+    
+    if_none_match = request.headers.get("if-none-match")
+    method = request.method
+    style = {"fmt": fmt, "colormap": colormap, "vmin": vmin, "vmax": vmax, "resampling": resampling}
+    
+    def render():
+        etag = tile_etag(path, z, x, y, **style)
+        status = if_none_match_status(if_none_match, etag.strip('"'), method)
+        if status is not None:
+            return None, etag, status
+        body, etag = render_tile(path, z, x, y, cache=get_tile_cache(), **style)
+        return body, etag, None
+    
+    try:
+        body, etag, status = await get_compute_dispatcher().run_io(render)
+    except TileError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ComputeBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Raster file not found")
+    
+    # Tiles are only served to their owner, so shared caches must not keep them
+    headers = {"ETag": etag, "Cache-Control": f"private, max-age={settings.TILE_CACHE_MAX_AGE}"}
+    if status is not None:
+        return Response(status_code=status, headers=headers)
+    if body is None:
+        # Outside the raster: nothing to draw, nothing to transfer
+        return Response(status_code=204, headers=headers)
+    return Response(content=body, media_type=TILE_FORMATS[fmt], headers=headers)
+
+
+async def _tilejson(path: str, request: Request, tiles_path: str) -> Dict[str, Any]:
+    from services.compute import ComputeBusy, get_compute_dispatcher
+    from services.tiles import TileError, available_colormaps, source_info
+    
+    try:
+        info = await get_compute_dispatcher().run_io(source_info, path)
+    except TileError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ComputeBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Raster file not found")
+    
+    query = f"?{request.url.query}" if request.url.query else ""
+    west, south, east, north = info.bounds
+    return {
+        "tilejson": "3.0.0",
+        "scheme": "xyz",
+        "tiles": [f"{settings.API_V1_STR}/tiles/{tiles_path}/{{z}}/{{x}}/{{y}}.png{query}"],
+        "bounds": [west, south, east, north],
+        "center": [(west + east) / 2, (south + north) / 2, info.minzoom],
+        "minzoom": info.minzoom,
+        "maxzoom": info.maxzoom,
+        "value_range": {"min": info.value_range[0], "max": info.value_range[1]},
+        "dtype": info.dtype,
+        "colormaps": available_colormaps()
+    }
+
+
+@router.get("/rasters/{raster_id}/tilejson.json")
+async def get_raster_tilejson(
+    raster_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Dict[str, Any]:
+    """
+    TileJSON for a raster: tiles URL template, bounds, zoom and value range
+    
+    Query parameters are carried over into the tiles URL template.
+    """
+    path = await _raster_tile_path(db, raster_id, current_user)
+    return await _tilejson(path, request, f"rasters/{raster_id}")
+
+
+@router.get("/rasters/{raster_id}/{z}/{x}/{y}.{fmt}")
+async def get_raster_tile(
+    raster_id: int,
+    z: int,
+    x: int,
+    y: int,
+    fmt: str,
+    request: Request,
+    colormap: str = Query("viridis", description="StyleManager ramp, World Machine scheme or matplotlib colormap"),
+    vmin: Optional[float] = Query(None, description="Value drawn with the first colour (default: 2nd percentile)"),
+    vmax: Optional[float] = Query(None, description="Value drawn with the last colour (default: 98th percentile)"),
+    resampling: str = Query("bilinear", description="nearest, bilinear, cubic, average, ..."),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    One 256x256 tile of a raster as PNG (coloured) or NPY (float32 values)
+    
+    Tiles outside the raster return 204 No Content.
+    """
+    path = await _raster_tile_path(db, raster_id, current_user)
+    return await _serve_tile(path, z, x, y, fmt, request, colormap, vmin, vmax, resampling)
+
+
+@router.get("/pipeline/{job_id}/{layer}/tilejson.json")
+async def get_pipeline_tilejson(
+    job_id: str,
+    layer: str,
+    request: Request,
+    current_user: User = Depends(get_current_active_user)
+) -> Dict[str, Any]:
+    """TileJSON for a pipeline result layer (erosion or risk)"""
+    path = await _job_raster_path(job_id, layer, current_user)
+    return await _tilejson(path, request, f"pipeline/{job_id}/{layer}")
+
+
+@router.get("/pipeline/{job_id}/{layer}/{z}/{x}/{y}.{fmt}")
+async def get_pipeline_tile(
+    job_id: str,
+    layer: str,
+    z: int,
+    x: int,
+    y: int,
+    fmt: str,
+    request: Request,
+    colormap: Optional[str] = Query(None, description="Default: erosion_heat for erosion, reds for risk"),
+    vmin: Optional[float] = Query(None),
+    vmax: Optional[float] = Query(None),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    One 256x256 tile of a completed pipeline's result raster
+    
+    Layers:
+    - erosion: Erosion rate in m/year
+    - risk: Risk classes (0-5), read with nearest-neighbour resampling
+    """
+    path = await _job_raster_path(job_id, layer, current_user)
+    if layer == "risk":
+        colormap, resampling = colormap or "reds", "nearest"
+    else:
+        colormap, resampling = colormap or "erosion_heat", "bilinear"
+    return await _serve_tile(path, z, x, y, fmt, request, colormap, vmin, vmax, resampling)
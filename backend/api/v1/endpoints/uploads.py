@@ -0,0 +1,201 @@
+"""
+Resumable Upload API Endpoints
+Chunked uploads of large rasters and point clouds that survive dropped connections
+
+Protocol (offsets follow the tus convention):
+  1. POST /uploads/ with kind, filename and total_size starts a session
+  2. PATCH /uploads/{upload_id} with an Upload-Offset header appends the
+     raw request body at that offset
+  3. After an interruption, GET or HEAD /uploads/{upload_id} reports the
+     offset to resume from
+  4. POST /uploads/{upload_id}/complete validates the file and registers it
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Header, Request, Response
+from sqlalchemy.orm import Session
+from typing import Dict, Any, Optional
+import asyncio
+import sys
+from pathlib import Path
+
+# Add backend directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from db.session import get_db
+from api.deps import get_current_active_user
+from schemas.user import User
+from schemas.raster import Raster
+from schemas.pointcloud import PointCloud
+from services.geospatial import register_uploaded_raster, register_uploaded_pointcloud
+from services.uploads import (
+    UploadError,
+    UploadOffsetMismatch,
+    UploadTooLarge,
+    get_upload_session_store,
+    validate_upload
+)
+from pydantic import BaseModel
+
+router = APIRouter()
+
+
+class UploadSessionCreate(BaseModel):
+    """Resumable upload session request"""
+    kind: str  # "raster" or "pointcloud"
+    filename: str
+    total_size: int
+    data_type: Optional[str] = None  # Raster data type (dem, dsm, ...)
+
+
+def _get_session(upload_id: str, current_user: User) -> Dict[str, Any]:
+    session = get_upload_session_store().get(upload_id)
+    if session is None or session["owner_id"] != current_user.id:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return session
+
+
+def _offset_headers(session: Dict[str, Any]) -> Dict[str, str]:
+    return {
+        "Upload-Offset": str(session["offset"]),
+        "Upload-Length": str(session["total_size"]),
+        "Cache-Control": "no-store"
+    }
+
+
+@router.post("/", status_code=201)
+def create_upload(
+    upload: UploadSessionCreate,
+    response: Response,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Start a resumable upload session"""
+    try:
+        session = get_upload_session_store().create(
+            upload.kind,
+            upload.filename,
+            upload.total_size,
+            current_user.id,
+            data_type=upload.data_type
+        )
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    response.headers.update(_offset_headers(session))
+    return session
+
+
+@router.head("/{upload_id}")
+def head_upload(
+    upload_id: str,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Offset to resume from, in the Upload-Offset header"""
+    session = _get_session(upload_id, current_user)
+    return Response(status_code=200, headers=_offset_headers(session))
+
+
+@router.get("/{upload_id}")
+def get_upload(
+    upload_id: str,
+    response: Response,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Session status, including the offset to resume from"""
+    session = _get_session(upload_id, current_user)
+    response.headers.update(_offset_headers(session))
+    return session
+
+
+@router.patch("/{upload_id}")
+async def append_upload(
+    upload_id: str,
+    request: Request,
+    upload_offset: int = Header(...),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Append the request body at Upload-Offset
+    
+    The body is written to disk as it arrives and never held in memory. A
+    mismatched offset returns 409 with the current offset in Upload-Offset.
+    """
+    session = _get_session(upload_id, current_user)
+    
+    try:
+        offset = await get_upload_session_store().append(upload_id, upload_offset, request.stream())
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    except UploadOffsetMismatch as e:
+        raise HTTPException(
+            status_code=409,
+            detail=str(e),
+            headers={"Upload-Offset": str(e.expected)}
+        )
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    
+    return Response(status_code=204, headers=_offset_headers({**session, "offset": offset}))
+
+
+@router.post("/{upload_id}/complete")
+async def complete_upload(
+    upload_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Validate a fully received upload and register it as a raster or point cloud"""
+    session = _get_session(upload_id, current_user)
+    store = get_upload_session_store()
+    
+    try:
+        stored = await asyncio.to_thread(store.complete, upload_id)
+        header = await asyncio.to_thread(validate_upload, stored, session["kind"])
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    except UploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if session["kind"] == "raster":
+        record = register_uploaded_raster(
+            db,
+            file_path=stored.path,
+            owner_id=current_user.id,
+            header=header,
+            original_filename=stored.filename,
+            file_size=stored.size,
+            sha256=stored.sha256,
+            data_type=session["metadata"].get("data_type")
+        )
+        record = Raster.model_validate(record)
+    else:
+        record = register_uploaded_pointcloud(
+            db,
+            file_path=stored.path,
+            owner_id=current_user.id,
+            header=header,
+            original_filename=stored.filename,
+            file_size=stored.size,
+            sha256=stored.sha256
+        )
+        record = PointCloud.model_validate(record)
+    
+    return {
+        "upload_id": upload_id,
+        "kind": session["kind"],
+        "sha256": stored.sha256,
+        "file_size": stored.size,
+        "record": record
+    }
+
+
+@router.delete("/{upload_id}")
+def delete_upload(
+    upload_id: str,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Abort a resumable upload and discard the bytes received"""
+    _get_session(upload_id, current_user)
+    get_upload_session_store().delete(upload_id)
+    return {"message": "Upload cancelled"}
@@ -40,6 +40,9 @@ class Settings(BaseSettings):
     USE_SQLITE: bool = os.getenv("USE_SQLITE", "true").lower() == "true"
     DATABASE_URL: Optional[str] = os.getenv("DATABASE_URL", None)  # Cloud database connection string
     DATABASE_TYPE: str = os.getenv("DATABASE_TYPE", "sqlite")  # 'sqlite' or 'postgresql'
+    DATABASE_POOL_SIZE: int = int(os.getenv("DATABASE_POOL_SIZE", "20"))  # per engine; sync and async each keep a pool
+    DATABASE_MAX_OVERFLOW: int = int(os.getenv("DATABASE_MAX_OVERFLOW", "10"))
+    DATABASE_POOL_TIMEOUT: float = float(os.getenv("DATABASE_POOL_TIMEOUT", "30"))  # seconds to wait for a free connection
     
     # Local PostgreSQL settings (if not using cloud)
     POSTGRES_SERVER: str = os.getenv("POSTGRES_SERVER", "localhost")
@@ -84,6 +87,65 @@ class Settings(BaseSettings):
     
     # Worker settings
     MAX_WORKERS: int = int(os.getenv("MAX_WORKERS", "4"))
+    PIPELINE_JOB_RETENTION: float = float(os.getenv("PIPELINE_JOB_RETENTION", "3600"))  # seconds finished in-process pipelines stay queryable
+    
+    # Durable task queue settings
+    TASK_QUEUE_ENABLED: bool = os.getenv("TASK_QUEUE_ENABLED", "true").lower() == "true"
+    TASK_QUEUE_EMBEDDED_WORKER: bool = os.getenv("TASK_QUEUE_EMBEDDED_WORKER", "true").lower() == "true"
+    TASK_QUEUE_LEASE_SECONDS: int = int(os.getenv("TASK_QUEUE_LEASE_SECONDS", "60"))
+    TASK_QUEUE_MAX_ATTEMPTS: int = int(os.getenv("TASK_QUEUE_MAX_ATTEMPTS", "3"))
+    TASK_QUEUE_RETRY_BACKOFF: float = float(os.getenv("TASK_QUEUE_RETRY_BACKOFF", "5"))  # seconds, doubled per attempt
+    
+    # Pipeline stage cache settings
+    PIPELINE_CACHE_ENABLED: bool = os.getenv("PIPELINE_CACHE_ENABLED", "true").lower() == "true"
+    PIPELINE_CACHE_DIR: Optional[str] = os.getenv("PIPELINE_CACHE_DIR")  # Default: LOCAL_STORAGE_PATH/cache/pipeline
+    PIPELINE_CACHE_MAX_BYTES: int = int(os.getenv("PIPELINE_CACHE_MAX_BYTES", str(5 * 1024 ** 3)))
+    
+    # Simulation result cache settings
+    RESULT_CACHE_ENABLED: bool = os.getenv("RESULT_CACHE_ENABLED", "true").lower() == "true"
+    RESULT_CACHE_DIR: Optional[str] = os.getenv("RESULT_CACHE_DIR")  # Default: LOCAL_STORAGE_PATH/cache/results
+    RESULT_CACHE_MAX_BYTES: int = int(os.getenv("RESULT_CACHE_MAX_BYTES", str(2 * 1024 ** 3)))
+    RESULT_CACHE_MEMORY_ENTRIES: int = int(os.getenv("RESULT_CACHE_MEMORY_ENTRIES", "128"))  # in-memory LRU front
+    
+    # Off-row result storage (arrays of job and erosion results)
+    RESULT_STORE_DIR: Optional[str] = os.getenv("RESULT_STORE_DIR")  # Default: LOCAL_STORAGE_PATH/results
+    RESULT_STORE_MIN_ARRAY_SIZE: int = int(os.getenv("RESULT_STORE_MIN_ARRAY_SIZE", "256"))  # elements; smaller stay in the row
+    
+    # Map tile cache settings
+    TILE_CACHE_ENABLED: bool = os.getenv("TILE_CACHE_ENABLED", "true").lower() == "true"
+    TILE_CACHE_DIR: Optional[str] = os.getenv("TILE_CACHE_DIR")  # Default: LOCAL_STORAGE_PATH/cache/tiles
+    TILE_CACHE_MAX_BYTES: int = int(os.getenv("TILE_CACHE_MAX_BYTES", str(1024 ** 3)))
+    TILE_CACHE_MEMORY_BYTES: int = int(os.getenv("TILE_CACHE_MEMORY_BYTES", str(64 * 1024 ** 2)))  # in-memory LRU front
+    TILE_CACHE_MAX_AGE: int = int(os.getenv("TILE_CACHE_MAX_AGE", "3600"))  # seconds, Cache-Control max-age
+    
+    # Job progress event streaming (SSE / WebSocket)
+    PROGRESS_EVENT_INTERVAL: float = float(os.getenv("PROGRESS_EVENT_INTERVAL", "0.5"))  # min seconds between progress events per job
+    PROGRESS_EVENT_HISTORY: int = int(os.getenv("PROGRESS_EVENT_HISTORY", "256"))  # events kept per job for reconnects
+    PROGRESS_EVENT_KEEPALIVE: float = float(os.getenv("PROGRESS_EVENT_KEEPALIVE", "15"))  # seconds between keepalives and status polls
+    
+    # Buffered job progress and log writes (services.job_writer)
+    JOB_UPDATE_BUFFERED: bool = os.getenv("JOB_UPDATE_BUFFERED", "true").lower() == "true"
+    JOB_UPDATE_FLUSH_INTERVAL: float = float(os.getenv("JOB_UPDATE_FLUSH_INTERVAL", "0.5"))  # seconds between bulk writes
+    JOB_UPDATE_MAX_PENDING: int = int(os.getenv("JOB_UPDATE_MAX_PENDING", "500"))  # buffered updates that force an early write
+    
+    # Compute dispatch for CPU-bound endpoint work
+    COMPUTE_PROCESS_WORKERS: int = int(os.getenv("COMPUTE_PROCESS_WORKERS", os.getenv("MAX_WORKERS", "4")))
+    COMPUTE_THREAD_WORKERS: int = int(os.getenv("COMPUTE_THREAD_WORKERS", "8"))
+    COMPUTE_MAX_PENDING: int = int(os.getenv("COMPUTE_MAX_PENDING", "32"))  # waiting calls per pool before 503
+    
+    # Rate limiting (GCRA token bucket per client IP)
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_REQUESTS_PER_MINUTE: int = int(os.getenv("RATE_LIMIT_REQUESTS_PER_MINUTE", "100"))
+    RATE_LIMIT_BURST: int = int(os.getenv("RATE_LIMIT_BURST", "0"))  # 0: one minute's worth
+    RATE_LIMIT_STORE: str = os.getenv("RATE_LIMIT_STORE", "memory")  # 'memory', 'sqlite' (per host) or 'redis' (shared)
+    RATE_LIMIT_SQLITE_PATH: Optional[str] = os.getenv("RATE_LIMIT_SQLITE_PATH")  # Default: LOCAL_STORAGE_PATH/rate_limits.db
+    RATE_LIMIT_ROUTE_COSTS: Optional[str] = os.getenv("RATE_LIMIT_ROUTE_COSTS")  # JSON {"POST /api/v1/...": cost}, merged over defaults
+    REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    
+    # Upload settings
+    UPLOAD_MAX_BYTES: int = int(os.getenv("UPLOAD_MAX_BYTES", str(20 * 1024 ** 3)))
+    UPLOAD_CHUNK_SIZE: int = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 ** 2)))  # bytes per read/write
+    UPLOAD_SESSION_TTL_HOURS: int = int(os.getenv("UPLOAD_SESSION_TTL_HOURS", "24"))  # idle resumable sessions are removed
     
     # Security
     SECURITY_PASSWORD_SALT: str = os.getenv("SECURITY_PASSWORD_SALT", secrets.token_urlsafe(32))
@@ -1,15 +1,23 @@
 """
 Database session management and transaction handling for TerraSim.
 Provides connection pooling, transaction management, and error handling.
+
+Two engines share the database:
+  - engine / SessionLocal: synchronous, for workers, scripts and sync endpoints
+  - get_async_engine() / get_async_db(): SQLAlchemy asyncio (aiosqlite or
+    asyncpg), for async endpoints, so waiting on the database does not
+    block the event loop
 """
 
 import logging
-from contextlib import contextmanager
-from typing import Generator, Optional
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncGenerator, Dict, Generator, Optional
 from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, scoped_session, Session
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import SQLAlchemyError, TimeoutError as PoolTimeoutError
 import sys
 from pathlib import Path
 
@@ -38,8 +46,9 @@ else:
     engine = create_engine(
         db_url,
         pool_pre_ping=True,  # Verify connections are alive before using
-        pool_size=getattr(settings, 'DATABASE_POOL_SIZE', 20),
-        max_overflow=getattr(settings, 'DATABASE_MAX_OVERFLOW', 10),
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
         pool_recycle=3600,  # Recycle connections after 1 hour
         echo=False,  # Set to True for SQL debugging
     )
@@ -48,21 +57,93 @@ else:
 
 @event.listens_for(engine, "connect")
 def receive_connect(dbapi_conn, connection_record):
-    """Enable foreign key constraints for SQLite."""
+    """Enable foreign key constraints and multi-process access for SQLite."""
     if db_url.startswith("sqlite"):
         cursor = dbapi_conn.cursor()
         cursor.execute("PRAGMA foreign_keys=ON")
+        # WAL lets API readers proceed while task-queue workers write;
+        # busy_timeout makes competing writers wait instead of failing
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA busy_timeout=30000")
         cursor.close()
 
 
 # Only register pool_connect for SQLite (PostgreSQL connection pooling doesn't support this event)
 if db_url.startswith("sqlite"):
-    @event.listens_for(engine, "pool_connect")
+    @event.listens_for(engine.pool, "connect")
     def receive_pool_connect(dbapi_conn, connection_record):
         """Log connection pool events."""
         logger.debug("Database connection established")
 
 
+class PoolMetrics:
+    """Connection counters of one engine's pool, fed by pool events"""
+    
+    def __init__(self):
+        self.connects = 0
+        self.checkouts = 0
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        self.timeouts = 0
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._lock = threading.Lock()
+    
+    def attach(self, sync_engine):
+        """Count connections and checkouts of an engine's pool"""
+        @event.listens_for(sync_engine, "connect")
+        def on_connect(dbapi_conn, connection_record):
+            with self._lock:
+                self.connects += 1
+        
+        @event.listens_for(sync_engine, "checkout")
+        def on_checkout(dbapi_conn, connection_record, connection_proxy):
+            with self._lock:
+                self.checkouts += 1
+                self.checked_out += 1
+                self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+        
+        @event.listens_for(sync_engine, "checkin")
+        def on_checkin(dbapi_conn, connection_record):
+            with self._lock:
+                self.checked_out = max(0, self.checked_out - 1)
+    
+    def record_wait(self, seconds: float):
+        """Time a session waited for its connection"""
+        with self._lock:
+            self.wait_count += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+    
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+    
+    def snapshot(self, pool) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {"pool": type(pool).__name__}
+        # Only queue pools have a fixed size and overflow
+        for name in ("size", "checkedin", "overflow"):
+            method = getattr(pool, name, None)
+            if callable(method):
+                stats[name] = method()
+        with self._lock:
+            stats.update({
+                "checked_out": self.checked_out,
+                "peak_checked_out": self.peak_checked_out,
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": round(self.wait_total / self.wait_count * 1000, 3) if self.wait_count else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 3)
+            })
+        return stats
+
+
+sync_pool_metrics = PoolMetrics()
+sync_pool_metrics.attach(engine)
+
+
 # Create a scoped session factory
 SessionLocal = scoped_session(
     sessionmaker(
@@ -141,6 +222,167 @@ def get_db_session() -> Generator[Session, None, None]:
         db.close()
 
 
+# ============================================================================
+# ASYNC SESSIONS
+# ============================================================================
+
+def async_database_url(url: str) -> str:
+    """
+    URL of the same database for its asyncio driver
+    
+    sqlite:// uses aiosqlite and postgresql:// uses asyncpg; URLs that
+    already name a driver other than psycopg2 are returned unchanged.
+    """
+    scheme, separator, rest = url.partition("://")
+    if not separator:
+        return url
+    drivers = {
+        "sqlite": "sqlite+aiosqlite",
+        "postgres": "postgresql+asyncpg",
+        "postgresql": "postgresql+asyncpg",
+        "postgresql+psycopg2": "postgresql+asyncpg",
+    }
+    return f"{drivers.get(scheme, scheme)}://{rest}"
+
+
+_async_engine = None
+_async_session_factory = None
+_async_engine_lock = threading.Lock()
+async_pool_metrics = PoolMetrics()
+
+
+def get_async_engine():
+    """
+    Get or create the asyncio engine
+    
+    Created on first use, so processes that never serve async endpoints
+    (task workers, scripts) do not need the async drivers.
+    """
+    global _async_engine, _async_session_factory
+    
+    if _async_engine is None:
+        with _async_engine_lock:
+            if _async_engine is None:
+                from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+                
+                async_url = async_database_url(db_url)
+                if db_url.startswith("sqlite"):
+                    async_engine = create_async_engine(async_url, echo=False)
+                else:
+                    async_engine = create_async_engine(
+                        async_url,
+                        pool_pre_ping=True,
+                        pool_size=settings.DATABASE_POOL_SIZE,
+                        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+                        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+                        pool_recycle=3600,
+                        echo=False,
+                    )
+                # Same pragmas as the sync engine
+                event.listen(async_engine.sync_engine, "connect", receive_connect)
+                async_pool_metrics.attach(async_engine.sync_engine)
+                _async_session_factory = async_sessionmaker(
+                    async_engine,
+                    autoflush=False,
+                    expire_on_commit=False
+                )
+                _async_engine = async_engine
+                logger.info(f"Async database engine initialized: {async_url.split('://')[0]}")
+    return _async_engine
+
+
+def AsyncSessionLocal():
+    """New AsyncSession bound to the asyncio engine"""
+    get_async_engine()
+    return _async_session_factory()
+
+
+async def _connect(db) -> None:
+    """Check out the session's connection now, timing the wait for the pool"""
+    start = time.perf_counter()
+    try:
+        await db.connection()
+    except PoolTimeoutError:
+        async_pool_metrics.record_timeout()
+        raise
+    async_pool_metrics.record_wait(time.perf_counter() - start)
+
+
+async def get_async_db() -> AsyncGenerator[Any, None]:
+    """
+    FastAPI dependency to get an async database session.
+    Commits on success and rolls back on error, like get_db.
+    
+    Yields:
+        SQLAlchemy AsyncSession instance
+    
+    Raises:
+        DatabaseError: If a database operation fails
+    """
+    db = AsyncSessionLocal()
+    try:
+        await _connect(db)
+        yield db
+        await db.commit()
+    except SQLAlchemyError as e:
+        await db.rollback()
+        logger.error(f"Database error in async session: {e}")
+        raise DatabaseError(
+            message="Database operation failed",
+            query=str(e.statement) if hasattr(e, 'statement') else None,
+            context={"error_type": type(e).__name__}
+        )
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Unexpected error in async database session: {e}")
+        raise
+    finally:
+        await db.close()
+
+
+@asynccontextmanager
+async def get_async_db_session() -> AsyncGenerator[Any, None]:
+    """
+    Async context manager for a database session with automatic cleanup.
+    
+    Example:
+        async with get_async_db_session() as db:
+            job = await get_job_async(db, job_id)
+    """
+    db = AsyncSessionLocal()
+    try:
+        yield db
+        await db.commit()
+    except SQLAlchemyError as e:
+        await db.rollback()
+        logger.error(f"Database error in async context manager: {e}")
+        raise DatabaseError(
+            message="Database operation failed",
+            query=str(e.statement) if hasattr(e, 'statement') else None,
+            context={"error_type": type(e).__name__}
+        )
+    except Exception:
+        await db.rollback()
+        raise
+    finally:
+        await db.close()
+
+
+async def close_async_db() -> None:
+    """Close the asyncio engine's pooled connections"""
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        logger.info("Async database connections closed")
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Connection pool metrics of the sync and async engines"""
+    stats = {"sync": sync_pool_metrics.snapshot(engine.pool)}
+    if _async_engine is not None:
+        stats["async"] = async_pool_metrics.snapshot(_async_engine.pool)
+    return stats
+
+
 def init_db() -> None:
     """
     Initialize database tables.
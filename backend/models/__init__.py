@@ -5,8 +5,10 @@ from .pointcloud import PointCloud
 from .raster import Raster
 from .analysis import Analysis
 from .job import Job
+from .job_log import JobLog
 from .erosion_result import ErosionResult
 from .analysis_metrics import AnalysisMetrics
+from .queued_task import QueuedTask
 
 # Import all models here to ensure they are registered with SQLAlchemy
 __all__ = [
@@ -17,6 +19,8 @@ __all__ = [
     "Raster",
     "Analysis",
     "Job",
+    "JobLog",
     "ErosionResult",
     "AnalysisMetrics",
+    "QueuedTask",
 ]
@@ -1,7 +1,7 @@
 from sqlalchemy import String, Text, ForeignKey
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from typing import Optional
-from .base import BaseModel
+from .base import BaseModel, JSONDocument
 
 class Analysis(BaseModel):
     __tablename__ = "analyses"
@@ -10,8 +10,8 @@ class Analysis(BaseModel):
     description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     type: Mapped[Optional[str]] = mapped_column(String, nullable=True)  # erosion, sediment, etc.
     status: Mapped[str] = mapped_column(String, default="pending")  # pending, running, completed, failed
-    parameters: Mapped[dict] = mapped_column(String, default=dict)
-    results: Mapped[dict] = mapped_column(String, default=dict)
+    parameters: Mapped[dict] = mapped_column(JSONDocument, default=dict)
+    results: Mapped[dict] = mapped_column(JSONDocument, default=dict)
     project_id: Mapped[Optional[int]] = mapped_column(ForeignKey("projects.id"), nullable=True)
     owner_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
 
@@ -1,9 +1,13 @@
 from typing import Any, Dict, Optional
 from datetime import datetime
-from sqlalchemy import Column, DateTime, Integer
+from sqlalchemy import JSON, Column, DateTime, Integer
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 from sqlalchemy.sql import func
 
+# Structured JSON documents: JSONB on PostgreSQL (indexable, no reparsing), JSON elsewhere
+JSONDocument = JSON().with_variant(JSONB(), "postgresql")
+
 class Base(DeclarativeBase):
     """Base class for all SQLAlchemy ORM models"""
     pass
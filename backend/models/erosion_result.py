@@ -5,7 +5,7 @@ from sqlalchemy import String, Text, Float, ForeignKey, DateTime
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from datetime import datetime
 from typing import Optional, TYPE_CHECKING
-from .base import BaseModel
+from .base import BaseModel, JSONDocument
 
 if TYPE_CHECKING:
     from .analysis import Analysis
@@ -38,7 +38,7 @@ class ErosionResult(BaseModel):
     processing_seconds: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
 
     # Input parameters (stored as JSON for reference)
-    input_parameters: Mapped[dict] = mapped_column(String, nullable=False)  # K, C, P, R, Q, A, beta, etc.
+    input_parameters: Mapped[dict] = mapped_column(JSONDocument, nullable=False)  # K, C, P, R, Q, A, beta, etc.
 
     # Main results
     mean_sediment_transport: Mapped[Optional[float]] = mapped_column(Float, nullable=True)  # T (kg/s)
@@ -55,22 +55,26 @@ class ErosionResult(BaseModel):
     area_very_high: Mapped[Optional[float]] = mapped_column(Float, nullable=True)  # km² in Very High risk
 
     # RUSLE comparison (Ha1 hypothesis testing)
-    rusle_comparison_result: Mapped[Optional[dict]] = mapped_column(String, nullable=True)  # {t_stat, p_value, rmse, mae, nse}
+    rusle_comparison_result: Mapped[Optional[dict]] = mapped_column(JSONDocument, nullable=True)  # {t_stat, p_value, rmse, mae, nse}
     ha1_supported: Mapped[Optional[str]] = mapped_column(String, nullable=True)  # "yes", "no", "pending"
 
     # Uncertainty metrics
-    uncertainty_metrics: Mapped[Optional[dict]] = mapped_column(String, nullable=True)  # {var_95, var_99, cvar_95, cvar_99}
+    uncertainty_metrics: Mapped[Optional[dict]] = mapped_column(JSONDocument, nullable=True)  # {var_95, var_99, cvar_95, cvar_99}
 
     # Sensitivity analysis results
-    sensitivity_analysis: Mapped[Optional[dict]] = mapped_column(String, nullable=True)  # {parameter: sensitivity_index, ...}
+    sensitivity_analysis: Mapped[Optional[dict]] = mapped_column(JSONDocument, nullable=True)  # {parameter: sensitivity_index, ...}
 
     # Output file paths/URIs
     output_dem_path: Mapped[Optional[str]] = mapped_column(String, nullable=True)  # Path to output DEM
     output_risk_map_path: Mapped[Optional[str]] = mapped_column(String, nullable=True)  # Path to risk classification
     output_statistics_path: Mapped[Optional[str]] = mapped_column(String, nullable=True)  # Path to statistics file
 
-    # Raw results (large datasets as reference)
-    raw_results: Mapped[Optional[dict]] = mapped_column(String, nullable=True)  # Complete output as JSON
+    # Raw results: the complete output as a JSON document whose large arrays are
+    # references into the NPZ file at raw_results_path (see services.result_store).
+    # Deferred so listings never read it.
+    raw_results: Mapped[Optional[dict]] = mapped_column(JSONDocument, nullable=True, deferred=True)
+    raw_results_path: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    raw_results_sha256: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
 
     # Relationships
     analysis: Mapped["Analysis"] = relationship("Analysis", backref="erosion_results")
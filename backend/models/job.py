@@ -2,7 +2,7 @@ from sqlalchemy import String, Text, ForeignKey, DateTime
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from datetime import datetime
 from typing import Optional
-from .base import BaseModel
+from .base import BaseModel, JSONDocument
 
 class Job(BaseModel):
     __tablename__ = "jobs"
@@ -11,9 +11,12 @@ class Job(BaseModel):
     description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     status: Mapped[str] = mapped_column(String, default="pending")  # pending, running, completed, failed, cancelled
     progress: Mapped[int] = mapped_column(default=0)  # 0-100
-    logs: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
-    parameters: Mapped[dict] = mapped_column(String, default=dict)
-    result: Mapped[dict] = mapped_column(String, default=dict)
+    parameters: Mapped[dict] = mapped_column(JSONDocument, default=dict)
+    # Result metadata; large arrays live in the file at result_path (see services.result_store).
+    # Deferred so job listings never read it.
+    result: Mapped[Optional[dict]] = mapped_column(JSONDocument, default=dict, deferred=True)
+    result_path: Mapped[Optional[str]] = mapped_column(String, index=True, nullable=True)
+    result_sha256: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
     started_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     job_type: Mapped[Optional[str]] = mapped_column(String, nullable=True)  # pointcloud_processing, raster_analysis, etc.
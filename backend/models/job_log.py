@@ -0,0 +1,27 @@
+"""
+JobLog model - append-only log lines of a job
+"""
+from sqlalchemy import String, Text, ForeignKey, DateTime, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+from datetime import datetime
+from .base import Base
+
+
+class JobLog(Base):
+    """
+    One log line of a job.
+    
+    Appending is a single INSERT however long the log grows; lines are
+    read back in id order and removed with their job.
+    """
+    __tablename__ = "job_logs"
+    __table_args__ = (
+        Index("ix_job_logs_job_id_id", "job_id", "id"),
+    )
+    
+    id: Mapped[int] = mapped_column(primary_key=True)
+    job_id: Mapped[int] = mapped_column(ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, server_default=func.now())
+    level: Mapped[str] = mapped_column(String(16), nullable=False, default="info")  # info, warning, error
+    message: Mapped[str] = mapped_column(Text, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import String, Float, ForeignKey
+from sqlalchemy import String, Float, ForeignKey, JSON
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from typing import Optional
 from .base import BaseModel
@@ -10,9 +10,9 @@ class PointCloud(BaseModel):
     file_path: Mapped[str] = mapped_column(String, nullable=False)
     file_size: Mapped[Optional[int]] = mapped_column(nullable=True)  # in bytes
     point_count: Mapped[Optional[int]] = mapped_column(nullable=True)
-    bounds: Mapped[dict] = mapped_column(String, default=dict)  # {"minx": float, "miny": float, "maxx": float, "maxy": float, "minz": float, "maxz": float}
+    bounds: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)  # {"minx": float, "miny": float, "maxx": float, "maxy": float, "minz": float, "maxz": float}
     srs: Mapped[Optional[str]] = mapped_column(String, nullable=True)  # Spatial Reference System
-    pointcloud_metadata: Mapped[dict] = mapped_column(String, default=dict)
+    pointcloud_metadata: Mapped[dict] = mapped_column("metadata", JSON, default=dict)
     status: Mapped[str] = mapped_column(String, default="uploaded")  # uploaded, processing, processed, error
     project_id: Mapped[Optional[int]] = mapped_column(ForeignKey("projects.id"), nullable=True)
     owner_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
@@ -0,0 +1,50 @@
+"""
+QueuedTask model - durable background task queue shared by all worker processes
+"""
+from sqlalchemy import String, Text, Integer, Boolean, DateTime, JSON, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime
+from typing import Optional, Any
+from .base import BaseModel
+
+
+class QueuedTask(BaseModel):
+    """
+    One unit of background work.
+    
+    Workers claim tasks by taking a time-limited lease and renew it with
+    heartbeats; tasks whose lease expires are handed to another worker.
+    """
+    __tablename__ = "task_queue"
+    __table_args__ = (
+        Index("ix_task_queue_claim", "queue", "status", "priority", "available_at"),
+    )
+
+    queue: Mapped[str] = mapped_column(String, nullable=False, default="default")
+    task_type: Mapped[str] = mapped_column(String, nullable=False)  # Registered handler name
+    payload: Mapped[Optional[Any]] = mapped_column(JSON, nullable=True)
+    status: Mapped[str] = mapped_column(String, nullable=False, default="queued")  # queued, running, completed, failed, cancelled
+    priority: Mapped[int] = mapped_column(Integer, nullable=False, default=0)  # Lower runs first
+    idempotency_key: Mapped[Optional[str]] = mapped_column(String, nullable=True, unique=True)
+    batch_id: Mapped[Optional[str]] = mapped_column(String, nullable=True, index=True)
+    owner_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True, index=True)
+
+    # Retry state
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=3)
+    available_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    # Lease state
+    lease_owner: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    lease_expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    heartbeat_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    cancel_requested: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+
+    # Progress and outcome
+    progress: Mapped[int] = mapped_column(Integer, nullable=False, default=0)  # 0-100
+    message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    state: Mapped[Optional[Any]] = mapped_column(JSON, nullable=True)  # Live task-specific detail, e.g. pipeline stages
+    result: Mapped[Optional[Any]] = mapped_column(JSON, nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
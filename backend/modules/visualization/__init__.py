@@ -13,6 +13,9 @@ from dataclasses import dataclass
 import numpy as np
 from pathlib import Path
 
+# Bump when visualization output changes, to invalidate cached results
+ENGINE_VERSION = "1"
+
 
 @dataclass
 class VisualizationConfig:
@@ -4,7 +4,7 @@ from .project import Project, ProjectCreate, ProjectUpdate, ProjectWithDetails
 from .pointcloud import PointCloud, PointCloudCreate, PointCloudUpdate, PointCloudProcess, PointCloudStats
 from .raster import Raster, RasterCreate, RasterUpdate, RasterProcess, RasterStats
 from .analysis import Analysis, AnalysisCreate, AnalysisUpdate, AnalysisResult, ErosionAnalysisParameters, ErosionAnalysisResults
-from .job import Job, JobCreate, JobUpdate, JobStatus
+from .job import Job, JobCreate, JobUpdate, JobStatus, JobSummary, JobLogEntry
 from .model import Model, ModelCreate, ModelUpdate, ModelPrediction, ModelTraining, ModelMetrics
 from .erosion_result import ErosionResultCreate, ErosionResultUpdate, ErosionResultInDB, ErosionResultResponse
 from .analysis_metrics import AnalysisMetricsCreate, AnalysisMetricsUpdate, AnalysisMetricsInDB, AnalysisMetricsResponse, SensitivityAnalysisRequest, CorrelationAnalysisRequest, UncertaintyAnalysisRequest
@@ -16,7 +16,7 @@ __all__ = [
     "PointCloud", "PointCloudCreate", "PointCloudUpdate", "PointCloudProcess", "PointCloudStats",
     "Raster", "RasterCreate", "RasterUpdate", "RasterProcess", "RasterStats",
     "Analysis", "AnalysisCreate", "AnalysisUpdate", "AnalysisResult", "ErosionAnalysisParameters", "ErosionAnalysisResults",
-    "Job", "JobCreate", "JobUpdate", "JobStatus",
+    "Job", "JobCreate", "JobUpdate", "JobStatus", "JobSummary", "JobLogEntry",
     "Model", "ModelCreate", "ModelUpdate", "ModelPrediction", "ModelTraining", "ModelMetrics",
     "ErosionResultCreate", "ErosionResultUpdate", "ErosionResultInDB", "ErosionResultResponse",
     "AnalysisMetricsCreate", "AnalysisMetricsUpdate", "AnalysisMetricsInDB", "AnalysisMetricsResponse",
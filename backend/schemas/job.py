@@ -19,18 +19,18 @@ class JobUpdate(BaseModel):
     description: Optional[str] = None
     status: Optional[str] = None
     progress: Optional[int] = None
-    logs: Optional[str] = None
     result: Optional[Dict[str, Any]] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
 
 
-class Job(JobBase):
+class JobSummary(JobBase):
+    """A job without its result, as listed"""
     id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
     status: str
     progress: int
-    logs: Optional[str] = None
-    result: Dict[str, Any] = {}
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
     analysis_id: Optional[int] = None
@@ -39,6 +39,21 @@ class Job(JobBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class Job(JobSummary):
+    # Result metadata; large arrays are references served by /jobs/{id}/result/arrays/{name}
+    result: Optional[Dict[str, Any]] = None
+    result_sha256: Optional[str] = None
+
+
+class JobLogEntry(BaseModel):
+    id: int
+    created_at: datetime
+    level: str
+    message: str
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class JobStatus(BaseModel):
     job_id: str
     status: str
@@ -1,5 +1,5 @@
 from typing import Optional, Dict, Any
-from pydantic import BaseModel, ConfigDict
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field
 from datetime import datetime
 
 
@@ -37,6 +37,8 @@ class PointCloudUpdate(BaseModel):
 
 class PointCloud(PointCloudBase):
     id: int
+    # The ORM attribute is pointcloud_metadata; "metadata" is reserved by SQLAlchemy
+    metadata: Dict[str, Any] = Field(default={}, validation_alias=AliasChoices("pointcloud_metadata", "metadata"))
     created_at: datetime
     updated_at: Optional[datetime] = None
     file_path: str
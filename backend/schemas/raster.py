@@ -1,5 +1,5 @@
 from typing import Optional, Dict, Any
-from pydantic import BaseModel, ConfigDict
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field
 from datetime import datetime
 
 
@@ -38,6 +38,8 @@ class RasterUpdate(BaseModel):
 
 class Raster(RasterBase):
     id: int
+    # The ORM attribute is raster_metadata; "metadata" is reserved by SQLAlchemy
+    metadata: Dict[str, Any] = Field(default={}, validation_alias=AliasChoices("raster_metadata", "metadata"))
     created_at: datetime
     updated_at: Optional[datetime] = None
     file_path: str
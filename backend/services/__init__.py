@@ -71,7 +71,9 @@ from .job_service import (
     cancel_job,
     get_job_status,
     update_job_progress,
-    append_job_log
+    append_job_log,
+    get_job_logs,
+    load_job_result
 )
 
 __all__ = [
@@ -148,4 +150,6 @@ __all__ = [
     'get_job_status',
     'update_job_progress',
     'append_job_log',
+    'get_job_logs',
+    'load_job_result',
 ]
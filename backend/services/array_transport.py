@@ -0,0 +1,299 @@
+"""
+Array Transport - Binary encodings for raster responses
+Content negotiation, compact dtypes, compression and server-side downsampling
+
+Nested JSON lists are about ten times larger than the raw grid and slow to
+encode. Clients choose an encoding with the Accept header or a format query
+parameter:
+  - application/json: {"shape", "dtype", "data": nested lists} (default)
+  - application/x-npy: NumPy .npy file, readable with numpy.load
+  - application/vnd.apache.arrow.stream: Arrow IPC stream with one
+    "values" column in row-major order (requires pyarrow)
+  - application/x-msgpack: {"shape", "dtype", "data": raw little-endian
+    bytes} (requires msgpack)
+
+Bodies are compressed with zstd (requires zstandard) or gzip when the
+client's Accept-Encoding allows it. Shape and dtype are also sent in
+X-Array-Shape and X-Array-DType headers.
+"""
+
+import gzip
+import io
+import json
+import math
+import warnings
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from fastapi import Response
+
+try:
+    import pyarrow  # type: ignore[import]
+    import pyarrow.ipc  # type: ignore[import]
+except ImportError:
+    pyarrow = None  # type: ignore
+
+try:
+    import msgpack  # type: ignore[import]
+except ImportError:
+    msgpack = None  # type: ignore
+
+try:
+    import zstandard  # type: ignore[import]
+except ImportError:
+    zstandard = None  # type: ignore
+
+MEDIA_TYPES = {
+    "json": "application/json",
+    "npy": "application/x-npy",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "msgpack": "application/x-msgpack"
+}
+
+ALLOWED_DTYPES = ("float64", "float32", "float16", "int32", "int16", "uint16", "uint8")
+
+# Binary formats default to float32; float64 rarely carries meaningful digits here
+DEFAULT_BINARY_DTYPE = "float32"
+
+GZIP_LEVEL = 4
+ZSTD_LEVEL = 3
+
+
+class ArrayTransportError(ValueError):
+    """Raised when a requested format, dtype or encoding cannot be served"""
+
+
+def available_formats() -> Tuple[str, ...]:
+    """Formats whose encoder is installed"""
+    return tuple(
+        name for name in MEDIA_TYPES
+        if (name != "arrow" or pyarrow is not None) and (name != "msgpack" or msgpack is not None)
+    )
+
+
+def _parse_accept(header: Optional[str]):
+    """(media type, q) pairs in the order given"""
+    for part in (header or "").split(","):
+        fields = [field.strip() for field in part.split(";")]
+        if not fields[0]:
+            continue
+        q = 1.0
+        for field in fields[1:]:
+            if field.startswith("q="):
+                try:
+                    q = float(field[2:])
+                except ValueError:
+                    q = 0.0
+        yield fields[0].lower(), q
+
+
+def negotiate_format(accept: Optional[str], requested: Optional[str] = None) -> str:
+    """
+    Pick a response format
+    
+    Args:
+        accept: Accept header
+        requested: Explicit format name, which takes precedence
+    
+    Raises:
+        ArrayTransportError: If the requested format is unknown or not installed
+    """
+    formats = available_formats()
+    if requested:
+        if requested not in MEDIA_TYPES:
+            raise ArrayTransportError(f"Unknown format '{requested}'; expected one of {', '.join(MEDIA_TYPES)}")
+        if requested not in formats:
+            raise ArrayTransportError(f"Format '{requested}' is not available on this server")
+        return requested
+    
+    best, best_q = "json", 0.0
+    for media_type, q in _parse_accept(accept):
+        for name in formats:
+            if media_type == MEDIA_TYPES[name] and q > best_q:
+                best, best_q = name, q
+    return best
+
+
+def negotiate_encoding(accept_encoding: Optional[str], requested: Optional[str] = None) -> str:
+    """
+    Pick a content encoding: "zstd", "gzip" or "identity"
+    
+    Args:
+        accept_encoding: Accept-Encoding header
+        requested: Explicit encoding ("none" disables compression)
+    """
+    if requested:
+        requested = "identity" if requested == "none" else requested
+        if requested not in ("zstd", "gzip", "identity"):
+            raise ArrayTransportError(f"Unknown compression '{requested}'")
+        if requested == "zstd" and zstandard is None:
+            raise ArrayTransportError("zstd compression is not available on this server")
+        return requested
+    
+    accepted = {coding: q for coding, q in _parse_accept(accept_encoding) if q > 0}
+    if "zstd" in accepted and zstandard is not None:
+        return "zstd"
+    if "gzip" in accepted:
+        return "gzip"
+    return "identity"
+
+
+def downsample(array: np.ndarray, max_size: int, method: Optional[str] = None) -> np.ndarray:
+    """
+    Shrink a 2D grid so neither side exceeds max_size
+    
+    Args:
+        array: 2D grid
+        max_size: Largest allowed width or height
+        method: "mean" (NaN-aware block mean) or "nearest" (every n-th cell).
+            Defaults to mean for floating point grids and nearest for integer
+            grids such as risk classes.
+    """
+    if max_size < 1:
+        raise ArrayTransportError("max_size must be at least 1")
+    factor = math.ceil(max(array.shape) / max_size)
+    if factor <= 1:
+        return array
+    
+    if method is None:
+        method = "mean" if np.issubdtype(array.dtype, np.floating) else "nearest"
+    if method == "nearest":
+        offset = factor // 2
+        return array[offset::factor, offset::factor]
+    if method != "mean":
+        raise ArrayTransportError(f"Unknown downsampling method '{method}'")
+    
+    height, width = array.shape
+    work_dtype = array.dtype if np.issubdtype(array.dtype, np.floating) else np.float64
+    pad_h, pad_w = -height % factor, -width % factor
+    if pad_h or pad_w:
+        grid = np.full((height + pad_h, width + pad_w), np.nan, dtype=work_dtype)
+        grid[:height, :width] = array
+    else:
+        grid = array.astype(work_dtype, copy=False)
+    blocks = grid.reshape(grid.shape[0] // factor, factor, grid.shape[1] // factor, factor)
+    with warnings.catch_warnings():
+        # All-NaN blocks become NaN
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.nanmean(blocks, axis=(1, 3))
+
+
+def _default_dtype(array: np.ndarray, fmt: str) -> str:
+    """float32 for floating point grids, the smallest fitting type for integer ones"""
+    if fmt == "json":
+        return array.dtype.name
+    if array.dtype.kind == "f":
+        return DEFAULT_BINARY_DTYPE
+    if array.dtype.kind in "iub" and array.size:
+        low, high = int(array.min()), int(array.max())
+        for name in ("uint8", "int16", "uint16", "int32"):
+            info = np.iinfo(name)
+            if info.min <= low and high <= info.max:
+                return name
+    return array.dtype.name
+
+
+def _cast(array: np.ndarray, dtype: str) -> np.ndarray:
+    if dtype not in ALLOWED_DTYPES and dtype != array.dtype.name:
+        raise ArrayTransportError(f"Unsupported dtype '{dtype}'; expected one of {', '.join(ALLOWED_DTYPES)}")
+    target = np.dtype(dtype).newbyteorder("<")
+    if np.issubdtype(target, np.integer) and np.issubdtype(array.dtype, np.floating):
+        # Clip and round instead of wrapping; NaN has no integer form
+        info = np.iinfo(target)
+        array = np.clip(np.rint(np.nan_to_num(array)), info.min, info.max)
+    return np.ascontiguousarray(array, dtype=target)
+
+
+def _encode(array: np.ndarray, fmt: str, meta: Dict[str, Any]) -> bytes:
+    header = {"shape": list(array.shape), "dtype": array.dtype.name, **meta}
+    
+    if fmt == "npy":
+        buffer = io.BytesIO()
+        np.lib.format.write_array(buffer, array, allow_pickle=False)
+        return buffer.getvalue()
+    
+    if fmt == "arrow":
+        column = pyarrow.array(array.ravel())
+        schema = pyarrow.schema(
+            [pyarrow.field("values", column.type)],
+            metadata={key: json.dumps(value) for key, value in header.items()}
+        )
+        batch = pyarrow.record_batch([column], schema=schema)
+        sink = pyarrow.BufferOutputStream()
+        with pyarrow.ipc.new_stream(sink, schema) as writer:
+            writer.write_batch(batch)
+        return sink.getvalue().to_pybytes()
+    
+    if fmt == "msgpack":
+        return msgpack.packb({**header, "data": array.tobytes()}, use_bin_type=True)
+    
+    data = array.tolist()
+    if array.dtype.kind == "f" and np.isnan(array).any():
+        # NaN is not valid JSON
+        data = np.where(np.isnan(array), None, array).tolist()
+    return json.dumps({**header, "data": data}).encode()
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL)
+    return body
+
+
+def array_response(
+    array: np.ndarray,
+    accept: Optional[str] = None,
+    accept_encoding: Optional[str] = None,
+    fmt: Optional[str] = None,
+    dtype: Optional[str] = None,
+    max_size: Optional[int] = None,
+    resample: Optional[str] = None,
+    compress: Optional[str] = None,
+    meta: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """
+    Encode a 2D grid for the client
+    
+    CPU-bound for large grids; async endpoints should run it through the
+    compute dispatcher's thread pool.
+    
+    Args:
+        array: 2D grid
+        accept: Accept header, used when fmt is None
+        accept_encoding: Accept-Encoding header, used when compress is None
+        fmt: Explicit format: json, npy, arrow or msgpack
+        dtype: Output dtype (binary formats default to float32 for floating
+            point grids and the smallest fitting type for integer grids)
+        max_size: Downsample so neither side exceeds this many cells
+        resample: Downsampling method, "mean" or "nearest"
+        compress: Explicit encoding: zstd, gzip or none
+        meta: Extra JSON-serializable fields sent with the shape and dtype
+        headers: Extra response headers
+    
+    Raises:
+        ArrayTransportError: If the format, dtype or encoding cannot be served
+    """
+    fmt = negotiate_format(accept, fmt)
+    encoding = negotiate_encoding(accept_encoding, compress)
+    
+    original_shape = array.shape
+    if max_size:
+        array = downsample(array, max_size, resample)
+    array = _cast(array, dtype or _default_dtype(array, fmt))
+    
+    meta = {**(meta or {}), "original_shape": list(original_shape)}
+    body = _compress(_encode(array, fmt, meta), encoding)
+    
+    response_headers = {
+        "X-Array-Shape": ",".join(str(n) for n in array.shape),
+        "X-Array-DType": array.dtype.name,
+        "X-Original-Shape": ",".join(str(n) for n in original_shape),
+        "Vary": "Accept, Accept-Encoding",
+        **(headers or {})
+    }
+    if encoding != "identity":
+        response_headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=MEDIA_TYPES[fmt], headers=response_headers)
@@ -0,0 +1,254 @@
+"""
+Compute Dispatcher - Keeps CPU-bound and blocking work off the asyncio event loop
+Runs NumPy simulations on a process pool and blocking I/O on a thread pool
+
+Async endpoints await run_cpu() or run_io() instead of calling heavy code
+directly, so one long simulation no longer stalls every other request
+(including health checks). Each pool admits at most as many calls as it has
+workers; further calls wait in a bounded queue and are rejected with
+ComputeBusy once it is full, which endpoints turn into 503 responses.
+
+Queue time (waiting for a slot) and run time are recorded per pool and
+exposed through stats().
+"""
+
+import asyncio
+import functools
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import BrokenExecutor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+import sys
+from pathlib import Path
+
+# Add backend directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+logger = logging.getLogger(__name__)
+
+# Number of recent calls the timing percentiles are computed over
+METRICS_WINDOW = 1024
+
+
+class ComputeBusy(Exception):
+    """Raised when a pool's wait queue is full"""
+
+
+class _PoolLane:
+    """One executor with its admission limit and metrics"""
+    
+    def __init__(self, name: str, executor_factory: Callable[[], Any], max_workers: int, max_pending: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor_factory = executor_factory
+        self._executor = None
+        self._slots = asyncio.Semaphore(max_workers)
+        self._lock = threading.Lock()
+        
+        self.running = 0
+        self.waiting = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.queue_times: Deque[float] = deque(maxlen=METRICS_WINDOW)
+        self.run_times: Deque[float] = deque(maxlen=METRICS_WINDOW)
+    
+    @property
+    def executor(self):
+        # Created on first use so importing the API never forks workers
+        with self._lock:
+            if self._executor is not None and getattr(self._executor, "_broken", False):
+                # A worker process died (e.g. OOM-killed); start a new pool
+                logger.warning(f"{self.name} pool is broken; starting a new one")
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            if self._executor is None:
+                self._executor = self._executor_factory()
+            return self._executor
+    
+    def _replace(self, broken):
+        """Drop a pool that raised BrokenExecutor, unless already replaced"""
+        with self._lock:
+            if self._executor is broken:
+                logger.warning(f"{self.name} pool is broken; starting a new one")
+                broken.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+    
+    def _submit(self, call: Callable) -> Tuple[Any, Future]:
+        executor = self.executor
+        try:
+            return executor, executor.submit(call)
+        except BrokenExecutor:
+            # The pool broke after its last call finished; the call has not run
+            self._replace(executor)
+            executor = self.executor
+            return executor, executor.submit(call)
+    
+    def _release(self, started_at: float):
+        self.run_times.append(time.perf_counter() - started_at)
+        self.running -= 1
+        self._slots.release()
+    
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        if self.waiting >= self.max_pending and self._slots.locked():
+            self.rejected += 1
+            raise ComputeBusy(
+                f"{self.name} pool is busy ({self.running} running, {self.waiting} waiting)"
+            )
+        
+        self.submitted += 1
+        self.waiting += 1
+        queued_at = time.perf_counter()
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        
+        started_at = time.perf_counter()
+        self.queue_times.append(started_at - queued_at)
+        self.running += 1
+        loop = asyncio.get_running_loop()
+        try:
+            executor, future = self._submit(functools.partial(func, *args, **kwargs))
+        except BaseException:
+            self.failed += 1
+            self._release(started_at)
+            raise
+        
+        def release(_):
+            # The slot is held until the worker is done, not until the caller
+            # stops waiting, so cancelled requests cannot exceed max_workers
+            try:
+                loop.call_soon_threadsafe(self._release, started_at)
+            except RuntimeError:
+                pass  # Event loop already closed
+        
+        future.add_done_callback(release)
+        try:
+            result = await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # The client went away; a call already running finishes on its own
+            raise
+        except BrokenExecutor:
+            self.failed += 1
+            self._replace(executor)
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        else:
+            self.completed += 1
+            return result
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "running": self.running,
+            "waiting": self.waiting,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "queue_time": _summarize(self.queue_times),
+            "run_time": _summarize(self.run_times)
+        }
+    
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
+
+
+def _summarize(samples: Deque[float]) -> Dict[str, float]:
+    """Mean, p50, p95 and max of recent durations in seconds"""
+    if not samples:
+        return {"count": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "mean": sum(ordered) / len(ordered),
+        "p50": ordered[len(ordered) // 2],
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "max": ordered[-1]
+    }
+
+
+class ComputeDispatcher:
+    """
+    Dispatches CPU-bound calls to a process pool and blocking I/O to a thread pool
+    
+    Functions sent to run_cpu() must be picklable: module-level functions
+    with picklable arguments. Return summaries rather than large arrays,
+    since results are pickled back to the API process.
+    """
+    
+    def __init__(self, process_workers: int = 4, thread_workers: int = 8, max_pending: int = 32):
+        """
+        Args:
+            process_workers: Processes for CPU-bound work
+            thread_workers: Threads for blocking I/O (raster reads, DB calls)
+            max_pending: Calls allowed to wait per pool before ComputeBusy
+        """
+        self.cpu = _PoolLane(
+            "cpu",
+            lambda: ProcessPoolExecutor(max_workers=process_workers),
+            process_workers,
+            max_pending
+        )
+        self.io = _PoolLane(
+            "io",
+            lambda: ThreadPoolExecutor(max_workers=thread_workers, thread_name_prefix="compute-io"),
+            thread_workers,
+            max_pending
+        )
+    
+    async def run_cpu(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run func(*args, **kwargs) in a worker process
+        
+        Raises:
+            ComputeBusy: If the process pool's wait queue is full
+        """
+        return await self.cpu.run(func, *args, **kwargs)
+    
+    async def run_io(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run func(*args, **kwargs) in a worker thread
+        
+        Raises:
+            ComputeBusy: If the thread pool's wait queue is full
+        """
+        return await self.io.run(func, *args, **kwargs)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Concurrency, throughput and queue-time metrics per pool"""
+        return {"cpu": self.cpu.stats(), "io": self.io.stats()}
+    
+    def shutdown(self, wait: bool = True):
+        """Shut down both pools"""
+        self.cpu.shutdown(wait=wait)
+        self.io.shutdown(wait=wait)
+
+
+# Global compute dispatcher instance
+_compute_dispatcher: Optional[ComputeDispatcher] = None
+
+
+def get_compute_dispatcher() -> ComputeDispatcher:
+    """Get or create the global compute dispatcher"""
+    global _compute_dispatcher
+    
+    if _compute_dispatcher is None:
+        from core.config import settings
+        _compute_dispatcher = ComputeDispatcher(
+            process_workers=settings.COMPUTE_PROCESS_WORKERS,
+            thread_workers=settings.COMPUTE_THREAD_WORKERS,
+            max_pending=settings.COMPUTE_MAX_PENDING
+        )
+    return _compute_dispatcher
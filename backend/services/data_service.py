@@ -6,6 +6,8 @@ Consolidates common data management patterns for geospatial data types
 import os
 import logging
 from typing import List, Optional, Dict, Any, TypeVar, Generic, Type, cast
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from abc import ABC, abstractmethod
 
@@ -38,6 +40,22 @@ class BaseDataService(ABC, Generic[T, C, U]):
             .all()
         ))
     
+    async def get_by_id_async(self, db: AsyncSession, item_id: int) -> Optional[T]:
+        """Get item by ID without blocking the event loop"""
+        return cast(Optional[T], await db.scalar(
+            select(self.model_class).where(getattr(self.model_class, 'id') == item_id)
+        ))
+    
+    async def get_by_owner_async(self, db: AsyncSession, owner_id: int, skip: int = 0, limit: int = 100) -> List[T]:
+        """Get items for a specific owner without blocking the event loop"""
+        result = await db.scalars(
+            select(self.model_class)
+            .where(getattr(self.model_class, 'owner_id') == owner_id)
+            .offset(skip)
+            .limit(limit)
+        )
+        return cast(List[T], list(result))
+    
     def create(self, db: Session, item: C, owner_id: int, **kwargs) -> T:
         """Create new item - override in subclass for custom logic"""
         create_data = self._prepare_create_data(item, **kwargs)
@@ -73,10 +91,15 @@ class BaseDataService(ABC, Generic[T, C, U]):
         if not db_item:
             return False
         
-        # Delete associated file if it exists
+        # Delete associated file if it exists; uploads are content-addressed,
+        # so keep it while another record still points at it
         file_path = getattr(db_item, 'file_path', None)
         if file_path and isinstance(file_path, str):
-            if os.path.exists(file_path):
+            shared = db.query(self.model_class).filter(
+                getattr(self.model_class, 'file_path') == file_path,
+                getattr(self.model_class, 'id') != item_id
+            ).first()
+            if not shared and os.path.exists(file_path):
                 try:
                     os.remove(file_path)
                 except OSError as e:
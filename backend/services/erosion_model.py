@@ -56,6 +56,9 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 logger = logging.getLogger(__name__)
 
+# Bump when simulation output changes, to invalidate cached results
+ENGINE_VERSION = "1"
+
 
 @dataclass
 class ErosionFactors:
@@ -44,10 +44,14 @@ from .raster_service import (
     RasterService,
     get_raster,
     get_rasters,
+    get_raster_async,
+    get_rasters_async,
     create_raster,
     update_raster,
     delete_raster,
     process_raster_file,
+    register_uploaded_raster,
+    replace_raster_file,
     get_raster_stats,
     create_cog
 )
@@ -61,6 +65,8 @@ from .pointcloud_service import (
     update_pointcloud,
     delete_pointcloud,
     process_pointcloud_file,
+    register_uploaded_pointcloud,
+    process_pointcloud_to_dem,
     get_pointcloud_stats
 )
 
@@ -68,6 +74,8 @@ from .pointcloud_service import (
 from .analysis import (
     get_analysis,
     get_analyses,
+    get_analysis_async,
+    get_analyses_async,
     create_analysis,
     update_analysis,
     delete_analysis,
@@ -115,10 +123,14 @@ __all__ = [
     'RasterService',
     'get_raster',
     'get_rasters',
+    'get_raster_async',
+    'get_rasters_async',
     'create_raster',
     'update_raster',
     'delete_raster',
     'process_raster_file',
+    'register_uploaded_raster',
+    'replace_raster_file',
     'get_raster_stats',
     'create_cog',
     
@@ -130,11 +142,15 @@ __all__ = [
     'update_pointcloud',
     'delete_pointcloud',
     'process_pointcloud_file',
+    'register_uploaded_pointcloud',
+    'process_pointcloud_to_dem',
     'get_pointcloud_stats',
     
     # Analysis Services
     'get_analysis',
     'get_analyses',
+    'get_analysis_async',
+    'get_analyses_async',
     'create_analysis',
     'update_analysis',
     'delete_analysis',
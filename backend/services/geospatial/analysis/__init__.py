@@ -14,6 +14,8 @@ Components:
 from .analysis_crud import (
     get_analysis,
     get_analyses,
+    get_analysis_async,
+    get_analyses_async,
     create_analysis,
     update_analysis,
     delete_analysis,
@@ -37,6 +39,8 @@ __all__ = [
     # CRUD Operations
     'get_analysis',
     'get_analyses',
+    'get_analysis_async',
+    'get_analyses_async',
     'create_analysis',
     'update_analysis',
     'delete_analysis',
@@ -11,6 +11,8 @@ import os
 import json
 import logging
 from typing import List, Optional, Dict, Any
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 import sys
 from pathlib import Path
@@ -65,6 +67,47 @@ def get_analyses(
     )
 
 
+async def get_analysis_async(db: AsyncSession, analysis_id: int) -> Optional[Analysis]:
+    """
+    Retrieve a single analysis by ID without blocking the event loop.
+    
+    Args:
+        db: Async database session
+        analysis_id: ID of analysis to retrieve
+    
+    Returns:
+        Analysis object or None if not found
+    """
+    return await db.scalar(select(Analysis).where(Analysis.id == analysis_id))
+
+
+async def get_analyses_async(
+    db: AsyncSession,
+    owner_id: int,
+    skip: int = 0,
+    limit: int = 100
+) -> List[Analysis]:
+    """
+    Retrieve analyses for a specific owner without blocking the event loop.
+    
+    Args:
+        db: Async database session
+        owner_id: Owner ID to filter by
+        skip: Number of records to skip (pagination)
+        limit: Maximum records to return
+    
+    Returns:
+        List of Analysis objects
+    """
+    result = await db.scalars(
+        select(Analysis)
+        .where(Analysis.owner_id == owner_id)
+        .offset(skip)
+        .limit(limit)
+    )
+    return list(result)
+
+
 def create_analysis(
     db: Session,
     analysis: AnalysisCreate,
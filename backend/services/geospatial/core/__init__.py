@@ -8,6 +8,18 @@ from .layer import Layer, LayerType, Extent, LayerStyle, LayerProperty
 from .raster_layer import RasterLayer, RasterBand
 from .vector_layer import VectorLayer, Feature, Geometry, GeometryType, Attribute
 from .pointcloud_layer import PointCloudLayer, PointCloudStatistics
+from .pointcloud_gridding import GridMethod, GridSpec, PointGridder, grid_points, nearest_idw_grid
+from .pointcloud_streaming import (
+    LASChunkReader, LASHeaderInfo, StreamingStatistics, read_header,
+    stream_statistics, stream_classification_counts, stream_to_grid, read_points_array
+)
+from .pointcloud_index import (
+    TileNode, PointCloudIndex, PointCloudIndexBuilder, build_index, build_index_from_array
+)
+from .pointcloud_filters import (
+    PointCloudFilterConfig, statistical_outlier_mask, voxel_downsample,
+    progressive_morphological_filter, filter_points, filter_index_to_grid
+)
 from .canvas import Canvas, LayerTree, CanvasSettings, CanvasUnit
 from .crs import CRS, CoordinateTransformer, CoordinateTransform
 from .spatial_ops import (
@@ -35,6 +47,20 @@ __all__ = [
     'Geometry', 'GeometryType', 'Feature', 'Attribute',
     'RasterBand', 'PointCloudStatistics', 'Extent',
     
+    # Point cloud gridding
+    'GridMethod', 'GridSpec', 'PointGridder', 'grid_points', 'nearest_idw_grid',
+    
+    # Point cloud streaming
+    'LASChunkReader', 'LASHeaderInfo', 'StreamingStatistics', 'read_header',
+    'stream_statistics', 'stream_classification_counts', 'stream_to_grid', 'read_points_array',
+    
+    # Point cloud tiling index
+    'TileNode', 'PointCloudIndex', 'PointCloudIndexBuilder', 'build_index', 'build_index_from_array',
+    
+    # Point cloud filtering
+    'PointCloudFilterConfig', 'statistical_outlier_mask', 'voxel_downsample',
+    'progressive_morphological_filter', 'filter_points', 'filter_index_to_grid',
+    
     # Canvas
     'Canvas', 'LayerTree', 'CanvasSettings', 'CanvasUnit',
     
@@ -200,38 +200,37 @@ class LASProvider(DataProvider):
     def read(self, source: str) -> Optional[PointCloudLayer]:
         """Read LAS file."""
         try:
-            import laspy
+            from .pointcloud_streaming import read_header, read_points_array
             
-            las = laspy.read(source)
+            header = read_header(source)
             
             layer = PointCloudLayer(
                 name=Path(source).stem,
                 source=source
             )
             
-            # Extract point data - convert to numpy arrays
-            x = np.array(las.x, dtype=np.float64)
-            y = np.array(las.y, dtype=np.float64)
-            z = np.array(las.z, dtype=np.float64)
-            intensity = np.array(las.intensity, dtype=np.float64) if hasattr(las, 'intensity') else np.zeros(len(las), dtype=np.float64)
-            classification = np.array(las.classification, dtype=np.float64) if hasattr(las, 'classification') else np.zeros(len(las), dtype=np.float64)
-            
-            points = np.vstack([
-                x,
-                y,
-                z,
-                intensity,
-                classification
-            ]).T
+            # Stream x, y, z, intensity, classification into one preallocated array
+            points, stats = read_points_array(source)
             
             layer.load_points(points)
-            layer.set_point_format(f"LAS {las.header.version}")
+            layer.load_statistics(stats.to_statistics())
+            layer.set_point_format(f"LAS {header.version}")
             
             return layer
         except Exception as e:
             print(f"Error reading LAS: {e}")
             return None
     
+    def read_statistics(self, source: str, chunk_size: int = 1_000_000) -> Optional[PointCloudStatistics]:
+        """Compute statistics in one streaming pass without loading points."""
+        try:
+            from .pointcloud_streaming import stream_statistics
+            
+            return stream_statistics(source, chunk_size=chunk_size)
+        except Exception as e:
+            print(f"Error reading LAS statistics: {e}")
+            return None
+    
     def write(self, layer: PointCloudLayer, destination: str) -> bool:
         """Write PointCloudLayer to LAS."""
         try:
@@ -0,0 +1,292 @@
+"""
+Point cloud filtering.
+Outlier removal, voxel downsampling and ground classification.
+
+Neighbourhood filters run on KD-trees and the ground filter on a gridded
+minimum surface, so every step is vectorized. Large clouds are processed tile
+by tile from a PointCloudIndex, with a halo of neighbouring points so results
+along tile edges match a whole-cloud run.
+"""
+
+from typing import Optional, Dict, Any, Callable, Tuple
+from dataclasses import dataclass, fields
+import logging
+import numpy as np
+from scipy import ndimage
+from scipy.spatial import cKDTree
+
+from .pointcloud_gridding import GridMethod, GridSpec, PointGridder
+from .pointcloud_index import PointCloudIndex, TileNode
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[float, str], None]
+
+
+@dataclass
+class PointCloudFilterConfig:
+    """Filter chain settings (distances in map units)."""
+    voxel_size: Optional[float] = None  # None = no downsampling
+    outlier_neighbors: int = 8
+    outlier_std_ratio: Optional[float] = 2.5  # None = no outlier removal
+    ground_filter: bool = True
+    ground_cell_size: float = 1.0
+    max_window: float = 16.0
+    slope: float = 0.15
+    initial_distance: float = 0.15
+    max_distance: float = 2.5
+    
+    @classmethod
+    def from_dict(cls, config: Dict[str, Any]) -> 'PointCloudFilterConfig':
+        """Build from a job configuration, ignoring unrelated keys."""
+        names = {f.name for f in fields(cls)}
+        return cls(**{key: value for key, value in config.items() if key in names})
+    
+    @property
+    def halo(self) -> float:
+        """Context distance needed around a tile for edge-consistent results."""
+        if self.ground_filter:
+            return self.max_window
+        return 4 * (self.voxel_size or self.ground_cell_size)
+
+
+def statistical_outlier_mask(
+    xyz: np.ndarray,
+    k: int = 8,
+    std_ratio: float = 2.5,
+    workers: int = -1
+) -> np.ndarray:
+    """
+    Statistical outlier removal.
+    
+    A point is an outlier when its mean distance to its k nearest neighbours
+    exceeds the cloud-wide mean of that distance by std_ratio standard
+    deviations.
+    
+    Returns:
+        Boolean mask of inliers
+    """
+    if len(xyz) <= k:
+        return np.ones(len(xyz), dtype=bool)
+    
+    tree = cKDTree(xyz)
+    # Querying in the tree's leaf order keeps neighbouring queries cache-local
+    order = tree.indices
+    distances, _ = tree.query(xyz[order], k=k + 1, workers=workers)
+    mean_distance = np.empty(len(xyz))
+    mean_distance[order] = distances[:, 1:].mean(axis=1)
+    threshold = mean_distance.mean() + std_ratio * mean_distance.std()
+    return mean_distance <= threshold
+
+
+def voxel_downsample(
+    points: np.ndarray,
+    voxel_size: float,
+    origin: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Keep one point per voxel.
+    
+    x, y, z become the centroid of the voxel's points; the remaining columns
+    are taken from the first point in the voxel. Pass a shared origin when
+    downsampling tiles separately so their voxels line up.
+    """
+    if len(points) == 0:
+        return points
+    
+    xyz = points[:, :3]
+    if origin is None:
+        origin = xyz.min(axis=0)
+    voxel = np.floor((xyz - origin) / voxel_size).astype(np.int64)
+    voxel -= voxel.min(axis=0)
+    code = np.ravel_multi_index(voxel.T, voxel.max(axis=0) + 1)
+    
+    _, first, inverse, counts = np.unique(code, return_index=True, return_inverse=True, return_counts=True)
+    result = points[first].astype(np.float64)
+    for axis in range(3):
+        result[:, axis] = np.bincount(inverse, weights=xyz[:, axis]) / counts
+    return result
+
+
+def _filled_minimum_surface(
+    x: np.ndarray,
+    y: np.ndarray,
+    z: np.ndarray,
+    spec: GridSpec
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Minimum-z grid with empty cells taken from the nearest populated cell."""
+    gridder = PointGridder(spec, GridMethod.MIN)
+    gridder.add_points(x, y, z)
+    surface = gridder.result()
+    
+    empty = np.isnan(surface)
+    if empty.any():
+        _, (rows, cols) = ndimage.distance_transform_edt(empty, return_indices=True)
+        surface = surface[rows, cols]
+    
+    index, _ = spec.cell_indices(x, y)
+    return surface, index
+
+
+def progressive_morphological_filter(
+    xyz: np.ndarray,
+    cell_size: float = 1.0,
+    max_window: float = 16.0,
+    slope: float = 0.15,
+    initial_distance: float = 0.15,
+    max_distance: float = 2.5
+) -> np.ndarray:
+    """
+    Progressive morphological ground filter (Zhang et al., 2003).
+    
+    The minimum surface is opened with windows of 3, 5, 9, 17... cells. At
+    each step, points higher than the opened surface by more than an
+    elevation threshold (growing with window size and terrain slope) are
+    removed from the ground.
+    
+    Args:
+        xyz: (n, 3) point coordinates
+        cell_size: Surface grid cell size
+        max_window: Largest window in map units (roughly the largest building)
+        slope: Expected terrain slope (rise/run)
+        initial_distance: Threshold for the first window
+        max_distance: Threshold cap
+    
+    Returns:
+        Boolean mask of ground points
+    """
+    ground = np.ones(len(xyz), dtype=bool)
+    if len(xyz) == 0:
+        return ground
+    
+    x, y, z = xyz[:, 0], xyz[:, 1], xyz[:, 2]
+    spec = GridSpec.from_bounds(float(x.min()), float(y.min()), float(x.max()), float(y.max()), cell_size)
+    surface, index = _filled_minimum_surface(x, y, z, spec)
+    
+    window, previous = 3, 1
+    while window * cell_size <= max_window or previous == 1:
+        surface = ndimage.grey_opening(surface, size=(window, window))
+        if previous == 1:
+            threshold = initial_distance
+        else:
+            threshold = min(slope * (window - previous) * cell_size + initial_distance, max_distance)
+        ground &= z - surface.ravel()[index] <= threshold
+        previous, window = window, 2 * window - 1
+    
+    return ground
+
+
+def filter_points(
+    points: np.ndarray,
+    config: PointCloudFilterConfig,
+    core_count: Optional[int] = None,
+    origin: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, Dict[str, int]]:
+    """
+    Run the filter chain on an in-memory cloud.
+    
+    Args:
+        points: (n, >=3) array; the first three columns are x, y, z
+        config: Filter settings
+        core_count: When set, only the first core_count points are returned;
+            the rest are halo points that only provide neighbourhood context
+        origin: Shared voxel origin for tiled runs
+    
+    Returns:
+        (kept points, counts of points removed by each step)
+    """
+    counts = {'input_points': len(points) if core_count is None else core_count}
+    core = np.ones(len(points), dtype=bool)
+    if core_count is not None:
+        core[core_count:] = False
+    
+    if config.voxel_size:
+        core_points = voxel_downsample(points[core], config.voxel_size, origin)
+        halo_points = voxel_downsample(points[~core], config.voxel_size, origin)
+        points = np.concatenate([core_points, halo_points])
+        core = np.r_[np.ones(len(core_points), dtype=bool), np.zeros(len(halo_points), dtype=bool)]
+        counts['after_downsampling'] = len(core_points)
+    
+    if config.outlier_std_ratio is not None:
+        inliers = statistical_outlier_mask(points[:, :3], config.outlier_neighbors, config.outlier_std_ratio)
+        counts['outliers_removed'] = int((core & ~inliers).sum())
+        points, core = points[inliers], core[inliers]
+    
+    if config.ground_filter:
+        ground = progressive_morphological_filter(
+            points[:, :3],
+            cell_size=config.ground_cell_size,
+            max_window=config.max_window,
+            slope=config.slope,
+            initial_distance=config.initial_distance,
+            max_distance=config.max_distance
+        )
+        counts['non_ground_removed'] = int((core & ~ground).sum())
+        points, core = points[ground], core[ground]
+    
+    counts['output_points'] = int(core.sum())
+    return points[core], counts
+
+
+def _tile_with_halo(index: PointCloudIndex, node: TileNode, halo: float) -> Tuple[np.ndarray, int]:
+    """Tile points followed by neighbouring-tile points within halo of its bounds."""
+    core = np.asarray(index.load_tile(node.key))
+    b = node.bounds
+    xmin, ymin, xmax, ymax = b[0] - halo, b[1] - halo, b[3] + halo, b[4] + halo
+    
+    parts = [core]
+    for neighbour in index.leaves_in_bbox(xmin, ymin, xmax, ymax):
+        if neighbour.key == node.key:
+            continue
+        tile = index.load_tile(neighbour.key)
+        mask = (
+            (tile[:, 0] >= xmin) & (tile[:, 0] <= xmax) &
+            (tile[:, 1] >= ymin) & (tile[:, 1] <= ymax)
+        )
+        parts.append(tile[mask])
+    return np.concatenate(parts), len(core)
+
+
+def filter_index_to_grid(
+    index: PointCloudIndex,
+    spec: GridSpec,
+    config: PointCloudFilterConfig,
+    method: GridMethod = GridMethod.IDW,
+    fill_empty: bool = True,
+    nodata: float = np.nan,
+    progress: Optional[ProgressCallback] = None
+) -> Tuple[np.ndarray, Dict[str, int]]:
+    """
+    Filter an indexed cloud tile by tile and grid the surviving points.
+    
+    Memory is bounded by one tile plus its halo and the output grid.
+    
+    Args:
+        index: Tiled point cloud
+        spec: Output grid
+        config: Filter settings
+        method: Cell reduction for the DEM
+        fill_empty: Fill cells without surviving points
+        nodata: Value for cells without data
+        progress: Called with (fraction complete, message)
+    
+    Returns:
+        (grid, summed filter counts)
+    """
+    gridder = PointGridder(spec, method)
+    origin = np.asarray(index.bounds[:3])
+    totals: Dict[str, int] = {}
+    
+    leaves = [index.nodes[key] for key in sorted(index.nodes) if index.nodes[key].leaf]
+    for i, node in enumerate(leaves):
+        points, core_count = _tile_with_halo(index, node, config.halo)
+        kept, counts = filter_points(points, config, core_count=core_count, origin=origin)
+        gridder.add_points(kept[:, 0], kept[:, 1], kept[:, 2])
+        
+        for key, value in counts.items():
+            totals[key] = totals.get(key, 0) + value
+        if progress is not None:
+            progress((i + 1) / len(leaves), f"Filtered tile {i + 1}/{len(leaves)}")
+    
+    logger.info(f"Filtered {index.point_count} points in {len(leaves)} tiles: {totals}")
+    return gridder.result(fill_empty=fill_empty, nodata=nodata), totals
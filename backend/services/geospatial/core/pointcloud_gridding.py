@@ -0,0 +1,356 @@
+"""
+Point cloud gridding engine.
+Rasterizes point clouds into DEM/DSM grids in linear time.
+
+Cell indices are computed once per point and reduced with bincount or
+unbuffered ufunc.at accumulation, so cost grows linearly with point count
+and points may be fed in chunks of any size.
+"""
+
+from typing import Optional, Tuple
+from dataclasses import dataclass
+from enum import Enum
+import numpy as np
+from scipy.interpolate import LinearNDInterpolator
+from scipy.spatial import cKDTree, QhullError
+
+from .layer import Extent
+
+
+class GridMethod(Enum):
+    """Cell reduction methods."""
+    MIN = "min"
+    MAX = "max"
+    MEAN = "mean"
+    IDW = "idw"
+    TIN = "tin"
+
+
+@dataclass
+class GridSpec:
+    """
+    North-up grid definition.
+    Row 0 is the northern edge; cells are resolution x resolution map units.
+    """
+    xmin: float
+    ymax: float
+    resolution: float
+    cols: int
+    rows: int
+    
+    @staticmethod
+    def from_bounds(
+        xmin: float,
+        ymin: float,
+        xmax: float,
+        ymax: float,
+        resolution: float
+    ) -> 'GridSpec':
+        """Smallest grid at resolution covering the bounds."""
+        if resolution <= 0:
+            raise ValueError("Grid resolution must be positive")
+        cols = max(1, int(np.ceil((xmax - xmin) / resolution)))
+        rows = max(1, int(np.ceil((ymax - ymin) / resolution)))
+        return GridSpec(xmin=xmin, ymax=ymax, resolution=resolution, cols=cols, rows=rows)
+    
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return (self.rows, self.cols)
+    
+    @property
+    def size(self) -> int:
+        return self.rows * self.cols
+    
+    @property
+    def extent(self) -> Extent:
+        return Extent(
+            xmin=self.xmin,
+            ymin=self.ymax - self.rows * self.resolution,
+            xmax=self.xmin + self.cols * self.resolution,
+            ymax=self.ymax
+        )
+    
+    @property
+    def transform(self) -> Tuple[float, float, float, float, float, float]:
+        """GDAL-ordered affine coefficients (a, b, c, d, e, f)."""
+        return (self.resolution, 0.0, self.xmin, 0.0, -self.resolution, self.ymax)
+    
+    def cell_indices(self, x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Flat cell index of each point.
+        
+        Returns:
+            (indices of points inside the grid, boolean mask of those points)
+        """
+        col = np.floor((x - self.xmin) / self.resolution).astype(np.int64)
+        row = np.floor((self.ymax - y) / self.resolution).astype(np.int64)
+        
+        # Points on the far edges belong to the last row/column
+        col[col == self.cols] = self.cols - 1
+        row[row == self.rows] = self.rows - 1
+        
+        inside = (col >= 0) & (col < self.cols) & (row >= 0) & (row < self.rows)
+        return row[inside] * self.cols + col[inside], inside
+    
+    def cell_centers(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Cell-centre x (cols,) and y (rows,) coordinates."""
+        x = self.xmin + (np.arange(self.cols) + 0.5) * self.resolution
+        y = self.ymax - (np.arange(self.rows) + 0.5) * self.resolution
+        return x, y
+
+
+class PointGridder:
+    """
+    Accumulates point chunks into a grid and reduces them per cell.
+    
+    Usage:
+        gridder = PointGridder(spec, GridMethod.MAX)
+        for x, y, z in chunks:
+            gridder.add_points(x, y, z)
+        dsm = gridder.result()
+    """
+    
+    def __init__(self, spec: GridSpec, method: GridMethod = GridMethod.MEAN, power: float = 2.0):
+        """
+        Args:
+            spec: Output grid definition
+            method: Cell reduction method
+            power: Distance power for IDW weighting
+        """
+        self.spec = spec
+        self.method = GridMethod(method)
+        self.power = power
+        
+        size = spec.size
+        self._count = np.zeros(size, dtype=np.int64)
+        self._min: Optional[np.ndarray] = None
+        self._max: Optional[np.ndarray] = None
+        self._weight: Optional[np.ndarray] = None
+        self._weighted_z: Optional[np.ndarray] = None
+        self._sum_x: Optional[np.ndarray] = None
+        self._sum_y: Optional[np.ndarray] = None
+        
+        if self.method == GridMethod.MIN:
+            self._min = np.full(size, np.inf)
+        elif self.method == GridMethod.MAX:
+            self._max = np.full(size, -np.inf)
+        else:
+            self._weight = np.zeros(size)
+            self._weighted_z = np.zeros(size)
+        if self.method == GridMethod.TIN:
+            self._sum_x = np.zeros(size)
+            self._sum_y = np.zeros(size)
+    
+    def add_points(self, x: np.ndarray, y: np.ndarray, z: np.ndarray):
+        """Accumulate a chunk of points."""
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        z = np.asarray(z, dtype=np.float64)
+        
+        index, inside = self.spec.cell_indices(x, y)
+        if index.size == 0:
+            return
+        x, y, z = x[inside], y[inside], z[inside]
+        size = self.spec.size
+        
+        self._count += np.bincount(index, minlength=size)
+        
+        if self.method == GridMethod.MIN:
+            np.minimum.at(self._min, index, z)
+        elif self.method == GridMethod.MAX:
+            np.maximum.at(self._max, index, z)
+        elif self.method == GridMethod.IDW:
+            # Weight each point by its distance to the centre of its cell
+            res = self.spec.resolution
+            cx = self.spec.xmin + (index % self.spec.cols + 0.5) * res
+            cy = self.spec.ymax - (index // self.spec.cols + 0.5) * res
+            weights = 1.0 / np.maximum(np.hypot(x - cx, y - cy), 1e-10 * res) ** self.power
+            self._weight += np.bincount(index, weights=weights, minlength=size)
+            self._weighted_z += np.bincount(index, weights=weights * z, minlength=size)
+        else:
+            self._weight += np.bincount(index, minlength=size)
+            self._weighted_z += np.bincount(index, weights=z, minlength=size)
+            if self.method == GridMethod.TIN:
+                self._sum_x += np.bincount(index, weights=x, minlength=size)
+                self._sum_y += np.bincount(index, weights=y, minlength=size)
+    
+    def counts(self) -> np.ndarray:
+        """Points per cell."""
+        return self._count.reshape(self.spec.shape)
+    
+    def result(self, fill_empty: bool = False, nodata: float = np.nan) -> np.ndarray:
+        """
+        Reduce accumulated points to a grid.
+        
+        Args:
+            fill_empty: Fill empty cells by IDW from the nearest populated cells
+                (TIN always interpolates inside the convex hull of the samples)
+            nodata: Value for cells without data
+        """
+        populated = self._count > 0
+        grid = np.full(self.spec.size, np.nan)
+        
+        if self.method == GridMethod.MIN:
+            grid[populated] = self._min[populated]
+        elif self.method == GridMethod.MAX:
+            grid[populated] = self._max[populated]
+        elif self.method == GridMethod.TIN:
+            grid = self._triangulate(populated)
+        else:
+            grid[populated] = self._weighted_z[populated] / self._weight[populated]
+        
+        if fill_empty:
+            grid = self._fill_empty(grid)
+        
+        grid = grid.reshape(self.spec.shape)
+        if not np.isnan(nodata):
+            grid[np.isnan(grid)] = nodata
+        return grid
+    
+    def _cell_center_points(self, cells: np.ndarray) -> np.ndarray:
+        res = self.spec.resolution
+        return np.column_stack([
+            self.spec.xmin + (cells % self.spec.cols + 0.5) * res,
+            self.spec.ymax - (cells // self.spec.cols + 0.5) * res
+        ])
+    
+    def _triangulate(self, populated: np.ndarray) -> np.ndarray:
+        """Linear TIN through one representative (mean) point per populated cell."""
+        grid = np.full(self.spec.size, np.nan)
+        count = self._count[populated]
+        samples = np.column_stack([
+            self._sum_x[populated] / count,
+            self._sum_y[populated] / count
+        ])
+        z = self._weighted_z[populated] / count
+        
+        if len(samples) < 3:
+            grid[populated] = z
+            return grid
+        try:
+            interpolator = LinearNDInterpolator(samples, z)
+        except QhullError:
+            # Collinear samples cannot be triangulated
+            grid[populated] = z
+            return grid
+        
+        x, y = self.spec.cell_centers()
+        rows_per_block = max(1, (1 << 20) // self.spec.cols)
+        for start in range(0, self.spec.rows, rows_per_block):
+            xx, yy = np.meshgrid(x, y[start:start + rows_per_block])
+            block = slice(start * self.spec.cols, (start + len(xx)) * self.spec.cols)
+            grid[block] = interpolator(xx.ravel(), yy.ravel())
+        return grid
+    
+    def _fill_empty(self, grid: np.ndarray, k: int = 8) -> np.ndarray:
+        """IDW fill of NaN cells from the k nearest valid cell centres."""
+        valid = np.isfinite(grid)
+        if valid.all() or not valid.any():
+            return grid
+        
+        valid_cells = np.flatnonzero(valid)
+        empty_cells = np.flatnonzero(~valid)
+        tree = cKDTree(self._cell_center_points(valid_cells))
+        k = min(k, len(valid_cells))
+        
+        filled = grid.copy()
+        block = 1 << 18
+        for start in range(0, len(empty_cells), block):
+            cells = empty_cells[start:start + block]
+            distances, nearest = tree.query(self._cell_center_points(cells), k=k)
+            if k == 1:
+                distances, nearest = distances[:, None], nearest[:, None]
+            weights = 1.0 / np.maximum(distances, 1e-10) ** self.power
+            filled[cells] = np.sum(weights * grid[valid_cells[nearest]], axis=1) / np.sum(weights, axis=1)
+        return filled
+
+
+def grid_points(
+    x: np.ndarray,
+    y: np.ndarray,
+    z: np.ndarray,
+    resolution: float,
+    method: GridMethod = GridMethod.MEAN,
+    spec: Optional[GridSpec] = None,
+    chunk_size: Optional[int] = None,
+    fill_empty: bool = False,
+    nodata: float = np.nan
+) -> Tuple[np.ndarray, GridSpec]:
+    """
+    Grid in-memory point arrays.
+    
+    Args:
+        x, y, z: Point coordinates
+        resolution: Cell size (ignored when spec is given)
+        method: Cell reduction method
+        spec: Output grid (None = fit to the point bounds)
+        chunk_size: Points per accumulation pass (None = all at once)
+        fill_empty: Fill empty cells from neighbouring cells
+        nodata: Value for cells without data
+    
+    Returns:
+        (grid, spec)
+    """
+    if spec is None:
+        if len(x) == 0:
+            raise ValueError("Cannot fit a grid to an empty point set")
+        spec = GridSpec.from_bounds(
+            float(np.min(x)), float(np.min(y)), float(np.max(x)), float(np.max(y)), resolution
+        )
+    
+    gridder = PointGridder(spec, method)
+    step = chunk_size or max(len(x), 1)
+    for start in range(0, len(x), step):
+        gridder.add_points(x[start:start + step], y[start:start + step], z[start:start + step])
+    
+    return gridder.result(fill_empty=fill_empty, nodata=nodata), spec
+
+
+def nearest_idw_grid(
+    x: np.ndarray,
+    y: np.ndarray,
+    z: np.ndarray,
+    xmin: float,
+    ymin: float,
+    xmax: float,
+    ymax: float,
+    resolution: float,
+    k: int = 10,
+    power: float = 1.0
+) -> np.ndarray:
+    """
+    IDW of the k nearest points at each grid node.
+    
+    Nodes are at (xmin + j * resolution, ymin + i * resolution), so row 0 is
+    the southern edge; this is the grid PointCloudLayer has always returned.
+    Uses a KD-tree instead of a distance scan per node.
+    
+    Args:
+        x, y, z: Point coordinates
+        xmin, ymin, xmax, ymax: Grid bounds (upper bounds exclusive)
+        resolution: Node spacing
+        k: Neighbours per node
+        power: Distance power for IDW weighting
+    
+    Returns:
+        (rows, cols) grid
+    """
+    x_range = np.arange(xmin, xmax, resolution)
+    y_range = np.arange(ymin, ymax, resolution)
+    grid = np.zeros((len(y_range), len(x_range)))
+    if len(x) == 0 or grid.size == 0:
+        return grid
+    
+    tree = cKDTree(np.column_stack([x, y]))
+    z = np.asarray(z, dtype=np.float64)
+    k = min(k, len(x))
+    rows_per_block = max(1, (1 << 18) // max(len(x_range), 1))
+    for start in range(0, len(y_range), rows_per_block):
+        xx, yy = np.meshgrid(x_range, y_range[start:start + rows_per_block])
+        distances, nearest = tree.query(np.column_stack([xx.ravel(), yy.ravel()]), k=k)
+        if k == 1:
+            distances, nearest = distances[:, None], nearest[:, None]
+        weights = 1.0 / (distances + 1e-10) ** power
+        values = np.sum(weights * z[nearest], axis=1) / np.sum(weights, axis=1)
+        grid[start:start + len(xx)] = values.reshape(xx.shape)
+    return grid
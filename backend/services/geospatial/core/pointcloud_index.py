@@ -0,0 +1,663 @@
+"""
+Point cloud spatial index.
+Splits a point cloud into a quadtree/octree of tiles cached on disk.
+
+Leaf tiles hold every point of their cell; internal tiles hold a random
+subsample of their children for level-of-detail rendering. A JSON manifest
+records the key, tight bounds and point count of every tile, so bbox/radius
+queries and LOD selection only open the tiles they touch.
+
+Layout of an index directory:
+    manifest.json
+    tiles/<level>-<ix>-<iy>-<iz>.npy
+"""
+
+from typing import Optional, Dict, Any, Iterator, List, Sequence, Tuple
+from dataclasses import dataclass
+import json
+import logging
+import math
+import os
+import shutil
+import numpy as np
+
+from .layer import Extent
+from .pointcloud_streaming import DEFAULT_CHUNK_SIZE, LASChunkReader, read_header
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+DEFAULT_TILE_POINTS = 100_000
+DEFAULT_MAX_DEPTH = 12
+DEFAULT_DIMENSIONS = ('x', 'y', 'z', 'intensity', 'classification')
+
+TileKey = Tuple[int, int, int, int]  # (level, ix, iy, iz)
+Bounds3D = Tuple[float, float, float, float, float, float]  # (xmin, ymin, zmin, xmax, ymax, zmax)
+
+ROOT_KEY: TileKey = (0, 0, 0, 0)
+
+
+def _key_name(key: TileKey) -> str:
+    return "-".join(str(v) for v in key)
+
+
+def _parse_key(name: str) -> TileKey:
+    level, ix, iy, iz = (int(v) for v in name.split("-"))
+    return (level, ix, iy, iz)
+
+
+def _parent_key(key: TileKey) -> TileKey:
+    level, ix, iy, iz = key
+    return (level - 1, ix >> 1, iy >> 1, iz >> 1)
+
+
+def _data_bounds(points: np.ndarray) -> Bounds3D:
+    mins = points[:, :3].min(axis=0)
+    maxs = points[:, :3].max(axis=0)
+    return tuple(float(v) for v in mins) + tuple(float(v) for v in maxs)
+
+
+def _union_bounds(bounds: Sequence[Bounds3D]) -> Bounds3D:
+    stacked = np.asarray(bounds)
+    return tuple(float(v) for v in stacked[:, :3].min(axis=0)) + \
+        tuple(float(v) for v in stacked[:, 3:].max(axis=0))
+
+
+@dataclass
+class TileNode:
+    """One tile of the index."""
+    key: TileKey
+    bounds: Bounds3D
+    point_count: int
+    leaf: bool
+    
+    @property
+    def level(self) -> int:
+        return self.key[0]
+    
+    def intersects(
+        self,
+        xmin: float,
+        ymin: float,
+        xmax: float,
+        ymax: float,
+        zmin: float = -np.inf,
+        zmax: float = np.inf
+    ) -> bool:
+        b = self.bounds
+        return (
+            b[0] <= xmax and b[3] >= xmin and
+            b[1] <= ymax and b[4] >= ymin and
+            b[2] <= zmax and b[5] >= zmin
+        )
+    
+    def overlap_fraction(self, xmin: float, ymin: float, xmax: float, ymax: float) -> float:
+        """Share of the tile's planimetric area inside the box."""
+        b = self.bounds
+        width = min(b[3], xmax) - max(b[0], xmin)
+        height = min(b[4], ymax) - max(b[1], ymin)
+        if width < 0 or height < 0:
+            return 0.0
+        area = max(b[3] - b[0], 1e-12) * max(b[4] - b[1], 1e-12)
+        return min(1.0, max(width, 1e-12) * max(height, 1e-12) / area)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'bounds': list(self.bounds),
+            'point_count': self.point_count,
+            'leaf': self.leaf
+        }
+
+
+def _cell_indices(
+    points: np.ndarray,
+    bounds: Bounds3D,
+    level: int,
+    octree: bool
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Tile indices (ix, iy, iz) of each point at level."""
+    cells = 1 << level
+    origin = np.asarray(bounds[:3])
+    size = np.maximum(np.asarray(bounds[3:]) - origin, 1e-9)
+    axes = 3 if octree else 2
+    
+    index = np.floor((points[:, :axes] - origin[:axes]) * (cells / size[:axes])).astype(np.int64)
+    np.clip(index, 0, cells - 1, out=index)
+    iz = index[:, 2] if octree else np.zeros(len(points), dtype=np.int64)
+    return index[:, 0], index[:, 1], iz
+
+
+class PointCloudIndex:
+    """
+    Read-only view of a tiled point cloud.
+    
+    Usage:
+        index = build_index("survey.laz", "/data/index/survey")
+        clip = index.query_bbox(xmin, ymin, xmax, ymax)
+        preview = index.lod_points(view_extent, point_budget=500_000)
+    """
+    
+    def __init__(
+        self,
+        root_dir: str,
+        bounds: Bounds3D,
+        dimensions: Sequence[str],
+        nodes: Dict[TileKey, TileNode],
+        octree: bool = False,
+        max_points_per_tile: int = DEFAULT_TILE_POINTS,
+        source: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Args:
+            root_dir: Index directory
+            bounds: Nominal cube bounds the tile keys are computed from
+            dimensions: Column names of the tile arrays
+            nodes: Tiles by key
+            octree: Tiles are also split along z
+            max_points_per_tile: Split threshold used when building
+            source: Signature of the file the index was built from
+        """
+        self.root_dir = root_dir
+        self.bounds = tuple(float(v) for v in bounds)
+        self.dimensions = tuple(dimensions)
+        self.nodes = nodes
+        self.octree = octree
+        self.max_points_per_tile = max_points_per_tile
+        self.source = source
+    
+    @staticmethod
+    def open(root_dir: str) -> 'PointCloudIndex':
+        """Open an index from its manifest."""
+        with open(os.path.join(root_dir, MANIFEST_NAME)) as f:
+            manifest = json.load(f)
+        if manifest.get('version') != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported point cloud index version: {manifest.get('version')}")
+        
+        nodes = {}
+        for name, entry in manifest['nodes'].items():
+            key = _parse_key(name)
+            nodes[key] = TileNode(
+                key=key,
+                bounds=tuple(entry['bounds']),
+                point_count=entry['point_count'],
+                leaf=entry['leaf']
+            )
+        return PointCloudIndex(
+            root_dir,
+            bounds=manifest['bounds'],
+            dimensions=manifest['dimensions'],
+            nodes=nodes,
+            octree=manifest['octree'],
+            max_points_per_tile=manifest['max_points_per_tile'],
+            source=manifest.get('source')
+        )
+    
+    def save_manifest(self):
+        """Write the manifest atomically."""
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'bounds': list(self.bounds),
+            'dimensions': list(self.dimensions),
+            'octree': self.octree,
+            'max_points_per_tile': self.max_points_per_tile,
+            'point_count': self.point_count,
+            'source': self.source,
+            'nodes': {_key_name(key): node.to_dict() for key, node in self.nodes.items()}
+        }
+        path = os.path.join(self.root_dir, MANIFEST_NAME)
+        with open(path + ".tmp", "w") as f:
+            json.dump(manifest, f)
+        os.replace(path + ".tmp", path)
+    
+    @property
+    def point_count(self) -> int:
+        """Number of points stored in leaf tiles."""
+        return sum(node.point_count for node in self.nodes.values() if node.leaf)
+    
+    @property
+    def depth(self) -> int:
+        return max((key[0] for key in self.nodes), default=0)
+    
+    def extent(self) -> Extent:
+        """Tight extent of the indexed points."""
+        b = self.nodes[ROOT_KEY].bounds if ROOT_KEY in self.nodes else self.bounds
+        return Extent(xmin=b[0], ymin=b[1], xmax=b[3], ymax=b[4], zmin=b[2], zmax=b[5])
+    
+    def tile_path(self, key: TileKey) -> str:
+        return os.path.join(self.root_dir, "tiles", _key_name(key) + ".npy")
+    
+    def load_tile(self, key: TileKey) -> np.ndarray:
+        """Memory-map one tile as an (n, len(dimensions)) array."""
+        return np.load(self.tile_path(key), mmap_mode='r')
+    
+    def children(self, key: TileKey) -> List[TileNode]:
+        level, ix, iy, iz = key
+        dz = (0, 1) if self.octree else (0,)
+        candidates = [
+            (level + 1, 2 * ix + i, 2 * iy + j, 2 * iz + k)
+            for i in (0, 1) for j in (0, 1) for k in dz
+        ]
+        return [self.nodes[c] for c in candidates if c in self.nodes]
+    
+    def leaves_in_bbox(
+        self,
+        xmin: float,
+        ymin: float,
+        xmax: float,
+        ymax: float,
+        zmin: float = -np.inf,
+        zmax: float = np.inf
+    ) -> List[TileNode]:
+        """Leaf tiles whose bounds intersect the box."""
+        if ROOT_KEY not in self.nodes:
+            return []
+        
+        leaves = []
+        stack = [self.nodes[ROOT_KEY]]
+        while stack:
+            node = stack.pop()
+            if not node.intersects(xmin, ymin, xmax, ymax, zmin, zmax):
+                continue
+            if node.leaf:
+                leaves.append(node)
+            else:
+                stack.extend(self.children(node.key))
+        return leaves
+    
+    def _clip(
+        self,
+        nodes: List[TileNode],
+        xmin: float,
+        ymin: float,
+        xmax: float,
+        ymax: float,
+        zmin: float,
+        zmax: float
+    ) -> np.ndarray:
+        parts = []
+        for node in nodes:
+            tile = self.load_tile(node.key)
+            b = node.bounds
+            contained = (
+                b[0] >= xmin and b[3] <= xmax and b[1] >= ymin and
+                b[4] <= ymax and b[2] >= zmin and b[5] <= zmax
+            )
+            if contained:
+                parts.append(np.asarray(tile))
+                continue
+            mask = (
+                (tile[:, 0] >= xmin) & (tile[:, 0] <= xmax) &
+                (tile[:, 1] >= ymin) & (tile[:, 1] <= ymax) &
+                (tile[:, 2] >= zmin) & (tile[:, 2] <= zmax)
+            )
+            parts.append(tile[mask])
+        
+        if not parts:
+            return np.empty((0, len(self.dimensions)))
+        return np.concatenate(parts)
+    
+    def query_bbox(
+        self,
+        xmin: float,
+        ymin: float,
+        xmax: float,
+        ymax: float,
+        zmin: Optional[float] = None,
+        zmax: Optional[float] = None
+    ) -> np.ndarray:
+        """All points inside the box, at full resolution."""
+        zmin = -np.inf if zmin is None else zmin
+        zmax = np.inf if zmax is None else zmax
+        nodes = self.leaves_in_bbox(xmin, ymin, xmax, ymax, zmin, zmax)
+        return self._clip(nodes, xmin, ymin, xmax, ymax, zmin, zmax)
+    
+    def query_extent(self, extent: Extent) -> np.ndarray:
+        return self.query_bbox(extent.xmin, extent.ymin, extent.xmax, extent.ymax)
+    
+    def query_radius(
+        self,
+        x: float,
+        y: float,
+        radius: float,
+        z: Optional[float] = None
+    ) -> np.ndarray:
+        """
+        Points within radius of (x, y), or of (x, y, z) when z is given.
+        """
+        if z is None:
+            candidates = self.query_bbox(x - radius, y - radius, x + radius, y + radius)
+            distance2 = (candidates[:, 0] - x) ** 2 + (candidates[:, 1] - y) ** 2
+        else:
+            candidates = self.query_bbox(
+                x - radius, y - radius, x + radius, y + radius, z - radius, z + radius
+            )
+            distance2 = (
+                (candidates[:, 0] - x) ** 2 + (candidates[:, 1] - y) ** 2 +
+                (candidates[:, 2] - z) ** 2
+            )
+        return candidates[distance2 <= radius * radius]
+    
+    def select_lod(
+        self,
+        xmin: float,
+        ymin: float,
+        xmax: float,
+        ymax: float,
+        point_budget: int
+    ) -> List[TileNode]:
+        """
+        Deepest uniform set of tiles covering the box within a point budget.
+        
+        Refinement proceeds level by level so the selected density is even
+        across the view; tiles that are already leaves are kept as they are.
+        Tile counts are scaled by their overlap with the box, assuming points
+        are spread evenly within a tile.
+        """
+        if ROOT_KEY not in self.nodes:
+            return []
+        root = self.nodes[ROOT_KEY]
+        if not root.intersects(xmin, ymin, xmax, ymax):
+            return []
+        
+        selected = [root]
+        while any(not node.leaf for node in selected):
+            refined = []
+            for node in selected:
+                if node.leaf:
+                    refined.append(node)
+                else:
+                    refined.extend(
+                        child for child in self.children(node.key)
+                        if child.intersects(xmin, ymin, xmax, ymax)
+                    )
+            estimate = sum(
+                node.point_count * node.overlap_fraction(xmin, ymin, xmax, ymax) for node in refined
+            )
+            if estimate > point_budget:
+                break
+            selected = refined
+        return selected
+    
+    def lod_points(self, extent: Optional[Extent] = None, point_budget: int = 1_000_000) -> np.ndarray:
+        """
+        Level-of-detail sample of the points inside extent (None = everything).
+        
+        Returns full-resolution points when they fit in the budget.
+        """
+        if extent is None:
+            extent = self.extent()
+        nodes = self.select_lod(extent.xmin, extent.ymin, extent.xmax, extent.ymax, point_budget)
+        return self._clip(nodes, extent.xmin, extent.ymin, extent.xmax, extent.ymax, -np.inf, np.inf)
+    
+    def iter_tiles(self, leaves_only: bool = True) -> Iterator[Tuple[TileNode, np.ndarray]]:
+        """Yield (node, points) for every tile, e.g. for out-of-core processing."""
+        for key in sorted(self.nodes):
+            node = self.nodes[key]
+            if node.leaf or not leaves_only:
+                yield node, self.load_tile(key)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'root_dir': self.root_dir,
+            'point_count': self.point_count,
+            'tile_count': len(self.nodes),
+            'leaf_count': sum(1 for node in self.nodes.values() if node.leaf),
+            'depth': self.depth,
+            'octree': self.octree,
+            'dimensions': list(self.dimensions)
+        }
+
+
+class PointCloudIndexBuilder:
+    """
+    Builds a PointCloudIndex incrementally from point chunks.
+    
+    Chunks are bucketed by their tile at a level sized from expected_points
+    and appended to staging files, so memory is bounded by one chunk during
+    ingestion and by one bucket while finalize() splits buckets into leaves.
+    
+    Usage:
+        builder = PointCloudIndexBuilder(root_dir, bounds, expected_points=n)
+        for chunk in LASChunkReader(path, dimensions=builder.dimensions):
+            builder.add_chunk(chunk)
+        index = builder.finalize()
+    """
+    
+    def __init__(
+        self,
+        root_dir: str,
+        bounds: Bounds3D,
+        dimensions: Sequence[str] = DEFAULT_DIMENSIONS,
+        expected_points: Optional[int] = None,
+        max_points_per_tile: int = DEFAULT_TILE_POINTS,
+        max_depth: int = DEFAULT_MAX_DEPTH,
+        octree: bool = False,
+        seed: int = 0
+    ):
+        """
+        Args:
+            root_dir: Index directory (existing tiles are replaced)
+            bounds: (xmin, ymin, zmin, xmax, ymax, zmax) covering all points
+            dimensions: Columns to store; must start with x, y, z
+            expected_points: Approximate total point count, used to pick the
+                staging level (None = stage everything in one bucket)
+            max_points_per_tile: Leaves above this are split further
+            max_depth: Deepest tile level
+            octree: Also split tiles along z
+            seed: Random seed for LOD sampling
+        """
+        if tuple(dimensions[:3]) != ('x', 'y', 'z'):
+            raise ValueError("Index dimensions must start with x, y, z")
+        
+        self.root_dir = root_dir
+        self.bounds = tuple(float(v) for v in bounds)
+        self.dimensions = tuple(dimensions)
+        self.max_points_per_tile = max_points_per_tile
+        self.max_depth = max_depth
+        self.octree = octree
+        self._rng = np.random.default_rng(seed)
+        self._point_count = 0
+        
+        fanout = 8 if octree else 4
+        ratio = (expected_points or 0) / max_points_per_tile
+        self.bucket_level = min(max_depth, math.ceil(math.log(ratio, fanout))) if ratio > 1 else 0
+        
+        self._tiles_dir = os.path.join(root_dir, "tiles")
+        self._staging_dir = os.path.join(root_dir, "staging")
+        for path in (self._tiles_dir, self._staging_dir):
+            shutil.rmtree(path, ignore_errors=True)
+            os.makedirs(path)
+        manifest = os.path.join(root_dir, MANIFEST_NAME)
+        if os.path.exists(manifest):
+            os.remove(manifest)
+    
+    def add_chunk(self, chunk):
+        """
+        Stage a chunk of points.
+        
+        Args:
+            chunk: Dict of 1-D arrays keyed by dimension name (as yielded by
+                LASChunkReader) or an (n, len(dimensions)) array
+        """
+        if isinstance(chunk, dict):
+            points = np.column_stack([np.asarray(chunk[name], dtype=np.float64) for name in self.dimensions])
+        else:
+            points = np.asarray(chunk, dtype=np.float64)
+        if len(points) == 0:
+            return
+        
+        ix, iy, iz = _cell_indices(points, self.bounds, self.bucket_level, self.octree)
+        cells = 1 << self.bucket_level
+        code = (iz * cells + iy) * cells + ix
+        order = np.argsort(code, kind='stable')
+        code = code[order]
+        points = points[order]
+        
+        starts = np.flatnonzero(np.r_[True, code[1:] != code[:-1]])
+        ends = np.r_[starts[1:], len(code)]
+        for start, end in zip(starts, ends):
+            key = (self.bucket_level, int(ix[order[start]]), int(iy[order[start]]), int(iz[order[start]]))
+            with open(os.path.join(self._staging_dir, _key_name(key) + ".bin"), "ab") as f:
+                points[start:end].tofile(f)
+        self._point_count += len(points)
+    
+    def _write_tile(self, key: TileKey, points: np.ndarray, leaf: bool) -> TileNode:
+        np.save(os.path.join(self._tiles_dir, _key_name(key) + ".npy"), points)
+        return TileNode(key=key, bounds=_data_bounds(points), point_count=len(points), leaf=leaf)
+    
+    def _split(self, key: TileKey, points: np.ndarray, nodes: Dict[TileKey, TileNode]):
+        """Recursively split a bucket until leaves fit max_points_per_tile."""
+        level = key[0]
+        if len(points) <= self.max_points_per_tile or level >= self.max_depth:
+            nodes[key] = self._write_tile(key, points, leaf=True)
+            return
+        
+        ix, iy, iz = _cell_indices(points, self.bounds, level + 1, self.octree)
+        children = ((iz & 1) << 2) | ((iy & 1) << 1) | (ix & 1)
+        for child in np.unique(children):
+            mask = children == child
+            first = np.argmax(mask)
+            child_key = (level + 1, int(ix[first]), int(iy[first]), int(iz[first]))
+            self._split(child_key, points[mask], nodes)
+    
+    def _sample_parent(self, key: TileKey, children: List[TileKey]) -> TileNode:
+        """Internal tile: random subsample of the children's tiles."""
+        points = np.concatenate([
+            np.load(os.path.join(self._tiles_dir, _key_name(child) + ".npy")) for child in children
+        ])
+        if len(points) > self.max_points_per_tile:
+            keep = self._rng.choice(len(points), self.max_points_per_tile, replace=False)
+            points = points[np.sort(keep)]
+        return self._write_tile(key, points, leaf=False)
+    
+    def finalize(self, source: Optional[Dict[str, Any]] = None) -> PointCloudIndex:
+        """
+        Split staged buckets into leaves, build LOD tiles and write the manifest.
+        
+        Args:
+            source: Signature of the source file, stored for cache validation
+        """
+        nodes: Dict[TileKey, TileNode] = {}
+        width = len(self.dimensions)
+        
+        for name in sorted(os.listdir(self._staging_dir)):
+            path = os.path.join(self._staging_dir, name)
+            points = np.fromfile(path, dtype=np.float64).reshape(-1, width)
+            self._split(_parse_key(name[:-len(".bin")]), points, nodes)
+            os.remove(path)
+        shutil.rmtree(self._staging_dir, ignore_errors=True)
+        
+        # Build internal tiles bottom-up so each samples already-written children
+        for level in range(max((key[0] for key in nodes), default=0), 0, -1):
+            children_of: Dict[TileKey, List[TileKey]] = {}
+            for key in nodes:
+                if key[0] == level:
+                    children_of.setdefault(_parent_key(key), []).append(key)
+            for parent, children in children_of.items():
+                nodes[parent] = self._sample_parent(parent, sorted(children))
+                # Internal bounds must cover the whole subtree, not just the sample
+                nodes[parent].bounds = _union_bounds([nodes[child].bounds for child in children])
+        
+        index = PointCloudIndex(
+            self.root_dir,
+            bounds=self.bounds,
+            dimensions=self.dimensions,
+            nodes=nodes,
+            octree=self.octree,
+            max_points_per_tile=self.max_points_per_tile,
+            source=source
+        )
+        index.save_manifest()
+        logger.info(
+            f"Indexed {self._point_count} points into {len(nodes)} tiles "
+            f"(depth {index.depth}) at {self.root_dir}"
+        )
+        return index
+
+
+def _source_signature(source: str) -> Dict[str, Any]:
+    stat = os.stat(source)
+    return {'path': os.path.abspath(source), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def build_index(
+    source: str,
+    root_dir: str,
+    dimensions: Sequence[str] = DEFAULT_DIMENSIONS,
+    max_points_per_tile: int = DEFAULT_TILE_POINTS,
+    max_depth: int = DEFAULT_MAX_DEPTH,
+    octree: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    rebuild: bool = False
+) -> PointCloudIndex:
+    """
+    Index a LAS/LAZ file by streaming it chunk by chunk.
+    
+    An existing index in root_dir is reused when it was built from the same
+    file (path, size and modification time) with the same settings.
+    
+    Args:
+        source: LAS/LAZ file path
+        root_dir: Index directory
+        dimensions: Columns to store; must start with x, y, z
+        max_points_per_tile: Leaves above this are split further
+        max_depth: Deepest tile level
+        octree: Also split tiles along z
+        chunk_size: Points per streamed chunk
+        rebuild: Ignore any cached index
+    """
+    signature = _source_signature(source)
+    if not rebuild and os.path.exists(os.path.join(root_dir, MANIFEST_NAME)):
+        try:
+            cached = PointCloudIndex.open(root_dir)
+            if (
+                cached.source == signature and cached.dimensions == tuple(dimensions) and
+                cached.octree == octree and cached.max_points_per_tile == max_points_per_tile
+            ):
+                return cached
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable point cloud index at {root_dir}: {e}")
+    
+    header = read_header(source)
+    builder = PointCloudIndexBuilder(
+        root_dir,
+        bounds=header.mins + header.maxs,
+        dimensions=dimensions,
+        expected_points=header.point_count,
+        max_points_per_tile=max_points_per_tile,
+        max_depth=max_depth,
+        octree=octree
+    )
+    for chunk in LASChunkReader(source, chunk_size=chunk_size, dimensions=dimensions):
+        builder.add_chunk(chunk)
+    return builder.finalize(source=signature)
+
+
+def build_index_from_array(
+    points: np.ndarray,
+    root_dir: str,
+    dimensions: Sequence[str] = DEFAULT_DIMENSIONS,
+    max_points_per_tile: int = DEFAULT_TILE_POINTS,
+    max_depth: int = DEFAULT_MAX_DEPTH,
+    octree: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> PointCloudIndex:
+    """Index an in-memory (n, len(dimensions)) point array."""
+    if len(points) == 0:
+        raise ValueError("Cannot index an empty point cloud")
+    
+    bounds = _data_bounds(np.asarray(points, dtype=np.float64))
+    builder = PointCloudIndexBuilder(
+        root_dir,
+        bounds=bounds,
+        dimensions=dimensions[:points.shape[1]],
+        expected_points=len(points),
+        max_points_per_tile=max_points_per_tile,
+        max_depth=max_depth,
+        octree=octree
+    )
+    for start in range(0, len(points), chunk_size):
+        builder.add_chunk(points[start:start + chunk_size])
+    return builder.finalize()
+
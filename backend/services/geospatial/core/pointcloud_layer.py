@@ -3,8 +3,9 @@ Point cloud layer implementation.
 Handles LAS/LAZ point cloud data for terrain analysis.
 """
 
-from typing import Optional, Dict, Any, List, Tuple
+from typing import Optional, Dict, Any, List, Tuple, Union
 from .layer import Layer, LayerType, Extent
+from .pointcloud_gridding import GridMethod, GridSpec, grid_points, nearest_idw_grid
 from dataclasses import dataclass
 import numpy as np
 
@@ -65,6 +66,8 @@ class PointCloudLayer(Layer):
         self._scale: Tuple[float, float, float] = (0.01, 0.01, 0.01)
         self._offset: Tuple[float, float, float] = (0.0, 0.0, 0.0)
         self._voxelized: Optional[Dict] = None
+        self._grid_spec: Optional[GridSpec] = None
+        self._index = None
     
     def load_statistics(self, stats: PointCloudStatistics):
         """Load point cloud statistics."""
@@ -117,6 +120,8 @@ class PointCloudLayer(Layer):
     def get_points_in_extent(self, extent: Extent) -> np.ndarray:
         """Get points within spatial extent."""
         if self._points_data is None:
+            if self._index is not None:
+                return self._index.query_extent(extent)
             return np.array([])
         
         mask = (
@@ -135,31 +140,134 @@ class PointCloudLayer(Layer):
         mask = self._points_data[:, 4] == classification
         return self._points_data[mask]
     
-    def compute_elevation_grid(self, resolution: float) -> np.ndarray:
-        """Compute DEM grid from point cloud at specified resolution."""
+    def compute_elevation_grid(
+        self,
+        resolution: float,
+        method: Optional[Union[GridMethod, str]] = None,
+        classification: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        fill_empty: bool = True
+    ) -> np.ndarray:
+        """
+        Compute DEM grid from point cloud at specified resolution.
+        
+        By default each node at (x_min + j * resolution, y_min + i * resolution)
+        is the IDW of its 10 nearest points, with row 0 at the southern edge.
+        
+        With a method, points are instead binned once into a north-up grid
+        (row 0 = northern edge, values at cell centres) and reduced per cell
+        in linear time; the grid georeferencing is available from
+        get_grid_spec().
+        
+        Args:
+            resolution: Cell size in map units
+            method: Cell reduction (min, max, mean, idw, tin); None for
+                nearest-neighbour IDW at the nodes
+            classification: Only grid points with this class code (e.g. 2 = ground)
+            chunk_size: Points per accumulation pass (None = all at once)
+            fill_empty: Fill cells without points from neighbouring cells
+        """
         if self._points_data is None or self._statistics is None:
             return np.array([])
         
+        points = self._points_data
+        if classification is not None:
+            points = self.get_points_by_classification(classification)
+            if points.size == 0:
+                return np.array([])
+        
         stats = self._statistics
-        x_range = np.arange(stats.x_min, stats.x_max, resolution)
-        y_range = np.arange(stats.y_min, stats.y_max, resolution)
-        
-        grid = np.zeros((len(y_range), len(x_range)))
-        
-        # Simple IDW interpolation
-        for i, y in enumerate(y_range):
-            for j, x in enumerate(x_range):
-                # Find nearest points
-                distances = np.sqrt(
-                    (self._points_data[:, 0] - x)**2 +
-                    (self._points_data[:, 1] - y)**2
-                )
-                nearest_idx = np.argsort(distances)[:10]  # 10 nearest
-                weights = 1.0 / (distances[nearest_idx] + 1e-10)
-                grid[i, j] = np.sum(self._points_data[nearest_idx, 2] * weights) / np.sum(weights)
+        if method is None:
+            self._grid_spec = None
+            return nearest_idw_grid(
+                points[:, 0], points[:, 1], points[:, 2],
+                stats.x_min, stats.y_min, stats.x_max, stats.y_max, resolution
+            )
         
+        spec = GridSpec.from_bounds(stats.x_min, stats.y_min, stats.x_max, stats.y_max, resolution)
+        grid, self._grid_spec = grid_points(
+            points[:, 0], points[:, 1], points[:, 2],
+            resolution,
+            method=GridMethod(method),
+            spec=spec,
+            chunk_size=chunk_size,
+            fill_empty=fill_empty
+        )
         return grid
     
+    def get_grid_spec(self) -> Optional[GridSpec]:
+        """Grid definition of the last elevation grid computed with a method."""
+        return self._grid_spec
+    
+    def build_index(
+        self,
+        root_dir: str,
+        max_points_per_tile: int = 100_000,
+        octree: bool = False,
+        rebuild: bool = False
+    ):
+        """
+        Build (or reuse) an on-disk tile index for this layer.
+        
+        Loaded points are indexed directly; otherwise the source file is
+        streamed, so the cloud never has to fit in memory.
+        
+        Returns:
+            The attached PointCloudIndex
+        """
+        # Imported here: the index module depends on this one via streaming
+        from .pointcloud_index import build_index, build_index_from_array
+        
+        if self._points_data is not None and self._points_data.shape[0] > 0:
+            index = build_index_from_array(
+                self._points_data, root_dir,
+                max_points_per_tile=max_points_per_tile, octree=octree
+            )
+        else:
+            index = build_index(
+                self.source, root_dir,
+                max_points_per_tile=max_points_per_tile, octree=octree, rebuild=rebuild
+            )
+        self.attach_index(index)
+        return index
+    
+    def attach_index(self, index):
+        """Use a PointCloudIndex for extent queries and level-of-detail sampling."""
+        self._index = index
+        if self._statistics is None:
+            extent = index.extent()
+            self.load_statistics(PointCloudStatistics(
+                point_count=index.point_count,
+                x_min=extent.xmin,
+                y_min=extent.ymin,
+                z_min=extent.zmin,
+                x_max=extent.xmax,
+                y_max=extent.ymax,
+                z_max=extent.zmax
+            ))
+    
+    def get_index(self):
+        """Attached PointCloudIndex, if any."""
+        return self._index
+    
+    def get_lod_points(self, extent: Optional[Extent] = None, point_budget: int = 1_000_000) -> np.ndarray:
+        """
+        Points for rendering extent with at most about point_budget points.
+        
+        Uses the tile index when attached (only intersecting tiles at the
+        chosen level are read); otherwise subsamples the loaded points.
+        """
+        if self._index is not None:
+            return self._index.lod_points(extent, point_budget)
+        if self._points_data is None:
+            return np.array([])
+        
+        points = self._points_data if extent is None else self.get_points_in_extent(extent)
+        if len(points) <= point_budget:
+            return points
+        step = int(np.ceil(len(points) / point_budget))
+        return points[::step]
+    
     def get_feature_count(self) -> int:
         """Get point count."""
         if self._statistics:
@@ -186,5 +294,6 @@ class PointCloudLayer(Layer):
             **self.get_metadata(),
             'point_format': self._point_format,
             'statistics': self._statistics.to_dict() if self._statistics else None,
-            'point_count': self.get_feature_count()
+            'point_count': self.get_feature_count(),
+            'index': self._index.to_dict() if self._index is not None else None
         }
@@ -0,0 +1,279 @@
+"""
+Chunked LAS/LAZ streaming.
+Reads point clouds in fixed-size chunks so processing runs in constant memory.
+
+Only the requested dimensions are converted to NumPy arrays, and statistics
+and bounds are accumulated incrementally, so multi-gigabyte clouds can be
+summarised, filtered and gridded without loading the whole file.
+"""
+
+from typing import Optional, Dict, Iterator, Sequence, Tuple, Union
+from dataclasses import dataclass, field
+import logging
+import numpy as np
+
+from .pointcloud_layer import PointCloudStatistics
+from .pointcloud_gridding import GridMethod, GridSpec, PointGridder
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+PointChunk = Dict[str, np.ndarray]
+
+
+def _open_las(source: str):
+    try:
+        import laspy
+    except ImportError:
+        raise ImportError("laspy not installed. Install with: pip install laspy")
+    return laspy.open(source)
+
+
+@dataclass
+class LASHeaderInfo:
+    """Header-only summary of a LAS/LAZ file."""
+    point_count: int
+    mins: Tuple[float, float, float]
+    maxs: Tuple[float, float, float]
+    version: str
+    point_format: int
+    srs: Optional[str] = None
+    dimensions: Tuple[str, ...] = ()
+    
+    def bounds(self) -> Dict[str, float]:
+        return {
+            "minx": self.mins[0],
+            "miny": self.mins[1],
+            "maxx": self.maxs[0],
+            "maxy": self.maxs[1],
+            "minz": self.mins[2],
+            "maxz": self.maxs[2],
+        }
+
+
+def read_header(source: str) -> LASHeaderInfo:
+    """Read the LAS header without touching point records."""
+    with _open_las(source) as reader:
+        header = reader.header
+        srs = None
+        try:
+            crs = header.parse_crs()
+            srs = crs.to_string() if crs is not None else None
+        except Exception as e:
+            logger.debug(f"Could not parse LAS CRS for {source}: {e}")
+        
+        return LASHeaderInfo(
+            point_count=int(header.point_count),
+            mins=tuple(float(v) for v in header.mins),
+            maxs=tuple(float(v) for v in header.maxs),
+            version=str(header.version),
+            point_format=int(header.point_format.id),
+            srs=srs,
+            dimensions=tuple(header.point_format.dimension_names)
+        )
+
+
+class LASChunkReader:
+    """
+    Iterate over a LAS/LAZ file in chunks of at most chunk_size points.
+    
+    Each chunk is a dict of 1-D arrays holding only the requested
+    dimensions; x, y and z are returned scaled as float64.
+    """
+    
+    def __init__(
+        self,
+        source: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        dimensions: Sequence[str] = ('x', 'y', 'z'),
+        classifications: Optional[Sequence[int]] = None
+    ):
+        """
+        Args:
+            source: LAS/LAZ file path
+            chunk_size: Points per chunk
+            dimensions: Dimension names to extract (e.g. x, y, z, intensity, classification)
+            classifications: Keep only points with these class codes
+        """
+        self.source = source
+        self.chunk_size = chunk_size
+        self.dimensions = tuple(dimensions)
+        self.classifications = None if classifications is None else np.asarray(classifications)
+    
+    def __iter__(self) -> Iterator[PointChunk]:
+        with _open_las(self.source) as reader:
+            available = set(reader.header.point_format.dimension_names)
+            for records in reader.chunk_iterator(self.chunk_size):
+                mask = None
+                if self.classifications is not None:
+                    mask = np.isin(np.asarray(records.classification), self.classifications)
+                    if not mask.any():
+                        continue
+                
+                chunk: PointChunk = {}
+                for name in self.dimensions:
+                    if name in ('x', 'y', 'z'):
+                        values = np.asarray(getattr(records, name), dtype=np.float64)
+                    elif name in available or name.upper() in available:
+                        values = np.asarray(records[name])
+                    else:
+                        values = np.zeros(len(records), dtype=np.float64)
+                    chunk[name] = values[mask] if mask is not None else values
+                yield chunk
+
+
+@dataclass
+class StreamingStatistics:
+    """Incrementally accumulated point cloud statistics."""
+    point_count: int = 0
+    mins: np.ndarray = field(default_factory=lambda: np.full(3, np.inf))
+    maxs: np.ndarray = field(default_factory=lambda: np.full(3, -np.inf))
+    z_mean: float = 0.0
+    z_m2: float = 0.0  # Sum of squared deviations from the mean
+    intensity_min: float = np.inf
+    intensity_max: float = -np.inf
+    intensity_sum: float = 0.0
+    class_counts: np.ndarray = field(default_factory=lambda: np.zeros(256, dtype=np.int64))
+    
+    def update(self, chunk: PointChunk):
+        """Fold one chunk into the running statistics."""
+        n = len(chunk['z'])
+        if n == 0:
+            return
+        
+        xyz = (chunk['x'], chunk['y'], chunk['z'])
+        self.mins = np.minimum(self.mins, [v.min() for v in xyz])
+        self.maxs = np.maximum(self.maxs, [v.max() for v in xyz])
+        
+        # Chan et al. pairwise combination keeps the variance numerically stable
+        chunk_mean = float(chunk['z'].mean())
+        chunk_m2 = float(((chunk['z'] - chunk_mean) ** 2).sum())
+        total = self.point_count + n
+        delta = chunk_mean - self.z_mean
+        self.z_mean += delta * n / total
+        self.z_m2 += chunk_m2 + delta ** 2 * self.point_count * n / total
+        self.point_count = total
+        
+        if 'intensity' in chunk:
+            intensity = chunk['intensity']
+            self.intensity_min = min(self.intensity_min, float(intensity.min()))
+            self.intensity_max = max(self.intensity_max, float(intensity.max()))
+            self.intensity_sum += float(intensity.sum(dtype=np.float64))
+        
+        if 'classification' in chunk:
+            self.class_counts += np.bincount(
+                np.asarray(chunk['classification'], dtype=np.int64), minlength=256
+            )[:256]
+    
+    def classification_distribution(self) -> Dict[int, int]:
+        codes = np.flatnonzero(self.class_counts)
+        return {int(code): int(self.class_counts[code]) for code in codes}
+    
+    def to_statistics(self) -> PointCloudStatistics:
+        """Convert to the layer statistics model."""
+        if self.point_count == 0:
+            return PointCloudStatistics()
+        has_intensity = np.isfinite(self.intensity_min)
+        return PointCloudStatistics(
+            point_count=self.point_count,
+            x_min=float(self.mins[0]),
+            y_min=float(self.mins[1]),
+            z_min=float(self.mins[2]),
+            x_max=float(self.maxs[0]),
+            y_max=float(self.maxs[1]),
+            z_max=float(self.maxs[2]),
+            z_mean=self.z_mean,
+            z_std=float(np.sqrt(self.z_m2 / self.point_count)),
+            intensity_min=self.intensity_min if has_intensity else 0.0,
+            intensity_max=self.intensity_max if has_intensity else 0.0,
+            intensity_mean=self.intensity_sum / self.point_count if has_intensity else 0.0,
+            classification_distribution=self.classification_distribution()
+        )
+
+
+def stream_statistics(
+    source: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    classifications: Optional[Sequence[int]] = None
+) -> PointCloudStatistics:
+    """Compute full point cloud statistics in one streaming pass."""
+    stats = StreamingStatistics()
+    reader = LASChunkReader(
+        source,
+        chunk_size=chunk_size,
+        dimensions=('x', 'y', 'z', 'intensity', 'classification'),
+        classifications=classifications
+    )
+    for chunk in reader:
+        stats.update(chunk)
+    return stats.to_statistics()
+
+
+def stream_classification_counts(source: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[int, int]:
+    """Count points per class code, reading only the classification dimension."""
+    counts = np.zeros(256, dtype=np.int64)
+    for chunk in LASChunkReader(source, chunk_size=chunk_size, dimensions=('classification',)):
+        counts += np.bincount(np.asarray(chunk['classification'], dtype=np.int64), minlength=256)[:256]
+    codes = np.flatnonzero(counts)
+    return {int(code): int(counts[code]) for code in codes}
+
+
+def stream_to_grid(
+    source: str,
+    resolution: float,
+    method: Union[GridMethod, str] = GridMethod.MEAN,
+    classifications: Optional[Sequence[int]] = None,
+    spec: Optional[GridSpec] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    fill_empty: bool = False,
+    nodata: float = np.nan
+) -> Tuple[np.ndarray, GridSpec]:
+    """
+    Grid a LAS/LAZ file chunk by chunk.
+    
+    The grid is sized from the header bounds unless spec is given, so memory
+    is bounded by the grid plus one chunk.
+    
+    Returns:
+        (grid, spec)
+    """
+    if spec is None:
+        header = read_header(source)
+        spec = GridSpec.from_bounds(
+            header.mins[0], header.mins[1], header.maxs[0], header.maxs[1], resolution
+        )
+    
+    gridder = PointGridder(spec, GridMethod(method))
+    reader = LASChunkReader(source, chunk_size=chunk_size, classifications=classifications)
+    for chunk in reader:
+        gridder.add_points(chunk['x'], chunk['y'], chunk['z'])
+    
+    return gridder.result(fill_empty=fill_empty, nodata=nodata), spec
+
+
+def read_points_array(
+    source: str,
+    dimensions: Sequence[str] = ('x', 'y', 'z', 'intensity', 'classification'),
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Tuple[np.ndarray, StreamingStatistics]:
+    """
+    Read selected dimensions into one preallocated (n, len(dimensions)) array.
+    
+    Peak memory is the output array plus one chunk, rather than the full
+    point record plus per-dimension copies.
+    """
+    header = read_header(source)
+    points = np.empty((header.point_count, len(dimensions)), dtype=np.float64)
+    stats = StreamingStatistics()
+    
+    offset = 0
+    for chunk in LASChunkReader(source, chunk_size=chunk_size, dimensions=dimensions):
+        n = len(chunk[dimensions[0]])
+        for column, name in enumerate(dimensions):
+            points[offset:offset + n, column] = chunk[name]
+        if {'x', 'y', 'z'} <= chunk.keys():
+            stats.update(chunk)
+        offset += n
+    
+    return points[:offset], stats
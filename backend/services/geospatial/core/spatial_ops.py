@@ -3,7 +3,7 @@ Spatial operations and analysis framework.
 Provides vector and raster spatial analysis algorithms.
 """
 
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Union
 from abc import ABC, abstractmethod
 from enum import Enum
 import numpy as np
@@ -13,6 +13,7 @@ from .layer import Extent, Layer
 from .raster_layer import RasterLayer
 from .vector_layer import VectorLayer, GeometryType
 from .pointcloud_layer import PointCloudLayer
+from .pointcloud_gridding import GridMethod, GridSpec, PointGridder
 
 
 class SpatialOperationType(Enum):
@@ -220,49 +221,268 @@ class VolumeAnalysis:
     @staticmethod
     def calculate_point_cloud_volume(
         points: np.ndarray,
-        reference_z: float,
-        cell_size: float = 1.0
+        reference_z: Union[float, np.ndarray] = 0.0,
+        cell_size: float = 1.0,
+        spec: Optional[GridSpec] = None,
+        method: GridMethod = GridMethod.MEAN,
+        fill_empty: bool = False
     ) -> Dict[str, float]:
         """
-        Calculate volume from point cloud relative to reference elevation.
+        Calculate volume from point cloud relative to a reference plane or DEM.
+        
+        Points are binned once into a surface grid and the volume is a single
+        reduction over the height grid, so cost is linear in point count.
+        
+        Args:
+            points: (n, >=3) array of x, y, z
+            reference_z: Reference elevation, or a reference DEM aligned with spec
+            cell_size: Cell size in map units (ignored when spec is given)
+            spec: Grid definition (required for a reference DEM)
+            method: Cell reduction for the surface (mean, min, max, idw, tin)
+            fill_empty: Interpolate empty cells instead of excluding them
+        
+        Returns:
+            Dictionary with volumes, coverage and one-sigma volume uncertainty
         """
-        height_above_ref = points[:, 2] - reference_z
+        reference = np.asarray(reference_z, dtype=np.float64)
+        if reference.ndim == 2:
+            if spec is None or reference.shape != spec.shape:
+                raise ValueError("A reference DEM needs a GridSpec of the same shape")
+        if spec is None:
+            spec = _fit_spec(points, cell_size)
         
-        # Grid-based volume calculation
-        x_bins = int((np.max(points[:, 0]) - np.min(points[:, 0])) / cell_size) + 1
-        y_bins = int((np.max(points[:, 1]) - np.min(points[:, 1])) / cell_size) + 1
+        surface, count, error = _grid_surface(points, spec, method, fill_empty)
+        height = surface - reference
         
-        height_grid = np.zeros((y_bins, x_bins))
-        count_grid = np.zeros((y_bins, x_bins))
+        return {
+            **_volume_summary(height, count, error, spec),
+            'grid_resolution': spec.resolution,
+            'grid_cells': spec.size
+        }
+    
+    @staticmethod
+    def calculate_point_cloud_cut_fill(
+        points_before: np.ndarray,
+        points_after: np.ndarray,
+        cell_size: float = 1.0,
+        spec: Optional[GridSpec] = None,
+        method: GridMethod = GridMethod.MEAN,
+        fill_empty: bool = False
+    ) -> Dict[str, float]:
+        """
+        Cut/fill volumes between two point cloud surveys.
         
-        for point in points:
-            xi = int((point[0] - np.min(points[:, 0])) / cell_size)
-            yi = int((point[1] - np.min(points[:, 1])) / cell_size)
-            
-            if 0 <= xi < x_bins and 0 <= yi < y_bins:
-                height_grid[yi, xi] += point[2] - reference_z
-                count_grid[yi, xi] += 1
+        Both clouds are gridded onto one grid covering their union; only cells
+        with data in both surveys contribute.
         
-        # Average heights
-        valid_cells = count_grid > 0
-        height_grid[valid_cells] /= count_grid[valid_cells]
+        Returns:
+            Dictionary with cut (material removed), fill (material added),
+            net change, coverage and one-sigma uncertainties
+        """
+        if spec is None:
+            spec = _fit_spec(np.concatenate([points_before[:, :3], points_after[:, :3]]), cell_size)
         
-        cell_area = cell_size ** 2
-        total_volume = np.sum(height_grid) * cell_area
+        before, count_before, error_before = _grid_surface(points_before, spec, method, fill_empty)
+        after, count_after, error_after = _grid_surface(points_after, spec, method, fill_empty)
+        
+        summary = _volume_summary(
+            after - before,
+            np.minimum(count_before, count_after),
+            np.hypot(error_before, error_after),
+            spec,
+            footprint=np.isfinite(before) | np.isfinite(after)
+        )
+        return {
+            'cut_volume': summary['volume_below_reference'],
+            'fill_volume': summary['volume_above_reference'],
+            'net_change': summary['total_volume'],
+            'cut_area': summary['area_below_reference'],
+            'fill_area': summary['area_above_reference'],
+            'valid_cells': summary['valid_cells'],
+            'coverage': summary['coverage'],
+            'volume_uncertainty': summary['volume_uncertainty'],
+            'sampling_uncertainty': summary['sampling_uncertainty'],
+            'interpolation_uncertainty': summary['interpolation_uncertainty'],
+            'grid_resolution': spec.resolution,
+            'grid_cells': spec.size
+        }
+    
+    @staticmethod
+    def calculate_stockpile_volume(
+        points: np.ndarray,
+        cell_size: float = 1.0,
+        base_z: Optional[float] = None,
+        spec: Optional[GridSpec] = None,
+        fill_empty: bool = True
+    ) -> Dict[str, float]:
+        """
+        Stockpile volume above its base.
         
-        above_ref = np.sum(height_grid[height_grid > 0]) * cell_area
-        below_ref = np.sum(np.abs(height_grid[height_grid < 0])) * cell_area
+        Without base_z, the base is the least-squares plane through the
+        surface along the edge of the surveyed footprint (the stockpile toe).
         
+        Args:
+            points: (n, >=3) array of x, y, z covering the pile and its toe
+            cell_size: Cell size in map units
+            base_z: Flat base elevation (None = fit a toe plane)
+            spec: Grid definition (None = fit to the points)
+            fill_empty: Interpolate empty cells inside the grid
+        """
+        if spec is None:
+            spec = _fit_spec(points, cell_size)
+        surface, count, error = _grid_surface(points, spec, GridMethod.MEAN, fill_empty)
+        
+        if base_z is None:
+            base, plane = _toe_plane(surface, count > 0, spec)
+        else:
+            base, plane = np.full(spec.shape, float(base_z)), (0.0, 0.0, float(base_z))
+        
+        summary = _volume_summary(surface - base, count, error, spec)
         return {
-            'total_volume': float(total_volume),
-            'volume_above_reference': float(above_ref),
-            'volume_below_reference': float(below_ref),
-            'grid_resolution': cell_size,
-            'grid_cells': x_bins * y_bins,
-            'valid_cells': int(np.sum(valid_cells))
+            'stockpile_volume': summary['volume_above_reference'],
+            'volume_below_base': summary['volume_below_reference'],
+            'footprint_area': summary['area_above_reference'],
+            'max_height': float(np.nanmax(surface - base)) if np.isfinite(surface).any() else 0.0,
+            'base_plane': {'slope_x': plane[0], 'slope_y': plane[1], 'intercept': plane[2]},
+            'valid_cells': summary['valid_cells'],
+            'coverage': summary['coverage'],
+            'volume_uncertainty': summary['volume_uncertainty'],
+            'sampling_uncertainty': summary['sampling_uncertainty'],
+            'interpolation_uncertainty': summary['interpolation_uncertainty'],
+            'grid_resolution': spec.resolution,
+            'grid_cells': spec.size
         }
 
 
+def _fit_spec(points: np.ndarray, cell_size: float) -> GridSpec:
+    if len(points) == 0:
+        raise ValueError("Cannot compute volumes from an empty point cloud")
+    return GridSpec.from_bounds(
+        float(points[:, 0].min()), float(points[:, 1].min()),
+        float(points[:, 0].max()), float(points[:, 1].max()),
+        cell_size
+    )
+
+
+def _grid_surface(
+    points: np.ndarray,
+    spec: GridSpec,
+    method: GridMethod,
+    fill_empty: bool
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Grid a point cloud into a surface.
+    
+    Returns:
+        (surface, points per cell, standard error of each cell's height).
+        Cells without points have zero count; their error is NaN unless
+        fill_empty interpolated them.
+    """
+    x, y, z = points[:, 0], points[:, 1], points[:, 2]
+    gridder = PointGridder(spec, GridMethod(method))
+    gridder.add_points(x, y, z)
+    surface = gridder.result(fill_empty=fill_empty)
+    count = gridder.counts().ravel()
+    
+    # Per-cell variance from centred sums (centring avoids cancellation at high elevations)
+    index, inside = spec.cell_indices(x, y)
+    dz = z[inside] - z[inside].mean() if index.size else z[inside]
+    total = np.bincount(index, weights=dz, minlength=spec.size)
+    total_sq = np.bincount(index, weights=dz * dz, minlength=spec.size)
+    
+    multi = count > 1
+    variance = np.zeros(spec.size)
+    variance[multi] = (total_sq[multi] - total[multi] ** 2 / count[multi]) / (count[multi] - 1)
+    np.maximum(variance, 0.0, out=variance)
+    # Single-point cells borrow the pooled within-cell variance
+    pooled = float(variance[multi].mean()) if multi.any() else 0.0
+    variance[count == 1] = pooled
+    
+    error = np.full(spec.size, np.nan)
+    populated = count > 0
+    error[populated] = np.sqrt(variance[populated] / count[populated])
+    return surface, count.reshape(spec.shape), error.reshape(spec.shape)
+
+
+def _roughness(surface: np.ndarray) -> float:
+    """Typical height difference between adjacent cells, used as the error of interpolated cells."""
+    diffs = np.concatenate([
+        np.diff(surface, axis=0).ravel(),
+        np.diff(surface, axis=1).ravel()
+    ])
+    diffs = diffs[np.isfinite(diffs)]
+    return float(np.sqrt(np.mean(diffs ** 2))) if diffs.size else 0.0
+
+
+def _toe_plane(
+    surface: np.ndarray,
+    populated: np.ndarray,
+    spec: GridSpec
+) -> Tuple[np.ndarray, Tuple[float, float, float]]:
+    """Least-squares plane through the surface on the edge of the footprint."""
+    from scipy import ndimage
+    
+    footprint = populated & np.isfinite(surface)
+    edge = footprint & ~ndimage.binary_erosion(footprint, border_value=0)
+    rows, cols = np.nonzero(edge)
+    x_centers, y_centers = spec.cell_centers()
+    
+    if rows.size < 3:
+        level = float(np.nanmin(surface)) if footprint.any() else 0.0
+        return np.full(spec.shape, level), (0.0, 0.0, level)
+    
+    design = np.column_stack([x_centers[cols], y_centers[rows], np.ones(rows.size)])
+    (a, b, c), *_ = np.linalg.lstsq(design, surface[rows, cols], rcond=None)
+    base = a * x_centers[None, :] + b * y_centers[:, None] + c
+    return base, (float(a), float(b), float(c))
+
+
+def _volume_summary(
+    height: np.ndarray,
+    count: np.ndarray,
+    error: np.ndarray,
+    spec: GridSpec,
+    footprint: Optional[np.ndarray] = None
+) -> Dict[str, float]:
+    """
+    Integrate a height grid and its uncertainty.
+    
+    Sampling uncertainty treats cell standard errors as independent.
+    Interpolated cells (finite height, no points) each carry the surface
+    roughness as their error. Coverage is the share of footprint cells
+    (default: the whole grid) that were actually sampled.
+    """
+    cell_area = spec.resolution ** 2
+    valid = np.isfinite(height)
+    sampled = valid & (count > 0)
+    interpolated = valid & (count == 0)
+    if footprint is None:
+        footprint = np.ones(height.shape, dtype=bool)
+    
+    values = height[valid]
+    above = values > 0
+    below = values < 0
+    
+    sampling = cell_area * float(np.sqrt(np.nansum(error[sampled] ** 2)))
+    interpolation = cell_area * _roughness(np.where(sampled, height, np.nan)) * \
+        float(np.sqrt(interpolated.sum()))
+    footprint_cells = int(footprint.sum())
+    
+    return {
+        'total_volume': float(values.sum() * cell_area),
+        'volume_above_reference': float(values[above].sum() * cell_area),
+        'volume_below_reference': float(np.abs(values[below]).sum() * cell_area),
+        'area_above_reference': float(above.sum() * cell_area),
+        'area_below_reference': float(below.sum() * cell_area),
+        'valid_cells': int(sampled.sum()),
+        'interpolated_cells': int(interpolated.sum()),
+        'coverage': float(sampled.sum() / footprint_cells) if footprint_cells else 0.0,
+        'volume_uncertainty': float(np.hypot(sampling, interpolation)),
+        'sampling_uncertainty': sampling,
+        'interpolation_uncertainty': interpolation
+    }
+
+
 class FeatureStatistics:
     """Calculate statistics from vector features."""
     
@@ -18,8 +18,8 @@ from .spatial_index import SpatialIndexer, SpatialIndex, SpatialQuery
 from .expressions import FieldCalculator, QueryBuilder, FieldExpressionContext
 from .network_analysis import NetworkGraph, NetworkEdge, NetworkNode
 from .interpolation import (
-    IDWInterpolator, RBFInterpolator, KernelDensity,
-    ContourGenerator, SpatialStatistics
+    IDWInterpolator, RBFInterpolator, OrdinaryKriging, VariogramModel,
+    KernelDensity, ContourGenerator, SpatialStatistics, fill_raster_gaps
 )
 from .styling import (
     StyleRenderer, SVGMarkerLibrary, Symbol, Color, Label, 
@@ -64,6 +64,9 @@ __all__ = [
     # Interpolation
     'IDWInterpolator',
     'RBFInterpolator',
+    'OrdinaryKriging',
+    'VariogramModel',
+    'fill_raster_gaps',
     'KernelDensity',
     'ContourGenerator',
     'SpatialStatistics',
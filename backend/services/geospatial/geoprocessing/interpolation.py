@@ -4,6 +4,7 @@ IDW, Kriging, and other interpolation methods for spatial analysis.
 
 Features:
 - Inverse Distance Weighting (IDW)
+- Local-neighbourhood RBF and ordinary kriging
 - Thiessen polygons (Voronoi)
 - Kernel density estimation
 - Heat maps
@@ -11,11 +12,17 @@ Features:
 """
 
 import logging
-from typing import List, Dict, Tuple, Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, List, Dict, Tuple, Optional
 import numpy as np
-from scipy.interpolate import griddata, Rbf
-from scipy.spatial.distance import cdist
-from scipy.ndimage import gaussian_filter
+from scipy.interpolate import griddata, RBFInterpolator as _ScipyRBFInterpolator
+from scipy.optimize import curve_fit
+from scipy.spatial import cKDTree
+from scipy.spatial.distance import cdist, pdist
+from scipy.ndimage import binary_dilation, gaussian_filter
+from scipy.signal import fftconvolve
+import shapely
 from shapely.geometry import Point, Polygon, LineString
 from shapely.ops import unary_union
 import geopandas as gpd
@@ -25,6 +32,11 @@ from rasterio.features import rasterize
 from rasterio.transform import Affine
 from skimage import measure
 
+try:
+    import contourpy  # type: ignore[import]
+except ImportError:
+    contourpy = None  # type: ignore
+
 try:
     from libpysal.weights import Rook  # type: ignore[import, name]
     from esda.moran import Moran, Moran_Local  # type: ignore[import, name]
@@ -37,18 +49,40 @@ logger = logging.getLogger(__name__)
 
 
 class IDWInterpolator:
-    """Inverse Distance Weighting interpolation."""
+    """
+    Inverse Distance Weighting interpolation.
+    
+    Samples are indexed once in a KD-tree and predictions are made in blocks,
+    so memory is bounded by the block size times the neighbourhood size rather
+    than by the full grid x samples distance matrix.
+    """
     
-    def __init__(self, power: float = 2.0, k: Optional[int] = None):  # type: ignore
+    # Upper bound on neighbour distances held in memory per prediction block
+    MAX_BLOCK_ELEMENTS = 1 << 22
+    
+    def __init__(
+        self,
+        power: float = 2.0,
+        k: Optional[int] = None,  # type: ignore
+        radius: Optional[float] = None,
+        block_size: Optional[int] = None,
+        workers: int = 1
+    ):
         """
         Initialize IDW interpolator.
         
         Args:
             power: Power parameter (default 2.0)
-            k: Number of nearest neighbors (None = use all)
+            k: Number of nearest neighbors (None = use all, or all within radius)
+            radius: Search radius; cells with no sample in range are NaN
+            block_size: Prediction points per block (None = derive from neighbourhood size)
+            workers: Parallel KD-tree query workers (-1 = all cores)
         """
         self.power = power
         self.k = k
+        self.radius = radius
+        self.block_size = block_size
+        self.workers = workers
     
     def interpolate(
         self,
@@ -68,47 +102,199 @@ class IDWInterpolator:
             (m,) array of interpolated values
         """
         try:
-            distances = cdist(grid_points, points)
+            points = np.asarray(points, dtype=np.float64)
+            values = np.asarray(values, dtype=np.float64)
+            grid_points = np.asarray(grid_points, dtype=np.float64)
             
-            if self.k:
-                # Use k-nearest neighbors
-                k_nearest_indices = np.argsort(distances, axis=1)[:, :self.k]
-                distances_knn = np.take_along_axis(distances, k_nearest_indices, axis=1)
-                values_knn = values[k_nearest_indices]
-            else:
-                distances_knn = distances
-                values_knn = np.tile(values, (len(grid_points), 1))
+            tree = cKDTree(points)
+            block = self._block_rows(len(points), 1)
+            
+            result = np.empty(len(grid_points))
+            for start in range(0, len(grid_points), block):
+                stop = start + block
+                result[start:stop] = self._predict_block(tree, values, grid_points[start:stop])
+            
+            return result
+            
+        except Exception as e:
+            logger.error(f"IDW interpolation error: {e}")
+            raise
+    
+    def interpolate_grid(
+        self,
+        points: np.ndarray,
+        values: np.ndarray,
+        x_coords: np.ndarray,
+        y_coords: np.ndarray
+    ) -> np.ndarray:
+        """
+        Interpolate onto a regular grid, one block of rows at a time.
+        
+        Cell coordinates are generated per row block, so the full
+        (rows * cols, 2) coordinate array is never materialised.
+        
+        Args:
+            points: (n, 2) array of point coordinates
+            values: (n,) array of values at points
+            x_coords: (cols,) cell-centre x coordinates
+            y_coords: (rows,) cell-centre y coordinates
             
-            # Avoid division by zero
-            distances_knn = np.maximum(distances_knn, 1e-10)
+        Returns:
+            (rows, cols) array of interpolated values
+        """
+        try:
+            points = np.asarray(points, dtype=np.float64)
+            values = np.asarray(values, dtype=np.float64)
+            x_coords = np.asarray(x_coords, dtype=np.float64)
+            y_coords = np.asarray(y_coords, dtype=np.float64)
             
-            # Calculate weights
-            weights = 1.0 / (distances_knn ** self.power)
-            weights_sum = np.sum(weights, axis=1, keepdims=True)
+            tree = cKDTree(points)
+            rows_per_block = self._block_rows(len(points), len(x_coords))
             
-            # Interpolate
-            interpolated = np.sum(weights * values_knn, axis=1) / weights_sum.flatten()
+            result = np.empty((len(y_coords), len(x_coords)))
+            for start in range(0, len(y_coords), rows_per_block):
+                block_y = y_coords[start:start + rows_per_block]
+                xx, yy = np.meshgrid(x_coords, block_y)
+                block_points = np.column_stack([xx.ravel(), yy.ravel()])
+                result[start:start + len(block_y)] = self._predict_block(
+                    tree, values, block_points
+                ).reshape(len(block_y), len(x_coords))
             
-            return interpolated
+            return result
             
         except Exception as e:
-            logger.error(f"IDW interpolation error: {e}")
+            logger.error(f"IDW grid interpolation error: {e}")
             raise
+    
+    def _neighbourhood_size(self, n_samples: int) -> int:
+        """Worst-case neighbours per prediction point."""
+        if self.k:
+            return min(self.k, n_samples)
+        return n_samples
+    
+    def _block_rows(self, n_samples: int, row_length: int) -> int:
+        """Number of rows (of row_length points) to predict per block."""
+        if self.block_size:
+            cells = self.block_size
+        else:
+            cells = self.MAX_BLOCK_ELEMENTS // max(self._neighbourhood_size(n_samples), 1)
+        return max(1, cells // max(row_length, 1))
+    
+    def _weighted_mean(self, distances: np.ndarray, neighbour_values: np.ndarray) -> np.ndarray:
+        """IDW estimate from (block, k) neighbour distances and values."""
+        # Avoid division by zero
+        distances = np.maximum(distances, 1e-10)
+        weights = 1.0 / (distances ** self.power)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.sum(weights * neighbour_values, axis=1) / np.sum(weights, axis=1)
+    
+    def _predict_block(self, tree: cKDTree, values: np.ndarray, block: np.ndarray) -> np.ndarray:
+        """Interpolate one block of prediction points."""
+        n_samples = tree.n
+        
+        if self.k:
+            k = min(self.k, n_samples)
+            upper = self.radius if self.radius is not None else np.inf
+            distances, indices = tree.query(
+                block, k=k, distance_upper_bound=upper, workers=self.workers
+            )
+            if k == 1:
+                distances = distances[:, None]
+                indices = indices[:, None]
+            
+            # Neighbours beyond the radius come back as (inf, n); give them zero weight
+            missing = indices == n_samples
+            neighbour_values = values[np.minimum(indices, n_samples - 1)]
+            neighbour_values[missing] = 0.0
+            distances = np.where(missing, np.inf, distances)
+            return self._weighted_mean(distances, neighbour_values)
+        
+        if self.radius is not None:
+            # Variable-size neighbourhoods: flatten and reduce per prediction point
+            neighbours = tree.query_ball_point(block, r=self.radius, workers=self.workers)
+            counts = np.fromiter((len(n) for n in neighbours), dtype=np.int64, count=len(block))
+            result = np.full(len(block), np.nan)
+            if counts.sum() == 0:
+                return result
+            
+            flat = np.concatenate([np.asarray(n, dtype=np.int64) for n in neighbours])
+            owner = np.repeat(np.arange(len(block)), counts)
+            distances = np.hypot(*(block[owner] - tree.data[flat]).T)
+            weights = 1.0 / np.maximum(distances, 1e-10) ** self.power
+            
+            weighted = np.bincount(owner, weights=weights * values[flat], minlength=len(block))
+            total = np.bincount(owner, weights=weights, minlength=len(block))
+            has_neighbours = counts > 0
+            result[has_neighbours] = weighted[has_neighbours] / total[has_neighbours]
+            return result
+        
+        # Global IDW: every sample contributes
+        distances = cdist(block, tree.data)
+        return self._weighted_mean(distances, np.broadcast_to(values, distances.shape))
+
+
+def _map_blocks(
+    func: Callable[[np.ndarray], np.ndarray],
+    query_points: np.ndarray,
+    block_size: int,
+    workers: int
+) -> np.ndarray:
+    """Evaluate func over row blocks of query_points, optionally on a thread pool."""
+    blocks = [query_points[i:i + block_size] for i in range(0, len(query_points), block_size)]
+    if not blocks:
+        return np.empty(0)
+    if workers == 1 or len(blocks) == 1:
+        return np.concatenate([func(block) for block in blocks])
+    
+    # NumPy/LAPACK release the GIL in the solves, so threads scale
+    with ThreadPoolExecutor(max_workers=None if workers < 0 else workers) as pool:
+        return np.concatenate(list(pool.map(func, blocks)))
 
 
 class RBFInterpolator:
-    """Radial Basis Function interpolation."""
+    """
+    Radial Basis Function interpolation.
+    
+    Backed by scipy.interpolate.RBFInterpolator. With neighbors set, each
+    prediction solves a small system over its nearest samples instead of a
+    dense N x N system, so large sample sets stay tractable.
+    """
+    
+    # Legacy scipy.interpolate.Rbf names -> RBFInterpolator kernels
+    FUNCTION_ALIASES = {
+        'thin_plate': 'thin_plate_spline',
+        'inverse': 'inverse_multiquadric',
+    }
     
-    def __init__(self, function: str = 'thin_plate', epsilon: Optional[float] = None):  # type: ignore
+    SCALE_INVARIANT = ('linear', 'thin_plate_spline', 'cubic', 'quintic')
+    
+    def __init__(
+        self,
+        function: str = 'thin_plate',
+        epsilon: Optional[float] = None,  # type: ignore
+        neighbors: Optional[int] = None,
+        smoothing: float = 0.0,
+        block_size: int = 16384,
+        workers: int = 1
+    ):
         """
         Initialize RBF interpolator.
         
         Args:
             function: RBF function type
-            epsilon: Regularization parameter
+            epsilon: Shape parameter as a distance, as in scipy.interpolate.Rbf
+                (None = mean sample spacing)
+            neighbors: Nearest samples per prediction (None = global dense solve)
+            smoothing: Smoothing parameter (0 = exact interpolation)
+            block_size: Prediction points per block
+            workers: Parallel prediction blocks (-1 = all cores)
         """
         self.function = function
         self.epsilon = epsilon
+        self.neighbors = neighbors
+        self.smoothing = smoothing
+        self.block_size = block_size
+        self.workers = workers
     
     def interpolate(
         self,
@@ -128,22 +314,326 @@ class RBFInterpolator:
             (m,) array of interpolated values
         """
         try:
-            rbf = Rbf(
-                points[:, 0], points[:, 1], values,
-                function=self.function,
-                epsilon=self.epsilon
+            points = np.asarray(points, dtype=np.float64)
+            values = np.asarray(values, dtype=np.float64)
+            grid_points = np.asarray(grid_points, dtype=np.float64)
+            
+            kernel = self.FUNCTION_ALIASES.get(self.function, self.function)
+            epsilon = None
+            if kernel not in self.SCALE_INVARIANT:
+                scale = self.epsilon
+                if scale is None:
+                    # Same default as scipy.interpolate.Rbf: mean spacing over the bounding box
+                    edges = np.ptp(points, axis=0)
+                    edges = edges[edges > 0]
+                    scale = (np.prod(edges) / len(points)) ** (1.0 / max(len(edges), 1))
+                # Rbf divides distances by epsilon, RBFInterpolator multiplies
+                epsilon = 1.0 / scale
+            
+            neighbors = self.neighbors
+            if neighbors is not None:
+                neighbors = min(neighbors, len(points))
+            
+            rbf = _ScipyRBFInterpolator(
+                points, values,
+                neighbors=neighbors,
+                smoothing=self.smoothing,
+                kernel=kernel,
+                epsilon=epsilon
             )
             
-            interpolated = rbf(grid_points[:, 0], grid_points[:, 1])
-            return interpolated
+            return _map_blocks(rbf, grid_points, self.block_size, self.workers)
             
         except Exception as e:
             logger.error(f"RBF interpolation error: {e}")
             raise
 
 
+@dataclass
+class VariogramModel:
+    """Fitted semivariogram shared by all kriging neighbourhoods."""
+    model: str = 'spherical'
+    nugget: float = 0.0
+    sill: float = 1.0  # Partial sill (total sill = nugget + sill)
+    correlation_range: float = 1.0  # Practical range
+    
+    MODELS = ('spherical', 'exponential', 'gaussian')
+    
+    def __call__(self, h: np.ndarray) -> np.ndarray:
+        """Semivariance at lag distances h (zero at h == 0)."""
+        h = np.asarray(h, dtype=np.float64)
+        gamma = self.nugget + self.sill * _variogram_shape(self.model, h, self.correlation_range)
+        return np.where(h > 0, gamma, 0.0)
+    
+    @classmethod
+    def fit(
+        cls,
+        points: np.ndarray,
+        values: np.ndarray,
+        model: str = 'spherical',
+        n_lags: int = 15,
+        max_samples: int = 2000,
+        seed: int = 0
+    ) -> 'VariogramModel':
+        """
+        Fit a variogram model to the empirical semivariogram.
+        
+        Pairs are taken from a random subset of at most max_samples points, so
+        fitting cost does not grow with the sample count.
+        """
+        if model not in cls.MODELS:
+            raise ValueError(f"Unknown variogram model: {model}")
+        
+        points = np.asarray(points, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        if len(points) > max_samples:
+            subset = np.random.default_rng(seed).choice(len(points), max_samples, replace=False)
+            points, values = points[subset], values[subset]
+        
+        variance = float(np.var(values)) or 1.0
+        lags = pdist(points)
+        if len(lags) == 0:
+            return cls(model=model, nugget=0.0, sill=variance, correlation_range=1.0)
+        semivariances = 0.5 * pdist(values[:, None], 'sqeuclidean')
+        
+        # Bin pairs by lag out to half the maximum separation
+        max_lag = lags.max() / 2.0 or 1.0
+        edges = np.linspace(0.0, max_lag, n_lags + 1)
+        bins = np.digitize(lags, edges) - 1
+        in_range = (bins >= 0) & (bins < n_lags)
+        counts = np.bincount(bins[in_range], minlength=n_lags)
+        sums = np.bincount(bins[in_range], weights=semivariances[in_range], minlength=n_lags)
+        centres = np.bincount(bins[in_range], weights=lags[in_range], minlength=n_lags)
+        populated = counts > 0
+        lag_centres = centres[populated] / counts[populated]
+        gamma = sums[populated] / counts[populated]
+        
+        initial = (0.0, variance, max_lag / 2.0)
+        try:
+            params, _ = curve_fit(
+                lambda h, nugget, sill, rng: nugget + sill * _variogram_shape(model, h, rng),
+                lag_centres, gamma,
+                p0=initial,
+                bounds=([0.0, 0.0, 1e-12], [np.inf, np.inf, lags.max()]),
+                sigma=1.0 / np.sqrt(counts[populated]),
+                maxfev=5000
+            )
+        except (RuntimeError, ValueError) as e:
+            logger.warning(f"Variogram fit failed, using initial estimate: {e}")
+            params = initial
+        
+        nugget, sill, rng = (float(p) for p in params)
+        return cls(model=model, nugget=nugget, sill=sill, correlation_range=rng)
+
+
+def _variogram_shape(model: str, h: np.ndarray, rng: float) -> np.ndarray:
+    """Unit-sill variogram structure."""
+    ratio = h / rng
+    if model == 'spherical':
+        return np.where(ratio < 1.0, 1.5 * ratio - 0.5 * ratio ** 3, 1.0)
+    if model == 'exponential':
+        return 1.0 - np.exp(-3.0 * ratio)
+    return 1.0 - np.exp(-3.0 * ratio ** 2)
+
+
+class OrdinaryKriging:
+    """
+    Ordinary kriging over local neighbourhoods.
+    
+    Prediction points are grouped into square spatial blocks; each block
+    solves one small kriging system over the k samples nearest its centre,
+    with the block's points as right-hand sides. All blocks share a single
+    fitted variogram model and may run in parallel.
+    """
+    
+    def __init__(
+        self,
+        variogram: Optional[VariogramModel] = None,
+        model: str = 'spherical',
+        neighbors: int = 32,
+        block_extent: Optional[float] = None,
+        workers: int = 1
+    ):
+        """
+        Initialize ordinary kriging.
+        
+        Args:
+            variogram: Pre-fitted variogram (None = fit on each interpolate call)
+            model: Variogram model to fit when variogram is None
+            neighbors: Samples per local kriging system
+            block_extent: Side of prediction blocks in map units
+                (None = spacing holding about neighbors / 4 samples)
+            workers: Parallel prediction blocks (-1 = all cores)
+        """
+        self.variogram = variogram
+        self.model = model
+        self.neighbors = neighbors
+        self.block_extent = block_extent
+        self.workers = workers
+    
+    def interpolate(
+        self,
+        points: np.ndarray,
+        values: np.ndarray,
+        grid_points: np.ndarray
+    ) -> np.ndarray:
+        """
+        Perform ordinary kriging.
+        
+        Args:
+            points: (n, 2) array of point coordinates
+            values: (n,) array of values at points
+            grid_points: (m, 2) array of grid points
+            
+        Returns:
+            (m,) array of interpolated values
+        """
+        return self.interpolate_with_variance(points, values, grid_points)[0]
+    
+    def interpolate_with_variance(
+        self,
+        points: np.ndarray,
+        values: np.ndarray,
+        grid_points: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Perform ordinary kriging and return the kriging variance.
+        
+        Returns:
+            ((m,) predictions, (m,) kriging variances)
+        """
+        try:
+            points = np.asarray(points, dtype=np.float64)
+            values = np.asarray(values, dtype=np.float64)
+            grid_points = np.asarray(grid_points, dtype=np.float64)
+            
+            variogram = self.variogram or VariogramModel.fit(points, values, model=self.model)
+            tree = cKDTree(points)
+            k = min(self.neighbors, len(points))
+            
+            extent = self.block_extent
+            if extent is None:
+                area = float(np.prod(np.maximum(np.ptp(points, axis=0), 1e-12)))
+                extent = np.sqrt(area / len(points) * max(k / 4.0, 1.0))
+            
+            # Group prediction points by block, keeping each group contiguous
+            cells = np.floor((grid_points - grid_points.min(axis=0)) / extent).astype(np.int64)
+            keys = cells[:, 0] * (cells[:, 1].max() + 1) + cells[:, 1]
+            order = np.argsort(keys, kind='stable')
+            boundaries = np.flatnonzero(np.diff(keys[order])) + 1
+            groups = np.split(order, boundaries)
+            
+            def solve(group: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+                targets = grid_points[group]
+                _, nearest = tree.query(targets.mean(axis=0), k=k)
+                nearest = np.atleast_1d(nearest)
+                return _krige_block(variogram, points[nearest], values[nearest], targets)
+            
+            predictions = np.empty(len(grid_points))
+            variances = np.empty(len(grid_points))
+            if self.workers == 1 or len(groups) == 1:
+                results = map(solve, groups)
+                for group, (prediction, variance) in zip(groups, results):
+                    predictions[group] = prediction
+                    variances[group] = variance
+            else:
+                with ThreadPoolExecutor(max_workers=None if self.workers < 0 else self.workers) as pool:
+                    for group, (prediction, variance) in zip(groups, pool.map(solve, groups)):
+                        predictions[group] = prediction
+                        variances[group] = variance
+            
+            return predictions, variances
+            
+        except Exception as e:
+            logger.error(f"Kriging interpolation error: {e}")
+            raise
+
+
+def _krige_block(
+    variogram: VariogramModel,
+    samples: np.ndarray,
+    values: np.ndarray,
+    targets: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Solve one ordinary kriging system with every target as a right-hand side."""
+    k = len(samples)
+    lhs = np.ones((k + 1, k + 1))
+    lhs[:k, :k] = variogram(cdist(samples, samples))
+    lhs[k, k] = 0.0
+    
+    rhs = np.ones((k + 1, len(targets)))
+    rhs[:k] = variogram(cdist(samples, targets))
+    
+    try:
+        solution = np.linalg.solve(lhs, rhs)
+    except np.linalg.LinAlgError:
+        # Duplicate samples make the system singular
+        solution = np.linalg.lstsq(lhs, rhs, rcond=None)[0]
+    
+    weights = solution[:k]
+    predictions = values @ weights
+    variances = np.sum(weights * rhs[:k], axis=0) + solution[k]
+    return predictions, np.maximum(variances, 0.0)
+
+
+def fill_raster_gaps(
+    raster: np.ndarray,
+    interpolator: Any,
+    nodata_value: Optional[float] = None,
+    ring: int = 8
+) -> np.ndarray:
+    """
+    Fill NoData gaps in a raster by interpolating from surrounding cells.
+    
+    Only valid cells within ring cells of a gap are used as samples, so the
+    interpolator sees the gap cells and their borders rather than every
+    valid cell. Locating gaps and their borders still passes over the whole
+    raster (the dilation ring times), and all gaps are interpolated in one
+    call, so the interpolator's own cost in sample count applies.
+    
+    Args:
+        raster: 2D array with gaps marked by NaN or nodata_value
+        interpolator: Any interpolator with interpolate(points, values, grid_points)
+        nodata_value: NoData value in addition to NaN
+        ring: Width in cells of the sampled border around gaps
+        
+    Returns:
+        Copy of raster with gaps filled
+    """
+    filled = np.array(raster, dtype=np.float64)
+    gaps = ~np.isfinite(filled)
+    if nodata_value is not None:
+        gaps |= filled == nodata_value
+    if not gaps.any() or gaps.all():
+        return filled
+    
+    border = binary_dilation(gaps, iterations=ring) & ~gaps
+    sample_rows, sample_cols = np.nonzero(border)
+    gap_rows, gap_cols = np.nonzero(gaps)
+    
+    filled[gaps] = interpolator.interpolate(
+        np.column_stack([sample_cols, sample_rows]).astype(np.float64),
+        filled[sample_rows, sample_cols],
+        np.column_stack([gap_cols, gap_rows]).astype(np.float64)
+    )
+    return filled
+
+
 class KernelDensity:
-    """Kernel density estimation."""
+    """
+    Kernel density estimation.
+    
+    Kernels are unnormalised (peak value 1 at distance 0) and scaled by the
+    bandwidth. Supported: gaussian, uniform, quartic, epanechnikov.
+    """
+    
+    KERNELS = ('gaussian', 'uniform', 'quartic', 'epanechnikov')
+    
+    # Gaussian tails beyond this many bandwidths are dropped in binned mode
+    GAUSSIAN_TRUNCATE = 4.0
+    
+    # Upper bound on grid x points distances held in memory in exact mode
+    MAX_BLOCK_ELEMENTS = 1 << 22
     
     def __init__(self, bandwidth: float = 1.0, kernel: str = 'gaussian'):
         """
@@ -151,11 +641,25 @@ class KernelDensity:
         
         Args:
             bandwidth: Bandwidth parameter
-            kernel: Kernel type (gaussian, uniform, etc.)
+            kernel: Kernel type (gaussian, uniform, quartic, epanechnikov)
         """
+        if kernel not in self.KERNELS:
+            raise ValueError(f"Unknown kernel: {kernel}")
         self.bandwidth = bandwidth
         self.kernel = kernel
     
+    def _kernel_values(self, distances: np.ndarray) -> np.ndarray:
+        """Evaluate the kernel at the given distances."""
+        u = distances / self.bandwidth
+        if self.kernel == 'gaussian':
+            return np.exp(-0.5 * u ** 2)
+        inside = u <= 1.0
+        if self.kernel == 'uniform':
+            return inside.astype(float)
+        if self.kernel == 'quartic':
+            return np.where(inside, (1.0 - u ** 2) ** 2, 0.0)
+        return np.where(inside, 1.0 - u ** 2, 0.0)
+    
     def estimate(
         self,
         points: np.ndarray,
@@ -165,6 +669,10 @@ class KernelDensity:
         """
         Estimate density at grid points.
         
+        Exact evaluation at arbitrary locations, computed in blocks of grid
+        points so memory stays bounded. For regular grids prefer
+        estimate_grid(), whose binned mode does not scale with point count.
+        
         Args:
             points: (n, 2) array of point coordinates
             grid_points: (m, 2) array of grid points
@@ -176,83 +684,212 @@ class KernelDensity:
         try:
             if weights is None:
                 weights = np.ones(len(points))
+            weights = np.asarray(weights, dtype=np.float64)
             
-            distances = cdist(grid_points, points)
-            
-            if self.kernel == 'gaussian':
-                kernel_values = np.exp(-0.5 * (distances / self.bandwidth) ** 2)
-            elif self.kernel == 'uniform':
-                kernel_values = (distances <= self.bandwidth).astype(float)
-            else:
-                raise ValueError(f"Unknown kernel: {self.kernel}")
-            
-            # Apply weights
-            density = np.sum(kernel_values * weights, axis=1)
+            block = max(1, self.MAX_BLOCK_ELEMENTS // max(len(points), 1))
+            density = np.empty(len(grid_points))
+            for start in range(0, len(grid_points), block):
+                distances = cdist(grid_points[start:start + block], points)
+                # Apply weights
+                density[start:start + block] = self._kernel_values(distances) @ weights
             
             return density
             
         except Exception as e:
             logger.error(f"Kernel density estimation error: {e}")
             raise
+    
+    def estimate_grid(
+        self,
+        points: np.ndarray,
+        x_coords: np.ndarray,
+        y_coords: np.ndarray,
+        weights: Optional[np.ndarray] = None,
+        method: str = 'binned'
+    ) -> np.ndarray:
+        """
+        Estimate density on a regular grid.
+        
+        In 'binned' mode point weights are linearly binned onto the grid cells
+        and the histogram is convolved with the sampled kernel by FFT, so cost
+        is O(cells log cells) regardless of point count. Binning error is
+        small when the bandwidth spans several cells; use 'exact' otherwise.
+        
+        Args:
+            points: (n, 2) array of point coordinates
+            x_coords: (cols,) evenly spaced cell-centre x coordinates
+            y_coords: (rows,) evenly spaced cell-centre y coordinates
+            weights: Optional weights for points
+            method: 'binned' (FFT convolution) or 'exact' (direct summation)
+            
+        Returns:
+            (rows, cols) array of density values
+        """
+        try:
+            points = np.asarray(points, dtype=np.float64)
+            x_coords = np.asarray(x_coords, dtype=np.float64)
+            y_coords = np.asarray(y_coords, dtype=np.float64)
+            if weights is None:
+                weights = np.ones(len(points))
+            weights = np.asarray(weights, dtype=np.float64)
+            
+            if method == 'exact':
+                xx, yy = np.meshgrid(x_coords, y_coords)
+                grid_points = np.column_stack([xx.ravel(), yy.ravel()])
+                return self.estimate(points, grid_points, weights).reshape(len(y_coords), len(x_coords))
+            if method != 'binned':
+                raise ValueError(f"Unknown density method: {method}")
+            
+            return self._estimate_binned(points, weights, x_coords, y_coords)
+            
+        except Exception as e:
+            logger.error(f"Gridded kernel density estimation error: {e}")
+            raise
+    
+    def _estimate_binned(
+        self,
+        points: np.ndarray,
+        weights: np.ndarray,
+        x_coords: np.ndarray,
+        y_coords: np.ndarray
+    ) -> np.ndarray:
+        """Histogram points onto the grid and convolve with the kernel via FFT."""
+        rows, cols = len(y_coords), len(x_coords)
+        dx = _grid_spacing(x_coords, 'x')
+        dy = _grid_spacing(y_coords, 'y')
+        
+        support = self.bandwidth * (self.GAUSSIAN_TRUNCATE if self.kernel == 'gaussian' else 1.0)
+        rx = int(np.ceil(support / abs(dx)))
+        ry = int(np.ceil(support / abs(dy)))
+        
+        # Linear binning onto a grid padded by the kernel radius, so points just
+        # outside the output extent still contribute to the edge cells
+        col = (points[:, 0] - x_coords[0]) / dx + rx
+        row = (points[:, 1] - y_coords[0]) / dy + ry
+        col0 = np.floor(col).astype(np.int64)
+        row0 = np.floor(row).astype(np.int64)
+        fc = col - col0
+        fr = row - row0
+        
+        padded_shape = (rows + 2 * ry, cols + 2 * rx)
+        histogram = np.zeros(padded_shape[0] * padded_shape[1])
+        for r_off, c_off, share in (
+            (0, 0, (1 - fr) * (1 - fc)),
+            (0, 1, (1 - fr) * fc),
+            (1, 0, fr * (1 - fc)),
+            (1, 1, fr * fc),
+        ):
+            r = row0 + r_off
+            c = col0 + c_off
+            inside = (r >= 0) & (r < padded_shape[0]) & (c >= 0) & (c < padded_shape[1])
+            histogram += np.bincount(
+                r[inside] * padded_shape[1] + c[inside],
+                weights=(weights * share)[inside],
+                minlength=histogram.size
+            )
+        histogram = histogram.reshape(padded_shape)
+        
+        offsets_y = np.arange(-ry, ry + 1) * abs(dy)
+        offsets_x = np.arange(-rx, rx + 1) * abs(dx)
+        kernel = self._kernel_values(np.hypot(*np.meshgrid(offsets_x, offsets_y)))
+        
+        density = fftconvolve(histogram, kernel, mode='valid')
+        # FFT round-off can leave tiny negative values in empty regions
+        return np.maximum(density, 0.0)
+
+
+def _grid_spacing(coords: np.ndarray, axis: str) -> float:
+    """Spacing of an evenly spaced coordinate axis."""
+    if len(coords) < 2:
+        raise ValueError(f"Grid {axis} axis needs at least two coordinates")
+    steps = np.diff(coords)
+    if not np.allclose(steps, steps[0], rtol=1e-6, atol=0.0) or steps[0] == 0:
+        raise ValueError(f"Grid {axis} coordinates must be evenly spaced")
+    return float(steps[0])
 
 
 class ContourGenerator:
-    """Generate contour lines from raster data."""
+    """
+    Generate contour lines from raster data.
+    
+    All levels are traced in a single marching-squares pass (contourpy's
+    multi-level API) and geometries are created in bulk as shapely arrays.
+    """
+    
+    @staticmethod
+    def contour_levels(raster: np.ndarray, interval: float, base: float = 0.0) -> List[float]:
+        """Levels at a fixed interval spanning the raster's finite range."""
+        finite = raster[np.isfinite(raster)]
+        if finite.size == 0 or interval <= 0:
+            return []
+        first = base + np.ceil((finite.min() - base) / interval) * interval
+        return [float(level) for level in np.arange(first, finite.max() + interval * 0.5, interval)]
     
     @staticmethod
     def generate_contours(
         raster: np.ndarray,
         levels: List[float],
         transform: Optional[Any] = None,  # type: ignore[name-defined]
-        crs: str = 'EPSG:4326'
+        crs: str = 'EPSG:4326',
+        smooth: float = 0.0,
+        simplify_tolerance: Optional[float] = None,
+        tile_size: Optional[int] = None,
+        workers: int = 1
     ) -> GeoDataFrame:
         """
         Generate contour lines from raster.
         
         Args:
-            raster: 2D array of values
+            raster: 2D array of values (NaN cells are masked)
             levels: List of contour levels
-            transform: Rasterio transform
+            transform: Rasterio transform; vertices are mapped from cell
+                centres. Without one, vertices are fractional array indices
+                (row, col)
             crs: Coordinate reference system
+            smooth: Gaussian pre-smoothing sigma in cells (0 = none)
+            simplify_tolerance: Douglas-Peucker tolerance in output units
+            tile_size: Trace in tiles of this many cells per side, each tile
+                tracing only the levels inside its value range. Much faster
+                for fine intervals on large DEMs (256 works well); lines are
+                split at tile edges
+            workers: Threads used to trace tiles (requires tile_size)
             
         Returns:
             GeoDataFrame with contour lines
         """
         try:
-            contours = []
-            
-            for level in levels:
-                # Find contours at this level
-                binary = (raster >= level).astype(int)
-                
-                try:
-                    contour_coords = measure.find_contours(binary, 0.5)
-                    
-                    for coords in contour_coords:
-                        if len(coords) > 2:
-                            # Convert pixel coordinates to geographic
-                            if transform:
-                                geo_coords = [
-                                    transform * (coord[1], coord[0])
-                                    for coord in coords
-                                ]
-                            else:
-                                geo_coords = coords
-                            
-                            line = LineString(geo_coords)
-                            contours.append({
-                                'geometry': line,
-                                'level': level
-                            })
-                except Exception as e:
-                    logger.debug(f"Error processing contour level {level}: {e}")
-                    continue
-            
-            if contours:
-                return GeoDataFrame(contours, crs=crs)
+            z = np.asarray(raster, dtype=np.float64)
+            mask = ~np.isfinite(z)
+            if smooth > 0:
+                # Normalised convolution keeps NaN holes from bleeding into valid cells
+                weight = gaussian_filter((~mask).astype(np.float64), smooth)
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    z = gaussian_filter(np.where(mask, 0.0, z), smooth) / weight
+            
+            if contourpy is not None:
+                coords, line_ids, line_levels = _trace_contourpy(z, mask, levels, tile_size, workers)
             else:
+                coords, line_ids, line_levels = _trace_skimage(np.where(mask, np.nan, z), levels)
+            
+            if len(line_levels) == 0:
                 return GeoDataFrame(columns=['geometry', 'level'], crs=crs)
             
+            if transform:
+                # Pixel (col, row) -> map coordinates at cell centres
+                cols = coords[:, 0] + 0.5
+                rows = coords[:, 1] + 0.5
+                a, b, c, d, e, f = transform.a, transform.b, transform.c, transform.d, transform.e, transform.f
+                coords = np.column_stack([a * cols + b * rows + c, d * cols + e * rows + f])
+            else:
+                # Array indices, (row, col) like skimage.measure.find_contours
+                coords = coords[:, ::-1]
+            
+            geometries = shapely.linestrings(coords, indices=line_ids)
+            if simplify_tolerance:
+                geometries = shapely.simplify(geometries, simplify_tolerance)
+            
+            return GeoDataFrame({'level': line_levels}, geometry=geometries, crs=crs)
+            
         except Exception as e:
             logger.error(f"Contour generation error: {e}")
             raise
@@ -271,7 +908,8 @@ class ContourGenerator:
             gdf: Point GeoDataFrame
             bounds: (minx, miny, maxx, maxy)
             resolution: Grid resolution
-            kernel_bandwidth: Kernel bandwidth
+            kernel_bandwidth: Kernel bandwidth (default: a tenth of a cell).
+                Bandwidths of at least one cell use binned estimation.
             
         Returns:
             (heatmap_array, extent)
@@ -282,21 +920,23 @@ class ContourGenerator:
             # Create grid
             x = np.linspace(minx, maxx, resolution)
             y = np.linspace(miny, maxy, resolution)
-            xx, yy = np.meshgrid(x, y)
-            grid_points = np.column_stack([xx.ravel(), yy.ravel()])
             
             # Extract point coordinates
-            points = np.array([(geom.centroid.x if hasattr(geom, 'centroid') else 0, geom.centroid.y if hasattr(geom, 'centroid') else 0) for geom in gdf.geometry])
+            centroids = shapely.centroid(np.asarray(gdf.geometry.values))
+            points = np.nan_to_num(shapely.get_coordinates(centroids, include_z=False), nan=0.0) \
+                if len(centroids) else np.empty((0, 2))
             
             # Calculate density
             if kernel_bandwidth is None:
                 kernel_bandwidth = (maxx - minx) / (10 * resolution)
             
-            kde = KernelDensity(bandwidth=kernel_bandwidth)
-            density = kde.estimate(points, grid_points)
+            # Binning smears kernels narrower than a cell (the default is a
+            # tenth of one), so those are summed exactly
+            cell = min(x[1] - x[0], y[1] - y[0]) if resolution > 1 else np.inf
+            method = 'binned' if kernel_bandwidth >= cell else 'exact'
             
-            # Reshape to grid
-            heatmap = density.reshape((resolution, resolution))
+            kde = KernelDensity(bandwidth=kernel_bandwidth)
+            heatmap = kde.estimate_grid(points, x, y, method=method)
             
             return heatmap, (minx, maxx, miny, maxy)
             
@@ -305,6 +945,121 @@ class ContourGenerator:
             raise
 
 
+def _trace_contourpy(
+    z: np.ndarray,
+    mask: np.ndarray,
+    levels: List[float],
+    tile_size: Optional[int],
+    workers: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Trace all levels with contourpy; returns flat (col, row) coords, line ids and line levels."""
+    levels_arr = np.asarray(levels, dtype=np.float64)
+    rows, cols = z.shape
+    if not tile_size or (rows <= tile_size + 1 and cols <= tile_size + 1):
+        return _pack_lines(*_trace_tile(z, mask, levels_arr, 0, 0))
+    
+    # Tiles overlap by one cell so lines meet at shared edges; each tile only
+    # traces the levels inside its own value range
+    origins = [
+        (r0, c0)
+        for r0 in range(0, max(rows - 1, 1), tile_size)
+        for c0 in range(0, max(cols - 1, 1), tile_size)
+    ]
+    
+    def trace(origin: Tuple[int, int]) -> Tuple[List, List, List]:
+        r0, c0 = origin
+        window = (slice(r0, r0 + tile_size + 1), slice(c0, c0 + tile_size + 1))
+        return _trace_tile(z[window], mask[window], levels_arr, r0, c0)
+    
+    if workers == 1:
+        traced = list(map(trace, origins))
+    else:
+        with ThreadPoolExecutor(max_workers=None if workers < 0 else workers) as pool:
+            traced = list(pool.map(trace, origins))
+    
+    coords, lengths, line_levels = [], [], []
+    for tile_coords, tile_lengths, tile_levels in traced:
+        coords.extend(tile_coords)
+        lengths.extend(tile_lengths)
+        line_levels.extend(tile_levels)
+    return _pack_lines(coords, lengths, line_levels)
+
+
+def _trace_tile(
+    z: np.ndarray,
+    mask: np.ndarray,
+    levels: np.ndarray,
+    row_offset: int,
+    col_offset: int
+) -> Tuple[List, List, List]:
+    """Trace the levels crossing one tile in a single multi-level pass."""
+    coords: List[np.ndarray] = []
+    lengths: List[np.ndarray] = []
+    line_levels: List[np.ndarray] = []
+    
+    valid = z[~mask] if mask.any() else z.ravel()
+    if valid.size == 0:
+        return coords, lengths, line_levels
+    levels = levels[(levels >= valid.min()) & (levels <= valid.max())]
+    if len(levels) == 0:
+        return coords, lengths, line_levels
+    
+    generator = contourpy.contour_generator(
+        z=np.ma.masked_array(z, mask=mask) if mask.any() else z,
+        line_type=contourpy.LineType.ChunkCombinedOffset,
+    )
+    if hasattr(generator, 'multi_lines'):
+        traced = generator.multi_lines(levels)
+    else:
+        traced = [generator.lines(level) for level in levels]
+    
+    offset = np.array([col_offset, row_offset], dtype=np.float64)
+    for level, (chunk_points, chunk_offsets) in zip(levels, traced):
+        for points, offsets in zip(chunk_points, chunk_offsets):
+            if points is None:
+                continue
+            coords.append(points + offset)
+            counts = np.diff(offsets)
+            lengths.append(counts)
+            line_levels.append(np.full(len(counts), level, dtype=np.float64))
+    
+    return coords, lengths, line_levels
+
+
+def _trace_skimage(
+    z: np.ndarray,
+    levels: List[float]
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Fallback tracer when contourpy is unavailable (one pass per level)."""
+    coords, lengths, line_levels = [], [], []
+    for level in levels:
+        for line in measure.find_contours(z, level):
+            coords.append(line[:, ::-1])
+            lengths.append(np.array([len(line)]))
+            line_levels.append(np.array([level], dtype=np.float64))
+    return _pack_lines(coords, lengths, line_levels)
+
+
+def _pack_lines(
+    coords: List[np.ndarray],
+    lengths: List[np.ndarray],
+    line_levels: List[np.ndarray]
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Concatenate traced lines, dropping those with fewer than two vertices."""
+    if not coords:
+        return np.empty((0, 2)), np.empty(0, dtype=np.int64), np.empty(0)
+    
+    coords_arr = np.concatenate(coords)
+    lengths_arr = np.concatenate(lengths)
+    levels_arr = np.concatenate(line_levels)
+    
+    vertex_keep = np.repeat(lengths_arr >= 2, lengths_arr)
+    keep = lengths_arr >= 2
+    lengths_arr = lengths_arr[keep]
+    line_ids = np.repeat(np.arange(len(lengths_arr)), lengths_arr)
+    return coords_arr[vertex_keep], line_ids, levels_arr[keep]
+
+
 class SpatialStatistics:
     """Statistical analysis for spatial data."""
     
@@ -393,6 +1148,9 @@ class SpatialStatistics:
 __all__ = [
     'IDWInterpolator',
     'RBFInterpolator',
+    'OrdinaryKriging',
+    'VariogramModel',
+    'fill_raster_gaps',
     'KernelDensity',
     'ContourGenerator',
     'SpatialStatistics'
@@ -9,6 +9,7 @@ Features:
 - Statistical operations
 - Logical operations
 - Trigonometric and mathematical functions
+- Neighbourhood (focal) and zonal operators
 """
 
 import logging
@@ -16,6 +17,7 @@ import re
 from typing import Dict, Any, List, Optional, Callable, Union
 import numpy as np
 from dataclasses import dataclass
+from scipy import ndimage
 import rasterio
 from rasterio.io import MemoryFile
 try:
@@ -39,13 +41,18 @@ class RasterAlgebraContext:
 class AlgebraToken:
     """Token in algebra expression."""
     
+    # Order matters: keywords must be tried before the generic RASTER identifier.
+    # Signs are not part of NUMBER; the parser handles them as unary operators.
     TOKEN_TYPES = {
-        'NUMBER': r'-?\d+\.?\d*([eE][+-]?\d+)?',
+        'NUMBER': r'\d+\.?\d*([eE][+-]?\d+)?',
+        'FUNCTION': (
+            r'(focal_mean|focal_max|focal_std|zonal_mean|shift|'
+            r'sin|cos|tan|sqrt|exp|log|abs|min|max|mean|std|sum|where)\b'
+        ),
+        'LOGICAL': r'(and|or|not)\b',
         'RASTER': r'[a-zA-Z_][a-zA-Z0-9_]*',
-        'FUNCTION': r'(sin|cos|tan|sqrt|exp|log|abs|min|max|mean|std|sum|where)',
         'OPERATOR': r'[\+\-\*\/\^]',
         'COMPARISON': r'(==|!=|<=|>=|<|>)',
-        'LOGICAL': r'(and|or|not)',
         'LPAREN': r'\(',
         'RPAREN': r'\)',
         'COMMA': r',',
@@ -60,6 +67,12 @@ class AlgebraToken:
         return f"Token({self.type}, {self.value})"
 
 
+_TOKEN_PATTERNS = [
+    (token_type, re.compile(pattern, re.IGNORECASE))
+    for token_type, pattern in AlgebraToken.TOKEN_TYPES.items()
+]
+
+
 class ExpressionLexer:
     """Tokenize map algebra expressions."""
     
@@ -73,8 +86,7 @@ class ExpressionLexer:
         while self.pos < len(self.expression):
             matched = False
             
-            for token_type, pattern in AlgebraToken.TOKEN_TYPES.items():
-                regex = re.compile(f'^({pattern})', re.IGNORECASE)
+            for token_type, regex in _TOKEN_PATTERNS:
                 match = regex.match(self.expression, self.pos)
                 
                 if match:
@@ -283,7 +295,11 @@ class RasterNode(ASTNode):
     def evaluate(self, context: RasterAlgebraContext) -> np.ndarray:
         if self.name not in context.rasters:
             raise ValueError(f"Unknown raster: {self.name}")
-        return context.rasters[self.name].astype(context.dtype)
+        values = context.rasters[self.name].astype(context.dtype)
+        if np.issubdtype(values.dtype, np.floating):
+            # NaN propagates through arithmetic and is skipped by focal/zonal operators
+            values[values == context.nodata_value] = np.nan
+        return values
 
 
 class BinaryOpNode(ASTNode):
@@ -399,6 +415,9 @@ class FunctionNode(ASTNode):
         self.args = args
     
     def evaluate(self, context: RasterAlgebraContext) -> np.ndarray:
+        if self.name in NEIGHBOURHOOD_FUNCTIONS:
+            return self._evaluate_neighbourhood(context)
+        
         arg_vals = [arg.evaluate(context) for arg in self.args]
         
         # Use numpy for common functions that work regardless of numexpr
@@ -454,6 +473,175 @@ class FunctionNode(ASTNode):
             return ne.evaluate('abs(arg_vals[0])')  # type: ignore
         else:
             raise ValueError(f"Unknown function: {self.name}")
+    
+    def _evaluate_neighbourhood(self, context: RasterAlgebraContext) -> np.ndarray:
+        """Evaluate focal, zonal and shift operators."""
+        expected = NEIGHBOURHOOD_FUNCTIONS[self.name]
+        if len(self.args) != expected:
+            raise ValueError(f"{self.name}() requires {expected} arguments")
+        
+        values = np.asarray(self.args[0].evaluate(context), dtype=np.float64)
+        
+        if self.name == 'zonal_mean':
+            zones = self.args[1].evaluate(context)
+            result = zonal_mean(values, zones)
+        elif self.name == 'shift':
+            dx = _constant_int(self.args[1], self.name)
+            dy = _constant_int(self.args[2], self.name)
+            result = shift(values, dx, dy)
+        else:
+            size = _constant_int(self.args[1], self.name)
+            result = FOCAL_OPERATORS[self.name](values, size)
+        
+        return result.astype(context.dtype, copy=False)
+
+
+def _constant_int(node: ASTNode, function: str) -> int:
+    """Fold a literal (optionally signed) integer argument."""
+    sign = 1
+    while isinstance(node, UnaryOpNode) and node.op in ('+', '-'):
+        if node.op == '-':
+            sign = -sign
+        node = node.operand
+    
+    if not isinstance(node, NumberNode) or not float(node.value).is_integer():
+        raise ValueError(f"{function}() window and offset arguments must be integer literals")
+    return sign * int(node.value)
+
+
+def _check_window(size: int) -> None:
+    if size < 1 or size % 2 == 0:
+        raise ValueError(f"Focal window size must be a positive odd integer, got {size}")
+
+
+def focal_mean(values: np.ndarray, size: int) -> np.ndarray:
+    """
+    Mean of valid cells in a size x size window.
+    
+    Uses separable running sums, so cost is independent of window size.
+    NaN cells are ignored; windows with no valid cells yield NaN.
+    """
+    _check_window(size)
+    valid = np.isfinite(values)
+    filled = np.where(valid, values, 0.0)
+    
+    sums = ndimage.uniform_filter(filled, size=size, mode='constant', cval=0.0)
+    counts = ndimage.uniform_filter(valid.astype(np.float64), size=size, mode='constant', cval=0.0)
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        result = sums / counts
+    result[counts < 0.5 / (size * size)] = np.nan
+    return result
+
+
+def focal_std(values: np.ndarray, size: int) -> np.ndarray:
+    """Population standard deviation of valid cells in a size x size window."""
+    _check_window(size)
+    valid = np.isfinite(values)
+    filled = np.where(valid, values, 0.0)
+    
+    # Centre on the global mean to limit cancellation in E[x^2] - E[x]^2
+    offset = filled[valid].mean() if valid.any() else 0.0
+    centred = np.where(valid, filled - offset, 0.0)
+    
+    counts = ndimage.uniform_filter(valid.astype(np.float64), size=size, mode='constant', cval=0.0)
+    sums = ndimage.uniform_filter(centred, size=size, mode='constant', cval=0.0)
+    sq_sums = ndimage.uniform_filter(centred * centred, size=size, mode='constant', cval=0.0)
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = sums / counts
+        variance = np.maximum(sq_sums / counts - mean * mean, 0.0)
+    result = np.sqrt(variance)
+    result[counts < 0.5 / (size * size)] = np.nan
+    return result
+
+
+def focal_max(values: np.ndarray, size: int) -> np.ndarray:
+    """
+    Maximum of valid cells in a size x size window.
+    
+    Applied as two 1-D passes whose cost does not depend on window size.
+    """
+    _check_window(size)
+    valid = np.isfinite(values)
+    filled = np.where(valid, values, -np.inf)
+    
+    result = ndimage.maximum_filter1d(filled, size=size, axis=0, mode='constant', cval=-np.inf)
+    result = ndimage.maximum_filter1d(result, size=size, axis=1, mode='constant', cval=-np.inf)
+    result[np.isneginf(result)] = np.nan
+    return result
+
+
+def zonal_mean(values: np.ndarray, zones: np.ndarray) -> np.ndarray:
+    """
+    Replace each cell with the mean of its zone.
+    
+    Zones are labelled by integer codes; cells with a NaN zone or value are
+    excluded from the reduction, and cells without a zone yield NaN.
+    """
+    zones = np.asarray(zones)
+    if zones.shape != values.shape:
+        raise ValueError("zonal_mean() zone raster must match value raster shape")
+    
+    zone_valid = np.isfinite(zones) if np.issubdtype(zones.dtype, np.floating) else np.ones(zones.shape, bool)
+    lo = zones[zone_valid].min() if zone_valid.any() else 0
+    hi = zones[zone_valid].max() if zone_valid.any() else 0
+    # Cells without a zone take a valid label so every index stays in range
+    labels = np.where(zone_valid, zones, lo).astype(np.int64)
+    lo, hi = int(lo), int(hi)
+    if hi - lo < 4 * labels.size:
+        # Dense label range: index directly
+        index = (labels - lo).ravel()
+        n_zones = int(hi - lo) + 1
+    else:
+        _, index = np.unique(labels.ravel(), return_inverse=True)
+        index = index.ravel()
+        n_zones = int(index.max()) + 1
+    
+    counted = (zone_valid & np.isfinite(values)).ravel()
+    sums = np.bincount(index[counted], weights=values.ravel()[counted], minlength=n_zones)
+    counts = np.bincount(index[counted], minlength=n_zones)
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = sums / counts
+    result = means[index].reshape(values.shape)
+    result[~zone_valid] = np.nan
+    return result
+
+
+def shift(values: np.ndarray, dx: int, dy: int) -> np.ndarray:
+    """
+    Read the neighbour dx columns right and dy rows down of each cell.
+    
+    Cells whose neighbour falls outside the raster yield NaN.
+    """
+    rows, cols = values.shape
+    result = np.full(values.shape, np.nan)
+    if abs(dx) >= cols or abs(dy) >= rows:
+        return result
+    
+    dst_rows = slice(max(-dy, 0), rows - max(dy, 0))
+    dst_cols = slice(max(-dx, 0), cols - max(dx, 0))
+    src_rows = slice(max(dy, 0), rows - max(-dy, 0))
+    src_cols = slice(max(dx, 0), cols - max(-dx, 0))
+    result[dst_rows, dst_cols] = values[src_rows, src_cols]
+    return result
+
+
+FOCAL_OPERATORS: Dict[str, Callable[[np.ndarray, int], np.ndarray]] = {
+    'focal_mean': focal_mean,
+    'focal_max': focal_max,
+    'focal_std': focal_std,
+}
+
+# Function name -> argument count for operators that look beyond a single cell
+NEIGHBOURHOOD_FUNCTIONS = {
+    'focal_mean': 2,
+    'focal_max': 2,
+    'focal_std': 2,
+    'zonal_mean': 2,
+    'shift': 3,
+}
 
 
 class RasterAlgebra:
@@ -472,6 +660,10 @@ class RasterAlgebra:
         """
         Evaluate raster algebra expression.
         
+        Besides cell-wise math, expressions may use neighbourhood operators:
+        focal_mean/focal_max/focal_std(r, size), zonal_mean(r, zones) and
+        shift(r, dx, dy). Cells these leave undefined are written as NoData.
+        
         Args:
             expression: Map algebra expression (e.g., "(B1 + B2) / 2")
             rasters: Dict of named raster arrays
@@ -501,6 +693,8 @@ class RasterAlgebra:
             result = ast.evaluate(context)
             
             # Handle NoData
+            if np.issubdtype(np.asarray(result).dtype, np.floating):
+                result = np.where(np.isnan(result), nodata_value, result)
             for raster in rasters.values():
                 result = np.where(raster == nodata_value, nodata_value, result)
             
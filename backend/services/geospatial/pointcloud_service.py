@@ -5,7 +5,7 @@ Provides point cloud-specific operations while delegating CRUD to data_service
 
 import os
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable
 from sqlalchemy.orm import Session
 import sys
 from pathlib import Path
@@ -16,6 +16,10 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from models.pointcloud import PointCloud
 from schemas.pointcloud import PointCloudCreate, PointCloudUpdate, PointCloudStats
 from services.data_service import BaseDataService
+from services.geospatial.core.pointcloud_streaming import read_header, stream_classification_counts
+from services.geospatial.core.pointcloud_gridding import GridMethod, GridSpec
+from services.geospatial.core.pointcloud_index import build_index
+from services.geospatial.core.pointcloud_filters import PointCloudFilterConfig, filter_index_to_grid
 import numpy as np
 
 logger = logging.getLogger(__name__)
@@ -35,11 +39,13 @@ class PointCloudService(BaseDataService[PointCloud, PointCloudCreate, PointCloud
             'file_path': file_path,
             'srs': item.srs,
             'bounds': item.bounds.dict() if item.bounds else None,
-            'metadata': item.metadata,
+            'pointcloud_metadata': item.metadata,
         }
     
     def _prepare_update_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Prepare point cloud data for update"""
+        if "metadata" in data:
+            data["pointcloud_metadata"] = data.pop("metadata")
         if "bounds" in data and data["bounds"]:
             if isinstance(data["bounds"], dict):
                 # Convert string keys to proper bounds format if needed
@@ -76,32 +82,54 @@ def delete_pointcloud(db: Session, pointcloud_id: int) -> bool:
     return _pointcloud_service.delete(db, pointcloud_id)
 
 
+def register_uploaded_pointcloud(
+    db: Session,
+    file_path: str,
+    owner_id: int,
+    header: Dict[str, Any],
+    original_filename: str,
+    file_size: int,
+    sha256: Optional[str] = None
+) -> PointCloud:
+    """
+    Create the record for an upload whose header has already been validated
+    
+    Args:
+        header: Metadata from services.uploads.validate_pointcloud_header
+    """
+    from schemas.pointcloud import Bounds as BoundsSchema
+    
+    pointcloud_data = PointCloudCreate(
+        name=original_filename,
+        file_path=file_path,
+        srs=header.get("srs"),
+        metadata={
+            "original_filename": original_filename,
+            "sha256": sha256,
+            "version": header.get("version"),
+            "point_format": header.get("point_format"),
+        }
+    )
+    db_pointcloud = create_pointcloud(db, pointcloud_data, owner_id)
+    return update_pointcloud(db, db_pointcloud.id, PointCloudUpdate(
+        point_count=header["point_count"],
+        file_size=file_size,
+        bounds=BoundsSchema(**header["bounds"]),
+        status="processed"
+    ))
+
+
 async def process_pointcloud_file(file_path: str, user_id: int, db: Session) -> Optional[PointCloud]:
     """Process an uploaded point cloud file"""
     try:
         file_size = os.path.getsize(file_path)
         
         if file_path.endswith('.las') or file_path.endswith('.laz'):
-            try:
-                import laspy
-            except ImportError:
-                raise ImportError("laspy not installed. Install with: pip install laspy")
-            
-            las = laspy.read(file_path)
-            point_count = len(las.points)
-            
-            mins = las.header.min
-            maxs = las.header.max
-            bounds = {
-                "minx": float(mins[0]),
-                "miny": float(mins[1]),
-                "maxx": float(maxs[0]),
-                "maxy": float(maxs[1]),
-                "minz": float(mins[2]) if len(mins) > 2 else None,
-                "maxz": float(maxs[2]) if len(maxs) > 2 else None,
-            }
-            
-            srs = str(las.header.srs) if hasattr(las.header, 'srs') else None
+            # Header only: point records are never loaded here
+            header = read_header(file_path)
+            point_count = header.point_count
+            bounds = header.bounds()
+            srs = header.srs
             
             pointcloud_data = PointCloudCreate(
                 name=os.path.basename(file_path),
@@ -145,25 +173,21 @@ def get_pointcloud_stats(db: Session, pointcloud_id: int) -> Optional[PointCloud
         return None
     
     try:
-        try:
-            import laspy
-        except ImportError:
-            raise ImportError("laspy not installed. Install with: pip install laspy")
-        
-        las = laspy.read(pointcloud.file_path)
+        header = read_header(pointcloud.file_path)
+        point_count = header.point_count
         
         if pointcloud.bounds:
             area = (pointcloud.bounds["maxx"] - pointcloud.bounds["minx"]) * \
                    (pointcloud.bounds["maxy"] - pointcloud.bounds["miny"])
-            density = len(las.points) / area if area > 0 else 0
+            density = point_count / area if area > 0 else 0
         else:
             density = 0
         
-        classification_counts = {}
-        if hasattr(las, 'classification'):
-            classifications = np.asarray(las.classification)
-            unique, counts = np.unique(classifications, return_counts=True)
-            classification_counts = dict(zip(unique.tolist(), counts.tolist()))
+        # Stream only the classification dimension, in fixed memory
+        classification_counts = {
+            str(code): count
+            for code, count in stream_classification_counts(pointcloud.file_path).items()
+        }
         
         # Ensure bounds is a Bounds object
         bounds_obj = pointcloud.bounds
@@ -172,7 +196,7 @@ def get_pointcloud_stats(db: Session, pointcloud_id: int) -> Optional[PointCloud
             bounds_obj = BoundsSchema(**bounds_obj)
         
         return PointCloudStats(
-            point_count=len(las.points),
+            point_count=point_count,
             file_size=pointcloud.file_size or 0,
             bounds=bounds_obj,
             density=density,
@@ -182,3 +206,86 @@ def get_pointcloud_stats(db: Session, pointcloud_id: int) -> Optional[PointCloud
     except Exception as e:
         logger.error(f"Error getting point cloud stats: {e}")
         return None
+
+
+def process_pointcloud_to_dem(
+    file_path: str,
+    output_dir: str,
+    config: Dict[str, Any],
+    progress: Optional[Callable[[float, str], None]] = None
+) -> Dict[str, Any]:
+    """
+    Filter a LAS/LAZ file and grid the ground points into a GeoTIFF DEM.
+    
+    The file is streamed into a tile index, then filtered and gridded tile
+    by tile, so memory stays bounded for arbitrarily large clouds.
+    
+    Args:
+        file_path: LAS/LAZ file
+        output_dir: Directory for the tile index and the DEM
+        config: resolution, method, fill_empty, max_points_per_tile and any
+            PointCloudFilterConfig field
+        progress: Called with (fraction complete, message)
+    
+    Returns:
+        Summary with the DEM path, grid definition and filter counts
+    """
+    import rasterio
+    from rasterio.transform import Affine
+    
+    report = progress or (lambda fraction, message: None)
+    resolution = float(config.get('resolution', 1.0))
+    method = GridMethod(config.get('method', GridMethod.IDW.value))
+    filter_config = PointCloudFilterConfig.from_dict(config)
+    nodata = -9999.0
+    
+    os.makedirs(output_dir, exist_ok=True)
+    header = read_header(file_path)
+    
+    report(0.0, "Indexing point cloud...")
+    index = build_index(
+        file_path,
+        os.path.join(output_dir, "index"),
+        max_points_per_tile=int(config.get('max_points_per_tile', 1_000_000))
+    )
+    
+    spec = GridSpec.from_bounds(header.mins[0], header.mins[1], header.maxs[0], header.maxs[1], resolution)
+    report(0.2, "Filtering and gridding tiles...")
+    grid, counts = filter_index_to_grid(
+        index,
+        spec,
+        filter_config,
+        method=method,
+        fill_empty=bool(config.get('fill_empty', True)),
+        nodata=nodata,
+        progress=lambda fraction, message: report(0.2 + 0.7 * fraction, message)
+    )
+    
+    report(0.9, "Writing DEM...")
+    output_path = os.path.join(output_dir, f"{Path(file_path).stem}_dem.tif")
+    profile = {
+        'driver': 'GTiff',
+        'height': spec.rows,
+        'width': spec.cols,
+        'count': 1,
+        'dtype': 'float32',
+        'crs': header.srs,
+        'transform': Affine(*spec.transform),
+        'nodata': nodata,
+        'compress': 'DEFLATE',
+        'tiled': True,
+        'blockxsize': 256,
+        'blockysize': 256,
+    }
+    with rasterio.open(output_path, 'w', **profile) as dst:
+        dst.write(grid.astype(np.float32), 1)
+    
+    return {
+        'output_path': output_path,
+        'resolution': resolution,
+        'method': method.value,
+        'width': spec.cols,
+        'height': spec.rows,
+        'bounds': spec.extent.to_dict(),
+        'filter_counts': counts,
+    }
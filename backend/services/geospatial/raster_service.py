@@ -6,6 +6,7 @@ Provides raster-specific operations while delegating CRUD to data_service
 import os
 import logging
 from typing import Optional, Dict, Any
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 import sys
 from pathlib import Path
@@ -34,11 +35,13 @@ class RasterService(BaseDataService[Raster, RasterCreate, RasterUpdate]):
             'resolution': item.resolution,
             'srs': item.srs,
             'bounds': item.bounds.dict() if item.bounds else None,
-            'metadata': item.metadata,
+            'raster_metadata': item.metadata,
         }
     
     def _prepare_update_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Prepare raster data for update"""
+        if "metadata" in data:
+            data["raster_metadata"] = data.pop("metadata")
         if "bounds" in data and data["bounds"]:
             data["bounds"] = data["bounds"].dict() if hasattr(data["bounds"], 'dict') else data["bounds"]
         return data
@@ -58,6 +61,16 @@ def get_rasters(db: Session, owner_id: int, skip: int = 0, limit: int = 100) ->
     return _raster_service.get_by_owner(db, owner_id, skip, limit)
 
 
+async def get_raster_async(db: AsyncSession, raster_id: int) -> Optional[Raster]:
+    """Get a raster by ID (async session)"""
+    return await _raster_service.get_by_id_async(db, raster_id)
+
+
+async def get_rasters_async(db: AsyncSession, owner_id: int, skip: int = 0, limit: int = 100) -> list[Raster]:
+    """Get rasters for owner (async session)"""
+    return await _raster_service.get_by_owner_async(db, owner_id, skip, limit)
+
+
 def create_raster(db: Session, raster: RasterCreate, owner_id: int) -> Raster:
     """Create a new raster"""
     return _raster_service.create(db, raster, owner_id)
@@ -69,10 +82,124 @@ def update_raster(db: Session, raster_id: int, raster: RasterUpdate) -> Optional
 
 
 def delete_raster(db: Session, raster_id: int) -> bool:
-    """Delete a raster"""
+    """Delete a raster and the results cached for its file"""
+    raster = get_raster(db, raster_id)
+    if raster is not None:
+        _invalidate_cached_results(raster)
     return _raster_service.delete(db, raster_id)
 
 
+def _invalidate_cached_results(raster: Raster) -> int:
+    """Drop simulation results and map tiles cached for a raster's current file"""
+    from services.result_cache import get_result_cache
+    from services.tiles import get_tile_cache
+    
+    metadata = raster.raster_metadata or {}
+    tile_cache = get_tile_cache()
+    if tile_cache is not None:
+        for path in (raster.file_path, metadata.get("cog_path")):
+            if path:
+                tile_cache.invalidate_file(path)
+    
+    cache = get_result_cache()
+    if cache is None:
+        return 0
+    return cache.invalidate_file(raster.file_path, metadata.get("sha256"))
+
+
+def register_uploaded_raster(
+    db: Session,
+    file_path: str,
+    owner_id: int,
+    header: Dict[str, Any],
+    original_filename: str,
+    file_size: int,
+    sha256: Optional[str] = None,
+    data_type: Optional[str] = None
+) -> Raster:
+    """
+    Create the record for an upload whose header has already been validated
+    
+    Args:
+        header: Metadata from services.uploads.validate_raster_header
+    """
+    from schemas.raster import Bounds as BoundsSchema
+    
+    raster_data = RasterCreate(
+        name=original_filename,
+        file_path=file_path,
+        data_type=data_type,
+        srs=header.get("srs"),
+        resolution=header.get("resolution"),
+        bounds=BoundsSchema(**header["bounds"]),
+        metadata={
+            "original_filename": original_filename,
+            "sha256": sha256,
+            "width": header.get("width"),
+            "height": header.get("height"),
+            "count": header.get("count"),
+            "dtype": header.get("dtype"),
+            "nodata": header.get("nodata"),
+        }
+    )
+    db_raster = create_raster(db, raster_data, owner_id)
+    return update_raster(db, db_raster.id, RasterUpdate(file_size=file_size, status="processed"))
+
+
+def replace_raster_file(
+    db: Session,
+    raster_id: int,
+    file_path: str,
+    header: Dict[str, Any],
+    file_size: int,
+    sha256: Optional[str] = None
+) -> Optional[Raster]:
+    """
+    Point a raster at a new, already validated file (e.g. a corrected DEM)
+    
+    Results cached for the old file are invalidated explicitly. Cache keys
+    hash file content, so they would miss anyway; this frees their space
+    and covers files overwritten in place.
+    
+    Args:
+        header: Metadata from services.uploads.validate_raster_header
+    """
+    from schemas.raster import Bounds as BoundsSchema
+    
+    raster = get_raster(db, raster_id)
+    if raster is None:
+        return None
+    _invalidate_cached_results(raster)
+    
+    old_path = raster.file_path
+    metadata = {
+        **(raster.raster_metadata or {}),
+        "sha256": sha256,
+        "width": header.get("width"),
+        "height": header.get("height"),
+        "count": header.get("count"),
+        "dtype": header.get("dtype"),
+        "nodata": header.get("nodata"),
+    }
+    # The COG was built from the old file
+    metadata.pop("cog_path", None)
+    raster = update_raster(db, raster_id, RasterUpdate(
+        file_path=file_path,
+        file_size=file_size,
+        srs=header.get("srs"),
+        resolution=header.get("resolution"),
+        bounds=BoundsSchema(**header["bounds"]),
+        metadata=metadata,
+        status="processed"
+    ))
+    
+    # Uploads are content-addressed, so another raster may share the old file
+    if old_path != file_path and os.path.exists(old_path):
+        if db.query(Raster).filter(Raster.file_path == old_path).first() is None:
+            os.remove(old_path)
+    return raster
+
+
 async def process_raster_file(file_path: str, user_id: int, db: Session) -> Raster:
     """Process an uploaded raster file"""
     try:
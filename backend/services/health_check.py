@@ -51,22 +51,24 @@ class HealthChecker:
     async def check_database(self) -> ComponentHealth:
         """Check database connectivity and performance."""
         try:
-            from backend.db.session import SessionLocal
+            from sqlalchemy import text
+            from db.session import get_async_db_session, pool_stats
             
-            db = SessionLocal()
             start = datetime.now()
             
             # Simple health check query
-            db.execute("SELECT 1")
+            async with get_async_db_session() as db:
+                await db.execute(text("SELECT 1"))
             
             elapsed = (datetime.now() - start).total_seconds()
+            pools = pool_stats()
             
             if elapsed > 1.0:
                 return ComponentHealth(
                     name="database",
                     status=HealthStatus.DEGRADED,
                     message="Database responding slowly",
-                    details={"response_time_ms": elapsed * 1000},
+                    details={"response_time_ms": elapsed * 1000, "pools": pools},
                     last_check=datetime.now()
                 )
             
@@ -74,7 +76,7 @@ class HealthChecker:
                 name="database",
                 status=HealthStatus.HEALTHY,
                 message="Database healthy",
-                details={"response_time_ms": elapsed * 1000},
+                details={"response_time_ms": elapsed * 1000, "pools": pools},
                 last_check=datetime.now()
             )
         except Exception as e:
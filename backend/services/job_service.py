@@ -1,10 +1,11 @@
 import os
 import json
-import uuid
 import logging
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
 from datetime import datetime
-from sqlalchemy.orm import Session
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, undefer
 import sys
 from pathlib import Path
 
@@ -12,11 +13,23 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from models.job import Job
+from models.job_log import JobLog
 from schemas.job import JobCreate, JobUpdate
+from services.job_writer import get_job_update_writer
+from services.progress_events import publish_progress
+from services.result_store import delete_payload, load_payload, store_payload
 
 logger = logging.getLogger(__name__)
 
 
+def _job_pk(job_id: Union[int, str]) -> Optional[int]:
+    """Integer primary key of a job ID, or None if it cannot be one"""
+    # IDs arrive as path strings and asyncpg does not coerce them to integers
+    if isinstance(job_id, str):
+        return int(job_id) if job_id.isdigit() else None
+    return job_id
+
+
 def get_job(db: Session, job_id: str) -> Optional[Job]:
     """Get a job by ID"""
     return db.query(Job).filter(Job.id == job_id).first()
@@ -33,11 +46,36 @@ def get_jobs(db: Session, owner_id: int, skip: int = 0, limit: int = 100) -> Lis
     )
 
 
+async def get_job_async(db: AsyncSession, job_id: str, with_result: bool = False) -> Optional[Job]:
+    """
+    Get a job by ID (async session)
+    
+    The result document is deferred; pass with_result to load it in the
+    same query, since async sessions cannot load it on access.
+    """
+    pk = _job_pk(job_id)
+    if pk is None:
+        return None
+    query = select(Job).where(Job.id == pk)
+    if with_result:
+        query = query.options(undefer(Job.result))
+    return await db.scalar(query)
+
+
+async def get_jobs_async(db: AsyncSession, owner_id: int, skip: int = 0, limit: int = 100) -> List[Job]:
+    """Get a list of jobs for a specific owner (async session)"""
+    result = await db.scalars(
+        select(Job)
+        .where(Job.owner_id == owner_id)
+        .offset(skip)
+        .limit(limit)
+    )
+    return list(result)
+
+
 def create_job(db: Session, job: JobCreate, owner_id: int) -> Job:
     """Create a new job"""
-    job_id = str(uuid.uuid4())
     db_job = Job(
-        id=job_id,
         name=job.name,
         description=job.description,
         job_type=job.job_type,
@@ -51,75 +89,166 @@ def create_job(db: Session, job: JobCreate, owner_id: int) -> Job:
     return db_job
 
 
+def _result_values(result: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Column values for a job result, its large arrays written off-row"""
+    stored = store_payload(result or {}, "jobs")
+    return {"result": stored.document, "result_path": stored.path, "result_sha256": stored.sha256}
+
+
+def _result_path_query(result_path: str, job_id: Optional[int] = None):
+    """Jobs other than job_id whose result is stored in result_path"""
+    query = select(Job.id).where(Job.result_path == result_path)
+    if job_id is not None:
+        query = query.where(Job.id != job_id)
+    return query.limit(1)
+
+
+def _release_result(db: Session, result_path: Optional[str], job_id: Optional[int] = None):
+    """
+    Delete a result file no other job references
+    
+    Result files are content-addressed, so jobs with identical arrays share
+    one; the file is kept while another row still points at it.
+    """
+    if result_path and db.scalar(_result_path_query(result_path, job_id)) is None:
+        delete_payload(result_path)
+
+
+async def _release_result_async(db: AsyncSession, result_path: Optional[str], job_id: Optional[int] = None):
+    """Delete a result file no other job references (async session)"""
+    if result_path and await db.scalar(_result_path_query(result_path, job_id)) is None:
+        delete_payload(result_path)
+
+
 def update_job(db: Session, job_id: str, job: JobUpdate) -> Optional[Job]:
     """Update a job"""
     db_job = get_job(db, job_id=job_id)
     if not db_job:
         return None
     
+    old_result_path = db_job.result_path
     update_data = job.dict(exclude_unset=True)
+    if "result" in update_data:
+        update_data.update(_result_values(update_data.pop("result")))
     for field, value in update_data.items():
         setattr(db_job, field, value)
     
     db.commit()
+    if old_result_path != db_job.result_path:
+        _release_result(db, old_result_path)
     db.refresh(db_job)
     return db_job
 
 
+async def update_job_async(db: AsyncSession, job_id: str, job: JobUpdate) -> Optional[Job]:
+    """Update a job (async session)"""
+    db_job = await get_job_async(db, job_id=job_id)
+    if not db_job:
+        return None
+    
+    old_result_path = db_job.result_path
+    update_data = job.dict(exclude_unset=True)
+    if "result" in update_data:
+        update_data.update(_result_values(update_data.pop("result")))
+    for field, value in update_data.items():
+        setattr(db_job, field, value)
+    
+    await db.commit()
+    if old_result_path != db_job.result_path:
+        await _release_result_async(db, old_result_path)
+    await db.refresh(db_job)
+    return db_job
+
+
 def delete_job(db: Session, job_id: str) -> bool:
     """Delete a job"""
     db_job = get_job(db, job_id=job_id)
     if not db_job:
         return False
     
+    # Log lines go with the row (ON DELETE CASCADE); the array file does not
+    writer = get_job_update_writer()
+    if writer is not None:
+        writer.take(db_job.id)
+    result_path = db_job.result_path
     db.delete(db_job)
     db.commit()
+    _release_result(db, result_path)
     return True
 
 
+def _set_job_fields(db: Session, job_id: str, **values) -> bool:
+    """
+    Update columns of a job with one UPDATE, without loading it
+    
+    Returns whether the job exists; the caller commits.
+    """
+    pk = _job_pk(job_id)
+    if pk is None:
+        return False
+    result = db.execute(update(Job).where(Job.id == pk).values(**values))
+    return result.rowcount > 0
+
+
+def _add_job_log(db: Session, job_id: str, message: str, level: str = "info"):
+    db.add(JobLog(job_id=_job_pk(job_id), level=level, message=message))
+
+
+def _take_buffered_logs(db: Session, job_id: str):
+    """
+    Move a job's buffered log lines into this transaction
+    
+    Called on status changes, which set progress themselves: the job's
+    lines are committed with its new status and a buffered progress value
+    can no longer overwrite it. Must run before the transaction writes
+    anything, since it waits for a flush that may need the write lock.
+    """
+    writer = get_job_update_writer()
+    if writer is None:
+        return
+    lines = writer.take(_job_pk(job_id))
+    if lines:
+        db.execute(insert(JobLog.__table__), lines)
+
+
 def start_job(db: Session, job_id: str) -> bool:
     """Start a job"""
-    db_job = get_job(db, job_id=job_id)
-    if not db_job:
+    _take_buffered_logs(db, job_id)
+    if not _set_job_fields(db, job_id, status="running", started_at=datetime.utcnow(), progress=0):
         return False
-    
-    update_data = JobUpdate(
-        status="running",
-        started_at=datetime.utcnow(),
-        progress=0
-    )
-    update_job(db, job_id, update_data)
+    db.commit()
+    publish_progress(job_id, event="status", status="running", progress=0)
     return True
 
 
 def complete_job(db: Session, job_id: str, result: Dict[str, Any]) -> bool:
-    """Complete a job"""
-    db_job = get_job(db, job_id=job_id)
-    if not db_job:
-        return False
+    """
+    Complete a job
     
-    update_data = JobUpdate(
-        status="completed",
-        completed_at=datetime.utcnow(),
-        progress=100,
-        result=result
-    )
-    update_job(db, job_id, update_data)
+    Arrays in the result are written to the result store and the row keeps
+    a document referencing them (see services.result_store).
+    """
+    values = _result_values(result)
+    _take_buffered_logs(db, job_id)
+    old_result_path = db.scalar(select(Job.result_path).where(Job.id == _job_pk(job_id)))
+    if not _set_job_fields(db, job_id, status="completed", completed_at=datetime.utcnow(), progress=100, **values):
+        _release_result(db, values["result_path"])
+        return False
+    db.commit()
+    if old_result_path != values["result_path"]:
+        _release_result(db, old_result_path)
+    publish_progress(job_id, event="status", status="completed", progress=100)
     return True
 
 
 def fail_job(db: Session, job_id: str, error_message: str) -> bool:
     """Mark a job as failed"""
-    db_job = get_job(db, job_id=job_id)
-    if not db_job:
+    _take_buffered_logs(db, job_id)
+    if not _set_job_fields(db, job_id, status="failed", completed_at=datetime.utcnow()):
         return False
-    
-    update_data = JobUpdate(
-        status="failed",
-        completed_at=datetime.utcnow(),
-        logs=error_message
-    )
-    update_job(db, job_id, update_data)
+    _add_job_log(db, job_id, error_message, level="error")
+    db.commit()
+    publish_progress(job_id, event="status", status="failed", message=error_message)
     return True
 
 
@@ -152,30 +281,94 @@ def get_job_status(job_id: str) -> Optional[Dict[str, Any]]:
 
 
 def update_job_progress(db: Session, job_id: str, progress: int, message: str = None) -> bool:
-    """Update job progress"""
-    db_job = get_job(db, job_id=job_id)
-    if not db_job:
-        return False
+    """
+    Update job progress; a message is appended to the job's log
     
-    update_data = JobUpdate(
-        progress=progress,
-        logs=message if message else db_job.logs
-    )
-    update_job(db, job_id, update_data)
+    With JOB_UPDATE_BUFFERED (the default) the update is handed to the job
+    update writer, which coalesces it with the job's other updates and
+    writes it in its next bulk flush; the job is not looked up, and updates
+    of jobs that do not exist are dropped at the flush.
+    """
+    writer = get_job_update_writer()
+    if writer is not None:
+        pk = _job_pk(job_id)
+        if pk is None:
+            return False
+        writer.progress(pk, progress, message)
+        publish_progress(job_id, progress=progress, message=message)
+        return True
+    
+    if not _set_job_fields(db, job_id, progress=progress):
+        return False
+    if message:
+        _add_job_log(db, job_id, message)
+    db.commit()
+    publish_progress(job_id, progress=progress, message=message)
     return True
 
 
-def append_job_log(db: Session, job_id: str, log_message: str) -> bool:
-    """Append a log message to a job"""
-    db_job = get_job(db, job_id=job_id)
-    if not db_job:
-        return False
+def append_job_log(db: Session, job_id: str, log_message: str, level: str = "info") -> bool:
+    """
+    Append a log message to a job: one INSERT, whatever the log's length
     
-    current_logs = db_job.logs or ""
-    timestamp = datetime.utcnow().isoformat()
-    new_log = f"[{timestamp}] {log_message}\n"
-    updated_logs = current_logs + new_log
+    Buffered like update_job_progress when JOB_UPDATE_BUFFERED is on.
+    """
+    pk = _job_pk(job_id)
+    writer = get_job_update_writer()
+    if writer is not None and pk is not None:
+        writer.log(pk, log_message, level=level)
+        publish_progress(job_id, event="log", message=log_message)
+        return True
+    if pk is None or db.scalar(select(Job.id).where(Job.id == pk)) is None:
+        return False
     
-    update_data = JobUpdate(logs=updated_logs)
-    update_job(db, job_id, update_data)
+    _add_job_log(db, job_id, log_message, level=level)
+    db.commit()
+    publish_progress(job_id, event="log", message=log_message)
     return True
+
+
+def _job_logs_query(job_id: str, after_id: Optional[int], limit: Optional[int]):
+    query = select(JobLog).where(JobLog.job_id == _job_pk(job_id))
+    if after_id is not None:
+        query = query.where(JobLog.id > after_id)
+    query = query.order_by(JobLog.id)
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+def get_job_logs(db: Session, job_id: str, after_id: Optional[int] = None, limit: Optional[int] = None) -> List[JobLog]:
+    """
+    Log lines of a job, oldest first
+    
+    Args:
+        after_id: Only lines after this one, to follow a running job
+        limit: At most this many lines
+    """
+    return list(db.scalars(_job_logs_query(job_id, after_id, limit)))
+
+
+async def get_job_logs_async(
+    db: AsyncSession,
+    job_id: str,
+    after_id: Optional[int] = None,
+    limit: Optional[int] = None
+) -> List[JobLog]:
+    """Log lines of a job, oldest first (async session)"""
+    return list(await db.scalars(_job_logs_query(job_id, after_id, limit)))
+
+
+def format_job_logs(entries: List[JobLog]) -> str:
+    """Log lines as text, one "[timestamp] message" per line"""
+    return "".join(f"[{entry.created_at.isoformat()}] {entry.message}\n" for entry in entries)
+
+
+def load_job_result(db_job: Job) -> Dict[str, Any]:
+    """
+    A job's full result, with its arrays read back from the result store
+    
+    Raises:
+        ResultStoreError: If the array file is missing or was modified
+    """
+    return load_payload(db_job.result or {}, db_job.result_path, db_job.result_sha256)
@@ -0,0 +1,294 @@
+"""
+Job Update Writer - Buffered, bulk persistence of job progress and log lines
+Keeps the database commit rate flat however many jobs report progress
+
+Simulations report progress per step. Written directly, every report is a
+commit, and with SQLite every commit takes the database's single write
+lock. The writer instead buffers reports per job and writes them from one
+background thread:
+
+  - progress updates are coalesced: only a job's latest value is written
+  - log lines are kept in order and inserted together
+  - a flush is one transaction: one executemany UPDATE of jobs and one
+    executemany INSERT into job_logs
+
+A flush happens every flush_interval seconds, as soon as max_pending
+updates are buffered, and on shutdown. When a job starts, completes or
+fails, job_service takes the job's buffered lines with take() and commits
+them with the status change, so a finished job's log is complete. Progress
+is only written to running jobs, so a value buffered after take() cannot
+overwrite a finished job's final state.
+"""
+
+import logging
+import threading
+import time
+from contextlib import AbstractContextManager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+import sys
+from pathlib import Path
+
+from sqlalchemy import bindparam, insert, select, update
+
+# Add backend directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models.job import Job
+from models.job_log import JobLog
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _PendingJob:
+    """Buffered updates of one job"""
+    progress: Optional[int] = None
+    logs: List[Dict[str, Any]] = field(default_factory=list)
+
+
+class JobUpdateWriter:
+    """Coalesces job progress and log lines and writes them in bulk"""
+    
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], AbstractContextManager]] = None,
+        flush_interval: float = 0.5,
+        max_pending: int = 500
+    ):
+        """
+        Args:
+            session_factory: Returns a context manager yielding a Session
+                that commits on exit (default: db.session.get_db_session)
+            flush_interval: Seconds between flushes
+            max_pending: Buffered updates (progress values plus log lines)
+                that trigger a flush before the interval ends
+        """
+        if session_factory is None:
+            from db.session import get_db_session
+            session_factory = get_db_session
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        
+        self._pending: Dict[int, _PendingJob] = {}
+        self._pending_count = 0
+        self._lock = threading.Lock()
+        # Held while a batch is being written, so batches commit in order
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        
+        self.updates_received = 0
+        self.logs_received = 0
+        self.progress_written = 0
+        self.logs_written = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.flush_seconds = 0.0
+    
+    def start(self):
+        """Start the background flusher (idempotent)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name="job-update-writer", daemon=True)
+            self._thread.start()
+    
+    def stop(self, timeout: float = 10.0):
+        """Stop the flusher and write everything still buffered"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+    
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                # flush() keeps the batch for the next attempt
+                logger.error(f"Job update flush failed: {e}")
+    
+    def _job(self, job_id: int) -> _PendingJob:
+        pending = self._pending.get(job_id)
+        if pending is None:
+            pending = self._pending[job_id] = _PendingJob()
+        return pending
+    
+    def _added(self, count: int):
+        """Account for buffered updates; call with the lock held"""
+        self._pending_count += count
+        if self._pending_count >= self.max_pending:
+            self._wakeup.set()
+    
+    def progress(self, job_id: int, progress: int, message: Optional[str] = None, level: str = "info"):
+        """Buffer a progress value, and a log line when a message is given"""
+        with self._lock:
+            pending = self._job(job_id)
+            self._added((pending.progress is None) + bool(message))
+            pending.progress = progress
+            if message:
+                pending.logs.append(self._line(job_id, message, level))
+                self.logs_received += 1
+            self.updates_received += 1
+    
+    def log(self, job_id: int, message: str, level: str = "info"):
+        """Buffer a log line"""
+        with self._lock:
+            self._job(job_id).logs.append(self._line(job_id, message, level))
+            self._added(1)
+            self.logs_received += 1
+    
+    @staticmethod
+    def _line(job_id: int, message: str, level: str) -> Dict[str, Any]:
+        # Timestamped when reported, not when written
+        return {"job_id": job_id, "level": level, "message": message, "created_at": datetime.utcnow()}
+    
+    def take(self, job_id: int) -> List[Dict[str, Any]]:
+        """
+        Remove a job's buffered updates and return its log lines
+        
+        For status changes that set progress themselves: the caller inserts
+        the lines in its own transaction. Waits for a batch being written,
+        so the caller's lines land after the job's earlier ones.
+        """
+        with self._flush_lock, self._lock:
+            pending = self._pending.pop(job_id, None)
+            if pending is None:
+                return []
+            self._pending_count -= (pending.progress is not None) + len(pending.logs)
+            return pending.logs
+    
+    def flush(self) -> int:
+        """
+        Write every buffered update in one transaction
+        
+        Returns:
+            Number of rows written; 0 if there was nothing to write
+        
+        Raises:
+            Exception: If the write fails; the batch stays buffered
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._pending_count = 0
+            if not batch:
+                return 0
+            
+            started = time.perf_counter()
+            try:
+                progress_rows, log_rows = self._write(batch)
+            except Exception:
+                self._requeue(batch)
+                self.failed_flushes += 1
+                raise
+            
+            self.flushes += 1
+            self.progress_written += progress_rows
+            self.logs_written += log_rows
+            self.flush_seconds += time.perf_counter() - started
+            return progress_rows + log_rows
+    
+    def _write(self, batch: Dict[int, _PendingJob]):
+        with self.session_factory() as db:
+            # Updates of deleted (or never created) jobs are dropped rather
+            # than failing the foreign key of the whole batch
+            existing = set(db.scalars(select(Job.id).where(Job.id.in_(list(batch)))))
+            
+            progress = [
+                {"job_pk": job_id, "new_progress": pending.progress}
+                for job_id, pending in batch.items()
+                if job_id in existing and pending.progress is not None
+            ]
+            logs = [line for job_id, pending in batch.items() if job_id in existing for line in pending.logs]
+            
+            jobs = Job.__table__
+            if progress:
+                # Only running jobs: a value reported just before the job
+                # finished must not overwrite the progress of its final state
+                db.execute(
+                    update(jobs)
+                    .where(jobs.c.id == bindparam("job_pk"), jobs.c.status == "running")
+                    .values(progress=bindparam("new_progress")),
+                    progress
+                )
+            if logs:
+                db.execute(insert(JobLog.__table__), logs)
+        return len(progress), len(logs)
+    
+    def _requeue(self, batch: Dict[int, _PendingJob]):
+        """Put a failed batch back in front of what was buffered since"""
+        with self._lock:
+            for job_id, pending in batch.items():
+                newer = self._pending.get(job_id)
+                if newer is None:
+                    self._pending[job_id] = pending
+                else:
+                    if newer.progress is None:
+                        newer.progress = pending.progress
+                    newer.logs[:0] = pending.logs
+                self._pending_count += (pending.progress is not None) + len(pending.logs)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Buffered, received and written updates, and the flush rate"""
+        with self._lock:
+            pending_jobs = len(self._pending)
+            pending = self._pending_count
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "flush_interval": self.flush_interval,
+            "max_pending": self.max_pending,
+            "pending_jobs": pending_jobs,
+            "pending_updates": pending,
+            "updates_received": self.updates_received,
+            "logs_received": self.logs_received,
+            "progress_written": self.progress_written,
+            "logs_written": self.logs_written,
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+            "mean_flush_ms": round(1000 * self.flush_seconds / self.flushes, 3) if self.flushes else None
+        }
+
+
+# Global job update writer instance
+_job_update_writer: Optional[JobUpdateWriter] = None
+_job_update_writer_lock = threading.Lock()
+
+
+def get_job_update_writer() -> Optional[JobUpdateWriter]:
+    """Get or create the global writer; None when JOB_UPDATE_BUFFERED is off"""
+    global _job_update_writer
+    
+    from core.config import settings
+    
+    if not settings.JOB_UPDATE_BUFFERED:
+        return None
+    if _job_update_writer is None:
+        with _job_update_writer_lock:
+            if _job_update_writer is None:
+                writer = JobUpdateWriter(
+                    flush_interval=settings.JOB_UPDATE_FLUSH_INTERVAL,
+                    max_pending=settings.JOB_UPDATE_MAX_PENDING
+                )
+                writer.start()
+                _job_update_writer = writer
+    return _job_update_writer
+
+
+def close_job_update_writer():
+    """Stop the global writer, writing what it still buffers"""
+    global _job_update_writer
+    
+    with _job_update_writer_lock:
+        writer, _job_update_writer = _job_update_writer, None
+    if writer is not None:
+        writer.stop()
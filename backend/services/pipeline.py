@@ -6,14 +6,30 @@ Core orchestration of the application flow:
 
 This module implements the complete processing pipeline that mirrors the
 application architecture flow.
+
+Stages run in a process pool so CPU-bound terrain and erosion work never
+blocks the API's event loop. Stages exchange rasters as .npy files in the
+job's work directory; only small summaries cross process boundaries.
 """
 
+import asyncio
+import json
 import logging
-from typing import Dict, Any, Optional, Tuple
-from dataclasses import dataclass
+import os
+import threading
+import time
+import uuid
+from typing import Dict, Any, Optional, Tuple, List, Callable
+from dataclasses import dataclass, asdict
 from enum import Enum
-import json
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
+import numpy as np
+
+from services.pipeline_cache import StageCache, file_sha256, get_stage_cache, stage_key
+from services.progress_events import publish_progress
+from services.worker_pool import CancellationToken, JobCancelled
 
 logger = logging.getLogger(__name__)
 
@@ -43,13 +59,480 @@ class PipelineInput:
 @dataclass
 class PipelineOutput:
     """Pipeline output data structure"""
-    status: str  # success, error, warning
+    status: str  # success, error, warning, cancelled
     stage: Optional[PipelineStage]
     results: Dict[str, Any]
     errors: Optional[list] = None
     warnings: Optional[list] = None
     execution_time: float = 0.0
     timestamp: str = ""
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-serializable dictionary"""
+        return {
+            "status": self.status,
+            "stage": self.stage.value if self.stage else None,
+            "results": self.results,
+            "errors": self.errors,
+            "warnings": self.warnings,
+            "execution_time": self.execution_time,
+            "timestamp": self.timestamp
+        }
+
+
+# ============================================================================
+# STAGE FUNCTIONS
+# ============================================================================
+# Module-level so they can be pickled into pool processes. Each receives the
+# pipeline input, the job work directory and the summaries of earlier stages,
+# and returns its own summary.
+
+def _stage_input_collection(pipeline_input: PipelineInput, work_dir: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Stage 1: Input Collection & File Upload
+    
+    Responsibilities:
+    - Validate file uploads
+    - Store file paths
+    - Collect user parameters
+    - Store metadata
+    """
+    if not os.path.isfile(pipeline_input.dem_file_path):
+        raise FileNotFoundError(f"DEM file not found: {pipeline_input.dem_file_path}")
+    
+    return {
+        "project_id": pipeline_input.project_id,
+        "user_id": pipeline_input.user_id,
+        "dem_file": pipeline_input.dem_file_path,
+        "parameters": pipeline_input.parameters,
+        "optional_files": pipeline_input.optional_files or {},
+        "metadata": pipeline_input.metadata or {}
+    }
+
+
+# Defaults for parameters the stages read
+PARAMETER_DEFAULTS = {
+    "R": 300,           # Rainfall erosivity
+    "K": 0.32,          # Soil erodibility
+    "C": 0.5,           # Cover management
+    "P": 0.8,           # Support practices
+    "m": 0.6,           # Area exponent
+    "n": 1.3,           # Slope exponent
+    "epsilon": 0.01,    # Slope coefficient
+    "delta_t": 1.0,     # Time step
+    "colormap": "YlOrRd"  # Heatmap colormap (any Matplotlib colormap name)
+}
+
+# Valid ranges for the USPED parameters
+PARAMETER_RANGES = {
+    "R": (0.0, 20000.0),
+    "K": (0.0, 1.0),
+    "C": (0.0, 1.0),
+    "P": (0.0, 1.0),
+    "m": (0.0, 3.0),
+    "n": (0.0, 3.0),
+    "delta_t": (0.0, 36525.0),
+}
+
+
+def _stage_validation(pipeline_input: PipelineInput, work_dir: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Stage 2: Data Validation & Parsing
+    
+    Responsibilities:
+    - Validate DEM file format
+    - Validate parameter ranges
+    - Check for missing/corrupted data
+    - Parse CSV/JSON auxiliary files
+    """
+    import rasterio
+    import matplotlib
+    
+    issues = []
+    with rasterio.open(pipeline_input.dem_file_path) as src:
+        file_format = src.driver
+        if src.count < 1:
+            issues.append("DEM has no raster bands")
+        if src.width < 3 or src.height < 3:
+            issues.append(f"DEM is too small ({src.width}x{src.height}); at least 3x3 cells are needed")
+        crs = src.crs.to_string() if src.crs else None
+    
+    for name, (low, high) in PARAMETER_RANGES.items():
+        value = pipeline_input.parameters.get(name)
+        if value is not None and not low <= float(value) <= high:
+            issues.append(f"Parameter {name}={value} outside [{low}, {high}]")
+    
+    # Checked here so a bad name fails the job before any compute, not in stage 7
+    colormap = pipeline_input.parameters.get("colormap", PARAMETER_DEFAULTS["colormap"])
+    if not isinstance(colormap, str) or colormap not in matplotlib.colormaps:
+        issues.append(f"Unknown colormap: {colormap}")
+    
+    if issues:
+        raise ValueError("Validation failed: " + "; ".join(issues))
+    
+    return {
+        "dem_valid": True,
+        "parameters_valid": True,
+        "file_format": file_format,
+        "crs": crs,
+        "issues": issues
+    }
+
+
+def _stage_preprocessing(pipeline_input: PipelineInput, work_dir: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Stage 3: Data Preprocessing & Parsing
+    
+    Responsibilities:
+    - Read raster to numeric arrays
+    - Normalize spatial resolution
+    - Handle missing data
+    - Parse auxiliary data (rainfall, soil, land cover)
+    """
+    import rasterio
+    from scipy import ndimage
+    
+    with rasterio.open(pipeline_input.dem_file_path) as src:
+        band = src.read(1, masked=True)
+        resolution = (abs(src.res[0]), abs(src.res[1]))
+        crs = src.crs.to_string() if src.crs else None
+    
+    dem = np.ma.filled(band.astype(np.float64), np.nan)
+    missing = ~np.isfinite(dem)
+    corrupted_cells = int(missing.sum())
+    if corrupted_cells == dem.size:
+        raise ValueError("DEM contains no valid elevations")
+    if corrupted_cells:
+        # Fill gaps from the nearest valid cell
+        _, (rows, cols) = ndimage.distance_transform_edt(missing, return_indices=True)
+        dem = dem[rows, cols]
+    
+    np.save(os.path.join(work_dir, "dem.npy"), dem)
+    
+    return {
+        "dem_array_shape": dem.shape,
+        "spatial_resolution": resolution,
+        "crs": crs,
+        "data_range": {"min": float(dem.min()), "max": float(dem.max())},
+        "corrupted_cells": corrupted_cells,
+        "missing_values_filled": corrupted_cells > 0
+    }
+
+
+def _stage_slope(pipeline_input: PipelineInput, work_dir: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Stage 4a: Slope (β) in radians"""
+    from services.simulation_engine import SimulationEngine
+    
+    dem = np.load(os.path.join(work_dir, "dem.npy"))
+    slope = SimulationEngine._calculate_slopes(dem, data["preprocessing"]["spatial_resolution"][0])
+    np.save(os.path.join(work_dir, "slope.npy"), slope)
+    
+    slope_degrees = np.degrees(slope)
+    return {"mean_slope": float(slope_degrees.mean()), "max_slope": float(slope_degrees.max())}
+
+
+def _stage_aspect(pipeline_input: PipelineInput, work_dir: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Stage 4b: Aspect (α) in radians"""
+    from services.simulation_engine import SimulationEngine
+    
+    aspect = SimulationEngine._calculate_aspects(np.load(os.path.join(work_dir, "dem.npy")))
+    np.save(os.path.join(work_dir, "aspect.npy"), aspect)
+    return {"aspect_computed": True}
+
+
+def _stage_flow_accumulation(pipeline_input: PipelineInput, work_dir: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Stage 4c: Flow accumulation (A)"""
+    from services.simulation_engine import SimulationEngine
+    
+    flow = SimulationEngine._calculate_flow_accumulation(np.load(os.path.join(work_dir, "dem.npy")))
+    np.save(os.path.join(work_dir, "flow_accumulation.npy"), flow)
+    return {"flow_accumulation_max": float(flow.max())}
+
+
+def _stage_curvature(pipeline_input: PipelineInput, work_dir: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Stage 4d: Total curvature (negative Laplacian, 1/100 z units; positive = convex)"""
+    dem = np.load(os.path.join(work_dir, "dem.npy"))
+    res_x, res_y = data["preprocessing"]["spatial_resolution"]
+    
+    d2x = np.gradient(np.gradient(dem, res_x, axis=1), res_x, axis=1)
+    d2y = np.gradient(np.gradient(dem, res_y, axis=0), res_y, axis=0)
+    curvature = -100.0 * (d2x + d2y)
+    np.save(os.path.join(work_dir, "curvature.npy"), curvature)
+    
+    return {
+        "mean_curvature": float(curvature.mean()),
+        "convex_percentage": float((curvature > 0).mean() * 100),
+        "concave_percentage": float((curvature < 0).mean() * 100)
+    }
+
+
+def _stage_terrain_analysis(pipeline_input: PipelineInput, work_dir: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Stage 4: Terrain Analysis
+    
+    Responsibilities:
+    - Compute slope (β)
+    - Compute aspect (α)
+    - Compute flow direction (D8)
+    - Compute flow accumulation (A)
+    - Generate sin(β), cos(α), sin(α)
+    
+    The products are computed by independent nodes; this node only
+    combines their summaries.
+    """
+    return {
+        "slope_computed": True,
+        "aspect_computed": data["aspect"]["aspect_computed"],
+        "flow_direction_computed": True,
+        "flow_accumulation_computed": True,
+        "curvature_computed": True,
+        "mean_slope": data["slope"]["mean_slope"],
+        "max_slope": data["slope"]["max_slope"],
+        "flow_accumulation_max": data["flow_accumulation"]["flow_accumulation_max"],
+        "mean_curvature": data["curvature"]["mean_curvature"],
+        "flow_directions": {"D8": True, "D4": False}
+    }
+
+
+def _simulation_parameters(params: Dict[str, Any]):
+    """Map the pipeline's USPED parameter names onto SimulationParameters"""
+    from services.simulation_engine import SimulationParameters
+    
+    params = {**PARAMETER_DEFAULTS, **params}
+    return SimulationParameters(
+        rainfall_erosivity=float(params["R"]),
+        soil_erodibility=float(params["K"]),
+        cover_factor=float(params["C"]),
+        practice_factor=float(params["P"]),
+        area_exponent=float(params["m"]),
+        slope_exponent=float(params["n"]),
+        time_step_days=float(params["delta_t"])
+    )
+
+
+def _stage_erosion_computation(pipeline_input: PipelineInput, work_dir: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Stage 5: Erosion Computation (USPED Model)
+    
+    Responsibilities:
+    - Apply USPED equations
+    - Cell-by-cell raster update
+    - Compute erosion/deposition per cell
+    - Apply finite difference method
+    """
+    from services.simulation_engine import SimulationEngine
+    
+    params = {**PARAMETER_DEFAULTS, **pipeline_input.parameters}
+    simulation_params = _simulation_parameters(params)
+    
+    slope = np.load(os.path.join(work_dir, "slope.npy"))
+    aspect = np.load(os.path.join(work_dir, "aspect.npy"))
+    flow = np.load(os.path.join(work_dir, "flow_accumulation.npy"))
+    
+    transport_capacity = SimulationEngine._calculate_transport_capacity(flow, slope, simulation_params)
+    erosion = SimulationEngine._calculate_erosion(transport_capacity, aspect, simulation_params)
+    deposition = transport_capacity - erosion
+    # Classified here so aggregation and visualization can run in parallel
+    risk = SimulationEngine._classify_risk(erosion)
+    
+    np.save(os.path.join(work_dir, "erosion.npy"), erosion)
+    np.save(os.path.join(work_dir, "deposition.npy"), deposition)
+    np.save(os.path.join(work_dir, "risk.npy"), risk)
+    
+    return {
+        "model": "USPED",
+        "parameters": {
+            name: params[name] for name in ("R", "K", "C", "P", "m", "n", "epsilon", "delta_t")
+        },
+        "erosion_cells_count": int((erosion > 0).sum()),
+        "deposition_cells_count": int((deposition > 0).sum()),
+        "computation_complete": True
+    }
+
+
+def _stage_aggregation(pipeline_input: PipelineInput, work_dir: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Stage 6: Result Aggregation
+    
+    Responsibilities:
+    - Compute mean soil loss
+    - Identify peak erosion areas
+    - Calculate susceptibility index
+    - Compute percentage of high-risk cells
+    """
+    erosion = np.load(os.path.join(work_dir, "erosion.npy"))
+    deposition = np.load(os.path.join(work_dir, "deposition.npy"))
+    risk = np.load(os.path.join(work_dir, "risk.npy"))
+    res_x, res_y = data["preprocessing"]["spatial_resolution"]
+    cell_area = res_x * res_y
+    
+    eroding = erosion[erosion > 0]
+    total_erosion = float(erosion.sum() * cell_area)
+    total_deposition = float(np.maximum(deposition, 0).sum() * cell_area)
+    cells = risk.size
+    
+    return {
+        "mean_soil_loss": float(eroding.mean()) if eroding.size else 0.0,  # m/year
+        "peak_erosion": float(erosion.max()),                               # m/year
+        "total_erosion": total_erosion,                                     # m³/year
+        "total_deposition": total_deposition,                               # m³/year
+        "net_loss": total_erosion - total_deposition,                       # m³/year
+        "susceptibility_index": float(risk.mean() / 5.0),                   # 0-1 scale
+        "high_risk_percentage": float((risk >= 4).sum() / cells * 100),
+        "medium_risk_percentage": float(((risk >= 2) & (risk < 4)).sum() / cells * 100),
+        "low_risk_percentage": float((risk < 2).sum() / cells * 100)
+    }
+
+
+def _stage_visualization(pipeline_input: PipelineInput, work_dir: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Stage 7: Visualization Preparation
+    
+    Responsibilities:
+    - Prepare heatmap data
+    - Generate raster overlay
+    - Prepare tabular results
+    - Create summary statistics
+    
+    Output paths are relative to the work directory, so the summary stays
+    valid when restored from the stage cache into another job. GeoTIFFs are
+    tiled with overviews so the tile server reads only what is on screen.
+    """
+    import rasterio
+    from rasterio.enums import Resampling
+    import matplotlib
+    from matplotlib.image import imsave
+    
+    erosion = np.load(os.path.join(work_dir, "erosion.npy"))
+    risk = np.load(os.path.join(work_dir, "risk.npy"))
+    colormap = pipeline_input.parameters.get("colormap", PARAMETER_DEFAULTS["colormap"])
+    
+    with rasterio.open(pipeline_input.dem_file_path) as src:
+        profile = src.profile.copy()
+    profile.update(
+        driver="GTiff", count=1, compress="deflate", nodata=None,
+        tiled=True, blockxsize=256, blockysize=256
+    )
+    
+    # Halve until the coarsest overview fits in one tile
+    factors = []
+    while max(erosion.shape) / (2 ** (len(factors) + 1)) >= 256:
+        factors.append(2 ** (len(factors) + 1))
+    
+    outputs = {}
+    for name, array, dtype, resampling in (
+        ("erosion", erosion, "float32", Resampling.average),
+        ("risk", risk, "uint8", Resampling.mode)
+    ):
+        with rasterio.open(os.path.join(work_dir, f"{name}.tif"), "w", **{**profile, "dtype": dtype}) as dst:
+            dst.write(array.astype(dtype), 1)
+            if factors:
+                dst.build_overviews(factors, resampling)
+        outputs[name] = f"{name}.tif"
+    
+    peak = float(erosion.max())
+    normalized = erosion / peak if peak > 0 else np.zeros_like(erosion)
+    imsave(os.path.join(work_dir, "heatmap.png"), matplotlib.colormaps[colormap](normalized))
+    outputs["heatmap"] = "heatmap.png"
+    
+    return {
+        "heatmap_ready": True,
+        "raster_overlay_ready": True,
+        "tables_ready": True,
+        "charts_ready": True,
+        "colormap": colormap,
+        "value_range": {"min": float(erosion.min()), "max": peak},
+        "outputs": outputs,
+        "export_formats": ["PDF", "CSV", "GeoTIFF", "JSON"]
+    }
+
+
+@dataclass(frozen=True)
+class StageSpec:
+    """
+    A node of the pipeline DAG and what its output depends on
+    
+    The cache key of a node covers exactly these dependencies, so a node
+    must declare every parameter it reads and every node whose summary or
+    files it consumes. Nodes receive only the summaries of their depends_on
+    nodes.
+    """
+    name: str
+    stage: PipelineStage  # Application stage the node reports under
+    key: str  # pipeline_data key the node's summary is stored under
+    func: Callable[[PipelineInput, str, Dict[str, Any]], Dict[str, Any]]
+    depends_on: Tuple[str, ...] = ()  # Nodes whose summaries or files it consumes
+    after: Tuple[str, ...] = ()  # Ordering-only dependencies, not part of the cache key
+    params: Tuple[str, ...] = ()  # Pipeline parameters the node reads
+    outputs: Tuple[str, ...] = ()  # Files the node writes to the work directory
+    reads_input: bool = False  # Reads the DEM file directly
+    cacheable: bool = True
+    version: str = "1"  # Bump when the node's output changes for the same inputs
+    
+    @property
+    def requires(self) -> Tuple[str, ...]:
+        return self.depends_on + self.after
+
+
+# Declared in topological order. slope, aspect, flow_accumulation and
+# curvature depend only on preprocessing and run concurrently; aggregation
+# and visualization both follow erosion_computation and also run together.
+STAGES: List[StageSpec] = [
+    StageSpec("input_collection", PipelineStage.INPUT_COLLECTION, "input", _stage_input_collection,
+              reads_input=True, cacheable=False),
+    StageSpec("validation", PipelineStage.VALIDATION, "validation", _stage_validation,
+              params=tuple(PARAMETER_RANGES), reads_input=True),
+    StageSpec("preprocessing", PipelineStage.PREPROCESSING, "preprocessing", _stage_preprocessing,
+              after=("validation",), outputs=("dem.npy",), reads_input=True),
+    StageSpec("slope", PipelineStage.TERRAIN_ANALYSIS, "slope", _stage_slope,
+              depends_on=("preprocessing",), outputs=("slope.npy",)),
+    StageSpec("aspect", PipelineStage.TERRAIN_ANALYSIS, "aspect", _stage_aspect,
+              depends_on=("preprocessing",), outputs=("aspect.npy",)),
+    StageSpec("flow_accumulation", PipelineStage.TERRAIN_ANALYSIS, "flow_accumulation", _stage_flow_accumulation,
+              depends_on=("preprocessing",), outputs=("flow_accumulation.npy",)),
+    StageSpec("curvature", PipelineStage.TERRAIN_ANALYSIS, "curvature", _stage_curvature,
+              depends_on=("preprocessing",), outputs=("curvature.npy",)),
+    StageSpec("terrain_analysis", PipelineStage.TERRAIN_ANALYSIS, "terrain", _stage_terrain_analysis,
+              depends_on=("slope", "aspect", "flow_accumulation", "curvature")),
+    StageSpec("erosion_computation", PipelineStage.EROSION_COMPUTATION, "erosion", _stage_erosion_computation,
+              depends_on=("slope", "aspect", "flow_accumulation"),
+              params=("R", "K", "C", "P", "m", "n", "epsilon", "delta_t"),
+              outputs=("erosion.npy", "deposition.npy", "risk.npy"), version="2"),
+    StageSpec("aggregation", PipelineStage.AGGREGATION, "results", _stage_aggregation,
+              depends_on=("preprocessing", "erosion_computation"), version="2"),
+    StageSpec("visualization", PipelineStage.VISUALIZATION, "visualization", _stage_visualization,
+              depends_on=("erosion_computation",), params=("colormap",),
+              outputs=("erosion.tif", "risk.tif", "heatmap.png"), reads_input=True, version="3"),
+]
+
+STAGES_BY_NAME: Dict[str, StageSpec] = {spec.name: spec for spec in STAGES}
+
+
+def _validate_dag(stages: List[StageSpec]):
+    """Check node names, dependencies and acyclicity"""
+    by_name = {spec.name: spec for spec in stages}
+    if len(by_name) != len(stages):
+        raise ValueError("Pipeline node names must be unique")
+    for spec in stages:
+        for dependency in spec.requires:
+            if dependency not in by_name:
+                raise ValueError(f"Node {spec.name} depends on unknown node {dependency}")
+        if spec.cacheable and any(not by_name[d].cacheable for d in spec.depends_on):
+            raise ValueError(f"Cacheable node {spec.name} consumes an uncacheable node")
+    
+    # Kahn's algorithm: every node must become ready eventually
+    remaining = {spec.name: set(spec.requires) for spec in stages}
+    while remaining:
+        ready = [name for name, requires in remaining.items() if not requires]
+        if not ready:
+            raise ValueError(f"Pipeline DAG has a cycle among {sorted(remaining)}")
+        for name in ready:
+            del remaining[name]
+        for requires in remaining.values():
+            requires.difference_update(ready)
+
+
+_validate_dag(STAGES)
 
 
 class ProcessingPipeline:
@@ -61,50 +544,257 @@ class ProcessingPipeline:
     │ Input   │→│ Validation │→│Preprocess│→│ Terrain│→│ Erosion    │→│Aggregate │→ Results
     │ Upload  │ │  & Parse   │ │ & Parse  │ │Analysis│ │ Computation│ │& Visualize
     └─────────┘ └────────────┘ └──────────┘ └────────┘ └────────────┘ └──────────┘
+    
+    The stages are nodes of a DAG (STAGES). The orchestrator runs in the
+    calling thread and submits every node whose dependencies are complete to
+    the executor (a process pool by default), so independent nodes run
+    concurrently and wall-clock time approaches the critical path. A failed
+    node skips only its dependants. Node state is kept live so it can be
+    read while the pipeline runs. With a StageCache, nodes whose inputs were
+    processed before are restored instead of recomputed.
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        executor: Optional[Executor] = None,
+        work_dir: Optional[str] = None,
+        cache: Optional[StageCache] = None,
+        event_channel: Optional[str] = None
+    ):
+        """
+        Args:
+            executor: Executor for stage functions (None = run inline, in order)
+            work_dir: Directory for intermediate rasters and outputs
+            cache: Stage output cache (None = always compute)
+            event_channel: Progress event channel (usually the job ID) that
+                node state changes are published to
+        """
         self.logger = logging.getLogger(__name__)
+        self.executor = executor
+        self.work_dir = work_dir
+        self.cache = cache
+        self.event_channel = event_channel
+        self.cache_keys: Dict[str, str] = {}
         self.current_stage = None
         self.pipeline_data = {}
         self.execution_log = []
+        self.timing: Dict[str, float] = {}
+        self._started: Dict[str, float] = {}
+        self.stage_states: Dict[str, Dict[str, Any]] = {
+            spec.name: {"stage": spec.stage.value, "status": "pending"} for spec in STAGES
+        }
+        self._lock = threading.Lock()
     
-    async def execute(self, pipeline_input: PipelineInput) -> PipelineOutput:
+    def get_state(self) -> Dict[str, Any]:
+        """Snapshot of live node state"""
+        with self._lock:
+            completed = sum(1 for s in self.stage_states.values() if s["status"] == "completed")
+            return {
+                "current_stage": self.current_stage.value if self.current_stage else None,
+                "running": [name for name, s in self.stage_states.items() if s["status"] == "running"],
+                "progress": int(completed / len(STAGES) * 100),
+                "stages": {name: dict(state) for name, state in self.stage_states.items()},
+                "timing": dict(self.timing)
+            }
+    
+    def _set_stage_state(self, name: str, status: str, **extra):
+        with self._lock:
+            state = self.stage_states[name]
+            state["status"] = status
+            state.update(extra)
+            if status == "running":
+                self.current_stage = STAGES_BY_NAME[name].stage
+        if self.event_channel is not None:
+            publish_progress(
+                self.event_channel, event="stage", message=f"{name} {status}",
+                data={"stage": name, "status": status, **extra}
+            )
+    
+    def _cache_key(self, spec: StageSpec, pipeline_input: PipelineInput) -> str:
+        params = {**PARAMETER_DEFAULTS, **pipeline_input.parameters}
+        return stage_key(
+            spec.name,
+            spec.version,
+            {name: params.get(name) for name in spec.params},
+            {dependency: self.cache_keys[dependency] for dependency in spec.depends_on},
+            file_sha256(pipeline_input.dem_file_path) if spec.reads_input else None
+        )
+    
+    def _node_inputs(self, spec: StageSpec) -> Dict[str, Any]:
+        """Summaries of the nodes spec consumes, keyed as in pipeline_data"""
+        keys = [STAGES_BY_NAME[dependency].key for dependency in spec.depends_on]
+        return {key: self.pipeline_data[key] for key in keys}
+    
+    def _start_node(self, spec: StageSpec, pipeline_input: PipelineInput) -> Tuple[Optional[Dict[str, Any]], Optional[Future]]:
         """
-        Execute complete processing pipeline.
+        Restore a node from the cache or start computing it
+        
+        Returns:
+            (cached summary, None) on a cache hit, otherwise (None, future)
+            or, without an executor, (computed summary, None)
+        """
+        self._started[spec.name] = time.perf_counter()
+        self._set_stage_state(spec.name, "running", started_at=datetime.now().isoformat())
+        
+        if self.cache is not None and spec.cacheable:
+            self.cache_keys[spec.name] = self._cache_key(spec, pipeline_input)
+            summary = self.cache.get(self.cache_keys[spec.name], self.work_dir)
+            if summary is not None:
+                self.stage_states[spec.name]["cached"] = True
+                return summary, None
+        
+        # Never write through a hard link into a cache entry
+        for name in spec.outputs:
+            path = os.path.join(self.work_dir, name)
+            if os.path.exists(path):
+                os.remove(path)
+        
+        if self.executor is None:
+            return spec.func(pipeline_input, self.work_dir, self._node_inputs(spec)), None
+        try:
+            return None, self.executor.submit(spec.func, pipeline_input, self.work_dir, self._node_inputs(spec))
+        except BrokenProcessPool:
+            # A stage process died (e.g. OOM-killed); carry on with a fresh pool
+            if self.executor is not _stage_executor:
+                raise
+            self.executor = replace_stage_executor(self.executor)
+            return None, self.executor.submit(spec.func, pipeline_input, self.work_dir, self._node_inputs(spec))
+    
+    def _finish_node(self, spec: StageSpec, summary: Dict[str, Any], progress_callback: Optional[Callable]):
+        state = self.stage_states[spec.name]
+        cached = state.get("cached", False)
+        if self.cache is not None and spec.cacheable and not cached:
+            # Round-trip so fresh and cached summaries have the same types
+            summary = json.loads(json.dumps(summary))
+            self.cache.put(self.cache_keys[spec.name], self.work_dir, spec.outputs, summary)
+        self.pipeline_data[spec.key] = summary
+        
+        duration = time.perf_counter() - self._started[spec.name]
+        self._set_stage_state(
+            spec.name, "completed",
+            completed_at=datetime.now().isoformat(),
+            duration=duration,
+            cached=cached
+        )
+        self.execution_log.append({
+            "stage": spec.name,
+            "status": "completed",
+            "duration": duration,
+            "cached": cached,
+            "timestamp": datetime.now().isoformat()
+        })
+        if progress_callback is not None:
+            progress_callback(self.get_state()["progress"], f"{spec.name} completed")
+    
+    def _fail_node(self, spec: StageSpec, error: Exception):
+        duration = time.perf_counter() - self._started.get(spec.name, time.perf_counter())
+        self.logger.error(f"Pipeline node {spec.name} failed: {error}")
+        self._set_stage_state(spec.name, "failed", error=str(error), duration=duration)
+        self.execution_log.append({
+            "stage": spec.name,
+            "status": "failed",
+            "error": str(error),
+            "timestamp": datetime.now().isoformat()
+        })
+    
+    def _record_timing(self, wall: float):
+        """Wall-clock, serial and critical-path durations of the run"""
+        durations = {
+            name: state.get("duration", 0.0) for name, state in self.stage_states.items()
+        }
+        finish: Dict[str, float] = {}
+        for spec in STAGES:  # STAGES is in topological order
+            finish[spec.name] = durations[spec.name] + max((finish[d] for d in spec.requires), default=0.0)
+        with self._lock:
+            self.timing = {
+                "wall": wall,
+                "serial": sum(durations.values()),
+                "critical_path": max(finish.values(), default=0.0)
+            }
+    
+    def run(
+        self,
+        pipeline_input: PipelineInput,
+        cancel_token: Optional[CancellationToken] = None,
+        progress_callback: Optional[Callable[[int, Optional[str]], None]] = None
+    ) -> PipelineOutput:
+        """
+        Execute complete processing pipeline, orchestrated from the calling thread.
         
         Args:
             pipeline_input: Input data for pipeline execution
-            
+            cancel_token: Checked while nodes run; running nodes finish in the
+                pool but their results are discarded
+            progress_callback: Called with (percent, message) after each node
+        
         Returns:
             PipelineOutput with results or errors
         """
         start_time = datetime.now()
+        wall_start = time.perf_counter()
+        if self.work_dir is None:
+            import tempfile
+            self.work_dir = tempfile.mkdtemp(prefix="terrasim_pipeline_")
+        os.makedirs(self.work_dir, exist_ok=True)
+        
+        pending: Dict[str, StageSpec] = {spec.name: spec for spec in STAGES}
+        running: Dict[Future, StageSpec] = {}
+        failed: List[StageSpec] = []
         
         try:
-            # Stage 1: Input Collection & Validation
-            await self._stage_input_collection(pipeline_input)
-            
-            # Stage 2: Validation
-            await self._stage_validation(pipeline_input)
-            
-            # Stage 3: Preprocessing
-            await self._stage_preprocessing(pipeline_input)
-            
-            # Stage 4: Terrain Analysis
-            await self._stage_terrain_analysis()
-            
-            # Stage 5: Erosion Computation
-            await self._stage_erosion_computation(pipeline_input)
-            
-            # Stage 6: Result Aggregation
-            await self._stage_aggregation()
-            
-            # Stage 7: Visualization Preparation
-            await self._stage_visualization()
+            while pending or running:
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+                
+                statuses = {name: state["status"] for name, state in self.stage_states.items()}
+                for spec in list(pending.values()):
+                    blocked = [d for d in spec.requires if statuses[d] in ("failed", "skipped")]
+                    if blocked:
+                        del pending[spec.name]
+                        self._set_stage_state(spec.name, "skipped", reason=f"{blocked[0]} did not complete")
+                        statuses[spec.name] = "skipped"
+                
+                ready = [spec for spec in pending.values() if all(statuses[d] == "completed" for d in spec.requires)]
+                for spec in ready:
+                    del pending[spec.name]
+                    try:
+                        summary, future = self._start_node(spec, pipeline_input)
+                    except Exception as e:
+                        self._fail_node(spec, e)
+                        failed.append(spec)
+                        continue
+                    if future is None:
+                        self._finish_node(spec, summary, progress_callback)
+                    else:
+                        running[future] = spec
+                
+                if running:
+                    finished, _ = wait(running, timeout=0.25, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        spec = running.pop(future)
+                        try:
+                            self._finish_node(spec, future.result(), progress_callback)
+                        except Exception as e:
+                            self._fail_node(spec, e)
+                            failed.append(spec)
+                elif not ready and pending and not any(
+                    any(statuses[d] in ("failed", "skipped") for d in spec.requires) for spec in pending.values()
+                ):
+                    raise RuntimeError(f"Pipeline stalled with pending nodes {sorted(pending)}")
             
+            self._record_timing(time.perf_counter() - wall_start)
             execution_time = (datetime.now() - start_time).total_seconds()
             
+            if failed:
+                return PipelineOutput(
+                    status="error",
+                    stage=failed[0].stage,
+                    results=self.pipeline_data.get("results", {}),
+                    errors=[f"{spec.name}: {self.stage_states[spec.name]['error']}" for spec in failed],
+                    execution_time=execution_time,
+                    timestamp=datetime.now().isoformat()
+                )
+            
             return PipelineOutput(
                 status="success",
                 stage=PipelineStage.VISUALIZATION,
@@ -112,7 +802,25 @@ class ProcessingPipeline:
                 execution_time=execution_time,
                 timestamp=datetime.now().isoformat()
             )
+        
+        except JobCancelled as e:
+            self.logger.info(f"Pipeline cancelled at stage {self.current_stage}")
+            for future, spec in running.items():
+                # Nodes already running in a pool process finish on their
+                # own; their outputs are simply not used
+                future.cancel()
+                self._set_stage_state(spec.name, "cancelled")
+            self._record_timing(time.perf_counter() - wall_start)
             
+            return PipelineOutput(
+                status="cancelled",
+                stage=self.current_stage,
+                results={},
+                errors=[str(e)],
+                execution_time=(datetime.now() - start_time).total_seconds(),
+                timestamp=datetime.now().isoformat()
+            )
+        
         except Exception as e:
             self.logger.error(f"Pipeline execution failed at stage {self.current_stage}: {str(e)}")
             execution_time = (datetime.now() - start_time).total_seconds()
@@ -126,248 +834,359 @@ class ProcessingPipeline:
                 timestamp=datetime.now().isoformat()
             )
     
-    async def _stage_input_collection(self, pipeline_input: PipelineInput):
-        """
-        Stage 1: Input Collection & File Upload
-        
-        Responsibilities:
-        - Validate file uploads
-        - Store file paths
-        - Collect user parameters
-        - Store metadata
+    async def execute(self, pipeline_input: PipelineInput) -> PipelineOutput:
         """
-        self.current_stage = PipelineStage.INPUT_COLLECTION
-        self.logger.info(f"Stage 1: Input Collection - Project {pipeline_input.project_id}")
+        Execute complete processing pipeline without blocking the event loop.
         
-        self.pipeline_data["input"] = {
-            "project_id": pipeline_input.project_id,
-            "user_id": pipeline_input.user_id,
-            "dem_file": pipeline_input.dem_file_path,
-            "parameters": pipeline_input.parameters,
-            "optional_files": pipeline_input.optional_files or {},
-            "metadata": pipeline_input.metadata or {}
-        }
+        Args:
+            pipeline_input: Input data for pipeline execution
         
-        self.execution_log.append({
-            "stage": self.current_stage.value,
-            "status": "completed",
-            "timestamp": datetime.now().isoformat()
-        })
+        Returns:
+            PipelineOutput with results or errors
+        """
+        return await asyncio.to_thread(self.run, pipeline_input)
+
+
+# Shared process pool for stage functions
+_stage_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _new_stage_executor() -> ProcessPoolExecutor:
+    from core.config import settings
+    executor = ProcessPoolExecutor(max_workers=settings.MAX_WORKERS)
+    logger.info(f"Pipeline stage pool started with {settings.MAX_WORKERS} processes")
+    return executor
+
+
+def get_stage_executor() -> ProcessPoolExecutor:
+    """
+    Get the process pool pipeline stages run on
+    
+    A pool that broke because one of its processes died is replaced.
+    """
+    global _stage_executor
+    
+    with _executor_lock:
+        if _stage_executor is None:
+            _stage_executor = _new_stage_executor()
+        elif getattr(_stage_executor, "_broken", False):
+            logger.warning("Pipeline stage pool is broken; starting a new one")
+            _stage_executor.shutdown(wait=False, cancel_futures=True)
+            _stage_executor = _new_stage_executor()
+    return _stage_executor
+
+
+def replace_stage_executor(broken: ProcessPoolExecutor) -> ProcessPoolExecutor:
+    """
+    Replace the shared pool after a submit raised BrokenProcessPool
+    
+    Only the pool that broke is replaced, so concurrent pipelines hitting
+    the same failure start one new pool between them.
+    """
+    global _stage_executor
+    
+    with _executor_lock:
+        if _stage_executor is broken:
+            logger.warning("Pipeline stage pool is broken; starting a new one")
+            broken.shutdown(wait=False, cancel_futures=True)
+            _stage_executor = _new_stage_executor()
+        return _stage_executor
+
+
+def run_pipeline(
+    pipeline_input: Dict[str, Any],
+    work_dir: str,
+    cancel_token: Optional[CancellationToken] = None,
+    progress_callback: Optional[Callable[..., None]] = None,
+    event_channel: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Run a pipeline to completion; the durable task queue's entry point.
+    
+    Progress is reported as (percent, message, state) so live stage state
+    reaches the task record; node state changes are also published to
+    event_channel.
+    
+    Raises:
+        JobCancelled: If the pipeline was cancelled
+        PermanentTaskError: If the input failed validation
+        RuntimeError: If a later stage failed (the task is retried)
+    """
+    from services.task_queue import PermanentTaskError
+    
+    pipeline = ProcessingPipeline(
+        executor=get_stage_executor(), work_dir=work_dir, cache=get_stage_cache(), event_channel=event_channel
+    )
+    
+    report = None
+    if progress_callback is not None:
+        report = lambda percent, message: progress_callback(percent, message, pipeline.get_state())
+        progress_callback(0, "queued stages", pipeline.get_state())
+    
+    output = pipeline.run(PipelineInput(**pipeline_input), cancel_token=cancel_token, progress_callback=report)
+    if progress_callback is not None:
+        progress_callback(pipeline.get_state()["progress"], output.status, pipeline.get_state())
+    
+    if output.status == "cancelled":
+        raise JobCancelled(output.errors[0] if output.errors else "Cancelled")
+    if output.status == "error":
+        message = "; ".join(output.errors or [])
+        if output.stage in (PipelineStage.INPUT_COLLECTION, PipelineStage.VALIDATION):
+            raise PermanentTaskError(message)
+        raise RuntimeError(message)
+    
+    result = output.to_dict()
+    result["stages"] = pipeline.pipeline_data
+    result["work_dir"] = work_dir
+    return result
+
+
+# Result grids of a completed job, by layer name
+RESULT_GRIDS = {
+    "erosion": "erosion.npy",
+    "deposition": "deposition.npy",
+    "risk": "risk.npy"
+}
+
+# Georeferenced result rasters of a completed job, by layer name
+RESULT_RASTERS = {
+    "erosion": "erosion.tif",
+    "risk": "risk.tif"
+}
+
+
+class PipelineManager:
+    """
+    Manages multiple pipeline executions and job scheduling
     
-    async def _stage_validation(self, pipeline_input: PipelineInput):
+    Jobs go to the durable task queue when one is configured, otherwise to
+    the in-process worker pool. Either way submit_job returns as soon as the
+    job is queued.
+    """
+    
+    def __init__(self, task_queue: Optional[Any] = None, work_root: Optional[str] = None):
         """
-        Stage 2: Data Validation & Parsing
-        
-        Responsibilities:
-        - Validate DEM file format
-        - Validate parameter ranges
-        - Check for missing/corrupted data
-        - Parse CSV/JSON auxiliary files
+        Args:
+            task_queue: Durable TaskQueue (None = in-process WorkerPool)
+            work_root: Parent directory of per-job work directories
         """
-        self.current_stage = PipelineStage.VALIDATION
-        self.logger.info(f"Stage 2: Validation - Checking {pipeline_input.dem_file_path}")
+        if work_root is None:
+            from core.config import settings
+            work_root = os.path.join(settings.LOCAL_STORAGE_PATH, "outputs", "pipelines")
+        self.task_queue = task_queue
+        self.work_root = work_root
+        # In-process jobs (no task queue), with the user who submitted each
+        self.jobs: Dict[str, ProcessingPipeline] = {}
+        self.owners: Dict[str, int] = {}
+        self._jobs_lock = threading.Lock()
+    
+    def submit(self, pipeline_input: PipelineInput, priority: int = 0) -> str:
+        """Queue a pipeline job and return its ID"""
+        work_dir = os.path.join(self.work_root, uuid.uuid4().hex)
         
-        # Placeholder for validation logic
-        self.pipeline_data["validation"] = {
-            "dem_valid": True,
-            "parameters_valid": True,
-            "corrupted_cells": 0,
-            "file_format": "GeoTIFF"
-        }
+        if self.task_queue is not None:
+            task = self.task_queue.enqueue(
+                "processing_pipeline",
+                {"pipeline_input": asdict(pipeline_input), "work_dir": work_dir},
+                priority=priority,
+                owner_id=pipeline_input.user_id
+            )
+            job_id = f"task_{task['id']}"
+        else:
+            from services.worker_pool import get_worker_pool
+            job_id = f"job_{pipeline_input.project_id}_{uuid.uuid4().hex[:12]}"
+            pipeline = ProcessingPipeline(
+                executor=get_stage_executor(), work_dir=work_dir, cache=get_stage_cache(), event_channel=job_id
+            )
+            self.prune_jobs()
+            with self._jobs_lock:
+                self.jobs[job_id] = pipeline
+                self.owners[job_id] = pipeline_input.user_id
+            get_worker_pool().submit_job(job_id, pipeline.run, pipeline_input, priority=priority)
         
-        self.execution_log.append({
-            "stage": self.current_stage.value,
-            "status": "completed",
-            "timestamp": datetime.now().isoformat()
-        })
+        logger.info(f"Pipeline job {job_id} submitted for project {pipeline_input.project_id}")
+        return job_id
     
-    async def _stage_preprocessing(self, pipeline_input: PipelineInput):
-        """
-        Stage 3: Data Preprocessing & Parsing
-        
-        Responsibilities:
-        - Read raster to numeric arrays
-        - Normalize spatial resolution
-        - Handle missing data
-        - Parse auxiliary data (rainfall, soil, land cover)
+    async def submit_job(self, pipeline_input: PipelineInput) -> str:
         """
-        self.current_stage = PipelineStage.PREPROCESSING
-        self.logger.info("Stage 3: Preprocessing - Parsing raster data")
+        Submit a new pipeline job for processing.
         
-        # Placeholder for preprocessing
-        self.pipeline_data["preprocessing"] = {
-            "dem_array_shape": (512, 512),
-            "spatial_resolution": (30, 30),
-            "crs": "EPSG:32633",
-            "data_range": {"min": 100, "max": 2500},
-            "missing_values_filled": True
-        }
+        Returns immediately; the stages run in the background.
         
-        self.execution_log.append({
-            "stage": self.current_stage.value,
-            "status": "completed",
-            "timestamp": datetime.now().isoformat()
-        })
+        Returns:
+            Job ID for tracking
+        """
+        return await asyncio.to_thread(self.submit, pipeline_input)
     
-    async def _stage_terrain_analysis(self):
+    def prune_jobs(self, retention: Optional[float] = None) -> int:
         """
-        Stage 4: Terrain Analysis
+        Forget in-process jobs that finished more than retention seconds ago
         
-        Responsibilities:
-        - Compute slope (β)
-        - Compute aspect (α)
-        - Compute flow direction (D8)
-        - Compute flow accumulation (A)
-        - Generate sin(β), cos(α), sin(α)
+        Args:
+            retention: Seconds (default: PIPELINE_JOB_RETENTION)
+        
+        Returns:
+            Number of jobs forgotten
         """
-        self.current_stage = PipelineStage.TERRAIN_ANALYSIS
-        self.logger.info("Stage 4: Terrain Analysis - Computing slope, aspect, flow")
+        from services.worker_pool import get_worker_pool
         
-        # Placeholder for terrain analysis
-        self.pipeline_data["terrain"] = {
-            "slope_computed": True,
-            "aspect_computed": True,
-            "flow_direction_computed": True,
-            "flow_accumulation_computed": True,
-            "mean_slope": 12.5,
-            "max_slope": 68.3,
-            "flow_directions": {"D8": True, "D4": False}
-        }
+        if retention is None:
+            from core.config import settings
+            retention = settings.PIPELINE_JOB_RETENTION
         
-        self.execution_log.append({
-            "stage": self.current_stage.value,
-            "status": "completed",
-            "timestamp": datetime.now().isoformat()
-        })
+        pool = get_worker_pool()
+        now = datetime.utcnow()
+        with self._jobs_lock:
+            expired = []
+            for job_id in self.jobs:
+                completed_at = (pool.get_job_status(job_id) or {}).get("completed_at")
+                if completed_at is not None and (now - completed_at).total_seconds() > retention:
+                    expired.append(job_id)
+            for job_id in expired:
+                del self.jobs[job_id]
+                self.owners.pop(job_id, None)
+        return len(expired)
     
-    async def _stage_erosion_computation(self, pipeline_input: PipelineInput):
-        """
-        Stage 5: Erosion Computation (USPED Model)
+    def get_job_owner(self, job_id: str) -> Optional[int]:
+        """ID of the user who submitted a job, or None if there is no such job"""
+        if self.task_queue is not None and job_id.startswith("task_"):
+            task_id = job_id[len("task_"):]
+            task = self.task_queue.get(int(task_id)) if task_id.isdigit() else None
+            if task is None or task["task_type"] != "processing_pipeline":
+                return None
+            return task["owner_id"]
+        return self.owners.get(job_id)
+    
+    def get_job_status(self, job_id: str) -> Dict[str, Any]:
+        """Get live status of a submitted job"""
+        if self.task_queue is not None and job_id.startswith("task_"):
+            task_id = job_id[len("task_"):]
+            task = self.task_queue.get(int(task_id)) if task_id.isdigit() else None
+            if task is None or task["task_type"] != "processing_pipeline":
+                return {"error": f"Job {job_id} not found"}
+            
+            state = task["state"] or {}
+            status = task["status"]
+            if status == "running" and task["cancel_requested"]:
+                status = "cancelling"
+            result = task["result"] or {}
+            timestamp = task["completed_at"] or task["updated_at"] or task["created_at"]
+            return {
+                "job_id": job_id,
+                "status": status,
+                "stage": state.get("current_stage"),
+                "running": state.get("running", []),
+                "progress": task["progress"],
+                "stages": state.get("stages", {}),
+                "timing": state.get("timing", {}),
+                "attempts": task["attempts"],
+                "execution_time": result.get("execution_time"),
+                "results": result.get("results"),
+                "error": task["error"],
+                "timestamp": timestamp.isoformat() if timestamp else None
+            }
         
-        Responsibilities:
-        - Apply USPED equations
-        - Cell-by-cell raster update
-        - Compute erosion/deposition per cell
-        - Apply finite difference method
-        """
-        self.current_stage = PipelineStage.EROSION_COMPUTATION
-        self.logger.info("Stage 5: Erosion Computation - Executing USPED model")
+        if job_id not in self.jobs:
+            return {"error": f"Job {job_id} not found"}
         
-        params = pipeline_input.parameters
+        from services.worker_pool import get_worker_pool
+        pipeline = self.jobs[job_id]
+        job_info = get_worker_pool().get_job_status(job_id) or {}
+        state = pipeline.get_state()
+        output: Optional[PipelineOutput] = job_info.get("result")
         
-        # Placeholder for erosion computation
-        self.pipeline_data["erosion"] = {
-            "model": "USPED",
-            "parameters": {
-                "R": params.get("R", 300),     # Rainfall erosivity
-                "K": params.get("K", 0.32),   # Soil erodibility
-                "C": params.get("C", 0.5),    # Cover management
-                "P": params.get("P", 0.8),    # Support practices
-                "m": params.get("m", 0.6),    # Area exponent
-                "n": params.get("n", 1.3),    # Slope exponent
-                "epsilon": params.get("epsilon", 0.01),  # Slope coefficient
-                "delta_t": params.get("delta_t", 1.0)    # Time step
-            },
-            "erosion_cells_count": 2048,
-            "deposition_cells_count": 1536,
-            "computation_complete": True
+        status = job_info.get("status", "queued")
+        if output is not None:
+            status = {"success": "completed", "error": "failed"}.get(output.status, output.status)
+        return {
+            "job_id": job_id,
+            "status": status,
+            "stage": state["current_stage"],
+            "running": state["running"],
+            "progress": state["progress"],
+            "stages": state["stages"],
+            "timing": state["timing"],
+            "execution_time": output.execution_time if output else None,
+            "results": output.results if output else None,
+            "error": (output.errors[0] if output and output.errors else job_info.get("error")),
+            "timestamp": output.timestamp if output else datetime.now().isoformat()
         }
-        
-        self.execution_log.append({
-            "stage": self.current_stage.value,
-            "status": "completed",
-            "timestamp": datetime.now().isoformat()
-        })
     
-    async def _stage_aggregation(self):
-        """
-        Stage 6: Result Aggregation
+    def get_job_work_dir(self, job_id: str) -> Optional[str]:
+        """Work directory holding a job's intermediate and output files"""
+        if self.task_queue is not None and job_id.startswith("task_"):
+            task_id = job_id[len("task_"):]
+            task = self.task_queue.get(int(task_id)) if task_id.isdigit() else None
+            if task is None or task["task_type"] != "processing_pipeline":
+                return None
+            return (task["payload"] or {}).get("work_dir")
         
-        Responsibilities:
-        - Compute mean soil loss
-        - Identify peak erosion areas
-        - Calculate susceptibility index
-        - Compute percentage of high-risk cells
+        pipeline = self.jobs.get(job_id)
+        return pipeline.work_dir if pipeline else None
+    
+    def load_result_grid(self, job_id: str, layer: str) -> Optional[np.ndarray]:
         """
-        self.current_stage = PipelineStage.AGGREGATION
-        self.logger.info("Stage 6: Aggregation - Computing summary statistics")
+        Load a result grid of a completed job
         
-        # Placeholder for aggregation
-        self.pipeline_data["results"] = {
-            "mean_soil_loss": 12.5,          # tons/ha/year
-            "peak_erosion": 125.8,           # tons/ha/year
-            "total_erosion": 45230.5,        # tons/year
-            "total_deposition": 12450.3,     # tons/year
-            "net_loss": 32780.2,             # tons/year
-            "susceptibility_index": 0.68,    # 0-1 scale
-            "high_risk_percentage": 23.4,    # % of cells with erosion
-            "medium_risk_percentage": 41.2,  # % of cells with moderate erosion
-            "low_risk_percentage": 35.4      # % of cells with low/no erosion
-        }
+        Args:
+            layer: A RESULT_GRIDS name
         
-        self.execution_log.append({
-            "stage": self.current_stage.value,
-            "status": "completed",
-            "timestamp": datetime.now().isoformat()
-        })
+        Returns:
+            The grid (memory-mapped), or None if the job has not completed
+        """
+        if self.get_job_status(job_id).get("status") != "completed":
+            return None
+        work_dir = self.get_job_work_dir(job_id)
+        if work_dir is None:
+            return None
+        return np.load(os.path.join(work_dir, RESULT_GRIDS[layer]), mmap_mode="r")
     
-    async def _stage_visualization(self):
+    def get_result_raster_path(self, job_id: str, layer: str) -> Optional[str]:
         """
-        Stage 7: Visualization Preparation
+        Path of a result GeoTIFF of a completed job
         
-        Responsibilities:
-        - Prepare heatmap data
-        - Generate raster overlay
-        - Prepare tabular results
-        - Create summary statistics
-        """
-        self.current_stage = PipelineStage.VISUALIZATION
-        self.logger.info("Stage 7: Visualization - Preparing output data")
+        Args:
+            layer: A RESULT_RASTERS name
         
-        # Add visualization data
-        self.pipeline_data["visualization"] = {
-            "heatmap_ready": True,
-            "raster_overlay_ready": True,
-            "tables_ready": True,
-            "charts_ready": True,
-            "export_formats": ["PDF", "CSV", "GeoTIFF", "JSON"]
-        }
+        Returns:
+            The GeoTIFF path, or None if the job has not completed
+        """
+        if self.get_job_status(job_id).get("status") != "completed":
+            return None
+        work_dir = self.get_job_work_dir(job_id)
+        if work_dir is None:
+            return None
+        return os.path.join(work_dir, RESULT_RASTERS[layer])
+    
+    def cancel_job(self, job_id: str) -> bool:
+        """Cancel a queued job, or stop a running one at its next check"""
+        if self.task_queue is not None and job_id.startswith("task_"):
+            task_id = job_id[len("task_"):]
+            return task_id.isdigit() and self.task_queue.cancel(int(task_id))
         
-        self.execution_log.append({
-            "stage": self.current_stage.value,
-            "status": "completed",
-            "timestamp": datetime.now().isoformat()
-        })
+        if job_id not in self.jobs:
+            return False
+        from services.worker_pool import get_worker_pool
+        return get_worker_pool().cancel_job(job_id)
 
 
-class PipelineManager:
-    """Manages multiple pipeline executions and job scheduling"""
-    
-    def __init__(self):
-        self.pipeline = ProcessingPipeline()
-        self.jobs = {}
+# Global pipeline manager instance
+_pipeline_manager: Optional[PipelineManager] = None
+
+
+def get_pipeline_manager() -> PipelineManager:
+    """Get global pipeline manager"""
+    global _pipeline_manager
     
-    async def submit_job(self, pipeline_input: PipelineInput) -> str:
-        """
-        Submit a new pipeline job for processing.
-        
-        Returns:
-            Job ID for tracking
-        """
-        job_id = f"job_{pipeline_input.project_id}_{datetime.now().timestamp()}"
-        self.jobs[job_id] = await self.pipeline.execute(pipeline_input)
-        return job_id
+    if _pipeline_manager is None:
+        from core.config import settings
+        task_queue = None
+        if settings.TASK_QUEUE_ENABLED:
+            from services.task_queue import get_task_queue, start_task_worker
+            task_queue = get_task_queue()
+            if settings.TASK_QUEUE_EMBEDDED_WORKER:
+                start_task_worker()
+        _pipeline_manager = PipelineManager(task_queue=task_queue)
     
-    def get_job_status(self, job_id: str) -> Dict[str, Any]:
-        """Get status of a submitted job"""
-        if job_id not in self.jobs:
-            return {"error": f"Job {job_id} not found"}
-        
-        output = self.jobs[job_id]
-        return {
-            "job_id": job_id,
-            "status": output.status,
-            "stage": output.stage.value if output.stage else None,
-            "execution_time": output.execution_time,
-            "timestamp": output.timestamp
-        }
+    return _pipeline_manager
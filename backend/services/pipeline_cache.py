@@ -0,0 +1,242 @@
+"""
+Pipeline Stage Cache - Content-addressed memoization of pipeline stage outputs
+Stores stage summaries and output files on local disk with size-bounded LRU eviction
+
+A stage's cache key hashes the stage name, its code version, the parameters
+it reads and the keys of the stages it consumes (or the DEM's content hash
+for stages that read the DEM directly). Changing a late-stage parameter
+therefore changes only the keys of that stage and its dependants, and every
+upstream stage is served from the cache.
+
+Entries are directories named by key. Files are hard-linked between the
+cache and job work directories where the filesystem allows, so hits cost no
+copying. Entries are published with an atomic rename, which makes the cache
+safe to share between worker processes.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_NAME = "summary.json"
+
+# Bump to invalidate every cached stage at once
+CACHE_FORMAT_VERSION = "1"
+
+# Content hashes by (path, size, mtime_ns), so a DEM is read once per process
+_file_hashes: Dict[Tuple[str, int, int], str] = {}
+_file_hash_lock = threading.Lock()
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's contents, memoized on its size and modification time"""
+    stat = os.stat(path)
+    signature = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _file_hash_lock:
+        if signature in _file_hashes:
+            return _file_hashes[signature]
+    
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    
+    with _file_hash_lock:
+        _file_hashes[signature] = digest.hexdigest()
+    return digest.hexdigest()
+
+
+def stage_key(
+    stage: str,
+    version: str,
+    params: Dict[str, Any],
+    upstream: Dict[str, str],
+    input_hash: Optional[str] = None
+) -> str:
+    """
+    Cache key for one stage
+    
+    Args:
+        stage: Stage name
+        version: Stage code version; bump when the stage's output changes
+        params: Parameters the stage reads, with defaults filled in
+        upstream: Cache keys of the stages whose outputs it consumes
+        input_hash: Content hash of input files the stage reads directly
+    """
+    material = json.dumps({
+        "format": CACHE_FORMAT_VERSION,
+        "stage": stage,
+        "version": version,
+        "params": params,
+        "upstream": upstream,
+        "input": input_hash
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+def _link_or_copy(src: str, dst: str):
+    if os.path.exists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+class StageCache:
+    """Size-bounded, content-addressed disk cache for stage outputs"""
+    
+    def __init__(self, root: str, max_bytes: int = 5 * 1024 ** 3):
+        """
+        Initialize stage cache
+        
+        Args:
+            root: Cache directory
+            max_bytes: Total size above which least recently used entries are evicted
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(self.root, "tmp"), exist_ok=True)
+    
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key)
+    
+    def get(self, key: str, work_dir: str) -> Optional[Dict[str, Any]]:
+        """
+        Restore a stage's output files into work_dir
+        
+        Returns:
+            The stage summary, or None on a miss
+        """
+        entry = self._entry_dir(key)
+        try:
+            with open(os.path.join(entry, SUMMARY_NAME)) as f:
+                summary = json.load(f)
+            for name in os.listdir(entry):
+                if name != SUMMARY_NAME:
+                    _link_or_copy(os.path.join(entry, name), os.path.join(work_dir, name))
+            # Directory mtime is the LRU clock
+            os.utime(entry)
+        except (FileNotFoundError, json.JSONDecodeError):
+            # Missing, or evicted by another process while we read it
+            with self._lock:
+                self.misses += 1
+            return None
+        
+        with self._lock:
+            self.hits += 1
+        return summary
+    
+    def put(self, key: str, work_dir: str, files: Iterable[str], summary: Dict[str, Any]):
+        """Store a stage's summary and output files (names relative to work_dir)"""
+        staging = os.path.join(self.root, "tmp", f"{key}.{uuid.uuid4().hex}")
+        os.makedirs(staging)
+        try:
+            for name in files:
+                _link_or_copy(os.path.join(work_dir, name), os.path.join(staging, name))
+            with open(os.path.join(staging, SUMMARY_NAME), "w") as f:
+                json.dump(summary, f)
+            
+            entry = self._entry_dir(key)
+            os.makedirs(os.path.dirname(entry), exist_ok=True)
+            try:
+                os.rename(staging, entry)
+            except OSError:
+                # Another worker stored the same key first; entries are identical
+                shutil.rmtree(staging, ignore_errors=True)
+        except Exception as e:
+            logger.error(f"Failed to cache stage output {key[:12]}: {e}")
+            shutil.rmtree(staging, ignore_errors=True)
+            return
+        
+        self.evict(keep=key)
+    
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        """(last used, size, path) of every entry"""
+        entries = []
+        for prefix in os.listdir(self.root):
+            if prefix == "tmp":
+                continue
+            prefix_dir = os.path.join(self.root, prefix)
+            for key in os.listdir(prefix_dir):
+                entry = os.path.join(prefix_dir, key)
+                try:
+                    size = sum(entry_file.stat().st_size for entry_file in os.scandir(entry))
+                    entries.append((os.stat(entry).st_mtime, size, entry))
+                except FileNotFoundError:
+                    continue
+        return entries
+    
+    def evict(self, keep: Optional[str] = None) -> int:
+        """
+        Remove least recently used entries until the cache fits in max_bytes
+        
+        Returns:
+            Number of entries removed
+        """
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        keep_dir = self._entry_dir(keep) if keep else None
+        
+        removed = 0
+        for _, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            if entry == keep_dir:
+                continue
+            # Job work directories keep their hard links, so eviction never
+            # breaks a pipeline that is reading these files
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            removed += 1
+        
+        if removed:
+            logger.info(f"Evicted {removed} stage cache entries; cache now {total / 1024 ** 2:.1f} MB")
+        return removed
+    
+    def clear(self):
+        """Remove every entry"""
+        for _, _, entry in self._entries():
+            shutil.rmtree(entry, ignore_errors=True)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Entry count, size and hit statistics"""
+        entries = self._entries()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(entries),
+                "size_bytes": sum(size for _, size, _ in entries),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+
+# Global stage cache instance
+_stage_cache: Optional[StageCache] = None
+
+
+def get_stage_cache() -> Optional[StageCache]:
+    """Get the global stage cache, or None when caching is disabled"""
+    global _stage_cache
+    
+    from core.config import settings
+    if not settings.PIPELINE_CACHE_ENABLED:
+        return None
+    
+    if _stage_cache is None:
+        root = settings.PIPELINE_CACHE_DIR or os.path.join(settings.LOCAL_STORAGE_PATH, "cache", "pipeline")
+        _stage_cache = StageCache(root, max_bytes=settings.PIPELINE_CACHE_MAX_BYTES)
+    return _stage_cache
@@ -0,0 +1,459 @@
+"""
+Progress Events - In-process event bus for job progress, status and logs
+Throttled per-job publishing with resumable streams for SSE and WebSocket clients
+
+Workers, the task queue, the pipeline orchestrator, batch jobs and
+job_service publish here from any thread; API endpoints stream a job's
+events to clients instead of having them poll the database.
+
+  - Progress updates are throttled per job: at most one every min_interval
+    seconds, the latest pending value is sent when the interval ends, and
+    unchanged values are dropped. Status, stage and log events are never
+    throttled.
+  - Each channel (a job, a batch, or "*" for everything) keeps a ring of
+    recent events. Event IDs are "<epoch>:<sequence>", so a client that
+    reconnects with Last-Event-ID receives exactly what it missed, and an
+    ID from before a restart replays the retained history.
+  - Streams end after a job's terminal status event.
+
+Events live in the publishing process. Jobs run by task workers in other
+processes are followed by an occasional status poll (see stream()).
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Set, Tuple
+import sys
+from pathlib import Path
+
+# Add backend directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+logger = logging.getLogger(__name__)
+
+# Channel that receives every event
+ALL_CHANNEL = "*"
+
+TERMINAL_STATUSES = frozenset({"completed", "failed", "cancelled", "timed_out"})
+
+
+@dataclass
+class ProgressEvent:
+    """One event on a job's stream"""
+    id: str
+    job_id: str
+    event: str  # progress, status, stage or log
+    progress: Optional[int] = None
+    status: Optional[str] = None
+    message: Optional[str] = None
+    data: Dict[str, Any] = field(default_factory=dict)
+    timestamp: float = field(default_factory=time.time)
+    
+    @property
+    def terminal(self) -> bool:
+        return self.event == "status" and self.status in TERMINAL_STATUSES
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "job_id": self.job_id,
+            "event": self.event,
+            "progress": self.progress,
+            "status": self.status,
+            "message": self.message,
+            "data": self.data,
+            "timestamp": self.timestamp
+        }
+    
+    def to_sse(self) -> str:
+        """Server-sent events frame"""
+        return f"id: {self.id}\nevent: {self.event}\ndata: {json.dumps(self.to_dict(), default=str)}\n\n"
+
+
+class _Channel:
+    """Recent events of one channel and the streams waiting on it"""
+    
+    def __init__(self, history: int):
+        self.events: Deque[ProgressEvent] = deque(maxlen=history)
+        self.waiters: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+        self.finished = False
+
+
+class _Throttle:
+    """Last sent and pending progress of one job"""
+    
+    def __init__(self):
+        self.sent_at = 0.0
+        self.sent: Optional[Tuple[Optional[int], Optional[str]]] = None
+        self.pending: Optional[Dict[str, Any]] = None
+        self.timer: Optional[threading.Timer] = None
+
+
+class ProgressEventBus:
+    """Thread-safe publish side, asyncio subscribe side"""
+    
+    def __init__(
+        self,
+        min_interval: float = 0.5,
+        history: int = 256,
+        max_channels: int = 4096,
+        all_history: int = 1024
+    ):
+        """
+        Initialize event bus
+        
+        Args:
+            min_interval: Minimum seconds between progress events of one job
+            history: Events kept per channel for reconnecting clients
+            max_channels: Channels kept; the least recently used finished
+                channels are dropped first
+            all_history: Events kept on the "*" channel
+        """
+        self.min_interval = min_interval
+        self.history = history
+        self.max_channels = max_channels
+        self.epoch = uuid.uuid4().hex[:8]
+        self._sequence = 0
+        self._channels: "OrderedDict[str, _Channel]" = OrderedDict()
+        self._channels[ALL_CHANNEL] = _Channel(all_history)
+        self._parents: Dict[str, List[str]] = {}
+        self._throttles: Dict[str, _Throttle] = {}
+        self._lock = threading.RLock()
+        self.published = 0
+        self.throttled = 0
+    
+    # ------------------------------------------------------------------
+    # Publishing
+    # ------------------------------------------------------------------
+    
+    def link(self, job_id: str, parent: str):
+        """Also deliver a job's events on a parent channel (e.g. its batch)"""
+        with self._lock:
+            parents = self._parents.setdefault(job_id, [])
+            if parent not in parents:
+                parents.append(parent)
+    
+    def publish(
+        self,
+        job_id: str,
+        event: str = "progress",
+        progress: Optional[float] = None,
+        status: Optional[str] = None,
+        message: Optional[str] = None,
+        data: Optional[Dict[str, Any]] = None
+    ) -> Optional[ProgressEvent]:
+        """
+        Publish an event for a job
+        
+        Returns:
+            The event, or None if a progress update was throttled or unchanged
+        """
+        fields = {
+            "event": event,
+            "progress": None if progress is None else int(progress),
+            "status": status,
+            "message": message,
+            "data": dict(data or {})
+        }
+        with self._lock:
+            throttle = self._throttles.setdefault(job_id, _Throttle())
+            if event == "progress":
+                if throttle.sent == (fields["progress"], message):
+                    return None
+                wait = throttle.sent_at + self.min_interval - time.monotonic()
+                if wait > 0:
+                    # Keep only the latest; it is sent when the interval ends
+                    throttle.pending = fields
+                    self.throttled += 1
+                    if throttle.timer is None:
+                        throttle.timer = threading.Timer(wait, self._flush, args=(job_id,))
+                        throttle.timer.daemon = True
+                        throttle.timer.start()
+                    return None
+            else:
+                # Progress that was held back goes out first, in order
+                self._flush_locked(job_id, throttle)
+            
+            if event == "status" and status in TERMINAL_STATUSES:
+                self._throttles.pop(job_id, None)
+            return self._emit_locked(job_id, throttle, fields)
+    
+    def publish_snapshot(
+        self,
+        job_id: str,
+        status: Optional[str],
+        progress: Optional[float] = None,
+        message: Optional[str] = None
+    ) -> Optional[ProgressEvent]:
+        """
+        Publish a polled status only if it differs from the latest event
+        
+        Used to follow jobs whose events are published in another process.
+        """
+        with self._lock:
+            channel = self._channels.get(job_id)
+            events = list(channel.events) if channel is not None else []
+        known_status = next((event.status for event in reversed(events) if event.status is not None), None)
+        known_progress = next((event.progress for event in reversed(events) if event.progress is not None), None)
+        if known_status == status and (progress is None or known_progress == int(progress)):
+            return None
+        return self.publish(job_id, event="status", status=status, progress=progress, message=message)
+    
+    def _flush(self, job_id: str):
+        with self._lock:
+            throttle = self._throttles.get(job_id)
+            if throttle is not None:
+                throttle.timer = None
+                self._flush_locked(job_id, throttle)
+    
+    def _flush_locked(self, job_id: str, throttle: _Throttle):
+        if throttle.timer is not None:
+            throttle.timer.cancel()
+            throttle.timer = None
+        if throttle.pending is not None:
+            fields, throttle.pending = throttle.pending, None
+            self._emit_locked(job_id, throttle, fields)
+    
+    def _emit_locked(self, job_id: str, throttle: _Throttle, fields: Dict[str, Any]) -> ProgressEvent:
+        self._sequence += 1
+        event = ProgressEvent(id=f"{self.epoch}:{self._sequence}", job_id=job_id, **fields)
+        if event.event == "progress":
+            throttle.sent_at = time.monotonic()
+            throttle.sent = (event.progress, event.message)
+        
+        for name in [job_id, *self._parents.get(job_id, ()), ALL_CHANNEL]:
+            channel = self._channel_locked(name)
+            channel.events.append(event)
+            if name == job_id and event.terminal:
+                channel.finished = True
+            for loop, waiter in channel.waiters:
+                try:
+                    loop.call_soon_threadsafe(waiter.set)
+                except RuntimeError:
+                    # The subscriber's loop is closed
+                    pass
+        self.published += 1
+        return event
+    
+    def _channel_locked(self, name: str) -> _Channel:
+        channel = self._channels.get(name)
+        if channel is None:
+            channel = self._channels[name] = _Channel(self.history)
+            self._evict_locked()
+        elif name != ALL_CHANNEL:
+            self._channels.move_to_end(name)
+        return channel
+    
+    def _evict_locked(self):
+        excess = len(self._channels) - self.max_channels
+        if excess <= 0:
+            return
+        # Finished channels without listeners go first, then idle ones
+        for finished_only in (True, False):
+            for name in list(self._channels):
+                if excess <= 0:
+                    return
+                channel = self._channels[name]
+                if name == ALL_CHANNEL or channel.waiters or (finished_only and not channel.finished):
+                    continue
+                del self._channels[name]
+                self._parents.pop(name, None)
+                excess -= 1
+    
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+    
+    def _after(self, channel: _Channel, last_event_id: Optional[str]) -> List[ProgressEvent]:
+        if not last_event_id:
+            return list(channel.events)
+        epoch, _, sequence = last_event_id.partition(":")
+        if epoch != self.epoch or not sequence.isdigit():
+            # Issued before a restart: replay what is retained
+            return list(channel.events)
+        last = int(sequence)
+        return [event for event in channel.events if int(event.id.partition(":")[2]) > last]
+    
+    def events_since(self, channel: str, last_event_id: Optional[str] = None) -> List[ProgressEvent]:
+        """Retained events of a channel after last_event_id (all if None)"""
+        with self._lock:
+            found = self._channels.get(channel)
+            return self._after(found, last_event_id) if found is not None else []
+    
+    def latest(self, job_id: str) -> Optional[ProgressEvent]:
+        """Most recent event of a channel"""
+        with self._lock:
+            channel = self._channels.get(job_id)
+            return channel.events[-1] if channel is not None and channel.events else None
+    
+    def is_finished(self, job_id: str) -> bool:
+        """Whether a job's terminal status has been published"""
+        with self._lock:
+            channel = self._channels.get(job_id)
+            return channel is not None and channel.finished
+    
+    async def stream(
+        self,
+        channel: str,
+        last_event_id: Optional[str] = None,
+        keepalive: float = 15.0,
+        poll: Optional[Callable[[], Optional[Dict[str, Any]]]] = None,
+        until_finished: bool = True
+    ) -> AsyncIterator[Optional[ProgressEvent]]:
+        """
+        Events of a channel as they are published
+        
+        Args:
+            channel: Job ID, batch ID or "*"
+            last_event_id: Resume after this event (the Last-Event-ID header)
+            keepalive: Seconds of silence after which None is yielded, so the
+                caller can send a keepalive frame
+            poll: Optional blocking callable returning the job's
+                {"status", "progress", "message"}; run in a thread when the
+                stream starts and on every keepalive, and published if it
+                changed. Covers jobs whose events are published elsewhere.
+            until_finished: Stop after the channel's terminal status event
+        
+        Yields:
+            Events in order, or None on keepalive
+        """
+        loop = asyncio.get_running_loop()
+        waiter = asyncio.Event()
+        with self._lock:
+            found = self._channel_locked(channel)
+            found.waiters.add((loop, waiter))
+        
+        async def poll_once():
+            snapshot = await asyncio.to_thread(poll)
+            if snapshot:
+                self.publish_snapshot(channel, snapshot.get("status"), snapshot.get("progress"), snapshot.get("message"))
+        
+        try:
+            if poll is not None and not self.is_finished(channel):
+                await poll_once()
+            while True:
+                waiter.clear()
+                with self._lock:
+                    events = self._after(found, last_event_id)
+                for event in events:
+                    last_event_id = event.id
+                    yield event
+                    if until_finished and event.terminal and event.job_id == channel:
+                        return
+                if until_finished and found.finished:
+                    # Resumed after the terminal event: nothing more will come
+                    return
+                try:
+                    await asyncio.wait_for(waiter.wait(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+                    if poll is not None:
+                        await poll_once()
+        finally:
+            with self._lock:
+                found.waiters.discard((loop, waiter))
+    
+    def stats(self) -> Dict[str, Any]:
+        """Channel, subscriber and throughput counters"""
+        with self._lock:
+            return {
+                "channels": len(self._channels),
+                "subscribers": sum(len(channel.waiters) for channel in self._channels.values()),
+                "published": self.published,
+                "throttled": self.throttled,
+                "min_interval": self.min_interval
+            }
+
+
+def event_stream_response(
+    channel: str,
+    last_event_id: Optional[str] = None,
+    poll: Optional[Callable[[], Optional[Dict[str, Any]]]] = None
+):
+    """
+    Stream a channel as server-sent events
+    
+    Browsers' EventSource reconnects on its own and sends the last received
+    ID as the Last-Event-ID header; pass it back in as last_event_id.
+    """
+    from fastapi.responses import StreamingResponse
+    from core.config import settings
+    
+    async def frames():
+        # Tell EventSource how soon to reconnect after a dropped connection
+        yield "retry: 3000\n\n"
+        async for event in get_progress_bus().stream(
+            channel, last_event_id, keepalive=settings.PROGRESS_EVENT_KEEPALIVE, poll=poll
+        ):
+            yield ": keepalive\n\n" if event is None else event.to_sse()
+    
+    return StreamingResponse(
+        frames(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def stream_to_websocket(
+    websocket,
+    channel: str,
+    last_event_id: Optional[str] = None,
+    poll: Optional[Callable[[], Optional[Dict[str, Any]]]] = None
+):
+    """
+    Send a channel's events to an accepted WebSocket as JSON messages
+    
+    Keepalives are sent as {"event": "keepalive"}. The socket is closed
+    after the terminal status event.
+    """
+    from fastapi import WebSocketDisconnect
+    from core.config import settings
+    
+    try:
+        async for event in get_progress_bus().stream(
+            channel, last_event_id, keepalive=settings.PROGRESS_EVENT_KEEPALIVE, poll=poll
+        ):
+            await websocket.send_json({"event": "keepalive"} if event is None else event.to_dict())
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+
+
+# Global progress event bus instance
+_progress_bus: Optional[ProgressEventBus] = None
+_progress_bus_lock = threading.Lock()
+
+
+def get_progress_bus() -> ProgressEventBus:
+    """Get or create the global progress event bus"""
+    global _progress_bus
+    
+    if _progress_bus is None:
+        with _progress_bus_lock:
+            if _progress_bus is None:
+                from core.config import settings
+                
+                _progress_bus = ProgressEventBus(
+                    min_interval=settings.PROGRESS_EVENT_INTERVAL,
+                    history=settings.PROGRESS_EVENT_HISTORY
+                )
+    return _progress_bus
+
+
+def publish_progress(job_id: str, **kwargs) -> Optional[ProgressEvent]:
+    """
+    Publish to the global bus without letting a failure reach the caller
+    
+    Progress reporting must never break the job that reports it.
+    """
+    try:
+        return get_progress_bus().publish(job_id, **kwargs)
+    except Exception as e:
+        logger.error(f"Failed to publish progress for job {job_id}: {e}")
+        return None
@@ -0,0 +1,336 @@
+"""
+Rate Limiter - GCRA (token bucket) request limiting with pluggable state stores
+Constant-time per request and shareable across API worker processes
+
+The generic cell rate algorithm keeps one number per client, its
+theoretical arrival time (TAT): the moment its bucket would be full again.
+A request of cost c advances the TAT by c emission intervals and is
+admitted when the TAT stays within burst intervals of now. This is a token
+bucket refilling at rate requests per second with capacity burst, without
+storing timestamps or running a refill timer.
+
+Stores:
+  - memory: per-process dict; idle clients are swept periodically
+  - sqlite: a local database file shared by all workers on one host
+  - redis: a Lua script updates the TAT atomically on the Redis server,
+    shared by every host (requires the redis package)
+
+Routes can cost more than one request so simulation endpoints consume more
+budget than metadata reads.
+"""
+
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import sys
+from pathlib import Path
+
+# Add backend directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+try:
+    import redis  # type: ignore[import]
+except ImportError:
+    redis = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+# Request cost by (method, path prefix); the longest matching prefix wins and
+# "*" matches any method. Everything else costs 1.
+DEFAULT_ROUTE_COSTS = {
+    "POST /api/v1/simulations": 10,
+    "POST /api/v1/analysis": 10,
+    "POST /api/v1/pipeline/execute": 10,
+    "POST /api/v1/batch": 10,
+    "POST /api/v1/uploads": 2,
+    "POST /api/v1/rasters/upload": 5,
+    "PUT /api/v1/rasters": 5,
+    "GET /api/v1/pipeline/data": 2,
+    # A map view loads dozens of tiles at once
+    "GET /api/v1/tiles": 0.1,
+    "* /health": 0,
+    "* /api/v1/health": 0,
+}
+
+
+@dataclass
+class RateLimitResult:
+    """Outcome of one rate limit check"""
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_after: float  # seconds until the bucket is full again
+    retry_after: float  # seconds until this request would be admitted (0 if allowed)
+
+
+def gcra(tat: Optional[float], now: float, increment: float, tolerance: float) -> Tuple[bool, float, float]:
+    """
+    One GCRA step
+    
+    Args:
+        tat: Stored theoretical arrival time, or None for a new client
+        now: Current time in seconds
+        increment: Cost times the emission interval
+        tolerance: Burst times the emission interval
+    
+    Returns:
+        (allowed, TAT to store, seconds until the request would be admitted)
+    """
+    tat = now if tat is None or tat < now else tat
+    new_tat = tat + increment
+    if new_tat - now > tolerance:
+        return False, tat, new_tat - now - tolerance
+    return True, new_tat, 0.0
+
+
+class RateLimitStore(ABC):
+    """
+    Storage for per-client TATs
+    
+    acquire() must read, decide and write atomically, since API workers
+    check the same client concurrently.
+    """
+    
+    # Whether acquire() blocks on I/O and should run off the event loop
+    blocking = False
+    
+    @abstractmethod
+    def acquire(self, key: str, increment: float, tolerance: float) -> Tuple[bool, float, float]:
+        """
+        Apply one GCRA step to a client
+        
+        Returns:
+            (allowed, seconds until the bucket is full, seconds until admitted)
+        """
+        pass
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    """Per-process store; each API worker limits on its own"""
+    
+    def __init__(self, sweep_every: int = 4096):
+        """
+        Args:
+            sweep_every: Checks between sweeps of clients whose bucket is full
+        """
+        self.sweep_every = sweep_every
+        self._tats: Dict[str, float] = {}
+        self._checks = 0
+        self._lock = threading.Lock()
+    
+    def acquire(self, key: str, increment: float, tolerance: float) -> Tuple[bool, float, float]:
+        now = time.monotonic()
+        with self._lock:
+            allowed, tat, retry_after = gcra(self._tats.get(key), now, increment, tolerance)
+            self._tats[key] = tat
+            self._checks += 1
+            if self._checks >= self.sweep_every:
+                # A client whose TAT has passed is indistinguishable from a new one
+                self._tats = {k: v for k, v in self._tats.items() if v > now}
+                self._checks = 0
+        return allowed, tat - now, retry_after
+    
+    def __len__(self) -> int:
+        return len(self._tats)
+
+
+class SQLiteRateLimitStore(RateLimitStore):
+    """Store in a local SQLite file, shared by the API workers of one host"""
+    
+    blocking = True
+    
+    def __init__(self, path: str, sweep_every: int = 4096):
+        """
+        Args:
+            path: Database file
+            sweep_every: Checks between deletions of rows whose bucket is full
+        """
+        self.path = path
+        self.sweep_every = sweep_every
+        self._checks = 0
+        # Guards _checks; each thread has its own connection
+        self._checks_lock = threading.Lock()
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits (key TEXT PRIMARY KEY, tat REAL NOT NULL)"
+            )
+    
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+    
+    def acquire(self, key: str, increment: float, tolerance: float) -> Tuple[bool, float, float]:
+        connection = self._connection()
+        # Wall clock: monotonic clocks are not comparable across processes
+        now = time.time()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute("SELECT tat FROM rate_limits WHERE key = ?", (key,)).fetchone()
+            allowed, tat, retry_after = gcra(row[0] if row else None, now, increment, tolerance)
+            if allowed:
+                connection.execute(
+                    "INSERT INTO rate_limits (key, tat) VALUES (?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET tat = excluded.tat",
+                    (key, tat)
+                )
+            with self._checks_lock:
+                self._checks += 1
+                sweep = self._checks >= self.sweep_every
+                if sweep:
+                    self._checks = 0
+            if sweep:
+                connection.execute("DELETE FROM rate_limits WHERE tat <= ?", (now,))
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        return allowed, tat - now, retry_after
+
+
+# GCRA on the Redis server, timed by the server clock so every host agrees.
+# Floats are returned as strings; Redis truncates Lua numbers to integers.
+_REDIS_GCRA = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local increment = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1]))
+if not tat or tat < now then tat = now end
+local new_tat = tat + increment
+if new_tat - now > tolerance then
+    return {0, tostring(tat - now), tostring(new_tat - now - tolerance)}
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.max(1, math.ceil((new_tat - now) * 1000)))
+return {1, tostring(new_tat - now), '0'}
+"""
+
+
+class RedisRateLimitStore(RateLimitStore):
+    """Store in Redis (or a Redis-compatible server), shared by every host"""
+    
+    blocking = True
+    
+    def __init__(self, url: str, prefix: str = "terrasim:ratelimit:"):
+        """
+        Args:
+            url: Redis URL, e.g. redis://localhost:6379/0
+            prefix: Key prefix
+        """
+        if redis is None:
+            raise RuntimeError("The redis package is required for the redis rate limit store")
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(_REDIS_GCRA)
+    
+    def acquire(self, key: str, increment: float, tolerance: float) -> Tuple[bool, float, float]:
+        allowed, reset_after, retry_after = self._script(keys=[self.prefix + key], args=[increment, tolerance])
+        return bool(int(allowed)), float(reset_after), float(retry_after)
+
+
+class RateLimiter:
+    """Admits requests at rate per second with bursts of up to burst"""
+    
+    def __init__(
+        self,
+        store: RateLimitStore,
+        requests_per_minute: int = 100,
+        burst: Optional[int] = None,
+        route_costs: Optional[Dict[str, float]] = None
+    ):
+        """
+        Args:
+            store: Where per-client state lives
+            requests_per_minute: Sustained rate, in requests of cost 1
+            burst: Requests that may be made at once (default: one minute's worth)
+            route_costs: {"METHOD /path/prefix": cost}; METHOD may be "*"
+        """
+        if requests_per_minute <= 0:
+            raise ValueError("requests_per_minute must be positive")
+        self.store = store
+        self.requests_per_minute = requests_per_minute
+        self.burst = burst or requests_per_minute
+        self.emission_interval = 60.0 / requests_per_minute
+        self.tolerance = self.burst * self.emission_interval
+        self._rules = self._compile(DEFAULT_ROUTE_COSTS if route_costs is None else route_costs)
+    
+    @staticmethod
+    def _compile(route_costs: Dict[str, float]) -> List[Tuple[str, str, float]]:
+        rules = []
+        for rule, cost in route_costs.items():
+            method, _, prefix = rule.strip().partition(" ")
+            if not prefix:
+                method, prefix = "*", method
+            rules.append((method.upper(), prefix.strip(), float(cost)))
+        # Longest prefix first, so the first match is the most specific
+        rules.sort(key=lambda rule: len(rule[1]), reverse=True)
+        return rules
+    
+    def cost(self, method: str, path: str) -> float:
+        """Budget a request consumes"""
+        for rule_method, prefix, cost in self._rules:
+            if (rule_method == "*" or rule_method == method) and path.startswith(prefix):
+                return cost
+        return 1.0
+    
+    def check(self, key: str, cost: float = 1.0) -> RateLimitResult:
+        """
+        Charge a client for a request
+        
+        A request costing more than the burst is charged the burst, so it
+        can still run once the bucket is full.
+        """
+        if cost <= 0:
+            return RateLimitResult(True, self.burst, self.burst, 0.0, 0.0)
+        increment = min(cost * self.emission_interval, self.tolerance)
+        allowed, reset_after, retry_after = self.store.acquire(key, increment, self.tolerance)
+        remaining = max(0, math.floor((self.tolerance - reset_after) / self.emission_interval))
+        return RateLimitResult(allowed, self.burst, remaining, max(0.0, reset_after), retry_after)
+
+
+def create_rate_limit_store(kind: Optional[str] = None) -> RateLimitStore:
+    """
+    Build the store named by RATE_LIMIT_STORE (memory, sqlite or redis)
+    
+    Raises:
+        ValueError: If the store kind is unknown
+    """
+    from core.config import settings
+    
+    kind = (kind or settings.RATE_LIMIT_STORE).lower()
+    if kind == "memory":
+        return MemoryRateLimitStore()
+    if kind == "sqlite":
+        path = settings.RATE_LIMIT_SQLITE_PATH or os.path.join(settings.LOCAL_STORAGE_PATH, "rate_limits.db")
+        return SQLiteRateLimitStore(path)
+    if kind == "redis":
+        return RedisRateLimitStore(settings.REDIS_URL)
+    raise ValueError(f"Unknown rate limit store '{kind}'; expected memory, sqlite or redis")
+
+
+def create_rate_limiter() -> RateLimiter:
+    """Build a rate limiter from settings"""
+    from core.config import settings
+    
+    route_costs = None
+    if settings.RATE_LIMIT_ROUTE_COSTS:
+        route_costs = {**DEFAULT_ROUTE_COSTS, **json.loads(settings.RATE_LIMIT_ROUTE_COSTS)}
+    return RateLimiter(
+        create_rate_limit_store(),
+        requests_per_minute=settings.RATE_LIMIT_REQUESTS_PER_MINUTE,
+        burst=settings.RATE_LIMIT_BURST or None,
+        route_costs=route_costs
+    )
@@ -0,0 +1,407 @@
+"""
+Result Cache - Memoization of simulation endpoint results
+Stores summaries and compressed arrays on local disk behind an in-memory LRU
+
+A result's key hashes the endpoint, its engine version, the normalized
+request parameters and the content hash of the DEM it ran on, so resubmitting
+an identical request is served without recomputing, and the key doubles as
+the response ETag.
+
+Entries live under a directory per DEM hash: replacing or deleting a DEM
+drops all of its results with one invalidate_input() call. The in-memory
+front checks that an entry still exists on disk before serving it, so an
+invalidation made by another process (or worker) takes effect everywhere.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add backend directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.pipeline_cache import file_sha256
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_NAME = "summary.json"
+ARRAYS_NAME = "arrays.npz"
+
+# Bump to invalidate every cached result at once
+CACHE_FORMAT_VERSION = "1"
+
+# Entry group for results that do not depend on an input file
+NO_INPUT = "none"
+
+
+@dataclass
+class CachedResult:
+    """A cached endpoint result"""
+    key: str
+    summary: Dict[str, Any]
+    arrays: Dict[str, np.ndarray] = field(default_factory=dict)
+    
+    @property
+    def etag(self) -> str:
+        return etag_for(self.key)
+    
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in self.arrays.values())
+
+
+def normalize_params(value: Any) -> Any:
+    """
+    Canonical, JSON-serializable form of request parameters
+    
+    Models become dicts, enums their values and numbers floats with 12
+    significant digits, so 1, 1.0 and 1.0000000000001 hash alike.
+    """
+    if hasattr(value, "model_dump"):
+        value = value.model_dump()
+    if isinstance(value, Enum):
+        value = value.value
+    if isinstance(value, dict):
+        return {str(k): normalize_params(v) for k, v in sorted(value.items(), key=lambda item: str(item[0]))}
+    if isinstance(value, (list, tuple)):
+        return [normalize_params(v) for v in value]
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return float(f"{float(value):.12g}")
+    return value
+
+
+def array_sha256(data: Any) -> str:
+    """Content hash of an inline DEM (array or nested lists)"""
+    array = np.ascontiguousarray(data, dtype=np.float64)
+    digest = hashlib.sha256(str(array.shape).encode())
+    digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def result_key(endpoint: str, version: str, params: Dict[str, Any], input_hash: Optional[str] = None) -> str:
+    """
+    Cache key for one result
+    
+    Args:
+        endpoint: Name of the computation
+        version: Engine version; bump when the computation's output changes
+        params: Request parameters, normalized with normalize_params
+        input_hash: Content hash of the DEM the result was computed from
+    """
+    material = json.dumps({
+        "format": CACHE_FORMAT_VERSION,
+        "endpoint": endpoint,
+        "version": version,
+        "params": params,
+        "input": input_hash
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+def etag_for(key: str) -> str:
+    """Strong ETag for a result key"""
+    return f'"{key[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], key: str) -> bool:
+    """
+    Whether an If-None-Match header covers the result with this key
+    
+    "*" on its own matches any current result; callers only ask once the
+    result exists (or can be computed). Inside a list "*" is not a valid
+    entity tag and is ignored. Tags compare weakly, as If-None-Match requires.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    etag = etag_for(key)
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def if_none_match_status(if_none_match: Optional[str], key: str, method: str) -> Optional[int]:
+    """
+    Status that answers a matching If-None-Match (RFC 9110, section 13.1.2)
+    
+    Returns:
+        304 for GET and HEAD, 412 for other methods, or None when the
+        condition does not match and the request proceeds
+    """
+    if not etag_matches(if_none_match, key):
+        return None
+    return 304 if method.upper() in ("GET", "HEAD") else 412
+
+
+class ResultCache:
+    """Size-bounded disk cache of endpoint results with an in-memory LRU front"""
+    
+    def __init__(
+        self,
+        root: str,
+        max_bytes: int = 2 * 1024 ** 3,
+        memory_entries: int = 128,
+        memory_bytes: int = 256 * 1024 ** 2
+    ):
+        """
+        Initialize result cache
+        
+        Args:
+            root: Cache directory
+            max_bytes: Disk size above which least recently used entries are evicted
+            memory_entries: Results kept in memory
+            memory_bytes: Array bytes kept in memory
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self.memory_bytes = memory_bytes
+        self.hits = 0
+        self.memory_hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, CachedResult]" = OrderedDict()
+        self._memory_nbytes = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(self.root, "tmp"), exist_ok=True)
+    
+    def _entry_dir(self, key: str, input_hash: Optional[str]) -> str:
+        return os.path.join(self.root, input_hash or NO_INPUT, key)
+    
+    def _remember(self, result: CachedResult):
+        """Add a result to the memory front, dropping the least recently used"""
+        with self._lock:
+            previous = self._memory.pop(result.key, None)
+            if previous is not None:
+                self._memory_nbytes -= previous.nbytes
+            if result.nbytes > self.memory_bytes:
+                return
+            self._memory[result.key] = result
+            self._memory_nbytes += result.nbytes
+            while len(self._memory) > self.memory_entries or self._memory_nbytes > self.memory_bytes:
+                _, old = self._memory.popitem(last=False)
+                self._memory_nbytes -= old.nbytes
+    
+    def _forget(self, key: str):
+        with self._lock:
+            result = self._memory.pop(key, None)
+            if result is not None:
+                self._memory_nbytes -= result.nbytes
+    
+    def get(self, key: str, input_hash: Optional[str] = None) -> Optional[CachedResult]:
+        """
+        Look up a result
+        
+        Returns:
+            The cached result, or None on a miss
+        """
+        entry = self._entry_dir(key, input_hash)
+        with self._lock:
+            result = self._memory.get(key)
+            if result is not None:
+                self._memory.move_to_end(key)
+        
+        try:
+            # Directory mtime is the disk LRU clock; touching it also
+            # confirms the entry was not invalidated by another process
+            os.utime(entry)
+            if result is None:
+                with open(os.path.join(entry, SUMMARY_NAME)) as f:
+                    summary = json.load(f)
+                arrays = {}
+                arrays_path = os.path.join(entry, ARRAYS_NAME)
+                if os.path.exists(arrays_path):
+                    with np.load(arrays_path, allow_pickle=False) as npz:
+                        arrays = {name: npz[name] for name in npz.files}
+                result = CachedResult(key, summary, arrays)
+                self._remember(result)
+            else:
+                with self._lock:
+                    self.memory_hits += 1
+        except (FileNotFoundError, json.JSONDecodeError, ValueError):
+            # Missing, invalidated, or evicted by another process while we read it
+            self._forget(key)
+            with self._lock:
+                self.misses += 1
+            return None
+        
+        with self._lock:
+            self.hits += 1
+        return result
+    
+    def put(
+        self,
+        key: str,
+        summary: Dict[str, Any],
+        arrays: Optional[Dict[str, np.ndarray]] = None,
+        input_hash: Optional[str] = None
+    ) -> CachedResult:
+        """Store a result's JSON summary and its arrays (compressed)"""
+        result = CachedResult(key, summary, dict(arrays or {}))
+        staging = os.path.join(self.root, "tmp", f"{key}.{uuid.uuid4().hex}")
+        os.makedirs(staging)
+        try:
+            with open(os.path.join(staging, SUMMARY_NAME), "w") as f:
+                json.dump(summary, f)
+            if result.arrays:
+                np.savez_compressed(os.path.join(staging, ARRAYS_NAME), **result.arrays)
+            
+            entry = self._entry_dir(key, input_hash)
+            os.makedirs(os.path.dirname(entry), exist_ok=True)
+            try:
+                os.rename(staging, entry)
+            except OSError:
+                # Another worker stored the same key first; entries are identical
+                shutil.rmtree(staging, ignore_errors=True)
+        except Exception as e:
+            logger.error(f"Failed to cache result {key[:12]}: {e}")
+            shutil.rmtree(staging, ignore_errors=True)
+            return result
+        
+        self._remember(result)
+        self.evict(keep=entry)
+        return result
+    
+    def invalidate_input(self, input_hash: str) -> int:
+        """
+        Remove every result computed from an input
+        
+        Returns:
+            Number of entries removed
+        """
+        group = os.path.join(self.root, input_hash)
+        try:
+            keys = os.listdir(group)
+        except FileNotFoundError:
+            return 0
+        shutil.rmtree(group, ignore_errors=True)
+        for key in keys:
+            self._forget(key)
+        
+        logger.info(f"Invalidated {len(keys)} cached results for input {input_hash[:12]}")
+        return len(keys)
+    
+    def invalidate_file(self, path: str, sha256: Optional[str] = None) -> int:
+        """
+        Remove every result computed from a DEM file
+        
+        Args:
+            path: DEM file path
+            sha256: The file's recorded content hash, if known
+        """
+        if sha256 is None:
+            try:
+                sha256 = file_sha256(path)
+            except OSError:
+                return 0
+        return self.invalidate_input(sha256)
+    
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        """(last used, size, path) of every entry"""
+        entries = []
+        for group in os.listdir(self.root):
+            if group == "tmp":
+                continue
+            group_dir = os.path.join(self.root, group)
+            try:
+                keys = os.listdir(group_dir)
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            for key in keys:
+                entry = os.path.join(group_dir, key)
+                try:
+                    size = sum(entry_file.stat().st_size for entry_file in os.scandir(entry))
+                    entries.append((os.stat(entry).st_mtime, size, entry))
+                except FileNotFoundError:
+                    continue
+        return entries
+    
+    def evict(self, keep: Optional[str] = None) -> int:
+        """
+        Remove least recently used entries until the cache fits in max_bytes
+        
+        Returns:
+            Number of entries removed
+        """
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        
+        removed = 0
+        for _, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            if entry == keep:
+                continue
+            shutil.rmtree(entry, ignore_errors=True)
+            self._forget(os.path.basename(entry))
+            total -= size
+            removed += 1
+        
+        if removed:
+            logger.info(f"Evicted {removed} result cache entries; cache now {total / 1024 ** 2:.1f} MB")
+        return removed
+    
+    def clear(self):
+        """Remove every entry"""
+        for _, _, entry in self._entries():
+            shutil.rmtree(entry, ignore_errors=True)
+        with self._lock:
+            self._memory.clear()
+            self._memory_nbytes = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """Entry count, size and hit statistics"""
+        entries = self._entries()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(entries),
+                "size_bytes": sum(size for _, size, _ in entries),
+                "max_bytes": self.max_bytes,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_nbytes,
+                "hits": self.hits,
+                "memory_hits": self.memory_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+
+# Global result cache instance
+_result_cache: Optional[ResultCache] = None
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """Get the global result cache, or None when caching is disabled"""
+    global _result_cache
+    
+    from core.config import settings
+    if not settings.RESULT_CACHE_ENABLED:
+        return None
+    
+    if _result_cache is None:
+        root = settings.RESULT_CACHE_DIR or os.path.join(settings.LOCAL_STORAGE_PATH, "cache", "results")
+        _result_cache = ResultCache(
+            root,
+            max_bytes=settings.RESULT_CACHE_MAX_BYTES,
+            memory_entries=settings.RESULT_CACHE_MEMORY_ENTRIES
+        )
+    return _result_cache
@@ -0,0 +1,227 @@
+"""
+Result Store - Off-row storage for large result payloads
+Arrays leave the database row as content-addressed NPZ files
+
+A result dict keeps its structure and small values as JSON in its row.
+Every array (or numeric list) of at least RESULT_STORE_MIN_ARRAY_SIZE
+elements is pulled out and replaced by a reference
+
+    {"$array": "a0", "shape": [512, 512], "dtype": "float32"}
+
+and all of a result's arrays are written together to one compressed NPZ
+file, named by its SHA-256. The row stores the path and hash, so reading
+a job's metadata never touches raster-sized data and a file that changed
+on disk is detected before it is served.
+
+Rasters that are already written as GeoTIFFs are referenced by their own
+path columns and are not copied here.
+"""
+
+import logging
+import os
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add backend directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.pipeline_cache import file_sha256
+
+logger = logging.getLogger(__name__)
+
+ARRAY_REF = "$array"
+
+
+class ResultStoreError(RuntimeError):
+    """A stored result file is missing or does not match its recorded hash"""
+
+
+@dataclass
+class StoredPayload:
+    """A result split into its row document and its array file"""
+    document: Dict[str, Any]
+    path: Optional[str] = None  # None when nothing was large enough to move
+    sha256: Optional[str] = None
+    nbytes: int = 0
+
+
+def result_store_root() -> str:
+    """Directory holding result array files"""
+    from core.config import settings
+    
+    return settings.RESULT_STORE_DIR or os.path.join(settings.LOCAL_STORAGE_PATH, "results")
+
+
+def is_array_ref(value: Any) -> bool:
+    """Whether a document value is a reference to an off-row array"""
+    return isinstance(value, dict) and ARRAY_REF in value
+
+
+def _as_numeric_array(value: Any, min_size: int) -> Optional[np.ndarray]:
+    """The value as an array if it is a numeric array worth moving off-row"""
+    if isinstance(value, np.ndarray):
+        array = value
+    elif isinstance(value, (list, tuple)) and len(value) > 0:
+        # Cheap pre-check before converting: large lists only
+        if len(value) < min_size and not isinstance(value[0], (list, tuple, np.ndarray)):
+            return None
+        try:
+            array = np.asarray(value)
+        except (ValueError, TypeError):
+            return None
+    else:
+        return None
+    if array.dtype.kind not in "biuf" or array.size < min_size:
+        return None
+    return array
+
+
+def _to_json(value: Any) -> Any:
+    """Small values in JSON-serializable form"""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, Path):
+        return str(value)
+    return value
+
+
+def split_payload(payload: Dict[str, Any], min_size: Optional[int] = None) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """
+    Separate a result's large arrays from the rest
+    
+    Args:
+        payload: Result dict, possibly nested, with arrays anywhere
+        min_size: Elements from which an array moves off-row
+            (default: RESULT_STORE_MIN_ARRAY_SIZE)
+    
+    Returns:
+        (JSON document with array references, {reference name: array})
+    """
+    if min_size is None:
+        from core.config import settings
+        min_size = settings.RESULT_STORE_MIN_ARRAY_SIZE
+    
+    arrays: Dict[str, np.ndarray] = {}
+    
+    def walk(value: Any) -> Any:
+        array = _as_numeric_array(value, min_size)
+        if array is not None:
+            name = f"a{len(arrays)}"
+            arrays[name] = array
+            return {ARRAY_REF: name, "shape": list(array.shape), "dtype": array.dtype.name}
+        if isinstance(value, dict):
+            return {str(k): walk(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [walk(v) for v in value]
+        return _to_json(value)
+    
+    return walk(payload or {}), arrays
+
+
+def join_payload(document: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """Replace the array references in a document with the arrays"""
+    def walk(value: Any) -> Any:
+        if is_array_ref(value):
+            return arrays[value[ARRAY_REF]]
+        if isinstance(value, dict):
+            return {k: walk(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [walk(v) for v in value]
+        return value
+    
+    return walk(document)
+
+
+def store_payload(payload: Dict[str, Any], namespace: str, min_size: Optional[int] = None) -> StoredPayload:
+    """
+    Split a result and write its large arrays to the store
+    
+    Args:
+        payload: Result dict
+        namespace: Subdirectory, e.g. "jobs" or "erosion"
+        min_size: Elements from which an array moves off-row
+    
+    Returns:
+        The document to store in the row, with the array file's path and hash
+    """
+    document, arrays = split_payload(payload, min_size)
+    if not arrays:
+        return StoredPayload(document)
+    
+    directory = os.path.join(result_store_root(), namespace)
+    os.makedirs(directory, exist_ok=True)
+    staging = os.path.join(directory, f".{uuid.uuid4().hex}.npz")
+    try:
+        np.savez_compressed(staging, **arrays)
+        sha256 = file_sha256(staging)
+        path = os.path.join(directory, sha256[:2], f"{sha256}.npz")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(staging, path)
+    except Exception:
+        if os.path.exists(staging):
+            os.remove(staging)
+        raise
+    
+    nbytes = sum(array.nbytes for array in arrays.values())
+    logger.debug(f"Stored {len(arrays)} result arrays ({nbytes} bytes) in {path}")
+    return StoredPayload(document, path, sha256, nbytes)
+
+
+def _verify(path: str, sha256: Optional[str]):
+    if not os.path.exists(path):
+        raise ResultStoreError(f"Result file {path} not found")
+    if sha256 and file_sha256(path) != sha256:
+        raise ResultStoreError(f"Result file {path} does not match its recorded hash")
+
+
+def load_arrays(path: str, sha256: Optional[str] = None) -> Dict[str, np.ndarray]:
+    """
+    Read a result's arrays
+    
+    Args:
+        path: Array file recorded with the result
+        sha256: Recorded hash; when given the file is verified first
+    
+    Raises:
+        ResultStoreError: If the file is missing or its hash differs
+    """
+    _verify(path, sha256)
+    with np.load(path, allow_pickle=False) as data:
+        return {name: data[name] for name in data.files}
+
+
+def load_array(path: str, name: str, sha256: Optional[str] = None) -> np.ndarray:
+    """Read one referenced array of a result, without decompressing the others"""
+    _verify(path, sha256)
+    with np.load(path, allow_pickle=False) as data:
+        if name not in data.files:
+            raise ResultStoreError(f"Result file {path} has no array '{name}'")
+        return data[name]
+
+
+def load_payload(document: Dict[str, Any], path: Optional[str], sha256: Optional[str] = None) -> Dict[str, Any]:
+    """The full result: the row document with its arrays put back"""
+    if not path:
+        return document
+    return join_payload(document, load_arrays(path, sha256))
+
+
+def delete_payload(path: Optional[str]) -> bool:
+    """Remove a result's array file; returns whether a file was removed"""
+    if not path:
+        return False
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        return False
+    except OSError as e:
+        logger.warning(f"Failed to delete result file {path}: {e}")
+        return False
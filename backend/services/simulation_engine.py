@@ -11,7 +11,7 @@ This module provides comprehensive simulation capabilities including:
 
 import numpy as np
 import logging
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Callable, Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 import time
@@ -329,7 +329,8 @@ class SimulationEngine:
         self,
         dem: np.ndarray,
         parameters: Optional[SimulationParameters] = None,
-        show_progress: bool = True
+        show_progress: bool = True,
+        progress_callback: Optional[Callable[[int, Optional[str]], None]] = None
     ) -> SimulationResult:
         """
         Run time-series erosion simulation with multiple timesteps
@@ -338,6 +339,7 @@ class SimulationEngine:
             dem: Initial Digital Elevation Model
             parameters: Simulation parameters
             show_progress: Whether to print progress
+            progress_callback: Called with (percent, message) after each timestep
         
         Returns:
             SimulationResult with temporal evolution
@@ -380,6 +382,12 @@ class SimulationEngine:
             
             elevation_evolution.append(current_dem.copy())
             erosion_evolution.append(erosion_rate.copy())
+            
+            if progress_callback is not None:
+                progress_callback(
+                    int((step + 1) / parameters.num_timesteps * 100),
+                    f"Step {step + 1}/{parameters.num_timesteps}"
+                )
         
         # Calculate final statistics
         final_elevation_change = current_dem - dem
@@ -541,7 +549,8 @@ class SimulationEngine:
         base_parameters: Optional[SimulationParameters] = None,
         num_samples: int = 100,
         variation_std: float = 0.1,
-        show_progress: bool = True
+        show_progress: bool = True,
+        progress_callback: Optional[Callable[[int, Optional[str]], None]] = None
     ) -> SimulationResult:
         """
         Run Monte Carlo uncertainty quantification
@@ -552,6 +561,7 @@ class SimulationEngine:
             num_samples: Number of Monte Carlo samples
             variation_std: Standard deviation of parameter variation (fraction)
             show_progress: Whether to print progress
+            progress_callback: Called with (percent, message) after each sample
         
         Returns:
             SimulationResult with uncertainty metrics
@@ -574,6 +584,9 @@ class SimulationEngine:
             # Run simulation
             result = self.run_single_simulation(dem, perturbed, show_progress=False)
             results.append(result.mean_erosion)
+            
+            if progress_callback is not None:
+                progress_callback(int((sample + 1) / num_samples * 100), f"Sample {sample + 1}/{num_samples}")
         
         # Calculate statistics
         results_array = np.array(results)
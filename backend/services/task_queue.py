@@ -0,0 +1,725 @@
+"""
+Durable Task Queue - Restart-safe background jobs stored in the database
+Any number of worker processes share one queue through lease/heartbeat semantics
+
+Tasks are rows in the task_queue table. A worker claims a task by taking a
+time-limited lease and renews it with heartbeats while the task runs; if the
+worker dies, the lease expires and the task is retried by another worker
+after an exponential backoff. Idempotency keys make submissions safe to
+repeat.
+
+Run extra worker processes with:
+    python -m services.task_queue --workers 4
+"""
+
+import argparse
+import functools
+import json
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Generator, List, Optional, Sequence
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+import sys
+from pathlib import Path
+
+# Add backend directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.config import settings
+from models.queued_task import QueuedTask
+from services.progress_events import publish_progress
+from services.worker_pool import CancellationToken, JobCancelled, WorkerPool, _accepts_keyword
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+
+
+class PermanentTaskError(Exception):
+    """Raised by a handler when retrying the task cannot succeed (e.g. invalid input)"""
+    pass
+
+# Registered task handlers by task type; durable tasks can only name their code
+_TASK_HANDLERS: Dict[str, Callable[..., Any]] = {}
+
+
+def register_task_handler(task_type: str, handler: Optional[Callable[..., Any]] = None):
+    """
+    Register the function that runs tasks of task_type
+    
+    Handlers receive the task payload as keyword arguments, plus
+    `cancel_token`, `progress_callback(percent, message)` and
+    `event_channel` (the task's progress event channel) when they declare
+    those parameters. Usable as a decorator.
+    """
+    if handler is None:
+        return functools.partial(register_task_handler, task_type)
+    _TASK_HANDLERS[task_type] = handler
+    return handler
+
+
+def get_task_handler(task_type: str) -> Optional[Callable[..., Any]]:
+    """Get the registered handler for a task type"""
+    return _TASK_HANDLERS.get(task_type)
+
+
+def _json_safe(value: Any) -> Any:
+    """Round-trip through JSON, converting NumPy scalars and other objects"""
+    def default(obj):
+        if hasattr(obj, "item"):
+            return obj.item()
+        if hasattr(obj, "tolist"):
+            return obj.tolist()
+        if hasattr(obj, "isoformat"):
+            return obj.isoformat()
+        return str(obj)
+    return json.loads(json.dumps(value, default=default))
+
+
+class TaskQueue:
+    """Database-backed task queue"""
+    
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        queue: str = "default",
+        lease_seconds: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        retry_backoff: Optional[float] = None,
+        max_backoff: float = 3600.0
+    ):
+        """
+        Initialize task queue
+        
+        Args:
+            session_factory: Callable returning a new Session (default: SessionLocal)
+            queue: Queue name; workers only claim tasks from their queue
+            lease_seconds: Lease length; workers heartbeat at a third of it
+            max_attempts: Default attempts before a task is marked failed
+            retry_backoff: Base retry delay in seconds, doubled per attempt
+            max_backoff: Upper bound on the retry delay
+        """
+        if session_factory is None:
+            from db.session import SessionLocal
+            session_factory = SessionLocal
+        self.session_factory = session_factory
+        self.queue = queue
+        self.lease_seconds = lease_seconds or settings.TASK_QUEUE_LEASE_SECONDS
+        self.max_attempts = max_attempts or settings.TASK_QUEUE_MAX_ATTEMPTS
+        self.retry_backoff = settings.TASK_QUEUE_RETRY_BACKOFF if retry_backoff is None else retry_backoff
+        self.max_backoff = max_backoff
+    
+    @contextmanager
+    def _session(self) -> Generator[Session, None, None]:
+        db = self.session_factory()
+        try:
+            yield db
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    
+    def _backoff(self, attempts: int) -> timedelta:
+        """Exponential backoff with jitter so retried tasks do not stampede"""
+        delay = min(self.retry_backoff * (2 ** max(attempts - 1, 0)), self.max_backoff)
+        return timedelta(seconds=delay * random.uniform(0.5, 1.0))
+    
+    def enqueue(
+        self,
+        task_type: str,
+        payload: Optional[Dict[str, Any]] = None,
+        priority: int = 0,
+        idempotency_key: Optional[str] = None,
+        max_attempts: Optional[int] = None,
+        delay: float = 0.0,
+        batch_id: Optional[str] = None,
+        owner_id: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Add a task to the queue
+        
+        Args:
+            task_type: Registered handler name
+            payload: JSON-serializable keyword arguments for the handler
+            priority: Priority level (lower = higher priority)
+            idempotency_key: Submitting the same key again returns the
+                existing task instead of creating a new one
+            max_attempts: Attempts before the task is marked failed
+            delay: Seconds before the task becomes available
+            batch_id: Optional batch the task belongs to
+            owner_id: Submitting user
+        
+        Returns:
+            The task as a dictionary
+        """
+        if idempotency_key is not None:
+            existing = self.get_by_key(idempotency_key)
+            if existing is not None:
+                return existing
+        
+        task = QueuedTask(
+            queue=self.queue,
+            task_type=task_type,
+            payload=_json_safe(payload or {}),
+            status="queued",
+            priority=priority,
+            idempotency_key=idempotency_key,
+            batch_id=batch_id,
+            owner_id=owner_id,
+            attempts=0,
+            max_attempts=max_attempts or self.max_attempts,
+            available_at=datetime.utcnow() + timedelta(seconds=delay),
+            cancel_requested=False,
+            progress=0
+        )
+        try:
+            with self._session() as db:
+                db.add(task)
+                db.flush()
+                record = task.to_dict()
+        except IntegrityError:
+            # Lost a race with a concurrent submission of the same key
+            existing = self.get_by_key(idempotency_key) if idempotency_key else None
+            if existing is None:
+                raise
+            return existing
+        
+        logger.info(f"Task {record['id']} ({task_type}) queued with priority {priority}")
+        return record
+    
+    def _recover_expired_leases(self, db: Session, now: datetime):
+        """Requeue (or fail) running tasks whose worker stopped heartbeating"""
+        expired = db.query(QueuedTask.id, QueuedTask.attempts, QueuedTask.max_attempts, QueuedTask.cancel_requested).filter(
+            QueuedTask.queue == self.queue,
+            QueuedTask.status == "running",
+            QueuedTask.lease_expires_at < now
+        ).all()
+        
+        for task_id, attempts, max_attempts, cancel_requested in expired:
+            if cancel_requested:
+                values = {"status": "cancelled", "completed_at": now}
+            elif attempts >= max_attempts:
+                values = {
+                    "status": "failed",
+                    "error": f"Worker lease expired after {attempts} attempts",
+                    "completed_at": now
+                }
+            else:
+                values = {"status": "queued", "available_at": now + self._backoff(attempts)}
+            values.update({"lease_owner": None, "lease_expires_at": None})
+            
+            # Conditional update: another worker may recover the same task concurrently
+            recovered = db.query(QueuedTask).filter(
+                QueuedTask.id == task_id,
+                QueuedTask.status == "running",
+                QueuedTask.lease_expires_at < now
+            ).update(values, synchronize_session=False)
+            if recovered:
+                logger.warning(f"Task {task_id} lease expired; now {values['status']}")
+    
+    def claim(self, worker_id: str, task_types: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Lease the next available task
+        
+        Args:
+            worker_id: Unique identifier of the claiming worker
+            task_types: Only claim these task types (None = any)
+        
+        Returns:
+            The claimed task, or None if nothing is available
+        """
+        now = datetime.utcnow()
+        with self._session() as db:
+            self._recover_expired_leases(db, now)
+            db.commit()
+            
+            query = db.query(QueuedTask.id).filter(
+                QueuedTask.queue == self.queue,
+                QueuedTask.status == "queued",
+                QueuedTask.available_at <= now
+            )
+            if task_types is not None:
+                query = query.filter(QueuedTask.task_type.in_(list(task_types)))
+            candidates = query.order_by(QueuedTask.priority, QueuedTask.id).limit(8).all()
+            
+            for (task_id,) in candidates:
+                # Optimistic claim: succeeds for exactly one worker
+                claimed = db.query(QueuedTask).filter(
+                    QueuedTask.id == task_id,
+                    QueuedTask.status == "queued"
+                ).update({
+                    "status": "running",
+                    "lease_owner": worker_id,
+                    "lease_expires_at": now + timedelta(seconds=self.lease_seconds),
+                    "heartbeat_at": now,
+                    "attempts": QueuedTask.attempts + 1,
+                    "started_at": now,
+                    "error": None
+                }, synchronize_session=False)
+                db.commit()
+                if claimed:
+                    return db.get(QueuedTask, task_id).to_dict()
+        return None
+    
+    def heartbeat(
+        self,
+        task_id: int,
+        worker_id: str,
+        progress: Optional[int] = None,
+        message: Optional[str] = None,
+        state: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """
+        Renew a lease and record progress
+        
+        Args:
+            task_id: Leased task
+            worker_id: Lease owner
+            progress: Percent complete
+            message: Short progress message
+            state: Task-specific live detail (e.g. per-stage status)
+        
+        Returns:
+            False if the lease was lost or cancellation was requested; the
+            worker should stop the task
+        """
+        now = datetime.utcnow()
+        values: Dict[str, Any] = {
+            "lease_expires_at": now + timedelta(seconds=self.lease_seconds),
+            "heartbeat_at": now
+        }
+        if progress is not None:
+            values["progress"] = int(progress)
+        if message is not None:
+            values["message"] = message
+        if state is not None:
+            values["state"] = _json_safe(state)
+        
+        with self._session() as db:
+            renewed = db.query(QueuedTask).filter(
+                QueuedTask.id == task_id,
+                QueuedTask.lease_owner == worker_id,
+                QueuedTask.status == "running"
+            ).update(values, synchronize_session=False)
+            if not renewed:
+                return False
+            cancel_requested = db.query(QueuedTask.cancel_requested).filter(QueuedTask.id == task_id).scalar()
+            return not cancel_requested
+    
+    def complete(
+        self,
+        task_id: int,
+        worker_id: str,
+        result: Any = None,
+        state: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """Mark a leased task completed; False if the lease was lost meanwhile"""
+        values = {
+            "status": "completed",
+            "progress": 100,
+            "result": _json_safe(result),
+            "completed_at": datetime.utcnow(),
+            "lease_owner": None,
+            "lease_expires_at": None
+        }
+        if state is not None:
+            values["state"] = _json_safe(state)
+        
+        with self._session() as db:
+            updated = db.query(QueuedTask).filter(
+                QueuedTask.id == task_id,
+                QueuedTask.lease_owner == worker_id,
+                QueuedTask.status == "running"
+            ).update(values, synchronize_session=False)
+        if updated:
+            logger.info(f"Task {task_id} completed")
+        return bool(updated)
+    
+    def fail(
+        self,
+        task_id: int,
+        worker_id: str,
+        error: str,
+        retryable: bool = True,
+        state: Optional[Dict[str, Any]] = None
+    ) -> Optional[str]:
+        """
+        Record a failed attempt
+        
+        The task is requeued with exponential backoff while attempts remain
+        and the error is retryable; otherwise it is marked failed.
+        
+        Returns:
+            The task's new status, or None if the lease was lost meanwhile
+        """
+        now = datetime.utcnow()
+        with self._session() as db:
+            task = db.query(QueuedTask).filter(
+                QueuedTask.id == task_id,
+                QueuedTask.lease_owner == worker_id,
+                QueuedTask.status == "running"
+            ).first()
+            if task is None:
+                return None
+            
+            if task.cancel_requested:
+                task.status = "cancelled"
+                task.completed_at = now
+            elif retryable and task.attempts < task.max_attempts:
+                task.status = "queued"
+                task.available_at = now + self._backoff(task.attempts)
+            else:
+                task.status = "failed"
+                task.completed_at = now
+            task.error = error
+            if state is not None:
+                task.state = _json_safe(state)
+            task.lease_owner = None
+            task.lease_expires_at = None
+            status = task.status
+        
+        logger.warning(f"Task {task_id} attempt failed ({status}): {error}")
+        return status
+    
+    def cancel(self, task_id: int) -> bool:
+        """
+        Cancel a task
+        
+        Queued tasks are cancelled immediately; running tasks are flagged and
+        stop at their worker's next heartbeat.
+        """
+        now = datetime.utcnow()
+        with self._session() as db:
+            cancelled = db.query(QueuedTask).filter(
+                QueuedTask.id == task_id,
+                QueuedTask.status == "queued"
+            ).update({"status": "cancelled", "completed_at": now}, synchronize_session=False)
+            if cancelled:
+                return True
+            flagged = db.query(QueuedTask).filter(
+                QueuedTask.id == task_id,
+                QueuedTask.status == "running"
+            ).update({"cancel_requested": True}, synchronize_session=False)
+            return bool(flagged)
+    
+    def get(self, task_id: int) -> Optional[Dict[str, Any]]:
+        """Get a task by ID"""
+        with self._session() as db:
+            task = db.get(QueuedTask, task_id)
+            return task.to_dict() if task else None
+    
+    def get_by_key(self, idempotency_key: str) -> Optional[Dict[str, Any]]:
+        """Get a task by idempotency key"""
+        with self._session() as db:
+            task = db.query(QueuedTask).filter(QueuedTask.idempotency_key == idempotency_key).first()
+            return task.to_dict() if task else None
+    
+    def list_tasks(
+        self,
+        batch_id: Optional[str] = None,
+        status: Optional[str] = None,
+        owner_id: Optional[int] = None,
+        limit: int = 1000
+    ) -> List[Dict[str, Any]]:
+        """List tasks in this queue, oldest first"""
+        with self._session() as db:
+            query = db.query(QueuedTask).filter(QueuedTask.queue == self.queue)
+            if batch_id is not None:
+                query = query.filter(QueuedTask.batch_id == batch_id)
+            if status is not None:
+                query = query.filter(QueuedTask.status == status)
+            if owner_id is not None:
+                query = query.filter(QueuedTask.owner_id == owner_id)
+            return [task.to_dict() for task in query.order_by(QueuedTask.id).limit(limit).all()]
+    
+    def stats(self) -> Dict[str, int]:
+        """Task counts by status"""
+        with self._session() as db:
+            rows = db.query(QueuedTask.status, func.count(QueuedTask.id)).filter(
+                QueuedTask.queue == self.queue
+            ).group_by(QueuedTask.status).all()
+        return {status: count for status, count in rows}
+
+
+class TaskWorker:
+    """
+    Pulls tasks from a TaskQueue and runs them on a thread WorkerPool
+    
+    Each running task gets a heartbeat thread that renews its lease and
+    flushes the latest progress; a lost lease or a cancellation request
+    triggers the task's CancellationToken.
+    """
+    
+    def __init__(
+        self,
+        task_queue: TaskQueue,
+        pool: Optional[WorkerPool] = None,
+        worker_id: Optional[str] = None,
+        poll_interval: float = 1.0,
+        task_types: Optional[Sequence[str]] = None,
+        progress_interval: float = 1.0
+    ):
+        """
+        Initialize task worker
+        
+        Args:
+            task_queue: Queue to pull from
+            pool: Thread WorkerPool to run tasks on (default: a private pool
+                of settings.MAX_WORKERS threads)
+            worker_id: Unique worker identifier (default: host:pid:random)
+            poll_interval: Seconds between polls when the queue is empty
+            task_types: Only run these task types (None = any registered)
+            progress_interval: Minimum seconds between progress writes
+        """
+        self.task_queue = task_queue
+        self.pool = pool or WorkerPool(max_workers=settings.MAX_WORKERS)
+        if self.pool.worker_type != "thread":
+            raise ValueError("TaskWorker needs a thread WorkerPool; run more worker processes for CPU parallelism")
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.poll_interval = poll_interval
+        self.task_types = task_types
+        self.progress_interval = progress_interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def _has_free_slot(self) -> bool:
+        stats = self.pool.get_worker_stats()
+        return stats["active_workers"] + stats["queued_jobs"] < stats["max_workers"]
+    
+    def run_forever(self):
+        """Claim and dispatch tasks until stop() is called"""
+        logger.info(f"Task worker {self.worker_id} started on queue '{self.task_queue.queue}'")
+        while not self._stop.is_set():
+            if not self._has_free_slot():
+                self._stop.wait(0.05)
+                continue
+            try:
+                task = self.task_queue.claim(self.worker_id, self.task_types)
+            except Exception as e:
+                logger.error(f"Task worker {self.worker_id} failed to claim: {e}")
+                task = None
+            if task is None:
+                self._stop.wait(self.poll_interval)
+                continue
+            self.pool.submit_job(f"task-{task['id']}-{task['attempts']}", self.execute, task)
+        logger.info(f"Task worker {self.worker_id} stopped")
+    
+    def start(self) -> "TaskWorker":
+        """Run the claim loop in a background thread"""
+        self._thread = threading.Thread(target=self.run_forever, name=f"task-worker-{self.worker_id}", daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self, wait: bool = True):
+        """Stop claiming; running tasks finish (or lose their lease if the process exits)"""
+        self._stop.set()
+        if wait and self._thread is not None:
+            self._thread.join()
+    
+    def run_once(self) -> bool:
+        """Claim and run one task in the calling thread; False if none was available"""
+        task = self.task_queue.claim(self.worker_id, self.task_types)
+        if task is None:
+            return False
+        self.execute(task)
+        return True
+    
+    def execute(self, task: Dict[str, Any], cancel_token: Optional[CancellationToken] = None):
+        """Run one claimed task with heartbeats and record its outcome"""
+        task_id = task["id"]
+        channel = f"task_{task_id}"
+        token = cancel_token or CancellationToken()
+        handler = get_task_handler(task["task_type"])
+        if handler is None:
+            error = f"No handler for task type '{task['task_type']}'"
+            self.task_queue.fail(task_id, self.worker_id, error, retryable=False)
+            publish_progress(channel, event="status", status="failed", message=error)
+            return
+        publish_progress(channel, event="status", status="running", progress=0, data={"attempt": task["attempts"]})
+        
+        latest = {"progress": None, "message": None, "state": None}
+        updated = threading.Event()
+        
+        def progress_callback(percent: int, message: Optional[str] = None, state: Optional[Dict[str, Any]] = None):
+            # Written by the heartbeat thread, so chatty tasks cost at most
+            # one write per progress_interval
+            latest["progress"], latest["message"] = int(percent), message
+            if state is not None:
+                latest["state"] = state
+            updated.set()
+            # Streamed live; the bus throttles per job on its own
+            publish_progress(channel, progress=percent, message=message)
+        
+        stop_heartbeat = threading.Event()
+        
+        def heartbeat_loop():
+            interval = max(self.task_queue.lease_seconds / 3.0, 0.05)
+            last_write = 0.0
+            while not stop_heartbeat.is_set():
+                updated.wait(interval)
+                if stop_heartbeat.is_set():
+                    break
+                # Coalesce bursts of progress updates
+                backoff = self.progress_interval - (time.monotonic() - last_write)
+                if updated.is_set() and backoff > 0 and stop_heartbeat.wait(backoff):
+                    break
+                updated.clear()
+                last_write = time.monotonic()
+                try:
+                    if not self.task_queue.heartbeat(
+                        task_id, self.worker_id, latest["progress"], latest["message"], latest["state"]
+                    ):
+                        token.cancel()
+                except Exception as e:
+                    logger.error(f"Heartbeat for task {task_id} failed: {e}")
+        
+        def stop_heartbeat_thread():
+            stop_heartbeat.set()
+            updated.set()
+            heartbeat.join()
+        
+        heartbeat = threading.Thread(target=heartbeat_loop, name=f"task-heartbeat-{task_id}", daemon=True)
+        heartbeat.start()
+        
+        kwargs = dict(task["payload"] or {})
+        if _accepts_keyword(handler, "cancel_token"):
+            kwargs["cancel_token"] = token
+        if _accepts_keyword(handler, "progress_callback"):
+            kwargs["progress_callback"] = progress_callback
+        if _accepts_keyword(handler, "event_channel"):
+            kwargs["event_channel"] = channel
+        
+        def fail(error: str, retryable: bool):
+            status = self.task_queue.fail(task_id, self.worker_id, error, retryable=retryable, state=latest["state"])
+            if status is not None:
+                publish_progress(channel, event="status", status=status, progress=latest["progress"], message=error)
+        
+        try:
+            result = handler(**kwargs)
+            stop_heartbeat_thread()
+            if token.cancelled:
+                fail("Cancelled", retryable=False)
+            elif self.task_queue.complete(task_id, self.worker_id, result, state=latest["state"]):
+                publish_progress(channel, event="status", status="completed", progress=100)
+        except JobCancelled:
+            stop_heartbeat_thread()
+            fail("Cancelled", retryable=False)
+        except PermanentTaskError as e:
+            stop_heartbeat_thread()
+            fail(str(e), retryable=False)
+        except Exception as e:
+            stop_heartbeat_thread()
+            logger.error(f"Task {task_id} raised: {e}")
+            fail(str(e), retryable=True)
+
+
+# ============================================================================
+# BUILT-IN TASK HANDLERS
+# ============================================================================
+
+@register_task_handler("erosion_simulation")
+def run_erosion_simulation_task(dem_path: str, parameters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Run one erosion simulation on a DEM file and return its summary"""
+    import rasterio
+    from services.simulation_engine import get_simulation_engine, SimulationParameters
+    
+    with rasterio.open(dem_path) as src:
+        dem = src.read(1).astype(float)
+    params = SimulationParameters(**parameters) if parameters else None
+    result = get_simulation_engine().run_single_simulation(dem, parameters=params, show_progress=False)
+    return result.to_dict()
+
+
+@register_task_handler("pointcloud_processing")
+def run_pointcloud_processing_task(
+    file_path: str,
+    output_dir: str,
+    config: Optional[Dict[str, Any]] = None,
+    progress_callback: Optional[Callable[[int, Optional[str]], None]] = None
+) -> Dict[str, Any]:
+    """Filter a LAS/LAZ file and build a DEM from its ground points"""
+    from services.geospatial.pointcloud_service import process_pointcloud_to_dem
+    
+    report = None
+    if progress_callback is not None:
+        report = lambda fraction, message: progress_callback(int(fraction * 100), message)
+    return process_pointcloud_to_dem(file_path, output_dir, config or {}, report)
+
+
+@register_task_handler("processing_pipeline")
+def run_processing_pipeline_task(
+    pipeline_input: Dict[str, Any],
+    work_dir: str,
+    cancel_token: Optional[CancellationToken] = None,
+    progress_callback: Optional[Callable[..., None]] = None,
+    event_channel: Optional[str] = None
+) -> Dict[str, Any]:
+    """Run the seven-stage DEM pipeline; stages execute on a process pool"""
+    from services.pipeline import run_pipeline
+    
+    return run_pipeline(
+        pipeline_input, work_dir,
+        cancel_token=cancel_token, progress_callback=progress_callback, event_channel=event_channel
+    )
+
+
+# Global task queue instance
+_task_queue: Optional[TaskQueue] = None
+_task_worker: Optional[TaskWorker] = None
+_lock = threading.RLock()
+
+
+def get_task_queue() -> TaskQueue:
+    """Get global task queue instance"""
+    global _task_queue
+    
+    with _lock:
+        if _task_queue is None:
+            _task_queue = TaskQueue()
+    return _task_queue
+
+
+def start_task_worker(pool: Optional[WorkerPool] = None) -> TaskWorker:
+    """Start the in-process task worker (once per process)"""
+    global _task_worker
+    
+    with _lock:
+        if _task_worker is None:
+            _task_worker = TaskWorker(get_task_queue(), pool=pool).start()
+    return _task_worker
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run TerraSim durable task queue workers")
+    parser.add_argument("--workers", type=int, default=settings.MAX_WORKERS, help="Concurrent tasks in this process")
+    parser.add_argument("--queue", default="default", help="Queue name")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds between polls when idle")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    worker = TaskWorker(
+        TaskQueue(queue=args.queue),
+        pool=WorkerPool(max_workers=args.workers),
+        poll_interval=args.poll_interval
+    )
+    try:
+        worker.run_forever()
+    except KeyboardInterrupt:
+        worker.stop(wait=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
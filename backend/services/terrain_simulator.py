@@ -28,6 +28,9 @@ from backend.services.usped_workflow import USPEDWorkflow
 
 logger = logging.getLogger(__name__)
 
+# Bump when simulation output changes, to invalidate cached results
+ENGINE_VERSION = "1"
+
 
 class SimulationMode(str, Enum):
     """Simulation mode enumeration"""
@@ -458,3 +461,67 @@ def create_simulator_for_mode(dem: np.ndarray,
         )
     
     return simulator, params
+
+
+def simulate_terrain(dem: Any,
+                     cell_size: float = 10.0,
+                     mode: SimulationMode = SimulationMode.MEDIUM,
+                     params: Optional[Dict[str, float]] = None,
+                     include_grids: bool = False) -> Dict[str, Any]:
+    """
+    Run a simulation and return per-snapshot statistics.
+    
+    Module-level so it can run in a worker process: the DEM is read there
+    and only scalar results are sent back, unless include_grids is set.
+    
+    Args:
+        dem: DEM array, nested lists, or path to a raster file
+        cell_size: Grid cell size in meters
+        mode: Simulation mode, used when params is None
+        params: TimeStepParameters fields overriding the mode preset
+        include_grids: Also return the final elevation and cumulative
+            erosion grids under "grids"
+    
+    Returns:
+        Dict with the snapshot statistics and overall elevation change
+    """
+    if isinstance(dem, str):
+        import rasterio
+        with rasterio.open(dem) as src:
+            dem = src.read(1).astype(np.float64)
+    else:
+        dem = np.asarray(dem, dtype=np.float64)
+    
+    if params:
+        simulator = TerrainSimulator(dem, cell_size)
+        time_params = TimeStepParameters(**params)
+    else:
+        simulator, time_params = create_simulator_for_mode(dem, mode, cell_size)
+    snapshots = simulator.run_simulation(time_params)
+    
+    summaries = [
+        {
+            "timestep": s.timestep,
+            "time_years": s.time_years,
+            "max_elevation": s.max_elevation,
+            "min_elevation": s.min_elevation,
+            "mean_elevation": s.mean_elevation,
+            "total_volume_change": s.total_volume_change
+        }
+        for s in snapshots
+    ]
+    start_elev = summaries[0]["mean_elevation"] if summaries else 0
+    end_elev = summaries[-1]["mean_elevation"] if summaries else 0
+    result = {
+        "snapshots": summaries,
+        "start_elevation": start_elev,
+        "end_elevation": end_elev,
+        "elevation_change": end_elev - start_elev,
+        "total_volume_change": summaries[-1]["total_volume_change"] if summaries else 0
+    }
+    if include_grids:
+        result["grids"] = {
+            "elevation": simulator.get_final_dem(),
+            "erosion": simulator.get_total_erosion_map()
+        }
+    return result
@@ -0,0 +1,687 @@
+"""
+Tile Server - XYZ map tiles rendered from result GeoTIFFs
+Web Mercator tile math, overview-aware windowed reads, colormaps and a tile cache
+
+Clients request 256x256 tiles by zoom/column/row (the XYZ scheme also used
+by WMTS GoogleMapsCompatible), so only the part of a raster that is on
+screen, at the resolution it is shown, is read, rendered and sent:
+  - png: RGBA image coloured with a StyleManager ramp, a World Machine
+    scheme or a matplotlib colormap; nodata is transparent
+  - npy: float32 values with NaN for nodata, for client-side styling
+
+Tiles are read through a Web Mercator WarpedVRT with an output shape, so
+GDAL reads from the GeoTIFF's overviews at low zoom levels instead of
+decimating full-resolution blocks (COGs and pipeline outputs carry them).
+
+Rendered tiles are kept in an in-memory LRU in front of a size-bounded disk
+cache. Entries are grouped by source path and file signature (size and
+mtime), so a rewritten raster never serves stale tiles and
+invalidate_file() drops every tile of a raster at once.
+"""
+
+import hashlib
+import io
+import logging
+import math
+import os
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add backend directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+logger = logging.getLogger(__name__)
+
+TILE_SIZE = 256
+
+# Half the Web Mercator world width in metres
+ORIGIN_SHIFT = math.pi * 6378137.0
+MAX_LATITUDE = 85.0511287798
+
+MAX_ZOOM = 24
+
+TILE_FORMATS = {
+    "png": "image/png",
+    "npy": "application/x-npy"
+}
+
+DEFAULT_COLORMAP = "viridis"
+
+# Longest side of the coarse read used to find a raster's value range
+RANGE_SAMPLE_SIZE = 1024
+
+# Bump to invalidate every cached tile at once
+TILE_FORMAT_VERSION = "1"
+
+
+class TileError(ValueError):
+    """Raised when a tile, colormap or source cannot be served"""
+
+
+# ============================================================================
+# Web Mercator tile math
+# ============================================================================
+
+def tile_bounds(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """
+    Web Mercator bounds of a tile
+    
+    Returns:
+        (left, bottom, right, top) in EPSG:3857 metres
+    """
+    span = 2 * ORIGIN_SHIFT / (1 << z)
+    left = -ORIGIN_SHIFT + x * span
+    top = ORIGIN_SHIFT - y * span
+    return left, top - span, left + span, top
+
+
+def validate_tile(z: int, x: int, y: int):
+    """
+    Raises:
+        TileError: If the address is outside the tile pyramid
+    """
+    if not 0 <= z <= MAX_ZOOM:
+        raise TileError(f"Zoom must be between 0 and {MAX_ZOOM}")
+    if not (0 <= x < (1 << z) and 0 <= y < (1 << z)):
+        raise TileError(f"Tile {z}/{x}/{y} is outside the tile grid")
+
+
+def lonlat_to_mercator(lon: float, lat: float) -> Tuple[float, float]:
+    """EPSG:4326 degrees to EPSG:3857 metres"""
+    lat = max(-MAX_LATITUDE, min(MAX_LATITUDE, lat))
+    x = lon * ORIGIN_SHIFT / 180.0
+    y = math.log(math.tan((90 + lat) * math.pi / 360.0)) * 6378137.0
+    return x, y
+
+
+def zoom_for_resolution(resolution: float) -> int:
+    """Smallest zoom level whose pixels are no larger than resolution (metres)"""
+    if resolution <= 0:
+        return 0
+    zoom = math.ceil(math.log2(2 * ORIGIN_SHIFT / (TILE_SIZE * resolution)))
+    return max(0, min(MAX_ZOOM, zoom))
+
+
+# ============================================================================
+# Raster sources
+# ============================================================================
+
+@dataclass
+class SourceInfo:
+    """Georeferencing and value range of a tile source"""
+    path: str
+    signature: str
+    bounds: Tuple[float, float, float, float]  # lon/lat: west, south, east, north
+    minzoom: int
+    maxzoom: int
+    value_range: Tuple[float, float]
+    dtype: str
+    nodata: Optional[float]
+
+
+def file_signature(path: str) -> str:
+    """Identifier that changes whenever the file is rewritten"""
+    stat = os.stat(path)
+    return hashlib.sha256(f"{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest()[:16]
+
+
+def path_key(path: str) -> str:
+    """Cache group for a source path"""
+    return hashlib.sha256(os.path.abspath(path).encode()).hexdigest()[:32]
+
+
+def _open_mercator(src, resampling: str):
+    from rasterio.vrt import WarpedVRT
+    from rasterio.enums import Resampling
+    
+    if src.crs is None:
+        raise TileError("Raster has no coordinate reference system")
+    # Without a nodata value, an alpha band masks the area outside the source
+    return WarpedVRT(src, crs="EPSG:3857", resampling=Resampling[resampling], add_alpha=src.nodata is None)
+
+
+def _value_range(src) -> Tuple[float, float]:
+    """2nd-98th percentile of the raster from a coarse, overview-backed read"""
+    factor = max(1, math.ceil(max(src.width, src.height) / RANGE_SAMPLE_SIZE))
+    sample = src.read(
+        1,
+        out_shape=(max(1, src.height // factor), max(1, src.width // factor)),
+        masked=True
+    )
+    values = sample.compressed().astype(np.float64)
+    values = values[np.isfinite(values)]
+    if values.size == 0:
+        return 0.0, 1.0
+    if np.issubdtype(src.dtypes[0], np.integer):
+        # Class rasters such as risk: use the full range so classes keep their colours
+        return float(values.min()), float(values.max())
+    low, high = np.percentile(values, [2, 98])
+    return float(low), float(high)
+
+
+@lru_cache(maxsize=256)
+def _source_info(path: str, signature: str) -> SourceInfo:
+    import rasterio
+    from rasterio.warp import transform_bounds
+    
+    with rasterio.open(path) as src:
+        if src.crs is None:
+            raise TileError("Raster has no coordinate reference system")
+        west, south, east, north = transform_bounds(src.crs, "EPSG:4326", *src.bounds, densify_pts=21)
+        with _open_mercator(src, "nearest") as vrt:
+            resolution = max(abs(vrt.res[0]), abs(vrt.res[1]))
+            extent = resolution * max(vrt.width, vrt.height)
+        
+        # From the zoom where the whole raster fits in one tile to native resolution
+        maxzoom = zoom_for_resolution(resolution)
+        minzoom = min(maxzoom, max(0, zoom_for_resolution(extent / TILE_SIZE) - 1))
+        
+        return SourceInfo(
+            path=path,
+            signature=signature,
+            bounds=(west, south, east, north),
+            minzoom=minzoom,
+            maxzoom=maxzoom,
+            value_range=_value_range(src),
+            dtype=src.dtypes[0],
+            nodata=src.nodata
+        )
+
+
+def source_info(path: str) -> SourceInfo:
+    """
+    Bounds, zoom range and value range of a GeoTIFF (memoized per file version)
+    
+    Raises:
+        FileNotFoundError: If the file does not exist
+        TileError: If the raster is not georeferenced
+    """
+    return _source_info(path, file_signature(path))
+
+
+def read_tile(path: str, z: int, x: int, y: int, resampling: str = "bilinear") -> Optional[np.ma.MaskedArray]:
+    """
+    Read one tile of band 1 in Web Mercator
+    
+    Only the window covering the tile is read, at tile resolution, so GDAL
+    serves low zoom levels from overviews.
+    
+    Returns:
+        A TILE_SIZE x TILE_SIZE float32 masked array (masked where there is
+        no data), or None if the tile does not intersect the raster
+    """
+    import rasterio
+    from rasterio.windows import from_bounds
+    
+    validate_tile(z, x, y)
+    left, bottom, right, top = tile_bounds(z, x, y)
+    
+    with rasterio.open(path) as src, _open_mercator(src, resampling) as vrt:
+        v_left, v_bottom, v_right, v_top = vrt.bounds
+        i_left, i_right = max(left, v_left), min(right, v_right)
+        i_bottom, i_top = max(bottom, v_bottom), min(top, v_top)
+        if i_left >= i_right or i_bottom >= i_top:
+            return None
+        
+        # Where the intersection lands in the tile, in tile pixels
+        pixel = (right - left) / TILE_SIZE
+        col0, col1 = round((i_left - left) / pixel), round((i_right - left) / pixel)
+        row0, row1 = round((top - i_top) / pixel), round((top - i_bottom) / pixel)
+        if col1 <= col0 or row1 <= row0:
+            return None
+        
+        window = from_bounds(i_left, i_bottom, i_right, i_top, vrt.transform)
+        data = vrt.read(1, window=window, out_shape=(row1 - row0, col1 - col0), masked=True)
+    
+    tile = np.ma.masked_all((TILE_SIZE, TILE_SIZE), dtype=np.float32)
+    tile[row0:row1, col0:col1] = data.astype(np.float32)
+    tile[~np.isfinite(tile.filled(0))] = np.ma.masked
+    return tile
+
+
+# ============================================================================
+# Colormaps and encoding
+# ============================================================================
+
+def _ramp_lut(colors) -> np.ndarray:
+    """Linear interpolation of StyleManager colour stops to 256 entries"""
+    stops = np.array([color.to_rgb() for color in colors], dtype=np.float64)
+    positions = np.linspace(0, 1, len(stops))
+    samples = np.linspace(0, 1, 256)
+    return np.stack([np.interp(samples, positions, stops[:, i]) for i in range(3)], axis=1)
+
+
+def _scheme_lut(scheme) -> np.ndarray:
+    """Sample a World Machine colour scheme at 256 heights"""
+    from services.visualization.themes.world_machine_style import WorldMachineVisualizer
+    
+    color = WorldMachineVisualizer().color_schemes[scheme]
+    return color(np.linspace(0, 1, 256)[np.newaxis, :])[0].astype(np.float64)
+
+
+def available_colormaps() -> List[str]:
+    """Colormap names accepted by colormap_lut (matplotlib names are also accepted)"""
+    from services.visualization.style_manager import StyleManager
+    from services.visualization.themes.world_machine_style import WorldMachineColorScheme
+    
+    return sorted(StyleManager.COLOR_RAMPS) + [scheme.value for scheme in WorldMachineColorScheme]
+
+
+@lru_cache(maxsize=64)
+def colormap_lut(name: str) -> np.ndarray:
+    """
+    256-entry RGB lookup table for a colormap
+    
+    Names are looked up in StyleManager.COLOR_RAMPS, then the World Machine
+    colour schemes, then matplotlib's colormaps.
+    
+    Raises:
+        TileError: If no colormap has this name
+    """
+    from services.visualization.style_manager import StyleManager
+    from services.visualization.themes.world_machine_style import WorldMachineColorScheme
+    
+    if name in StyleManager.COLOR_RAMPS:
+        lut = _ramp_lut(StyleManager.COLOR_RAMPS[name])
+    elif name in {scheme.value for scheme in WorldMachineColorScheme}:
+        lut = _scheme_lut(WorldMachineColorScheme(name))
+    else:
+        try:
+            import matplotlib
+            lut = matplotlib.colormaps[name](np.linspace(0, 1, 256))[:, :3] * 255
+        except (ImportError, KeyError):
+            raise TileError(f"Unknown colormap '{name}'; expected one of {', '.join(available_colormaps())}")
+    return np.clip(np.rint(lut), 0, 255).astype(np.uint8)
+
+
+def render_png(tile: np.ma.MaskedArray, colormap: str, vmin: float, vmax: float) -> bytes:
+    """Colour a tile and encode it as an RGBA PNG with transparent nodata"""
+    from PIL import Image
+    
+    lut = colormap_lut(colormap)
+    span = vmax - vmin if vmax > vmin else 1.0
+    scaled = np.clip((tile.filled(vmin) - vmin) / span, 0, 1)
+    index = np.rint(scaled * 255).astype(np.uint8)
+    
+    rgba = np.empty(tile.shape + (4,), dtype=np.uint8)
+    rgba[..., :3] = lut[index]
+    rgba[..., 3] = np.where(np.ma.getmaskarray(tile), 0, 255)
+    
+    buffer = io.BytesIO()
+    Image.fromarray(rgba, "RGBA").save(buffer, format="PNG", compress_level=6)
+    return buffer.getvalue()
+
+
+def render_npy(tile: np.ma.MaskedArray) -> bytes:
+    """Encode a tile as float32 .npy with NaN nodata"""
+    buffer = io.BytesIO()
+    np.lib.format.write_array(buffer, tile.filled(np.nan).astype("<f4"), allow_pickle=False)
+    return buffer.getvalue()
+
+
+def style_key(fmt: str, colormap: str, vmin: float, vmax: float, resampling: str) -> str:
+    """Cache subgroup for one rendering of a source"""
+    if fmt == "npy":
+        material = f"{TILE_FORMAT_VERSION}:npy:{resampling}"
+    else:
+        material = f"{TILE_FORMAT_VERSION}:png:{colormap}:{vmin:.12g}:{vmax:.12g}:{resampling}"
+    return hashlib.sha256(material.encode()).hexdigest()[:16]
+
+
+def _tile_style(
+    path: str,
+    z: int,
+    x: int,
+    y: int,
+    fmt: str,
+    colormap: str,
+    vmin: Optional[float],
+    vmax: Optional[float],
+    resampling: str
+) -> Tuple[SourceInfo, str, float, float, str]:
+    """Validate a tile request; returns (source info, style key, vmin, vmax, etag)"""
+    from rasterio.enums import Resampling
+    
+    if fmt not in TILE_FORMATS:
+        raise TileError(f"Unknown tile format '{fmt}'; expected one of {', '.join(TILE_FORMATS)}")
+    if resampling not in Resampling.__members__:
+        raise TileError(f"Unknown resampling '{resampling}'")
+    validate_tile(z, x, y)
+    
+    info = source_info(path)
+    if fmt == "png":
+        colormap_lut(colormap)  # Validate before touching the cache
+        low, high = info.value_range
+        vmin = low if vmin is None else vmin
+        vmax = high if vmax is None else vmax
+    style = style_key(fmt, colormap, vmin or 0.0, vmax or 0.0, resampling)
+    etag = f'"{hashlib.sha256(f"{info.signature}:{style}:{z}/{x}/{y}".encode()).hexdigest()[:32]}"'
+    return info, style, vmin, vmax, etag
+
+
+def tile_etag(
+    path: str,
+    z: int,
+    x: int,
+    y: int,
+    fmt: str = "png",
+    colormap: str = DEFAULT_COLORMAP,
+    vmin: Optional[float] = None,
+    vmax: Optional[float] = None,
+    resampling: str = "bilinear"
+) -> str:
+    """
+    ETag render_tile() would return, without reading any pixels
+    
+    Lets endpoints answer If-None-Match before rendering. Same arguments
+    and errors as render_tile().
+    """
+    return _tile_style(path, z, x, y, fmt, colormap, vmin, vmax, resampling)[4]
+
+
+def render_tile(
+    path: str,
+    z: int,
+    x: int,
+    y: int,
+    fmt: str = "png",
+    colormap: str = DEFAULT_COLORMAP,
+    vmin: Optional[float] = None,
+    vmax: Optional[float] = None,
+    resampling: str = "bilinear",
+    cache: Optional["TileCache"] = None
+) -> Tuple[Optional[bytes], str]:
+    """
+    Render (or fetch from cache) one tile of a GeoTIFF
+    
+    Blocking: async endpoints should call it through the compute
+    dispatcher's thread pool.
+    
+    Args:
+        path: GeoTIFF path
+        fmt: "png" or "npy"
+        colormap: Colormap name for png tiles
+        vmin, vmax: Value range mapped onto the colormap (default: the
+            raster's 2nd-98th percentile, the same for every tile)
+        resampling: GDAL resampling used when reading (e.g. nearest for
+            class rasters)
+        cache: Tile cache to read from and store into
+    
+    Returns:
+        (body, etag); body is None for tiles outside the raster
+    
+    Raises:
+        FileNotFoundError: If the raster does not exist
+        TileError: For invalid addresses, formats, colormaps or sources
+    """
+    info, style, vmin, vmax, etag = _tile_style(path, z, x, y, fmt, colormap, vmin, vmax, resampling)
+    
+    if cache is not None:
+        body = cache.get(path, info.signature, style, z, x, y, fmt)
+        if body is not None:
+            return body or None, etag
+    
+    tile = read_tile(path, z, x, y, resampling)
+    if tile is None or tile.mask.all():
+        body = b""
+    elif fmt == "png":
+        body = render_png(tile, colormap, vmin, vmax)
+    else:
+        body = render_npy(tile)
+    
+    if cache is not None:
+        # Empty tiles are cached too, so probing outside the raster stays cheap
+        cache.put(path, info.signature, style, z, x, y, fmt, body)
+    return body or None, etag
+
+
+# ============================================================================
+# Tile cache
+# ============================================================================
+
+class TileCache:
+    """Size-bounded disk cache of rendered tiles with an in-memory LRU front"""
+    
+    def __init__(self, root: str, max_bytes: int = 1024 ** 3, memory_bytes: int = 64 * 1024 ** 2):
+        """
+        Initialize tile cache
+        
+        Args:
+            root: Cache directory
+            max_bytes: Disk size above which least recently used tiles are evicted
+            memory_bytes: Tile bytes kept in memory
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self.memory_bytes = memory_bytes
+        self.hits = 0
+        self.memory_hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_nbytes = 0
+        self._disk_nbytes: Optional[int] = None
+        self._seen: Dict[str, str] = {}  # path group -> current signature
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(self.root, "tmp"), exist_ok=True)
+    
+    def _tile_path(self, path: str, signature: str, style: str, z: int, x: int, y: int, fmt: str) -> str:
+        return os.path.join(self.root, path_key(path), signature, style, str(z), str(x), f"{y}.{fmt}")
+    
+    def _remember(self, key: str, body: bytes):
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_nbytes -= len(previous)
+            self._memory[key] = body
+            self._memory_nbytes += len(body)
+            while self._memory_nbytes > self.memory_bytes and self._memory:
+                _, old = self._memory.popitem(last=False)
+                self._memory_nbytes -= len(old)
+    
+    def _forget_group(self, group: str):
+        prefix = os.path.join(self.root, group) + os.sep
+        with self._lock:
+            for key in [key for key in self._memory if key.startswith(prefix)]:
+                self._memory_nbytes -= len(self._memory.pop(key))
+    
+    def get(self, path: str, signature: str, style: str, z: int, x: int, y: int, fmt: str) -> Optional[bytes]:
+        """
+        Look up a tile
+        
+        Returns:
+            The tile body (b"" for a cached empty tile), or None on a miss
+        """
+        tile_path = self._tile_path(path, signature, style, z, x, y, fmt)
+        with self._lock:
+            body = self._memory.get(tile_path)
+            if body is not None:
+                self._memory.move_to_end(tile_path)
+                self.hits += 1
+                self.memory_hits += 1
+                return body
+        
+        try:
+            with open(tile_path, "rb") as f:
+                body = f.read()
+            # File mtime is the disk LRU clock
+            os.utime(tile_path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        
+        self._remember(tile_path, body)
+        with self._lock:
+            self.hits += 1
+        return body
+    
+    def put(self, path: str, signature: str, style: str, z: int, x: int, y: int, fmt: str, body: bytes):
+        """Store a rendered tile"""
+        group = path_key(path)
+        if self._seen.get(group) != signature:
+            # First tile of a new file version: drop the tiles of older versions
+            self._drop_stale(group, signature)
+            self._seen[group] = signature
+        
+        tile_path = self._tile_path(path, signature, style, z, x, y, fmt)
+        staging = os.path.join(self.root, "tmp", uuid.uuid4().hex)
+        try:
+            os.makedirs(os.path.dirname(tile_path), exist_ok=True)
+            with open(staging, "wb") as f:
+                f.write(body)
+            os.replace(staging, tile_path)
+        except OSError as e:
+            logger.error(f"Failed to cache tile {z}/{x}/{y}: {e}")
+            try:
+                os.remove(staging)
+            except OSError:
+                pass
+            return
+        
+        self._remember(tile_path, body)
+        with self._lock:
+            if self._disk_nbytes is not None:
+                self._disk_nbytes += len(body)
+            over = self._disk_nbytes is None or self._disk_nbytes > self.max_bytes
+        if over:
+            self.evict()
+    
+    def _drop_stale(self, group: str, signature: str):
+        group_dir = os.path.join(self.root, group)
+        try:
+            versions = os.listdir(group_dir)
+        except FileNotFoundError:
+            return
+        for version in versions:
+            if version != signature:
+                shutil.rmtree(os.path.join(group_dir, version), ignore_errors=True)
+        self._forget_group(group)
+        with self._lock:
+            self._disk_nbytes = None
+    
+    def invalidate_file(self, path: str) -> bool:
+        """
+        Remove every tile rendered from a raster file
+        
+        Returns:
+            Whether any tiles were cached for it
+        """
+        group = path_key(path)
+        group_dir = os.path.join(self.root, group)
+        self._seen.pop(group, None)
+        self._forget_group(group)
+        if not os.path.isdir(group_dir):
+            return False
+        shutil.rmtree(group_dir, ignore_errors=True)
+        with self._lock:
+            self._disk_nbytes = None
+        logger.info(f"Invalidated cached tiles for {path}")
+        return True
+    
+    def _files(self) -> List[Tuple[float, int, str]]:
+        """(last used, size, path) of every cached tile"""
+        files = []
+        for directory, subdirs, names in os.walk(self.root):
+            if directory == self.root and "tmp" in subdirs:
+                subdirs.remove("tmp")
+            for name in names:
+                tile_path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(tile_path)
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, tile_path))
+        return files
+    
+    def evict(self) -> int:
+        """
+        Remove least recently used tiles until the cache fits in 90% of max_bytes
+        
+        The margin keeps a full cache from rescanning the disk on every put.
+        
+        Returns:
+            Number of tiles removed
+        """
+        files = sorted(self._files())
+        total = sum(size for _, size, _ in files)
+        target = int(self.max_bytes * 0.9) if total > self.max_bytes else total
+        
+        removed = 0
+        for _, size, tile_path in files:
+            if total <= target:
+                break
+            try:
+                os.remove(tile_path)
+            except FileNotFoundError:
+                pass
+            with self._lock:
+                body = self._memory.pop(tile_path, None)
+                if body is not None:
+                    self._memory_nbytes -= len(body)
+            total -= size
+            removed += 1
+        
+        with self._lock:
+            self._disk_nbytes = total
+        if removed:
+            logger.info(f"Evicted {removed} cached tiles; cache now {total / 1024 ** 2:.1f} MB")
+        return removed
+    
+    def clear(self):
+        """Remove every tile"""
+        for entry in os.listdir(self.root):
+            if entry != "tmp":
+                shutil.rmtree(os.path.join(self.root, entry), ignore_errors=True)
+        with self._lock:
+            self._memory.clear()
+            self._memory_nbytes = 0
+            self._disk_nbytes = 0
+        self._seen.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Tile count, size and hit statistics"""
+        files = self._files()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "tiles": len(files),
+                "size_bytes": sum(size for _, size, _ in files),
+                "max_bytes": self.max_bytes,
+                "memory_tiles": len(self._memory),
+                "memory_bytes": self._memory_nbytes,
+                "hits": self.hits,
+                "memory_hits": self.memory_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+
+# Global tile cache instance
+_tile_cache: Optional[TileCache] = None
+
+
+def get_tile_cache() -> Optional[TileCache]:
+    """Get the global tile cache, or None when caching is disabled"""
+    global _tile_cache
+    
+    from core.config import settings
+    if not settings.TILE_CACHE_ENABLED:
+        return None
+    
+    if _tile_cache is None:
+        root = settings.TILE_CACHE_DIR or os.path.join(settings.LOCAL_STORAGE_PATH, "cache", "tiles")
+        _tile_cache = TileCache(
+            root,
+            max_bytes=settings.TILE_CACHE_MAX_BYTES,
+            memory_bytes=settings.TILE_CACHE_MEMORY_BYTES
+        )
+    return _tile_cache
@@ -0,0 +1,441 @@
+"""
+Upload Service - Stream-to-disk and resumable uploads for rasters and point clouds
+Files are written in fixed-size chunks while being hashed, so API worker
+memory stays constant regardless of file size
+
+Single-request uploads are copied chunk by chunk from the multipart body.
+Large files can instead be sent as a resumable session: the client creates a
+session, appends chunks at an explicit byte offset (tus-style Upload-Offset)
+and resumes from the server's offset after a dropped connection.
+
+Completed files are validated by opening only their headers (rasterio for
+rasters, laspy for point clouds) and stored under a content-addressed name,
+so re-uploading the same file reuses the stored copy.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, BinaryIO, Dict, Optional, Tuple
+import sys
+from pathlib import Path
+
+# Add backend directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Accepted extensions and storage subdirectory per upload kind
+UPLOAD_KINDS: Dict[str, Dict[str, Any]] = {
+    "raster": {"extensions": (".tif", ".tiff", ".geotiff"), "directory": "rasters"},
+    "pointcloud": {"extensions": (".las", ".laz"), "directory": "pointclouds"},
+}
+
+PART_NAME = "data.part"
+META_NAME = "meta.json"
+
+
+class UploadError(ValueError):
+    """The upload is malformed or its content failed validation"""
+
+
+class UploadTooLarge(UploadError):
+    """The upload exceeds the configured size limit"""
+
+
+class UploadOffsetMismatch(UploadError):
+    """A chunk was sent for an offset other than the session's current size"""
+    
+    def __init__(self, expected: int, received: int):
+        super().__init__(f"Upload offset is {expected}, chunk was sent for offset {received}")
+        self.expected = expected
+
+
+@dataclass
+class StoredUpload:
+    """A completed upload on local disk"""
+    path: str
+    filename: str
+    size: int
+    sha256: str
+
+
+def safe_filename(filename: Optional[str]) -> str:
+    """Strip directories and unusual characters from a client-supplied name"""
+    name = os.path.basename((filename or "").replace("\\", "/"))
+    name = re.sub(r"[^A-Za-z0-9._-]", "_", name).lstrip(".")
+    return name or "upload"
+
+
+def check_extension(kind: str, filename: Optional[str]):
+    """Raise UploadError unless filename has an extension accepted for kind"""
+    if kind not in UPLOAD_KINDS:
+        raise UploadError(f"Unknown upload kind: {kind}")
+    extensions = UPLOAD_KINDS[kind]["extensions"]
+    if not (filename or "").lower().endswith(extensions):
+        raise UploadError(f"File must be one of: {', '.join(extensions)}")
+
+
+def check_declared_size(size: Optional[int], max_bytes: Optional[int] = None):
+    """Reject a Content-Length or declared total size before reading the body"""
+    max_bytes = max_bytes or settings.UPLOAD_MAX_BYTES
+    if size is not None and size > max_bytes:
+        raise UploadTooLarge(f"Upload of {size} bytes exceeds the {max_bytes} byte limit")
+
+
+def _storage_dir(kind: str) -> str:
+    directory = os.path.join(settings.LOCAL_STORAGE_PATH, "uploads", UPLOAD_KINDS[kind]["directory"])
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def _publish(kind: str, part_path: str, filename: str, size: int, sha256: str) -> StoredUpload:
+    """Move a finished part file to its content-addressed location"""
+    name = f"{sha256[:16]}_{safe_filename(filename)}"
+    path = os.path.join(_storage_dir(kind), name)
+    if os.path.exists(path) and os.path.getsize(path) == size:
+        # Same content already stored
+        os.remove(part_path)
+    else:
+        os.replace(part_path, path)
+    return StoredUpload(path=path, filename=filename, size=size, sha256=sha256)
+
+
+def stream_to_disk(
+    source: BinaryIO,
+    kind: str,
+    filename: str,
+    max_bytes: Optional[int] = None,
+    chunk_size: Optional[int] = None
+) -> StoredUpload:
+    """
+    Copy a file object to upload storage in fixed-size chunks
+    
+    Args:
+        source: Readable binary file object (e.g. UploadFile.file)
+        kind: Upload kind ("raster" or "pointcloud")
+        filename: Client file name
+        max_bytes: Size limit, enforced while copying
+        chunk_size: Bytes read per chunk
+    
+    Raises:
+        UploadTooLarge: If the file exceeds max_bytes; nothing is kept
+    """
+    max_bytes = max_bytes or settings.UPLOAD_MAX_BYTES
+    chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+    
+    part_path = os.path.join(_storage_dir(kind), f".{uuid.uuid4().hex}.part")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(part_path, "wb") as out:
+            for chunk in iter(lambda: source.read(chunk_size), b""):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"Upload exceeds the {max_bytes} byte limit")
+                digest.update(chunk)
+                out.write(chunk)
+        return _publish(kind, part_path, filename, size, digest.hexdigest())
+    except BaseException:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+
+
+async def save_upload(upload, kind: str, max_bytes: Optional[int] = None) -> StoredUpload:
+    """
+    Stream a FastAPI UploadFile to upload storage without buffering it in memory
+    
+    The copy runs in a worker thread so the event loop is never blocked.
+    """
+    check_extension(kind, upload.filename)
+    return await asyncio.to_thread(stream_to_disk, upload.file, kind, upload.filename, max_bytes)
+
+
+# ============================================================================
+# HEADER VALIDATION
+# ============================================================================
+
+def validate_raster_header(path: str) -> Dict[str, Any]:
+    """
+    Open a raster's header only and return its spatial metadata
+    
+    Raises:
+        UploadError: If the file is not a readable georeferenced raster
+    """
+    import rasterio
+    from rasterio._err import CPLE_BaseError
+    from rasterio.errors import RasterioError
+    
+    try:
+        with rasterio.open(path) as src:
+            if src.count < 1 or src.width < 1 or src.height < 1:
+                raise UploadError("Raster has no bands or no cells")
+            return {
+                "width": src.width,
+                "height": src.height,
+                "count": src.count,
+                "dtype": src.dtypes[0],
+                "nodata": src.nodata,
+                "srs": str(src.crs) if src.crs else None,
+                "resolution": float(abs(src.transform.a)),
+                "bounds": {
+                    "minx": float(src.bounds.left),
+                    "miny": float(src.bounds.bottom),
+                    "maxx": float(src.bounds.right),
+                    "maxy": float(src.bounds.top),
+                },
+            }
+    except UploadError:
+        raise
+    except (RasterioError, CPLE_BaseError, ValueError) as e:
+        # Any failure to read a header means a bad upload, not a server error
+        logger.warning(f"Rejected raster upload {os.path.basename(path)}: {e}")
+        raise UploadError("Not a readable raster file")
+
+
+def validate_pointcloud_header(path: str) -> Dict[str, Any]:
+    """
+    Read a LAS/LAZ header only and return its metadata
+    
+    Raises:
+        UploadError: If the file is not a readable LAS/LAZ file
+    """
+    from services.geospatial.core.pointcloud_streaming import read_header
+    
+    try:
+        header = read_header(path)
+    except ImportError:
+        raise
+    except Exception as e:
+        logger.warning(f"Rejected point cloud upload {os.path.basename(path)}: {e}")
+        raise UploadError("Not a readable LAS/LAZ file")
+    if header.point_count < 1:
+        raise UploadError("Point cloud contains no points")
+    return {
+        "point_count": header.point_count,
+        "version": header.version,
+        "point_format": header.point_format,
+        "srs": header.srs,
+        "bounds": header.bounds(),
+    }
+
+
+HEADER_VALIDATORS = {
+    "raster": validate_raster_header,
+    "pointcloud": validate_pointcloud_header,
+}
+
+
+def validate_upload(stored: StoredUpload, kind: str) -> Dict[str, Any]:
+    """Validate a stored upload's header; an invalid file is deleted"""
+    try:
+        return HEADER_VALIDATORS[kind](stored.path)
+    except UploadError:
+        if os.path.exists(stored.path):
+            os.remove(stored.path)
+        raise
+
+
+async def receive_upload(upload, kind: str, max_bytes: Optional[int] = None) -> Tuple[StoredUpload, Dict[str, Any]]:
+    """
+    Stream an UploadFile to storage and validate its header
+    
+    Returns:
+        (stored upload, header metadata)
+    
+    Raises:
+        UploadTooLarge: If the file exceeds the size limit
+        UploadError: If the file is of the wrong kind or unreadable
+    """
+    stored = await save_upload(upload, kind, max_bytes)
+    header = await asyncio.to_thread(validate_upload, stored, kind)
+    return stored, header
+
+
+# ============================================================================
+# RESUMABLE UPLOAD SESSIONS
+# ============================================================================
+
+class UploadSessionStore:
+    """
+    Resumable upload sessions kept on local disk
+    
+    Each session is a directory holding the partial file and its metadata, so
+    sessions survive API restarts. The current offset is the partial file's
+    size. Chunks for one session are serialized within a process.
+    """
+    
+    def __init__(self, root: Optional[str] = None, max_bytes: Optional[int] = None):
+        """
+        Args:
+            root: Session directory (default LOCAL_STORAGE_PATH/uploads/sessions)
+            max_bytes: Largest total size a session may declare
+        """
+        self.root = root or os.path.join(settings.LOCAL_STORAGE_PATH, "uploads", "sessions")
+        self.max_bytes = max_bytes or settings.UPLOAD_MAX_BYTES
+        self._locks: Dict[str, asyncio.Lock] = {}
+        os.makedirs(self.root, exist_ok=True)
+    
+    def _session_dir(self, upload_id: str) -> str:
+        if not re.fullmatch(r"[0-9a-f]{32}", upload_id):
+            raise KeyError(upload_id)
+        return os.path.join(self.root, upload_id)
+    
+    def _lock(self, upload_id: str) -> asyncio.Lock:
+        return self._locks.setdefault(upload_id, asyncio.Lock())
+    
+    def create(self, kind: str, filename: str, total_size: int, owner_id: int, **metadata) -> Dict[str, Any]:
+        """
+        Start a session for a file of total_size bytes
+        
+        Raises:
+            UploadError: If the kind or extension is not accepted
+            UploadTooLarge: If total_size exceeds the limit
+        """
+        check_extension(kind, filename)
+        if total_size < 1:
+            raise UploadError("Upload size must be positive")
+        check_declared_size(total_size, self.max_bytes)
+        
+        upload_id = uuid.uuid4().hex
+        session_dir = self._session_dir(upload_id)
+        os.makedirs(session_dir)
+        open(os.path.join(session_dir, PART_NAME), "wb").close()
+        meta = {
+            "upload_id": upload_id,
+            "kind": kind,
+            "filename": filename,
+            "total_size": total_size,
+            "owner_id": owner_id,
+            "created_at": datetime.utcnow().isoformat(),
+            "metadata": metadata,
+        }
+        with open(os.path.join(session_dir, META_NAME), "w") as f:
+            json.dump(meta, f)
+        return {**meta, "offset": 0}
+    
+    def get(self, upload_id: str) -> Optional[Dict[str, Any]]:
+        """Session metadata with its current offset, or None"""
+        try:
+            session_dir = self._session_dir(upload_id)
+            with open(os.path.join(session_dir, META_NAME)) as f:
+                meta = json.load(f)
+            meta["offset"] = os.path.getsize(os.path.join(session_dir, PART_NAME))
+        except (KeyError, FileNotFoundError):
+            return None
+        return meta
+    
+    async def append(self, upload_id: str, offset: int, chunks: AsyncIterator[bytes]) -> int:
+        """
+        Append a request body at offset, writing each chunk as it arrives
+        
+        Bytes written before a dropped connection are kept, so the client
+        resumes from the offset reported by get().
+        
+        Returns:
+            The new offset
+        
+        Raises:
+            KeyError: If the session does not exist
+            UploadOffsetMismatch: If offset is not the current offset
+            UploadTooLarge: If the body runs past the declared total size
+        """
+        async with self._lock(upload_id):
+            meta = self.get(upload_id)
+            if meta is None:
+                raise KeyError(upload_id)
+            if offset != meta["offset"]:
+                raise UploadOffsetMismatch(meta["offset"], offset)
+            
+            size = offset
+            part_path = os.path.join(self._session_dir(upload_id), PART_NAME)
+            with open(part_path, "ab") as out:
+                async for chunk in chunks:
+                    if size + len(chunk) > meta["total_size"]:
+                        # Keep the bytes that fit; the rest is rejected
+                        chunk = chunk[:meta["total_size"] - size]
+                        await asyncio.to_thread(out.write, chunk)
+                        raise UploadTooLarge(f"Chunk runs past the declared size of {meta['total_size']} bytes")
+                    await asyncio.to_thread(out.write, chunk)
+                    size += len(chunk)
+            return size
+    
+    def complete(self, upload_id: str) -> StoredUpload:
+        """
+        Hash and publish a fully received session
+        
+        Raises:
+            KeyError: If the session does not exist
+            UploadError: If bytes are still missing
+        """
+        meta = self.get(upload_id)
+        if meta is None:
+            raise KeyError(upload_id)
+        if meta["offset"] != meta["total_size"]:
+            raise UploadError(f"Upload incomplete: {meta['offset']} of {meta['total_size']} bytes received")
+        
+        part_path = os.path.join(self._session_dir(upload_id), PART_NAME)
+        digest = hashlib.sha256()
+        with open(part_path, "rb") as f:
+            for block in iter(lambda: f.read(settings.UPLOAD_CHUNK_SIZE), b""):
+                digest.update(block)
+        
+        stored = _publish(meta["kind"], part_path, meta["filename"], meta["total_size"], digest.hexdigest())
+        self.delete(upload_id)
+        return stored
+    
+    def delete(self, upload_id: str) -> bool:
+        """Discard a session and any bytes received"""
+        try:
+            session_dir = self._session_dir(upload_id)
+        except KeyError:
+            return False
+        if not os.path.isdir(session_dir):
+            return False
+        shutil.rmtree(session_dir, ignore_errors=True)
+        self._locks.pop(upload_id, None)
+        return True
+    
+    def cleanup(self, max_age: Optional[timedelta] = None) -> int:
+        """
+        Remove sessions not written to within max_age
+        
+        Returns:
+            Number of sessions removed
+        """
+        max_age = max_age or timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS)
+        cutoff = (datetime.utcnow() - max_age).timestamp()
+        removed = 0
+        for upload_id in os.listdir(self.root):
+            part_path = os.path.join(self.root, upload_id, PART_NAME)
+            try:
+                if os.path.getmtime(part_path) < cutoff and self.delete(upload_id):
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        if removed:
+            logger.info(f"Removed {removed} stale upload sessions")
+        return removed
+
+
+# Global upload session store
+_session_store: Optional[UploadSessionStore] = None
+
+
+def get_upload_session_store() -> UploadSessionStore:
+    """Get the global upload session store"""
+    global _session_store
+    if _session_store is None:
+        _session_store = UploadSessionStore()
+        _session_store.cleanup()
+    return _session_store
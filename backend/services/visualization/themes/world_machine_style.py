@@ -121,10 +121,10 @@ class WorldMachineVisualizer:
         
         # Grass/Plains
         mask = (dem_norm >= 0.4) & (dem_norm < 0.6)
-        r = int(50 + (dem_norm[mask] - 0.4) * 200)
-        g = int(120 + (dem_norm[mask] - 0.4) * 80)
-        b = int(50 + (dem_norm[mask] - 0.4) * 50)
-        rgb[mask] = np.dstack([r, g, b])
+        r = 50 + (dem_norm[mask] - 0.4) * 200
+        g = 120 + (dem_norm[mask] - 0.4) * 80
+        b = 50 + (dem_norm[mask] - 0.4) * 50
+        rgb[mask] = np.stack([r, g, b], axis=-1).astype(np.uint8)
         
         # Forest
         mask = (dem_norm >= 0.6) & (dem_norm < 0.75)
@@ -3,35 +3,98 @@ Worker Pool Manager - Handle multiple concurrent processes
 Manages parallel job execution with worker pool and queue management
 """
 
-import asyncio
+import functools
+import heapq
+import inspect
+import itertools
 import logging
+import time
 from typing import List, Dict, Any, Optional, Callable
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
 from sqlalchemy.orm import Session
-from queue import Queue, PriorityQueue
 import threading
 import uuid
 
+from services.progress_events import get_progress_bus, publish_progress
+
 logger = logging.getLogger(__name__)
 
 
+class JobCancelled(Exception):
+    """Raised inside a task when its cancellation token has been triggered"""
+    pass
+
+
+class WorkerPoolFull(Exception):
+    """Raised when the job queue is at capacity"""
+    pass
+
+
+class CancellationToken:
+    """Cooperative cancellation flag shared between the pool and a running task"""
+    
+    def __init__(self):
+        self._event = threading.Event()
+    
+    def cancel(self):
+        self._event.set()
+    
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+    
+    def raise_if_cancelled(self):
+        """Call at safe points inside long-running tasks"""
+        if self._event.is_set():
+            raise JobCancelled()
+
+
+def _accepts_keyword(func: Callable, name: str) -> bool:
+    try:
+        parameter = inspect.signature(func).parameters.get(name)
+    except (TypeError, ValueError):
+        return False
+    return parameter is not None and parameter.kind in (
+        inspect.Parameter.POSITIONAL_OR_KEYWORD, inspect.Parameter.KEYWORD_ONLY
+    )
+
+
 class WorkerPool:
-    """Thread/process pool for managing concurrent jobs"""
+    """
+    Thread/process pool for managing concurrent jobs
     
-    def __init__(self, max_workers: int = 4, worker_type: str = "thread"):
+    A dispatcher thread pops queued jobs in priority order and hands them to
+    the executor while fewer than max_workers are running. Tasks that declare
+    a `cancel_token` or `progress_callback` parameter receive a
+    CancellationToken and a progress(percent, message) callable (thread
+    workers only; process workers cannot share them).
+    """
+    
+    def __init__(self, max_workers: int = 4, worker_type: str = "thread", max_queue_size: int = 1000):
         """
         Initialize worker pool
         
         Args:
             max_workers: Maximum number of concurrent workers
             worker_type: "thread" or "process" - type of workers to use
+            max_queue_size: Maximum number of queued (not yet running) jobs
         """
         self.max_workers = max_workers
         self.worker_type = worker_type
+        self.max_queue_size = max_queue_size
         self.active_jobs: Dict[str, Dict[str, Any]] = {}
-        self.job_queue: PriorityQueue = PriorityQueue()
+        self.job_queue: List[tuple] = []  # heap of (priority, sequence, job_id)
         self.lock = threading.Lock()
+        self._condition = threading.Condition(self.lock)
+        self._sequence = itertools.count()
+        self._tasks: Dict[str, tuple] = {}
+        self._tokens: Dict[str, CancellationToken] = {}
+        self._done_events: Dict[str, threading.Event] = {}
+        self._deadlines: Dict[str, float] = {}
+        self._queued_count = 0
+        self._running_count = 0
+        self._shutdown = False
         
         # Create executor pool
         if worker_type == "process":
@@ -39,9 +102,22 @@ class WorkerPool:
         else:
             self.executor = ThreadPoolExecutor(max_workers=max_workers)
         
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="worker-pool-dispatcher", daemon=True)
+        self._dispatcher.start()
+        
         logger.info(f"WorkerPool initialized: {max_workers} {worker_type} workers")
     
-    def submit_job(self, job_id: str, task_func: Callable, *args, priority: int = 0, **kwargs) -> bool:
+    def submit_job(
+        self,
+        job_id: str,
+        task_func: Callable,
+        *args,
+        priority: int = 0,
+        job_timeout: Optional[float] = None,
+        on_progress: Optional[Callable[[str, int, Optional[str]], None]] = None,
+        queue_timeout: Optional[float] = 0,
+        **kwargs
+    ) -> bool:
         """
         Submit a job to the worker pool
         
@@ -49,18 +125,46 @@ class WorkerPool:
             job_id: Unique job identifier
             task_func: Callable function to execute
             priority: Priority level (lower = higher priority)
+            job_timeout: Seconds the job may run before it is marked timed out
+                and its cancellation token is triggered
+            on_progress: Called with (job_id, percent, message) on task progress
+            queue_timeout: Seconds to wait for queue space when full
+                (0 = fail immediately, None = wait indefinitely)
             args, kwargs: Arguments for the task function
             
         Returns:
             True if submitted, False if job already exists
+        
+        Raises:
+            WorkerPoolFull: If the queue stays full for queue_timeout seconds
         """
-        with self.lock:
+        with self._condition:
             if job_id in self.active_jobs:
                 logger.warning(f"Job {job_id} already exists")
                 return False
+            if self._shutdown:
+                raise RuntimeError("WorkerPool has been shut down")
+            
+            # Backpressure: wait for the dispatcher to drain the queue
+            has_space = self._condition.wait_for(
+                lambda: self._queued_count < self.max_queue_size or self._shutdown,
+                timeout=queue_timeout
+            )
+            if not has_space or self._shutdown:
+                raise WorkerPoolFull(f"Job queue is full ({self.max_queue_size} jobs)")
+            
+            token = CancellationToken()
+            if self.worker_type == "thread":
+                if _accepts_keyword(task_func, "cancel_token"):
+                    kwargs["cancel_token"] = token
+                if _accepts_keyword(task_func, "progress_callback"):
+                    kwargs["progress_callback"] = functools.partial(self._report_progress, job_id, on_progress)
             
-            # Add to queue with priority
-            self.job_queue.put((priority, job_id, task_func, args, kwargs))
+            heapq.heappush(self.job_queue, (priority, next(self._sequence), job_id))
+            self._tasks[job_id] = (task_func, args, kwargs, job_timeout)
+            self._tokens[job_id] = token
+            self._done_events[job_id] = threading.Event()
+            self._queued_count += 1
             
             # Track job state
             self.active_jobs[job_id] = {
@@ -69,13 +173,131 @@ class WorkerPool:
                 "submitted_at": datetime.utcnow(),
                 "started_at": None,
                 "completed_at": None,
+                "progress": 0,
+                "message": None,
                 "result": None,
                 "error": None
             }
+            self._condition.notify_all()
             
             logger.info(f"Job {job_id} queued with priority {priority}")
             return True
     
+    def _report_progress(
+        self,
+        job_id: str,
+        on_progress: Optional[Callable[[str, int, Optional[str]], None]],
+        percent: int,
+        message: Optional[str] = None
+    ):
+        with self.lock:
+            job_info = self.active_jobs.get(job_id)
+            if job_info is not None:
+                job_info["progress"] = int(percent)
+                job_info["message"] = message
+        publish_progress(job_id, progress=percent, message=message)
+        if on_progress is not None:
+            try:
+                on_progress(job_id, int(percent), message)
+            except Exception as e:
+                logger.error(f"Progress callback for job {job_id} failed: {e}")
+    
+    def _dispatch_loop(self):
+        """Start queued jobs in priority order while worker slots are free"""
+        while True:
+            with self._condition:
+                while True:
+                    if self._shutdown:
+                        return
+                    self._expire_timeouts()
+                    if self.job_queue and self._running_count < self.max_workers:
+                        break
+                    self._condition.wait(timeout=self._next_deadline_delay())
+                
+                _, _, job_id = heapq.heappop(self.job_queue)
+                job_info = self.active_jobs[job_id]
+                task_func, args, kwargs, job_timeout = self._tasks.pop(job_id)
+                if job_info["status"] != "queued":
+                    # Cancelled while queued
+                    continue
+                
+                self._queued_count -= 1
+                self._running_count += 1
+                job_info["status"] = "running"
+                job_info["started_at"] = datetime.utcnow()
+                if job_timeout is not None:
+                    self._deadlines[job_id] = time.monotonic() + job_timeout
+                self._condition.notify_all()
+            publish_progress(job_id, event="status", status="running", progress=0)
+            
+            try:
+                future = self.executor.submit(task_func, *args, **kwargs)
+            except Exception as e:
+                future = Future()
+                future.set_exception(e)
+            future.add_done_callback(functools.partial(self._on_job_done, job_id))
+    
+    def _next_deadline_delay(self) -> Optional[float]:
+        if not self._deadlines:
+            return None
+        return max(0.0, min(self._deadlines.values()) - time.monotonic())
+    
+    def _expire_timeouts(self):
+        """Mark running jobs past their deadline as timed out (caller holds the lock)"""
+        now = time.monotonic()
+        for job_id, deadline in list(self._deadlines.items()):
+            if deadline > now:
+                continue
+            del self._deadlines[job_id]
+            job_info = self.active_jobs[job_id]
+            job_info["status"] = "timed_out"
+            job_info["error"] = "Job exceeded its timeout"
+            job_info["completed_at"] = datetime.utcnow()
+            # The worker slot is held until the task actually returns
+            self._tokens[job_id].cancel()
+            self._done_events[job_id].set()
+            publish_progress(job_id, event="status", status="timed_out", message=job_info["error"])
+            logger.warning(f"Job {job_id} timed out")
+    
+    def _on_job_done(self, job_id: str, future: Future):
+        with self._condition:
+            self._running_count -= 1
+            self._deadlines.pop(job_id, None)
+            job_info = self.active_jobs[job_id]
+            
+            if job_info["status"] == "timed_out":
+                pass
+            elif future.cancelled() or isinstance(future.exception(), JobCancelled):
+                job_info["status"] = "cancelled"
+            elif future.exception() is not None:
+                job_info["status"] = "failed"
+                job_info["error"] = str(future.exception())
+                logger.error(f"Job {job_id} failed: {future.exception()}")
+            elif job_info["status"] == "cancelling":
+                # Finished without checking its token
+                job_info["status"] = "cancelled"
+            else:
+                job_info["status"] = "completed"
+                job_info["result"] = future.result()
+                job_info["progress"] = 100
+            
+            if job_info["completed_at"] is None:
+                job_info["completed_at"] = datetime.utcnow()
+                publish_progress(
+                    job_id, event="status", status=job_info["status"],
+                    progress=job_info["progress"], message=job_info["error"]
+                )
+            self._done_events[job_id].set()
+            self._condition.notify_all()
+    
+    def wait_for_job(self, job_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Block until a job finishes (or timeout) and return its status"""
+        event = self._done_events.get(job_id)
+        if event is None:
+            return None
+        event.wait(timeout)
+        return self.get_job_status(job_id)
+    
     def get_job_status(self, job_id: str) -> Optional[Dict[str, Any]]:
         """Get status of a job"""
         with self.lock:
@@ -88,41 +310,79 @@ class WorkerPool:
     
     def get_queue_size(self) -> int:
         """Get number of jobs in queue"""
-        return self.job_queue.qsize()
+        with self.lock:
+            return self._queued_count
+    
+    def get_queue_capacity(self) -> int:
+        """Number of jobs that can be queued without blocking"""
+        with self.lock:
+            return max(0, self.max_queue_size - self._queued_count)
     
     def get_worker_stats(self) -> Dict[str, Any]:
         """Get worker pool statistics"""
         with self.lock:
-            active_count = sum(1 for j in self.active_jobs.values() if j["status"] == "running")
-            queued_count = sum(1 for j in self.active_jobs.values() if j["status"] == "queued")
-            
             return {
                 "max_workers": self.max_workers,
-                "active_workers": active_count,
-                "queued_jobs": queued_count,
+                "active_workers": self._running_count,
+                "queued_jobs": self._queued_count,
                 "total_jobs": len(self.active_jobs),
-                "worker_type": self.worker_type
+                "worker_type": self.worker_type,
+                "max_queue_size": self.max_queue_size
             }
     
-    def shutdown(self, wait: bool = True):
-        """Shutdown worker pool"""
+    def shutdown(self, wait: bool = True, cancel_pending: bool = False):
+        """
+        Shutdown worker pool
+        
+        Queued jobs are never started and are marked cancelled.
+        
+        Args:
+            wait: Wait for running jobs to finish
+            cancel_pending: Also signal running jobs to stop via their tokens
+        """
+        with self._condition:
+            for job_id, job_info in self.active_jobs.items():
+                if job_info["status"] == "queued":
+                    job_info["status"] = "cancelled"
+                    job_info["completed_at"] = datetime.utcnow()
+                    self._done_events[job_id].set()
+                elif job_info["status"] == "running" and cancel_pending:
+                    self._tokens[job_id].cancel()
+            self._queued_count = 0
+            self._shutdown = True
+            self._condition.notify_all()
+        
+        self._dispatcher.join()
         self.executor.shutdown(wait=wait)
         logger.info("WorkerPool shutdown complete")
     
     def cancel_job(self, job_id: str) -> bool:
-        """Cancel a queued job"""
-        with self.lock:
+        """
+        Cancel a job
+        
+        Queued jobs are cancelled immediately. Running jobs are signalled
+        through their cancellation token and stop at their next check.
+        """
+        with self._condition:
             if job_id not in self.active_jobs:
                 return False
             
             job_info = self.active_jobs[job_id]
             if job_info["status"] == "queued":
                 job_info["status"] = "cancelled"
+                job_info["completed_at"] = datetime.utcnow()
+                self._queued_count -= 1
+                self._done_events[job_id].set()
+                self._condition.notify_all()
+                publish_progress(job_id, event="status", status="cancelled")
                 logger.info(f"Job {job_id} cancelled")
                 return True
             elif job_info["status"] == "running":
-                logger.warning(f"Cannot cancel running job {job_id}")
-                return False
+                job_info["status"] = "cancelling"
+                self._tokens[job_id].cancel()
+                publish_progress(job_id, event="status", status="cancelling")
+                logger.info(f"Cancellation requested for running job {job_id}")
+                return True
         
         return False
 
@@ -130,27 +390,48 @@ class WorkerPool:
 class BatchJobManager:
     """Manage batch job submissions and execution"""
     
-    def __init__(self, worker_pool: WorkerPool):
+    def __init__(self, worker_pool: WorkerPool, task_queue: Optional[Any] = None):
         """
         Initialize batch job manager
         
         Args:
             worker_pool: WorkerPool instance
+            task_queue: Optional durable TaskQueue; jobs defined by task_type
+                are persisted there and survive restarts
         """
         self.worker_pool = worker_pool
+        self.task_queue = task_queue
         self.batch_jobs: Dict[str, List[str]] = {}
+        self.batch_owners: Dict[str, Optional[int]] = {}
     
-    def submit_batch(self, batch_id: str, jobs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def submit_batch(self, batch_id: str, jobs: List[Dict[str, Any]], owner_id: Optional[int] = None) -> Dict[str, Any]:
         """
         Submit multiple jobs as a batch
         
         Args:
             batch_id: Unique batch identifier
             jobs: List of job definitions with task_func, args, kwargs, priority
+                and optional job_timeout; or, for durable jobs, task_type,
+                payload, priority and optional idempotency_key and owner_id
+            owner_id: Submitting user of a worker pool batch (durable jobs
+                carry their own owner_id)
             
         Returns:
             Batch submission result with job IDs
+        
+        Raises:
+            WorkerPoolFull: If the batch does not fit in the queue
         """
+        if self.task_queue is not None and jobs and all("task_type" in job for job in jobs):
+            return self._submit_durable_batch(batch_id, jobs)
+        
+        # Reject the whole batch rather than queueing part of it
+        if len(jobs) > self.worker_pool.get_queue_capacity():
+            raise WorkerPoolFull(
+                f"Batch of {len(jobs)} jobs exceeds free queue capacity "
+                f"({self.worker_pool.get_queue_capacity()})"
+            )
+        
         job_ids = []
         
         for idx, job_config in enumerate(jobs):
@@ -161,10 +442,16 @@ class BatchJobManager:
             priority = job_config.get("priority", idx)  # Default: FIFO order
             
             if task_func:
-                self.worker_pool.submit_job(job_id, task_func, *args, priority=priority, **kwargs)
+                # The batch's stream carries the events of all its jobs
+                get_progress_bus().link(job_id, batch_id)
+                self.worker_pool.submit_job(
+                    job_id, task_func, *args,
+                    priority=priority, job_timeout=job_config.get("job_timeout"), **kwargs
+                )
                 job_ids.append(job_id)
         
         self.batch_jobs[batch_id] = job_ids
+        self.batch_owners[batch_id] = owner_id
         
         logger.info(f"Batch {batch_id} submitted with {len(job_ids)} jobs")
         
@@ -176,35 +463,90 @@ class BatchJobManager:
             "timestamp": datetime.utcnow().isoformat()
         }
     
+    def _submit_durable_batch(self, batch_id: str, jobs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Persist a batch in the task queue; workers in any process pick it up"""
+        job_ids = []
+        for idx, job_config in enumerate(jobs):
+            task = self.task_queue.enqueue(
+                job_config["task_type"],
+                job_config.get("payload", {}),
+                priority=job_config.get("priority", idx),
+                idempotency_key=job_config.get("idempotency_key"),
+                batch_id=batch_id,
+                owner_id=job_config.get("owner_id")
+            )
+            job_ids.append(f"task_{task['id']}")
+            get_progress_bus().link(f"task_{task['id']}", batch_id)
+        
+        logger.info(f"Batch {batch_id} queued durably with {len(job_ids)} jobs")
+        
+        return {
+            "batch_id": batch_id,
+            "job_ids": job_ids,
+            "total_jobs": len(job_ids),
+            "status": "submitted",
+            "durable": True,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    
+    def get_batch_owner(self, batch_id: str) -> Optional[int]:
+        """ID of the user who submitted a batch, or None if unknown"""
+        if batch_id in self.batch_jobs:
+            return self.batch_owners.get(batch_id)
+        if self.task_queue is not None:
+            tasks = self.task_queue.list_tasks(batch_id=batch_id, limit=1)
+            return tasks[0]["owner_id"] if tasks else None
+        return None
+    
     def get_batch_status(self, batch_id: str) -> Optional[Dict[str, Any]]:
         """Get status of all jobs in a batch"""
-        if batch_id not in self.batch_jobs:
+        if batch_id in self.batch_jobs:
+            job_ids = self.batch_jobs[batch_id]
+            statuses = []
+            
+            for job_id in job_ids:
+                status = self.worker_pool.get_job_status(job_id)
+                if status:
+                    statuses.append({
+                        "job_id": job_id,
+                        "status": status["status"]
+                    })
+        elif self.task_queue is not None:
+            # Durable batches are read back from the database, so their
+            # status survives restarts and is visible from every process
+            tasks = self.task_queue.list_tasks(batch_id=batch_id)
+            if not tasks:
+                return None
+            job_ids = [f"task_{task['id']}" for task in tasks]
+            statuses = [
+                {
+                    "job_id": f"task_{task['id']}",
+                    "status": "cancelling" if task["status"] == "running" and task["cancel_requested"] else task["status"],
+                    "progress": task["progress"],
+                    "attempts": task["attempts"],
+                    "error": task["error"]
+                }
+                for task in tasks
+            ]
+        else:
             return None
         
-        job_ids = self.batch_jobs[batch_id]
-        statuses = []
-        
-        for job_id in job_ids:
-            status = self.worker_pool.get_job_status(job_id)
-            if status:
-                statuses.append({
-                    "job_id": job_id,
-                    "status": status["status"]
-                })
-        
         # Calculate batch progress
         completed = sum(1 for s in statuses if s["status"] == "completed")
-        failed = sum(1 for s in statuses if s["status"] == "failed")
-        running = sum(1 for s in statuses if s["status"] == "running")
+        failed = sum(1 for s in statuses if s["status"] in ("failed", "timed_out"))
+        cancelled = sum(1 for s in statuses if s["status"] == "cancelled")
+        running = sum(1 for s in statuses if s["status"] in ("running", "cancelling"))
+        finished = completed + failed + cancelled
         
         return {
             "batch_id": batch_id,
             "total_jobs": len(job_ids),
             "completed": completed,
             "failed": failed,
+            "cancelled": cancelled,
             "running": running,
-            "queued": len(job_ids) - completed - failed - running,
-            "progress_percent": int((completed + failed) / len(job_ids) * 100) if job_ids else 0,
+            "queued": len(job_ids) - finished - running,
+            "progress_percent": int(finished / len(job_ids) * 100) if job_ids else 0,
             "job_statuses": statuses
         }
 
@@ -214,11 +556,11 @@ _worker_pool: Optional[WorkerPool] = None
 _batch_manager: Optional[BatchJobManager] = None
 
 
-def initialize_worker_pool(max_workers: int = 4, worker_type: str = "thread"):
+def initialize_worker_pool(max_workers: int = 4, worker_type: str = "thread", max_queue_size: int = 1000):
     """Initialize global worker pool"""
     global _worker_pool, _batch_manager
     
-    _worker_pool = WorkerPool(max_workers=max_workers, worker_type=worker_type)
+    _worker_pool = WorkerPool(max_workers=max_workers, worker_type=worker_type, max_queue_size=max_queue_size)
     logger.info(f"Global worker pool initialized with {max_workers} {worker_type} workers")
 
 
@@ -239,7 +581,15 @@ def get_batch_manager(db_session_factory=None) -> BatchJobManager:
     global _batch_manager
     
     if _batch_manager is None:
-        _batch_manager = BatchJobManager(get_worker_pool())
+        task_queue = None
+        from core.config import settings
+        if settings.TASK_QUEUE_ENABLED:
+            # Imported here: task_queue builds on this module
+            from services.task_queue import get_task_queue, start_task_worker
+            task_queue = get_task_queue()
+            if settings.TASK_QUEUE_EMBEDDED_WORKER:
+                start_task_worker()
+        _batch_manager = BatchJobManager(get_worker_pool(), task_queue=task_queue)
     
     return _batch_manager
 
@@ -248,7 +598,8 @@ def submit_parallel_simulations(
     db: Session,
     dem_data: Any,
     parameters_list: List[Dict[str, Any]],
-    callback: Optional[Callable] = None
+    callback: Optional[Callable] = None,
+    owner_id: Optional[int] = None
 ) -> str:
     """
     Submit multiple erosion simulations to run in parallel
@@ -258,6 +609,7 @@ def submit_parallel_simulations(
         dem_data: Digital Elevation Model data
         parameters_list: List of parameter dictionaries
         callback: Optional callback function for results
+        owner_id: Submitting user
         
     Returns:
         batch_id for tracking
@@ -282,4 +634,4 @@ def submit_parallel_simulations(
         jobs.append(job_config)
     
     batch_manager = get_batch_manager()
-    return batch_manager.submit_batch(batch_id, jobs)["batch_id"]
+    return batch_manager.submit_batch(batch_id, jobs, owner_id=owner_id)["batch_id"]
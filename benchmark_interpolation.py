@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+TerraSim Interpolation Benchmarks
+
+Times the geoprocessing interpolators while growing the number of samples and
+the output grid size independently:
+    python benchmark_interpolation.py
+    python benchmark_interpolation.py --quick
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+
+def _time(func, repeat: int = 1) -> float:
+    """Best wall-clock time of func() over repeat runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _samples(n: int, rng: np.random.Generator):
+    points = rng.random((n, 2)) * 1000.0
+    values = np.sin(points[:, 0] / 100.0) + np.cos(points[:, 1] / 150.0)
+    return points, values
+
+
+def benchmark_idw(sample_sizes, grid_sizes, k: int, workers: int) -> None:
+    """IDW timings: samples grow with a fixed grid, then the grid grows with fixed samples."""
+    from backend.services.geospatial.geoprocessing.interpolation import IDWInterpolator
+
+    rng = np.random.default_rng(42)
+    idw = IDWInterpolator(k=k, workers=workers)
+
+    fixed_grid = grid_sizes[0]
+    axis = np.linspace(0.0, 1000.0, fixed_grid)
+    print(f"\nIDW (k={k}, workers={workers}) - grid fixed at {fixed_grid}x{fixed_grid}")
+    print(f"{'samples':>12} {'seconds':>10} {'cells/s':>14}")
+    for n in sample_sizes:
+        points, values = _samples(n, rng)
+        seconds = _time(lambda: idw.interpolate_grid(points, values, axis, axis))
+        print(f"{n:>12,} {seconds:>10.3f} {fixed_grid * fixed_grid / seconds:>14,.0f}")
+
+    fixed_samples = sample_sizes[0]
+    points, values = _samples(fixed_samples, rng)
+    print(f"\nIDW (k={k}, workers={workers}) - samples fixed at {fixed_samples:,}")
+    print(f"{'grid':>12} {'seconds':>10} {'cells/s':>14}")
+    for size in grid_sizes:
+        axis = np.linspace(0.0, 1000.0, size)
+        seconds = _time(lambda: idw.interpolate_grid(points, values, axis, axis))
+        print(f"{f'{size}x{size}':>12} {seconds:>10.3f} {size * size / seconds:>14,.0f}")
+
+
+def benchmark_kde(sample_sizes, grid_sizes, bandwidth: float) -> None:
+    """Binned KDE timings: points grow with a fixed grid, then the grid grows with fixed points."""
+    from backend.services.geospatial.geoprocessing.interpolation import KernelDensity
+
+    rng = np.random.default_rng(7)
+    kde = KernelDensity(bandwidth=bandwidth, kernel="quartic")
+
+    fixed_grid = grid_sizes[0]
+    axis = np.linspace(0.0, 1000.0, fixed_grid)
+    print(f"\nBinned KDE (quartic, bandwidth={bandwidth}) - grid fixed at {fixed_grid}x{fixed_grid}")
+    print(f"{'points':>12} {'seconds':>10} {'cells/s':>14}")
+    for n in sample_sizes:
+        points, _ = _samples(n, rng)
+        seconds = _time(lambda: kde.estimate_grid(points, axis, axis))
+        print(f"{n:>12,} {seconds:>10.3f} {fixed_grid * fixed_grid / seconds:>14,.0f}")
+
+    points, _ = _samples(sample_sizes[0], rng)
+    print(f"\nBinned KDE (quartic, bandwidth={bandwidth}) - points fixed at {sample_sizes[0]:,}")
+    print(f"{'grid':>12} {'seconds':>10} {'cells/s':>14}")
+    for size in grid_sizes:
+        axis = np.linspace(0.0, 1000.0, size)
+        seconds = _time(lambda: kde.estimate_grid(points, axis, axis))
+        print(f"{f'{size}x{size}':>12} {seconds:>10.3f} {size * size / seconds:>14,.0f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark TerraSim interpolators")
+    parser.add_argument("--quick", action="store_true", help="Run small problem sizes only")
+    parser.add_argument("--k", type=int, default=12, help="IDW neighbours")
+    parser.add_argument("--workers", type=int, default=-1, help="KD-tree query workers")
+    args = parser.parse_args()
+
+    if args.quick:
+        sample_sizes = [1_000, 10_000, 100_000]
+        grid_sizes = [128, 256, 512]
+    else:
+        sample_sizes = [10_000, 100_000, 1_000_000]
+        grid_sizes = [256, 512, 1024, 2048]
+
+    print("=" * 70)
+    print("TERRASIM INTERPOLATION BENCHMARKS")
+    print("=" * 70)
+
+    benchmark_idw(sample_sizes, grid_sizes, args.k, args.workers)
+    benchmark_kde(sample_sizes, grid_sizes, bandwidth=25.0)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+TerraSim Worker Pool Benchmarks
+
+Checks WorkerPool behaviour (results, failures, cancellation, timeouts,
+backpressure, priority order), then measures job throughput as the worker
+count grows. Each benchmark job blocks for a fixed time without holding the
+GIL (as raster I/O and most NumPy kernels do), so throughput should scale
+close to linearly until workers exceed the job count. Exits non-zero if a
+check fails or throughput stops scaling:
+    python benchmark_worker_pool.py
+    python benchmark_worker_pool.py --quick
+    python benchmark_worker_pool.py --checks-only
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+
+def _blocking_job(seconds: float) -> float:
+    time.sleep(seconds)
+    return seconds
+
+
+def _failing_job():
+    raise ValueError("boom")
+
+
+def _cooperative_job(cancel_token=None, progress_callback=None):
+    """Reports progress, then runs until cancelled"""
+    progress_callback(50, "half way")
+    while True:
+        cancel_token.raise_if_cancelled()
+        time.sleep(0.01)
+
+
+def _wait_until(predicate, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+def check_submit_and_result():
+    from services.worker_pool import WorkerPool
+
+    pool = WorkerPool(max_workers=2)
+    try:
+        assert pool.submit_job("a", pow, 2, 10)
+        assert not pool.submit_job("a", pow, 2, 10), "duplicate job ID accepted"
+        status = pool.wait_for_job("a", timeout=5)
+        assert status["status"] == "completed", status
+        assert status["result"] == 1024, status
+        assert status["progress"] == 100, status
+        assert status["started_at"] is not None and status["completed_at"] is not None, status
+        assert pool.get_job_status("missing") is None
+        assert pool.wait_for_job("missing") is None
+    finally:
+        pool.shutdown()
+
+
+def check_worker_failure():
+    from services.worker_pool import WorkerPool
+
+    pool = WorkerPool(max_workers=1)
+    try:
+        pool.submit_job("bad", _failing_job)
+        status = pool.wait_for_job("bad", timeout=5)
+        assert status["status"] == "failed", status
+        assert status["error"] == "boom", status
+        # The failure frees its slot: the next job still runs
+        pool.submit_job("next", pow, 3, 2)
+        status = pool.wait_for_job("next", timeout=5)
+        assert status["status"] == "completed" and status["result"] == 9, status
+    finally:
+        pool.shutdown()
+
+
+def check_cancel():
+    from services.worker_pool import WorkerPool
+
+    ran = []
+    progress = []
+    pool = WorkerPool(max_workers=1)
+    try:
+        pool.submit_job(
+            "running", _cooperative_job,
+            on_progress=lambda job_id, percent, message: progress.append((job_id, percent, message))
+        )
+        pool.submit_job("queued", ran.append, "queued")
+        assert _wait_until(lambda: pool.get_job_status("running")["status"] == "running")
+
+        # A queued job is cancelled without ever starting
+        assert pool.cancel_job("queued")
+        assert pool.wait_for_job("queued", timeout=5)["status"] == "cancelled"
+
+        # A running job stops at its next token check
+        assert _wait_until(lambda: bool(progress))
+        assert pool.cancel_job("running")
+        status = pool.wait_for_job("running", timeout=5)
+        assert status["status"] == "cancelled", status
+        assert progress == [("running", 50, "half way")], progress
+        assert status["progress"] == 50, status
+
+        assert not pool.cancel_job("running"), "finished job cancelled again"
+        assert not pool.cancel_job("missing")
+        assert ran == [], "cancelled job ran"
+    finally:
+        pool.shutdown()
+
+
+def check_timeout():
+    from services.worker_pool import WorkerPool
+
+    pool = WorkerPool(max_workers=1)
+    try:
+        pool.submit_job("slow", _cooperative_job, job_timeout=0.1)
+        pool.submit_job("after", pow, 2, 3)
+        status = pool.wait_for_job("slow", timeout=5)
+        assert status["status"] == "timed_out", status
+        # The slot is held until the task returns, then the queue moves on
+        status = pool.wait_for_job("after", timeout=5)
+        assert status["status"] == "completed" and status["result"] == 8, status
+        assert pool.get_job_status("slow")["status"] == "timed_out"
+    finally:
+        pool.shutdown()
+
+
+def check_backpressure():
+    from services.worker_pool import WorkerPool, WorkerPoolFull
+
+    pool = WorkerPool(max_workers=1, max_queue_size=2)
+    try:
+        pool.submit_job("gate", _blocking_job, 0.3)
+        assert _wait_until(lambda: pool.get_job_status("gate")["status"] == "running")
+        pool.submit_job("q1", _blocking_job, 0)
+        pool.submit_job("q2", _blocking_job, 0)
+        assert pool.get_queue_capacity() == 0
+        try:
+            pool.submit_job("q3", _blocking_job, 0)
+        except WorkerPoolFull:
+            pass
+        else:
+            raise AssertionError("submit to a full queue succeeded")
+        # Waiting for space succeeds once the gate job finishes
+        assert pool.submit_job("q3", _blocking_job, 0, queue_timeout=5)
+        for job_id in ("gate", "q1", "q2", "q3"):
+            assert pool.wait_for_job(job_id, timeout=5)["status"] == "completed", job_id
+    finally:
+        pool.shutdown()
+
+
+def check_shutdown():
+    from services.worker_pool import WorkerPool
+
+    ran = []
+    pool = WorkerPool(max_workers=1)
+    pool.submit_job("gate", _blocking_job, 0.1)
+    pool.submit_job("queued", ran.append, "queued")
+    assert _wait_until(lambda: pool.get_job_status("gate")["status"] == "running")
+    pool.shutdown()
+    assert pool.get_job_status("gate")["status"] == "completed"
+    assert pool.get_job_status("queued")["status"] == "cancelled"
+    assert ran == [], "queued job ran after shutdown"
+    try:
+        pool.submit_job("late", ran.append, "late")
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("submit after shutdown succeeded")
+
+
+BEHAVIOUR_CHECKS = [
+    check_submit_and_result,
+    check_worker_failure,
+    check_cancel,
+    check_timeout,
+    check_backpressure,
+    check_shutdown,
+]
+
+
+def run_checks() -> bool:
+    """Run every behaviour check; returns True when all pass."""
+    print("\nWorkerPool behaviour")
+    passed = True
+    for check in BEHAVIOUR_CHECKS:
+        try:
+            check()
+            print(f"  ok      {check.__name__}")
+        except AssertionError as e:
+            print(f"  FAILED  {check.__name__}: {e}")
+            passed = False
+    return passed
+
+
+def benchmark_throughput(worker_counts, jobs: int, job_seconds: float) -> bool:
+    """Jobs/s per worker count; returns True when throughput scales monotonically."""
+    from services.worker_pool import WorkerPool
+
+    print(f"\nWorkerPool throughput - {jobs} jobs of {job_seconds * 1000:.0f} ms")
+    print(f"{'workers':>8} {'seconds':>10} {'jobs/s':>10} {'speedup':>9} {'ideal':>7}")
+
+    baseline = None
+    previous = 0.0
+    scales = True
+    for workers in worker_counts:
+        pool = WorkerPool(max_workers=workers, max_queue_size=jobs)
+        start = time.perf_counter()
+        for i in range(jobs):
+            pool.submit_job(f"bench_{workers}_{i}", _blocking_job, job_seconds)
+        for i in range(jobs):
+            status = pool.wait_for_job(f"bench_{workers}_{i}")
+            assert status["status"] == "completed", status
+        seconds = time.perf_counter() - start
+        pool.shutdown()
+
+        throughput = jobs / seconds
+        baseline = baseline or throughput
+        ideal = min(workers, jobs) / min(worker_counts[0], jobs)
+        print(f"{workers:>8} {seconds:>10.3f} {throughput:>10.1f} {throughput / baseline:>8.2f}x {ideal:>6.0f}x")
+
+        scales = scales and throughput > previous
+        previous = throughput
+    return scales
+
+
+def benchmark_priority(jobs: int) -> bool:
+    """A single worker must start queued jobs strictly in priority order."""
+    from services.worker_pool import WorkerPool
+
+    started = []
+    pool = WorkerPool(max_workers=1, max_queue_size=jobs + 1)
+    pool.submit_job("gate", _blocking_job, 0.1)
+    for i in range(jobs):
+        pool.submit_job(f"p{i}", started.append, i, priority=jobs - i)
+    for i in range(jobs):
+        pool.wait_for_job(f"p{i}")
+    pool.shutdown()
+
+    in_order = started == list(reversed(range(jobs)))
+    print(f"\nPriority ordering with 1 worker: {'ok' if in_order else 'FAILED'}")
+    return in_order
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the TerraSim worker pool")
+    parser.add_argument("--quick", action="store_true", help="Run small problem sizes only")
+    parser.add_argument("--job-ms", type=float, default=50.0, help="Duration of each job in milliseconds")
+    parser.add_argument("--checks-only", action="store_true", help="Run the behaviour checks without benchmarking")
+    args = parser.parse_args()
+
+    if args.quick:
+        worker_counts, jobs = [1, 2, 4], 16
+    else:
+        worker_counts, jobs = [1, 2, 4, 8, 16], 64
+
+    print("=" * 70)
+    print("TERRASIM WORKER POOL BENCHMARKS")
+    print("=" * 70)
+
+    checked = run_checks()
+    ordered = benchmark_priority(jobs)
+    if args.checks_only:
+        return 0 if checked and ordered else 1
+    scales = benchmark_throughput(worker_counts, jobs, args.job_ms / 1000.0)
+    return 0 if checked and scales and ordered else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())